@@ -5,73 +5,281 @@
 提供多种方式对文本进行智能总结
 """
 
-import re
+import os
 import math
-import jieba
-import jieba.analyse
+import threading
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from sentence_splitter import iter_sentences
+
+# 自定义词典路径
+NOVEL_DICT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "novel_dict.txt")
+
+# jieba及其词典加载约需1秒，延迟到首次分词时进行，且每个进程只加载一次；
+# 其他线程在加载完成前等待，不会用到未加载自定义词典的jieba
+_jieba_ready = False
+_jieba_lock = threading.Lock()
+
+def get_jieba():
+    """导入jieba并加载自定义词典，返回jieba模块"""
+    global _jieba_ready
+    import jieba
+    import jieba.analyse
+    if not _jieba_ready:
+        with _jieba_lock:
+            if not _jieba_ready:
+                try:
+                    jieba.load_userdict(NOVEL_DICT_PATH)
+                except Exception:
+                    print("未找到自定义词典")
+                _jieba_ready = True
+    return jieba
+
+def keyword_terms(words):
+    """按关键词提取的规则过滤分词结果：去掉单字和停用词（与analyze一致）"""
+    stop_words = get_jieba().analyse.default_tfidf.stop_words
+    return [w for w in words if len(w.strip()) >= 2 and w.lower() not in stop_words]
+
+def chapter_terms(text):
+    """章节正文分词并过滤，用于导入书籍级IDF索引（可在工作进程中调用）"""
+    return keyword_terms(get_jieba().cut(text))
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# TextRank参数
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 30
+TEXTRANK_TOLERANCE = 1e-6
+# 相似度矩阵只使用权重最高的若干词；句子过多时退化为线性的关键词打分
+TEXTRANK_MAX_TERMS = 1000
+TEXTRANK_MAX_SENTENCES = 2000
+
+# 批量总结时每个工作进程内复用的总结器
+_worker_summarizer = None
+
+def _init_summary_worker(idf_index=None):
+    """工作进程初始化：加载一次jieba词典并创建总结器"""
+    global _worker_summarizer
+    get_jieba()
+    _worker_summarizer = TextSummarizer(idf_index=idf_index)
+
+def _summarize_in_worker(text, max_ratio, max_sentences):
+    """在工作进程中总结单个章节"""
+    if _worker_summarizer is None:
+        _init_summary_worker()
+    return _worker_summarizer.summarize(text, max_ratio=max_ratio, max_sentences=max_sentences)
+
+class TextAnalysis:
+    """一次分词得到的文本分析结果，供关键词提取和句子排序共用"""
+    
+    def __init__(self, sentences, sentence_terms, keywords, spans=None):
+        """
+        Args:
+            sentences: 分句列表
+            sentence_terms: 每个句子中的有效词（已过滤单字和停用词）
+            keywords: 全文TF-IDF关键词 [(词, 权重)]，按权重降序
+            spans: 每个句子在原文中的 (起始偏移, 结束偏移)，用于高亮
+        """
+        self.sentences = sentences
+        self.sentence_terms = sentence_terms
+        self.keywords = keywords
+        self.spans = spans or []
 
 class TextSummarizer:
     """文本总结类，提供多种总结方法"""
     
-    def __init__(self):
-        """初始化"""
-        # 加载jieba自定义词典
-        try:
-            jieba.load_userdict("novel_dict.txt")
-        except:
-            print("未找到自定义词典")
+    def __init__(self, idf_index=None):
+        """初始化（jieba词典在首次分词时加载）
+        
+        Args:
+            idf_index: 书籍级IDF索引（corpus_idf.BookIDFIndex），
+                章节足够多时替代jieba通用IDF表
+        """
+        self.idf_index = idf_index
     
     def extract_keywords(self, text, topK=10):
-        """提取关键词"""
+        """提取关键词（书籍级IDF索引可用时按全书IDF计算权重）"""
+        if self.idf_index is not None and self.idf_index.ready:
+            return self.analyze(text).keywords[:topK]
+        jieba = get_jieba()
         keywords = jieba.analyse.extract_tags(text, topK=topK, withWeight=True)
         return keywords
     
-    def get_important_sentences(self, text, topK=3):
-        """获取最重要的几个句子"""
-        # 分句
-        text = re.sub(r'([。！？\?])([^"'])', r'\1\n\2', text)
-        text = re.sub(r'(\.{6})([^"'])', r'\1\n\2', text)
-        text = re.sub(r'(\…{2})([^"'])', r'\1\n\2', text)
-        text = re.sub(r'([。！？\?]["'])([^，。！？\?])', r'\1\n\2', text)
+    def split_sentences(self, text):
+        """分句"""
+        return [sentence for sentence, _, _ in iter_sentences(text)]
+    
+    def analyze(self, text):
+        """分句并对全文只分词一次，计算TF-IDF关键词权重
         
-        sentences = text.split('\n')
-        sentences = [s.strip() for s in sentences if s.strip()]
+        词语过滤规则和权重计算与jieba.analyse.extract_tags一致
         
-        if len(sentences) <= topK:
-            return sentences
+        Args:
+            text: 原文
+            
+        Returns:
+            TextAnalysis
+        """
+        jieba = get_jieba()
+        tfidf = jieba.analyse.default_tfidf
+        stop_words = tfidf.stop_words
+        
+        sentences = []
+        spans = []
+        for sentence, start, end in iter_sentences(text):
+            sentences.append(sentence)
+            spans.append((start, end))
+        sentence_terms = []
+        term_freq = defaultdict(float)
+        for sentence in sentences:
+            terms = [w for w in jieba.cut(sentence)
+                     if len(w.strip()) >= 2 and w.lower() not in stop_words]
+            sentence_terms.append(terms)
+            for term in terms:
+                term_freq[term] += 1.0
+        
+        total = sum(term_freq.values()) or 1.0
+        if self.idf_index is not None and self.idf_index.ready:
+            # 使用书籍级IDF
+            idf = self.idf_index.idf
+            weights = {term: freq * idf(term) / total for term, freq in term_freq.items()}
+        else:
+            # 未登录词的IDF取中位数
+            idf_freq, median_idf = tfidf.idf_freq, tfidf.median_idf
+            weights = {term: freq * idf_freq.get(term, median_idf) / total
+                       for term, freq in term_freq.items()}
+        keywords = sorted(weights.items(), key=lambda item: item[1], reverse=True)
+        return TextAnalysis(sentences, sentence_terms, keywords, spans)
+    
+    def add_chapter(self, chapter_id, text):
+        """将章节导入书籍级IDF索引
         
-        # 提取关键词
-        keywords_dict = {}
-        keywords = self.extract_keywords(text, topK=20)
-        for word, weight in keywords:
-            keywords_dict[word] = weight
-        
-        # 计算句子得分
-        sentence_scores = []
-        for i, sentence in enumerate(sentences):
-            score = 0
-            for word in jieba.cut(sentence):
-                if word in keywords_dict:
-                    score += keywords_dict[word]
+        Args:
+            chapter_id: 章节唯一标识
+            text: 章节正文
             
-            # 考虑句子位置因素
-            # 开头和结尾的句子权重略高
-            position_weight = 1.0
-            if i < len(sentences) * 0.1 or i > len(sentences) * 0.9:
-                position_weight = 1.2
+        Returns:
+            本章的TextAnalysis，可直接用于rank_sentences，避免重复分词
+        """
+        analysis = self.analyze(text)
+        if self.idf_index is not None:
+            self.idf_index.add_chapter(
+                chapter_id, [term for terms in analysis.sentence_terms for term in terms])
+        return analysis
+    
+    def index_chapters(self, chapters, workers=None):
+        """把多个章节导入书籍级IDF索引，分词交给进程池并行
+        
+        整本书总结前先导入全部章节，之后每章的关键词都按全书IDF计算
+        
+        Args:
+            chapters: [(章节ID, 正文)]
+            workers: 进程数，默认为CPU核数；为1时在当前进程内顺序处理
+            
+        Returns:
+            新导入的章节数
+        """
+        if self.idf_index is None:
+            return 0
+        chapters = [(chapter_id, text) for chapter_id, text in chapters
+                    if str(chapter_id) not in self.idf_index.chapter_terms]
+        texts = [text for _, text in chapters]
+        workers = min(workers or os.cpu_count() or 1, len(texts))
+        if workers <= 1:
+            terms_list = [chapter_terms(text) for text in texts]
+        else:
+            chunksize = max(1, len(texts) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=get_jieba) as executor:
+                terms_list = list(executor.map(chapter_terms, texts, chunksize=chunksize))
+        return sum(self.idf_index.add_chapter(chapter_id, terms)
+                   for (chapter_id, _), terms in zip(chapters, terms_list))
+    
+    def rank_sentences(self, analysis, topK=3, keyword_count=20):
+        """选出最重要的句子
+        
+        以句子TF-IDF向量的余弦相似度构图做TextRank，随机跳转概率按句子
+        包含的关键词权重分配，兼顾句子的中心性与关键词覆盖；开头和结尾的
+        句子权重略高。没有NumPy时退化为关键词权重求和。
+        
+        Args:
+            analysis: analyze()的结果
+            topK: 返回的句子数
+            keyword_count: 参与打分的关键词数
             
-            score = score * position_weight
-            sentence_scores.append((i, sentence, score))
+        Returns:
+            按原文顺序排列的句子列表
+        """
+        sentences = analysis.sentences
+        if len(sentences) <= topK:
+            return sentences
+        
+        keyword_weights = dict(analysis.keywords[:keyword_count])
+        keyword_scores = [sum(keyword_weights.get(t, 0.0) for t in terms)
+                          for terms in analysis.sentence_terms]
+        
+        if NUMPY_AVAILABLE and len(sentences) <= TEXTRANK_MAX_SENTENCES:
+            scores = self._textrank_scores(analysis, keyword_scores)
+        else:
+            scores = keyword_scores
         
-        # 按得分排序
-        sentence_scores.sort(key=lambda x: x[2], reverse=True)
+        # 考虑句子位置因素：开头和结尾的句子权重略高
+        count = len(sentences)
+        ranked = []
+        for i, score in enumerate(scores):
+            position_weight = 1.2 if i < count * 0.1 or i > count * 0.9 else 1.0
+            ranked.append((score * position_weight, i))
         
-        # 取出得分最高的topK个句子，并按原文顺序排列
-        top_sentences = sentence_scores[:topK]
-        top_sentences.sort(key=lambda x: x[0])
+        # 得分相同时保留靠前的句子，保证结果稳定
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        top_indexes = sorted(i for _, i in ranked[:topK])
+        return [sentences[i] for i in top_indexes]
+    
+    def _textrank_scores(self, analysis, keyword_scores):
+        """计算带关键词偏置的TextRank得分"""
+        top_terms = analysis.keywords[:TEXTRANK_MAX_TERMS]
+        vocabulary = {term: index for index, (term, _) in enumerate(top_terms)}
+        weights = np.array([weight for _, weight in top_terms], dtype=float)
+        count = len(analysis.sentences)
+        
+        # 句子-词语TF-IDF矩阵
+        matrix = np.zeros((count, len(vocabulary)), dtype=float)
+        for row, terms in enumerate(analysis.sentence_terms):
+            for term in terms:
+                index = vocabulary.get(term)
+                if index is not None:
+                    matrix[row, index] += 1.0
+        matrix *= weights
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+        
+        # 余弦相似度图，按行归一化为转移矩阵
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0.0)
+        out_weight = similarity.sum(axis=1, keepdims=True)
+        transition = np.divide(similarity, out_weight,
+                               out=np.full_like(similarity, 1.0 / count), where=out_weight > 0)
         
-        return [s[1] for s in top_sentences]
+        # 随机跳转向量按关键词得分分配
+        teleport = np.asarray(keyword_scores, dtype=float) + 1e-9
+        teleport /= teleport.sum()
+        
+        scores = np.full(count, 1.0 / count)
+        for _ in range(TEXTRANK_ITERATIONS):
+            updated = (1 - TEXTRANK_DAMPING) * teleport + TEXTRANK_DAMPING * (transition.T @ scores)
+            converged = np.abs(updated - scores).sum() < TEXTRANK_TOLERANCE
+            scores = updated
+            if converged:
+                break
+        return scores.tolist()
+    
+    def get_important_sentences(self, text, topK=3):
+        """获取最重要的几个句子"""
+        return self.rank_sentences(self.analyze(text), topK=topK)
     
     def summarize(self, text, max_ratio=0.3, max_sentences=5):
         """总结文本"""
@@ -82,16 +290,16 @@ class TextSummarizer:
         if len(text) < 200:
             return {"summary": text, "keywords": [], "ratio": 1.0}
         
-        # 2. 提取关键词
-        keywords = self.extract_keywords(text, topK=8)
-        keyword_list = [word for word, _ in keywords]
+        # 2. 分句并分词（只进行一次），提取关键词
+        analysis = self.analyze(text)
+        keyword_list = [word for word, _ in analysis.keywords[:8]]
         
         # 3. 提取重要句子
         max_num_sentences = min(max_sentences, int(len(text) / 100))
         if max_num_sentences < 3:
             max_num_sentences = 3
             
-        important_sentences = self.get_important_sentences(text, topK=max_num_sentences)
+        important_sentences = self.rank_sentences(analysis, topK=max_num_sentences)
         
         # 4. 生成总结
         summary = "【内容概要】\n\n"
@@ -111,6 +319,36 @@ class TextSummarizer:
         
         return summary_info
 
+    def summarize_batch(self, texts, workers=None, max_ratio=0.3, max_sentences=5):
+        """批量总结多个章节
+        
+        jieba分词只能使用单核，整本书总结时按章节分发到进程池并行处理，
+        每个工作进程只加载一次词典。分词和排序都是确定性的，结果与逐章
+        调用summarize一致。
+        
+        Args:
+            texts: 章节正文列表
+            workers: 进程数，默认为CPU核数；为1时在当前进程内顺序处理
+            max_ratio: 同summarize
+            max_sentences: 同summarize
+            
+        Returns:
+            与输入顺序一致的总结结果列表
+        """
+        texts = list(texts)
+        workers = min(workers or os.cpu_count() or 1, len(texts))
+        if workers <= 1:
+            return [self.summarize(text, max_ratio=max_ratio, max_sentences=max_sentences)
+                    for text in texts]
+        
+        # 每个进程分到若干批，兼顾负载均衡和进程间通信开销
+        chunksize = max(1, len(texts) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_summary_worker,
+                                 initargs=(self.idf_index,)) as executor:
+            return list(executor.map(_summarize_in_worker, texts,
+                                     [max_ratio] * len(texts), [max_sentences] * len(texts),
+                                     chunksize=chunksize))
+
     def chapter_analysis(self, chapter_text, chapter_title=""):
         """分析小说章节"""
         # 检测章节标题
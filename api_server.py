@@ -0,0 +1,835 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地API服务
+把网页提取、MHTML提取、OCR和总结作为HTTP/JSON接口提供给其他工具使用。
+asyncio处理连接，每个处理阶段有独立的工作池（CPU密集的阶段使用进程池，
+等待网络的阶段使用线程池），结果按内容哈希缓存，相同的并发请求只计算一次，
+并为每个接口记录延迟直方图
+
+接口:
+    POST /v1/extract    {"url": ..., "html": ...}          网页提取（未给出html时下载url）
+    POST /v1/mhtml      MHTML文件内容，或 {"path": ...}     MHTML提取（path需要--allow-local-files）
+    POST /v1/ocr        图片内容，或 {"url"/"image": ...}   图片文字识别（转发到OCR服务）
+    POST /v1/summarize  {"text": ..., "method": "rule"/"ai", "model": ..., "context": ...}
+    GET  /v1/status     工作池、缓存和各接口的延迟直方图
+
+请求头X-Request-Id（未提供时自动生成）原样写入响应头和响应体的request_id
+
+用法:
+    python api_server.py --port 8766 [--workers extract=8 --workers ai=4]
+        curl -d '{"url": "https://..."}' http://127.0.0.1:8766/v1/extract
+        curl --data-binary @chapter.mhtml http://127.0.0.1:8766/v1/mhtml
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import base64
+import asyncio
+import hashlib
+import logging
+import argparse
+import tempfile
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlparse
+
+from bulk_ingest import to_record
+
+logger = logging.getLogger(__name__)
+
+# 延迟直方图的桶上界（毫秒），最后一个桶收集更慢的请求
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+# CPU密集的阶段使用进程池，其余阶段使用线程池
+PROCESS_STAGES = ('extract', 'mhtml', 'summarize')
+
+# 各阶段默认的工作者数
+DEFAULT_STAGE_WORKERS = {
+    'fetch': 16,
+    'extract': os.cpu_count() or 1,
+    'mhtml': os.cpu_count() or 1,
+    'summarize': os.cpu_count() or 1,
+    'ocr': 4,
+    'ai': 4,
+}
+
+# 每个阶段在工作者全忙时最多排队的任务数，超过后返回503
+DEFAULT_MAX_PENDING = 256
+
+# 单个阶段任务的超时（秒）
+DEFAULT_STAGE_TIMEOUT = 120
+
+# 结果缓存的条目数和有效期（秒）
+DEFAULT_CACHE_ENTRIES = 1024
+DEFAULT_CACHE_TTL = 600
+
+# 请求体上限（字节）
+DEFAULT_MAX_BODY = 64 * 1024 * 1024
+
+# 请求头的最大数量
+MAX_HEADERS = 100
+
+# 可接受的客户端请求ID
+_REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+# 规则总结的参数（与TextSummarizer.summarize的默认值一致）
+SUMMARY_MAX_RATIO = 0.3
+SUMMARY_MAX_SENTENCES = 5
+
+# 每个工作进程/线程内复用的提取器
+_web_extractor = None
+_mhtml_extractor = None
+
+
+class APIError(Exception):
+    """带HTTP状态码的请求错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+    def __reduce__(self):
+        # 在工作进程中抛出时需要跨进程传回
+        return APIError, (self.status, self.message)
+
+
+def is_url(value):
+    return isinstance(value, str) and value.startswith(('http://', 'https://'))
+
+
+def digest(*parts):
+    """计算缓存键：各部分（字符串或字节）按长度前缀拼接后的SHA-256"""
+    h = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode('utf-8')
+        h.update(len(data).to_bytes(8, 'big'))
+        h.update(data)
+    return h.hexdigest()
+
+
+# ---- 工作池中执行的函数（进程池要求定义在模块顶层） ----
+
+def extract_html(html, url=None):
+    """提取网页正文，返回可写入JSON的记录"""
+    global _web_extractor
+    if _web_extractor is None:
+        from web_extractor import WebExtractor
+        _web_extractor = WebExtractor()
+    result = _web_extractor.extract_content(html, url)
+    if not result or not result.get('text'):
+        raise APIError(422, "未提取到内容")
+    return to_record(result)
+
+
+def extract_mhtml(path):
+    """提取MHTML文件，返回可写入JSON的记录"""
+    global _mhtml_extractor
+    if _mhtml_extractor is None:
+        from mhtml_extractor import MHTMLExtractor
+        _mhtml_extractor = MHTMLExtractor()
+    result = _mhtml_extractor.extract_content(path)
+    if not result or not result.get('text'):
+        raise APIError(422, "未提取到内容")
+    return to_record(result)
+
+
+def extract_mhtml_bytes(data):
+    """提取上传的MHTML内容（写入临时文件后按文件提取）"""
+    fd, path = tempfile.mkstemp(suffix='.mhtml')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        record = extract_mhtml(path)
+    finally:
+        os.remove(path)
+    # 临时文件名对调用方没有意义
+    record['source'] = ''
+    if record.get('title') == os.path.basename(path).replace('.mhtml', ''):
+        record['title'] = ''
+    return record
+
+
+def summarize_text(text):
+    """规则总结"""
+    from ai_summary import _summarize_in_worker
+    return _summarize_in_worker(text, SUMMARY_MAX_RATIO, SUMMARY_MAX_SENTENCES)
+
+
+def download(url, timeout=15):
+    """下载图片等二进制资源"""
+    import requests
+    from web_extractor import WebExtractor
+    response = requests.get(url, headers=WebExtractor().headers, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+# ---- 统计 ----
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图，分位数在桶内线性插值估算"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """估算q分位数（0 < q <= 1）的延迟毫秒数"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max_ms
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max_ms)
+            seen += count
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50': round(self.percentile(0.5), 3),
+            'p90': round(self.percentile(0.9), 3),
+            'p99': round(self.percentile(0.99), 3),
+            'max': round(self.max_ms, 3),
+            # [桶上界, 个数]，上界为None的桶收集超过最大上界的请求
+            'buckets': [[upper, count] for upper, count in zip(self.buckets + (None,), self.counts)],
+        }
+
+
+class ResultCache:
+    """按键缓存成功结果的LRU缓存，条目超过有效期后失效"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES, ttl=DEFAULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and (self.ttl is None or entry[0] > time.monotonic()):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class StagePool:
+    """一个处理阶段的工作池：限制排队长度，统计任务数和耗时"""
+
+    def __init__(self, name, workers, processes=False, max_pending=DEFAULT_MAX_PENDING,
+                 timeout=DEFAULT_STAGE_TIMEOUT):
+        self.name = name
+        self.workers = max(1, workers)
+        self.processes = processes
+        self.max_pending = max_pending
+        self.timeout = timeout
+        if processes:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"api-{name}")
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.latency = LatencyHistogram()
+
+    async def run(self, func, *args):
+        """在工作池中执行func(*args)，返回结果
+
+        Raises:
+            APIError: 排队已满（503）或超时（504）；func抛出的APIError原样传出
+        """
+        if self.active >= self.workers + self.max_pending:
+            self.rejected += 1
+            raise APIError(503, f"{self.name}阶段繁忙，请稍后重试")
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        # 超时只是不再等待，已开始的任务仍占用工作线程/进程，直到任务结束才释放名额
+        future = self.executor.submit(func, *args)
+        self.active += 1
+        future.add_done_callback(lambda _: self._release(loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.failed += 1
+            raise APIError(504, f"{self.name}阶段超时")
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.completed += 1
+            self.latency.observe((time.perf_counter() - start) * 1000)
+
+    def _release(self, loop):
+        """任务结束（或排队时被取消）后在事件循环线程中释放名额"""
+        try:
+            loop.call_soon_threadsafe(self._decrement_active)
+        except RuntimeError:
+            # 事件循环已关闭（服务停止时取消排队的任务）
+            self._decrement_active()
+
+    def _decrement_active(self):
+        self.active -= 1
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'kind': 'process' if self.processes else 'thread',
+            'active': self.active,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'latency_ms': self.latency.to_dict(),
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ---- HTTP ----
+
+class Request:
+    """解析后的HTTP请求"""
+
+    def __init__(self, method, target, version, headers, body):
+        self.method = method
+        parsed = urlparse(target)
+        self.path = parsed.path
+        self.query = parsed.query
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    @property
+    def is_json(self):
+        return self.headers.get('content-type', '').split(';')[0].strip().lower() == 'application/json' \
+            or self.body[:1] == b'{'
+
+    def json(self):
+        """请求体解析为JSON对象"""
+        try:
+            data = json.loads(self.body or b'{}')
+        except ValueError:
+            raise APIError(400, "请求体不是有效的JSON")
+        if not isinstance(data, dict):
+            raise APIError(400, "请求体不是有效的JSON")
+        return data
+
+
+async def read_request(reader, max_body=DEFAULT_MAX_BODY):
+    """从连接读取一个请求，连接关闭时返回None
+
+    Raises:
+        APIError: 请求格式错误
+    """
+    try:
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            raise APIError(400, "请求行无效")
+        method, target, version = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise APIError(431, "请求头过多")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+    except ValueError:
+        # 单行超过StreamReader的缓冲上限
+        raise APIError(431, "请求头过长")
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise APIError(411, "需要Content-Length")
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise APIError(400, "Content-Length无效")
+    if length < 0 or length > max_body:
+        raise APIError(413, "请求体过大")
+    body = await reader.readexactly(length) if length else b''
+    return Request(method.upper(), target, version, headers, body)
+
+
+def encode_response(status, payload, request_id, keep_alive=True):
+    """编码JSON响应"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"X-Request-Id: {request_id}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + body
+
+
+def request_id_of(request=None):
+    """客户端提供的请求ID，缺失或格式不合法时生成新的ID"""
+    request_id = request.headers.get('x-request-id', '') if request is not None else ''
+    return request_id if _REQUEST_ID_RE.match(request_id) else uuid.uuid4().hex
+
+
+# ---- 服务 ----
+
+class APIServer:
+    """API服务：路由、各阶段工作池、结果缓存和延迟统计"""
+
+    def __init__(self, workers=None, use_processes=True, max_pending=DEFAULT_MAX_PENDING,
+                 stage_timeout=DEFAULT_STAGE_TIMEOUT, cache_entries=DEFAULT_CACHE_ENTRIES,
+                 cache_ttl=DEFAULT_CACHE_TTL, ocr_url=None, allow_local_files=False,
+                 max_body=DEFAULT_MAX_BODY):
+        """初始化服务
+
+        Args:
+            workers: {阶段名: 工作者数}，覆盖DEFAULT_STAGE_WORKERS中的对应项
+            use_processes: CPU密集的阶段是否使用进程池（False时全部使用线程池）
+            max_pending: 每个阶段在工作者全忙时最多排队的任务数
+            stage_timeout: 单个阶段任务的超时秒数
+            cache_entries: 结果缓存条目数，0表示不缓存
+            cache_ttl: 缓存有效期（秒），None表示不过期
+            ocr_url: OCR服务地址，默认使用OCR客户端的默认地址
+            allow_local_files: 是否允许/v1/mhtml按服务器本地路径读取文件
+            max_body: 请求体上限（字节）
+        """
+        stage_workers = dict(DEFAULT_STAGE_WORKERS, **(workers or {}))
+        self.pools = {
+            name: StagePool(name, count, use_processes and name in PROCESS_STAGES, max_pending, stage_timeout)
+            for name, count in stage_workers.items()
+        }
+        self.cache = ResultCache(cache_entries, cache_ttl)
+        self.ocr_url = ocr_url
+        self.allow_local_files = allow_local_files
+        self.max_body = max_body
+        self.started = time.time()
+        self.latency = defaultdict(LatencyHistogram)
+        self.statuses = defaultdict(Counter)
+        self._inflight = {}
+        self._models = {}
+        self._web_extractor = None
+        self._ocr_client = None
+        self._client_lock = threading.Lock()
+        self.routes = {
+            '/v1/extract': ('POST', self.handle_extract),
+            '/v1/mhtml': ('POST', self.handle_mhtml),
+            '/v1/ocr': ('POST', self.handle_ocr),
+            '/v1/summarize': ('POST', self.handle_summarize),
+            '/v1/status': ('GET', self.handle_status),
+        }
+
+    @property
+    def web_extractor(self):
+        with self._client_lock:
+            if self._web_extractor is None:
+                from web_extractor import WebExtractor
+                self._web_extractor = WebExtractor()
+            return self._web_extractor
+
+    @property
+    def ocr_client(self):
+        with self._client_lock:
+            if self._ocr_client is None:
+                from ocr_client import OCRClient, DEFAULT_OCR_URL
+                self._ocr_client = OCRClient(self.ocr_url or DEFAULT_OCR_URL,
+                                             max_workers=self.pools['ocr'].workers)
+            return self._ocr_client
+
+    async def start(self, host='127.0.0.1', port=8766):
+        """开始监听，返回asyncio.Server"""
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def serve_forever(self, host='127.0.0.1', port=8766):
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"API服务已启动: http://{address[0]}:{address[1]}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, self.max_body)
+                except APIError as e:
+                    writer.write(encode_response(e.status, {'status': 'error', 'error': e.message},
+                                                 request_id_of(), keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                status, payload = await self.handle(request)
+                writer.write(encode_response(status, payload, payload['request_id'], request.keep_alive))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # 服务关闭时取消空闲连接；不再向上传播，避免asyncio报告回调异常
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handle(self, request):
+        """处理一个请求，返回 (状态码, 响应对象)"""
+        request_id = request_id_of(request)
+        start = time.perf_counter()
+        route = self.routes.get(request.path)
+        if route is None:
+            status, payload = 404, {'status': 'error', 'error': 'not found'}
+        elif request.method != route[0]:
+            status, payload = 405, {'status': 'error', 'error': 'method not allowed'}
+        else:
+            try:
+                status, payload = 200, await route[1](request)
+            except APIError as e:
+                status, payload = e.status, {'status': 'error', 'error': e.message}
+            except Exception as e:
+                logger.exception(f"[{request_id}] 处理 {request.path} 时出错")
+                status, payload = 500, {'status': 'error', 'error': str(e) or type(e).__name__}
+
+        payload['request_id'] = request_id
+        endpoint = f"{request.method} {request.path}" if route is not None else 'other'
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.latency[endpoint].observe(elapsed_ms)
+        self.statuses[endpoint][status] += 1
+        logger.debug(f"[{request_id}] {request.method} {request.path} {status} {elapsed_ms:.1f}ms")
+        return status, payload
+
+    async def _cached(self, key, compute):
+        """先查缓存；相同键的并发请求共享同一次计算
+
+        Returns:
+            (结果, 是否来自缓存或共享的计算)
+        """
+        value = self.cache.get(key)
+        if value is not None:
+            return value, True
+        shared = self._inflight.get(key)
+        if shared is not None:
+            return await asyncio.shield(shared), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # 没有共享请求等待时避免“异常未被获取”的警告
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(value)
+        self.cache.put(key, value)
+        return value, False
+
+    # ---- 接口 ----
+
+    async def handle_extract(self, request):
+        data = request.json()
+        url, html = data.get('url'), data.get('html')
+        if html is not None and not isinstance(html, str):
+            raise APIError(400, "html必须是字符串")
+        if url is not None and not isinstance(url, str):
+            raise APIError(400, "url必须是字符串")
+        if not html and not is_url(url):
+            raise APIError(400, "缺少html或有效的url")
+
+        async def compute():
+            page = html
+            if not page:
+                page = await self.pools['fetch'].run(self.web_extractor.fetch_url, url)
+                if not page:
+                    raise APIError(502, "下载失败")
+            return await self.pools['extract'].run(extract_html, page, url)
+
+        key = digest('extract', url or '', html) if html else digest('extract:url', url)
+        content, cached = await self._cached(key, compute)
+        return {'status': 'success', 'cached': cached, 'content': content}
+
+    async def handle_mhtml(self, request):
+        if request.is_json:
+            path = request.json().get('path')
+            if not isinstance(path, str) or not path:
+                raise APIError(400, "缺少path或MHTML文件内容")
+            if not self.allow_local_files:
+                raise APIError(403, "服务未允许读取本地文件，请上传文件内容")
+            if not os.path.isfile(path):
+                raise APIError(404, f"文件不存在: {path}")
+            stat = os.stat(path)
+            key = digest('mhtml:path', os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+            compute = lambda: self.pools['mhtml'].run(extract_mhtml, path)
+        else:
+            if not request.body:
+                raise APIError(400, "缺少path或MHTML文件内容")
+            key = digest('mhtml', request.body)
+            compute = lambda: self.pools['mhtml'].run(extract_mhtml_bytes, request.body)
+        content, cached = await self._cached(key, compute)
+        return {'status': 'success', 'cached': cached, 'content': content}
+
+    async def handle_ocr(self, request):
+        if request.is_json:
+            data = request.json()
+            if data.get('image'):
+                try:
+                    image = base64.b64decode(data['image'], validate=True)
+                except (ValueError, TypeError):
+                    raise APIError(400, "image不是有效的base64")
+            elif is_url(data.get('url')):
+                try:
+                    image = await self.pools['fetch'].run(download, data['url'])
+                except APIError:
+                    raise
+                except Exception as e:
+                    raise APIError(502, f"下载图片失败: {e}")
+            else:
+                raise APIError(400, "缺少图片内容、image或url")
+        else:
+            image = request.body
+        if not image:
+            raise APIError(400, "缺少图片内容、image或url")
+
+        async def compute():
+            from ocr_client import OCRClient
+            result = await self.pools['ocr'].run(self.ocr_client.recognize, image)
+            if result is None:
+                raise APIError(502, "OCR服务不可用或识别失败")
+            return {'text': OCRClient.parse_result(result)}
+
+        content, cached = await self._cached(digest('ocr', image), compute)
+        return {'status': 'success', 'cached': cached, 'content': content}
+
+    async def _get_model(self, name):
+        """按名称获取AI模型配置（配置文件只读取一次）"""
+        name = name or ''
+        if name not in self._models:
+            from novel_reader_cli import load_ai_model
+            try:
+                self._models[name] = await self.pools['ai'].run(load_ai_model, name or None)
+            except ValueError as e:
+                raise APIError(400, str(e))
+            except ImportError as e:
+                raise APIError(503, f"AI功能不可用: {e}")
+        return self._models[name]
+
+    async def handle_summarize(self, request):
+        data = request.json()
+        text, method, context = data.get('text'), data.get('method', 'rule'), data.get('context')
+        if not isinstance(text, str) or not text.strip():
+            raise APIError(400, "缺少text")
+        if method not in ('rule', 'ai'):
+            raise APIError(400, "method必须是rule或ai")
+        if context is not None and not isinstance(context, str):
+            raise APIError(400, "context必须是字符串")
+
+        if method == 'rule':
+            key = digest('summarize:rule', text)
+            compute = lambda: self.pools['summarize'].run(summarize_text, text)
+        else:
+            model = await self._get_model(data.get('model'))
+
+            async def compute():
+                from config.ai_client import AIModelManager
+                response = await self.pools['ai'].run(AIModelManager.generate_summary, model, text, 500, context)
+                if not response.success:
+                    raise APIError(502, response.error_message or "AI总结失败")
+                return {'summary': response.content, 'model': model.name, 'usage': response.usage}
+
+            key = digest('summarize:ai', model.id, context or '', text)
+        content, cached = await self._cached(key, compute)
+        return {'status': 'success', 'cached': cached, 'content': content}
+
+    async def handle_status(self, request):
+        return self.stats()
+
+    def stats(self):
+        return {
+            'status': 'success',
+            'uptime_s': round(time.time() - self.started, 1),
+            'stages': {name: pool.stats() for name, pool in self.pools.items()},
+            'cache': self.cache.stats(),
+            'endpoints': {
+                endpoint: {
+                    'statuses': {str(status): count for status, count in sorted(self.statuses[endpoint].items())},
+                    'latency_ms': histogram.to_dict(),
+                }
+                for endpoint, histogram in sorted(self.latency.items())
+            },
+        }
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+        if self._ocr_client is not None:
+            self._ocr_client.close()
+
+
+class BackgroundServer:
+    """在后台线程的事件循环中运行APIServer（测试和基准测试使用）"""
+
+    def __init__(self, api, host='127.0.0.1', port=0):
+        self.api = api
+        self.host = host
+        self.port = None
+        self.loop = asyncio.new_event_loop()
+        self._server = None
+        self._error = None
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(port, ready), daemon=True)
+        self.thread.start()
+        ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _run(self, port, ready):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._server = self.loop.run_until_complete(self.api.start(self.host, port))
+            self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self._error = e
+            ready.set()
+            return
+        ready.set()
+        self.loop.run_forever()
+
+        self._server.close()
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+    def stop(self):
+        if self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+        self.api.close()
+
+
+def _parse_workers(values):
+    """解析 --workers 阶段=数量"""
+    workers = {}
+    for value in values or ():
+        name, _, count = value.partition('=')
+        if name not in DEFAULT_STAGE_WORKERS or not count.isdigit() or int(count) < 1:
+            raise argparse.ArgumentTypeError(
+                f"无效的工作者设置: {value}（阶段: {', '.join(DEFAULT_STAGE_WORKERS)}）")
+        workers[name] = int(count)
+    return workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="小说阅读器本地API服务（提取、OCR、总结）")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址")
+    parser.add_argument('--port', type=int, default=8766, help="监听端口")
+    parser.add_argument('--workers', action='append', metavar='阶段=数量',
+                        help=f"各阶段的工作者数，可重复（阶段: {', '.join(DEFAULT_STAGE_WORKERS)}）")
+    parser.add_argument('--threads-only', action='store_true', help="所有阶段都使用线程池")
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING, help="每个阶段的最大排队任务数")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_STAGE_TIMEOUT, help="单个阶段任务的超时秒数")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_ENTRIES, help="结果缓存条目数，0表示不缓存")
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_CACHE_TTL, help="缓存有效期（秒）")
+    parser.add_argument('--ocr-url', help="OCR服务地址（默认使用OCR客户端的默认地址）")
+    parser.add_argument('--allow-local-files', action='store_true', help="允许/v1/mhtml按服务器本地路径读取文件")
+    parser.add_argument('--log-requests', action='store_true', help="记录每个请求的ID、状态和耗时")
+    args = parser.parse_args(argv)
+
+    try:
+        workers = _parse_workers(args.workers)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s %(levelname)s %(message)s')
+    if args.log_requests:
+        logger.setLevel(logging.DEBUG)
+
+    api = APIServer(workers, use_processes=not args.threads_only, max_pending=args.max_pending,
+                    stage_timeout=args.timeout, cache_entries=args.cache_size, cache_ttl=args.cache_ttl,
+                    ocr_url=args.ocr_url, allow_local_files=args.allow_local_files)
+    try:
+        asyncio.run(api.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        print("已停止", file=sys.stderr)
+    except OSError as e:
+        print(f"无法启动服务: {e}", file=sys.stderr)
+        return 1
+    finally:
+        api.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API服务负载测试
+若干并发客户端通过长连接向本地API服务发送提取和规则总结请求，
+部分请求重复以覆盖缓存命中，报告吞吐量、客户端测得的延迟分位数，
+以及服务端各接口的延迟直方图和缓存命中率
+
+默认在本进程内启动服务；--url指定时压测已运行的服务
+
+用法:
+    python benchmarks/bench_api_server.py [--requests 400] [--concurrency 16] [--repeat 0.5]
+    python benchmarks/bench_api_server.py --url http://127.0.0.1:8766
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+from urllib.parse import urlparse
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_server import APIServer, BackgroundServer
+from bench_summarize_batch import build_chapters
+
+
+def chapter_page(number, text):
+    """把章节正文包装成小说网站的章节页面"""
+    paragraphs = "".join(f"<p>{line}</p>" for line in text.split("\n")[1:])
+    return (f"<html><head><meta charset='utf-8'><title>第{number}章</title></head><body>"
+            f"<h1>第{number}章</h1><div id='content'>{paragraphs}</div>"
+            f"<div class='footer'>本站推荐</div></body></html>")
+
+
+def build_workload(count, repeat, seed=0):
+    """生成请求列表 [(路径, 请求体)]：提取和总结各占一半，repeat比例的请求重复之前的内容"""
+    rng = random.Random(seed)
+    chapters = build_chapters(max(1, int(count * (1 - repeat)) + 1), paragraphs_per_chapter=60)
+    # 每章加上序号，保证不重复的请求内容确实不同
+    chapters = [f"{text}\n第{i + 1}章完。" for i, text in enumerate(chapters)]
+    workload = []
+    # 每个接口分别计数已发送过的内容，重复请求只会选到本接口发送过的内容
+    fresh = {'/v1/extract': 0, '/v1/summarize': 0}
+    for i in range(count):
+        path = '/v1/extract' if i % 2 == 0 else '/v1/summarize'
+        if fresh[path] and rng.random() < repeat:
+            index = rng.randrange(fresh[path])
+        else:
+            index = fresh[path] % len(chapters)
+            fresh[path] += 1
+        if path == '/v1/extract':
+            workload.append((path, {'html': chapter_page(index + 1, chapters[index]),
+                                    'url': f"https://book.example.com/chapter/{index + 1}"}))
+        else:
+            workload.append((path, {'text': chapters[index]}))
+    return workload
+
+
+async def _send(reader, writer, host, path, payload):
+    """在长连接上发送一个请求，返回 (状态码, 响应体)"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, queue, results):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while not queue.empty():
+            path, payload = queue.get_nowait()
+            start = time.perf_counter()
+            status, _ = await _send(reader, writer, host, path, payload)
+            results.append((path, status, (time.perf_counter() - start) * 1000))
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(host, port, workload, concurrency):
+    """并发发送全部请求，返回 ([(路径, 状态码, 耗时毫秒)], 总耗时秒)"""
+    queue = asyncio.Queue()
+    for item in workload:
+        queue.put_nowait(item)
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, queue, results) for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _get_status(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET /v1/status HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+        await writer.drain()
+        await reader.readline()
+        while (await reader.readline()) not in (b'\r\n', b''):
+            pass
+        return json.loads(await reader.read())
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API服务负载测试")
+    parser.add_argument('--url', help="已运行的服务地址（默认在本进程内启动）")
+    parser.add_argument('--requests', type=int, default=400, help="请求总数")
+    parser.add_argument('--concurrency', type=int, default=16, help="并发连接数")
+    parser.add_argument('--repeat', type=float, default=0.5, help="重复之前内容的请求比例（命中缓存）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="本进程内服务的提取/总结进程数")
+    parser.add_argument('--threads-only', action='store_true', help="本进程内服务只使用线程池")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        api = APIServer({'extract': args.workers, 'summarize': args.workers},
+                        use_processes=not args.threads_only)
+        server = BackgroundServer(api)
+        host, port = server.host, server.port
+
+    workload = build_workload(args.requests, args.repeat)
+    try:
+        results, elapsed = asyncio.run(run_load(host, port, workload, max(1, args.concurrency)))
+        stats = asyncio.run(_get_status(host, port))
+    finally:
+        if server is not None:
+            server.stop()
+
+    print("=" * 72)
+    print(f"{len(results)} 个请求，{args.concurrency} 个并发连接，重复比例 {args.repeat:.0%}")
+    print(f"总耗时 {elapsed:.2f} s，吞吐量 {len(results) / elapsed:.1f} 请求/秒")
+    print("-" * 72)
+    print(f"{'接口':<16}{'请求数':>8}{'状态':>18}{'p50':>10}{'p95':>10}{'p99':>10}  (客户端, ms)")
+    for path in sorted({path for path, _, _ in results}):
+        latencies = sorted(ms for p, _, ms in results if p == path)
+        statuses = Counter(status for p, status, _ in results if p == path)
+        status_text = ",".join(f"{status}:{count}" for status, count in sorted(statuses.items()))
+        print(f"{path:<16}{len(latencies):>8}{status_text:>18}{percentile(latencies, 0.5):>10.1f}"
+              f"{percentile(latencies, 0.95):>10.1f}{percentile(latencies, 0.99):>10.1f}")
+    print("-" * 72)
+    print("服务端延迟直方图 (ms):")
+    for endpoint, data in stats.get('endpoints', {}).items():
+        latency = data['latency_ms']
+        print(f"  {endpoint:<24} 次数 {latency['count']:>5}  均值 {latency['mean']:>8.1f}  "
+              f"p50 {latency['p50']:>8.1f}  p90 {latency['p90']:>8.1f}  p99 {latency['p99']:>8.1f}")
+    cache = stats.get('cache', {})
+    print(f"缓存命中率 {cache.get('hit_rate', 0):.1%}（命中 {cache.get('hits', 0)}，未命中 {cache.get('misses', 0)}）")
+    print("=" * 72)
+    return 0 if all(status == 200 for _, status, _ in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
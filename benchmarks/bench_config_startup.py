@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI配置管理器启动耗时报告
+对比首次派生密钥与后续创建管理器/加载配置的耗时
+"""
+
+import os
+import sys
+import time
+import uuid
+import tempfile
+import shutil
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.ai_config import AIConfigManager, AIModelConfig, ConfigEncryptor
+
+
+def _timed(func):
+    """执行函数并返回 (结果, 耗时毫秒)"""
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(rounds: int = 20):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        print("=" * 60)
+        print("AI配置管理器启动耗时报告")
+        print("=" * 60)
+
+        # 1. 创建管理器不再派生密钥
+        _, construct_ms = _timed(lambda: AIConfigManager(config_dir=temp_dir))
+        print(f"创建管理器（未触发密钥派生）: {construct_ms:8.2f} ms")
+
+        # 2. 首次使用加密器：进程内唯一一次PBKDF2派生
+        _, first_ms = _timed(lambda: ConfigEncryptor())
+        print(f"首次创建加密器（PBKDF2派生）:   {first_ms:8.2f} ms")
+
+        # 3. 后续创建加密器直接复用缓存密钥
+        _, cached_ms = _timed(lambda: [ConfigEncryptor() for _ in range(rounds)])
+        print(f"再创建加密器（缓存命中）:       {cached_ms / rounds:8.2f} ms/次")
+
+        # 4. 典型流程：多个管理器读取同一份配置（对话框、浏览器、测试）
+        writer = AIConfigManager(config_dir=temp_dir)
+        writer.add_model(AIModelConfig(
+            id=str(uuid.uuid4()),
+            name="基准模型",
+            base_url="https://api.example.com/v1",
+            token_key="sk-benchmark-key",
+            model_name="bench-model",
+            is_default=True
+        ))
+
+        def open_and_load():
+            manager = AIConfigManager(config_dir=temp_dir)
+            return manager.get_default_model()
+
+        _, load_ms = _timed(lambda: [open_and_load() for _ in range(rounds)])
+        print(f"新管理器+加载默认模型:          {load_ms / rounds:8.2f} ms/次")
+
+        print("-" * 60)
+        if cached_ms > 0:
+            print(f"单次加密器初始化提速: 约 {first_ms / (cached_ms / rounds):.0f} 倍")
+        print("=" * 60)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容特征检测基准测试
+对比逐词str.count扫描与TermCounter一次正则扫描统计全部特征词的耗时，
+并校验TermCounter的计数与逐位置查找（允许重叠）一致
+
+用法:
+    python benchmarks/bench_feature_detector.py [--chapters 200] [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feature_detector import get_feature_detector
+from bench_summarize_batch import build_chapters
+
+
+def overlapping_count(text, pattern):
+    """用str.find逐个查找（允许重叠）的出现次数"""
+    count = 0
+    position = text.find(pattern)
+    while position >= 0:
+        count += 1
+        position = text.find(pattern, position + 1)
+    return count
+
+
+def best_of(func, repeat):
+    """重复执行，返回 (结果, 最短耗时秒)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="内容特征检测基准测试")
+    parser.add_argument('--chapters', type=int, default=200, help="章节数（每章约4000字）")
+    parser.add_argument('--repeat', type=int, default=5, help="重复次数（取最短耗时）")
+    args = parser.parse_args(argv)
+
+    text = "\n".join(build_chapters(args.chapters))
+    detector = get_feature_detector()
+    patterns = detector.counter.patterns
+
+    print("=" * 60)
+    print(f"特征检测基准：{len(text) / 10000:.1f} 万字，{len(patterns)} 个特征词")
+    print("=" * 60)
+
+    _, per_term_s = best_of(lambda: [text.count(p) for p in patterns], args.repeat)
+    print(f"逐词str.count:            {per_term_s * 1000:8.1f} ms")
+
+    counts, counter_s = best_of(lambda: detector.counter.count(text), args.repeat)
+    print(f"TermCounter一次扫描:      {counter_s * 1000:8.1f} ms")
+
+    _, detect_s = best_of(lambda: detector.detect(text), args.repeat)
+    print(f"detect（含类别汇总）:     {detect_s * 1000:8.1f} ms")
+    print(f"加速比:                   {per_term_s / counter_s:8.2f}x")
+
+    if counts != [overlapping_count(text, p) for p in patterns]:
+        print("❌ 计数与逐位置查找不一致")
+        return 1
+    print(f"✅ 计数与逐位置查找一致（共 {sum(counts)} 次命中）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
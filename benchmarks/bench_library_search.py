@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书库全文检索基准测试
+构建指定字数的书库（默认1000万字），测量短语、前缀、多词查询和
+“首次出现”查询的耗时
+
+用法:
+    python benchmarks/bench_library_search.py [--chars 10000000] [--chapter-chars 4000]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_store import LibraryStore, tokenize_for_search
+
+PARAGRAPHS = [
+    "张无忌自从学会了乾坤大挪移和太极拳，武功大进，现在终于可以为父母报仇了。",
+    "他来到了光明顶，看到了阳顶天留下的七个字“光明正大，洗刷污垢”，心中感慨万千。",
+    "这时，赵敏带着一群蒙古兵闯了进来，张无忌立即迎上前去，二人战在一处。",
+    "赵敏出招狠辣，张无忌则招招相让，不愿伤她。",
+    "战了几十招，张无忌以乾坤大挪移化解了赵敏的招式，并点中了她的穴道。",
+    "“张教主，你为何不杀我？”赵敏问道。",
+    "张无忌叹了口气：“我与姑娘无冤无仇，又怎会取你性命？”",
+    "赵敏心中感动，从此对张无忌芳心暗许。",
+]
+
+QUERIES = [
+    ("单词", "张无忌", 'rank'),
+    ("短语", '"乾坤大挪移"', 'rank'),
+    ("前缀", "蒙古*", 'rank'),
+    ("多词", "赵敏 穴道", 'rank'),
+    ("稀有词首次出现", "屠龙宝刀", 'chapter'),
+]
+
+
+def build_library(store, total_chars, chapter_chars):
+    """写入合成章节；段落只分词一次，正文按段落拼接以节省建库时间"""
+    tokenized = [tokenize_for_search(p) for p in PARAGRAPHS]
+    chapter_count = max(1, total_chars // chapter_chars)
+    per_chapter = max(1, chapter_chars // (sum(map(len, PARAGRAPHS)) // len(PARAGRAPHS)))
+    with store.batch():
+        for i in range(chapter_count):
+            order = [(i + j) % len(PARAGRAPHS) for j in range(per_chapter)]
+            text = "".join(PARAGRAPHS[k] for k in order)
+            body = " ".join(tokenized[k] for k in order)
+            if i % 97 == 96:
+                # 少量章节包含稀有词
+                text += "屠龙宝刀重现江湖。"
+                body += " " + tokenize_for_search("屠龙宝刀重现江湖。")
+            store.save_extraction("bench-book", {
+                'title': f"第{i + 1}章",
+                'text': text + f"（第{i}章）",
+                'url': f"bench://chapter/{i}",
+            }, search_body=body)
+    return chapter_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="书库全文检索基准测试")
+    parser.add_argument('--chars', type=int, default=10_000_000, help="书库总字数")
+    parser.add_argument('--chapter-chars', type=int, default=4000, help="每章字数")
+    parser.add_argument('--rounds', type=int, default=20, help="每个查询重复次数")
+    args = parser.parse_args(argv)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        store = LibraryStore(os.path.join(temp_dir, "library.db"))
+        if not store.fts_available:
+            print("SQLite不支持FTS5，无法运行基准")
+            return 1
+
+        start = time.perf_counter()
+        chapters = build_library(store, args.chars, args.chapter_chars)
+        build_s = time.perf_counter() - start
+
+        print("=" * 60)
+        print(f"书库全文检索基准：{chapters} 章，约 {args.chars / 10000:.0f} 万字")
+        print("=" * 60)
+        print(f"建库耗时: {build_s:.1f} s")
+
+        for name, query, order in QUERIES:
+            hits = store.search(query, order=order)
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                store.search(query, order=order)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / args.rounds
+            print(f"{name:<10} {query:<14} {len(hits):3d} 条  {elapsed_ms:8.2f} ms/次")
+
+        store.close()
+        return 0
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
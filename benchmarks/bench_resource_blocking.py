@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资源拦截基准测试
+本地服务模拟章节页面：正文来自127.0.0.1，广告脚本、统计图片和推荐框架来自
+localhost且每个响应延迟一段时间。对比无界面页面池在拦截与不拦截时从提交到
+得到正文的耗时，并报告拦截的请求数（需要PyQt5和PyQtWebEngine）
+
+用法:
+    python benchmarks/bench_resource_blocking.py [--pages 10] [--delay 0.5]
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless_service
+from resource_blocker import BlockRules
+
+PARAGRAPH = "少年背着长剑走出了山门，回头望了一眼云雾中的青山。"
+
+
+def chapter_html(number, third_party):
+    """第number章：正文之外引用多个慢速第三方资源"""
+    body = "".join(f"<p>{PARAGRAPH}</p>" for _ in range(40))
+    extras = "".join([
+        f'<script src="{third_party}/ads.js?{number}"></script>',
+        f'<img src="{third_party}/pixel.gif?{number}">',
+        f'<iframe src="{third_party}/recommend.html?{number}"></iframe>',
+        f'<video src="{third_party}/promo.mp4?{number}" autoplay muted></video>',
+    ])
+    return (f"<html><head><meta charset='utf-8'><title>第{number}章</title></head><body>"
+            f"<div id='content'>{body}</div>{extras}</body></html>")
+
+
+def start_server(delay):
+    """启动本地服务：/chapter/N 立即返回，其余资源延迟delay秒"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith('/chapter/'):
+                number = int(self.path.rsplit('/', 1)[-1])
+                third_party = f"http://localhost:{self.server.server_address[1]}"
+                body = chapter_html(number, third_party).encode('utf-8')
+                content_type = 'text/html; charset=utf-8'
+            else:
+                time.sleep(delay)
+                body = b''
+                content_type = 'application/octet-stream'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(app, pool, urls):
+    """依次提取所有页面，返回 (每页耗时列表, 失败数)"""
+    from PyQt5.QtCore import QEventLoop
+    latencies = []
+    failed = 0
+    for url in urls:
+        start = time.perf_counter()
+        future = pool.submit(url)
+        while not future.done():
+            app.processEvents(QEventLoop.AllEvents, 50)
+        latencies.append(time.perf_counter() - start)
+        if future.exception() is not None:
+            failed += 1
+    return latencies, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="资源拦截基准测试")
+    parser.add_argument('--pages', type=int, default=10, help="页面数")
+    parser.add_argument('--delay', type=float, default=0.5, help="第三方资源的响应延迟（秒）")
+    args = parser.parse_args(argv)
+
+    try:
+        app = headless_service.create_application()
+    except ImportError as e:
+        print(f"跳过: {e}")
+        return 0
+
+    server = start_server(args.delay)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    # 同一服务通过localhost访问即为第三方站点，按广告域名拦截
+    rules = BlockRules(ad_hosts=('localhost',), rules_path=None)
+
+    print("=" * 60)
+    print(f"{args.pages} 个页面，每个第三方资源延迟 {args.delay:.2f} 秒")
+    for name, options in (("不拦截", {'block_resources': False}),
+                          ("拦截", {'profile': headless_service.create_extraction_profile(rules=rules)})):
+        pool = headless_service.HeadlessExtractionPool(pool_size=1, timeout=30, **options)
+        urls = [f"{base}/chapter/{i}" for i in range(args.pages)]
+        latencies, failed = run(app, pool, urls)
+        latencies.sort()
+        print(f"{name}: 平均 {sum(latencies) / len(latencies) * 1000:.0f} ms，"
+              f"中位数 {latencies[len(latencies) // 2] * 1000:.0f} ms，失败 {failed}")
+        blocker = getattr(pool.profile, 'blocker', None)
+        if blocker is not None:
+            print(f"  {blocker.stats.report()}")
+        pool.close()
+    print("=" * 60)
+
+    server.shutdown()
+    server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器冷启动基准测试
+使用 python -X importtime 统计导入 browser 模块的耗时，
+并检查提取/OCR/AI相关的重型模块是否被推迟到首次使用时加载
+"""
+
+import os
+import re
+import sys
+import subprocess
+
+# 项目根目录
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动预算：导入browser模块（不含PyQt5自身）允许的最大耗时（毫秒）
+STARTUP_BUDGET_MS = 150
+
+# 窗口显示前不应被加载的模块
+DEFERRED_MODULES = [
+    'requests',
+    'bs4',
+    'jieba',
+    'web_extractor',
+    'mhtml_extractor',
+    'ai_summary',
+    'config',
+    'cryptography',
+    'ocr_client',
+]
+
+# Qt本身的导入不可避免，单独统计
+QT_PREFIXES = ('PyQt5', 'sip')
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def run_importtime(statement):
+    """在子进程中执行语句，返回 [(模块名, 自身耗时us, 累计耗时us, 深度)]"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True
+    )
+    records = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def main():
+    records = run_importtime('import browser')
+    if not records:
+        print("❌ 无法获取导入耗时（browser模块导入失败？）")
+        return 1
+    
+    loaded = {name for name, _, _, _ in records}
+    qt_us = sum(s for name, s, _, _ in records if name.startswith(QT_PREFIXES))
+    total_us = sum(s for _, s, _, _ in records)
+    app_us = total_us - qt_us
+    
+    print("=" * 60)
+    print("浏览器冷启动导入耗时（-X importtime）")
+    print("=" * 60)
+    print(f"导入模块数:        {len(records)}")
+    print(f"总耗时:            {total_us / 1000:8.1f} ms")
+    print(f"  其中PyQt5:       {qt_us / 1000:8.1f} ms")
+    print(f"  其余模块:        {app_us / 1000:8.1f} ms  (预算 {STARTUP_BUDGET_MS} ms)")
+    print("-" * 60)
+    print("自身耗时最多的模块：")
+    for name, self_us, _, _ in sorted(records, key=lambda r: r[1], reverse=True)[:10]:
+        print(f"  {self_us / 1000:8.2f} ms  {name}")
+    print("-" * 60)
+    
+    ok = True
+    eager = [m for m in DEFERRED_MODULES if m in loaded]
+    if eager:
+        ok = False
+        print(f"❌ 以下模块在启动时被提前加载: {', '.join(eager)}")
+    else:
+        print("✅ 提取/OCR/AI相关模块均延迟到首次使用")
+    
+    if app_us / 1000 > STARTUP_BUDGET_MS:
+        ok = False
+        print(f"❌ 启动导入耗时超出预算 {STARTUP_BUDGET_MS} ms")
+    else:
+        print("✅ 启动导入耗时在预算之内")
+    print("=" * 60)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
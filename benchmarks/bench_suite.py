@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端性能基准套件
+在benchmarks/corpus的固定语料上逐项测量处理流程各阶段的耗时：下载（本地静态服务）、
+解析、文本清理、标题和章节识别、MHTML解码、OCR往返（替身服务）、规则总结和AI总结
+（替身服务）。每项先预热一次再重复测量，同时记录正确性指标，结果输出为JSON，
+可与上一版本的结果对比，发现性能和正确性的回退
+
+用法:
+    python benchmarks/bench_suite.py -o results.json
+    python benchmarks/bench_suite.py --only parse,mhtml --repeat 10
+    python benchmarks/bench_suite.py -o new.json --baseline old.json [--threshold 0.1]
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, PROJECT_DIR)
+
+from stub_servers import start_static_server, start_ocr_stub, start_ai_stub
+
+CORPUS_DIR = os.path.join(BENCH_DIR, 'corpus')
+
+# 结果文件格式版本，字段含义变化时递增
+SCHEMA_VERSION = 1
+
+# 对比时中位数变慢超过该比例视为回退
+DEFAULT_THRESHOLD = 0.10
+
+# 正确性指标中越小越好的字段，其余数值字段越大越好
+LOWER_IS_BETTER = ('pages_with_urls_left', 'max_length_ratio', 'requests')
+
+# 记录版本号的依赖包
+TRACKED_PACKAGES = ('beautifulsoup4', 'jieba', 'requests', 'numpy', 'PyQt5')
+
+
+class Corpus:
+    """基准测试语料（manifest.json及其引用的文件）"""
+
+    def __init__(self, root=CORPUS_DIR):
+        self.root = root
+        with open(os.path.join(root, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.pages = self.manifest['pages']
+        self.raw_pages = [self._read(page['file']) for page in self.pages]
+        self.html_pages = [raw.decode(page['encoding']) for raw, page in zip(self.raw_pages, self.pages)]
+        self.mhtml = self.manifest['mhtml']
+        self.mhtml_paths = [self.path(item['file']) for item in self.mhtml]
+        self.images = [self._read(item['file']) for item in self.manifest['images']]
+        self.ocr_texts = {item['sha256']: item['ocr_text'] for item in self.manifest['images']}
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def _read(self, name):
+        with open(self.path(name), 'rb') as f:
+            return f.read()
+
+    def chapter_texts(self):
+        """网页章节的页面文本（直接取body文本并清理，不受正文提取质量影响）"""
+        from web_extractor import WebExtractor
+        from bs4 import BeautifulSoup
+        extractor = WebExtractor()
+        texts = []
+        for html in self.html_pages:
+            soup = BeautifulSoup(html, 'html.parser')
+            texts.append(extractor.clean_text(soup.body.get_text(separator='\n', strip=True)))
+        return texts
+
+
+def timing_stats(samples, items):
+    """重复测量的耗时统计（毫秒）"""
+    ms = sorted(s * 1000 for s in samples)
+    median = statistics.median(ms)
+    return {
+        'repeat': len(ms),
+        'items': items,
+        'min_ms': round(ms[0], 3),
+        'median_ms': round(median, 3),
+        'mean_ms': round(statistics.fmean(ms), 3),
+        'stdev_ms': round(statistics.stdev(ms), 3) if len(ms) > 1 else 0.0,
+        'max_ms': round(ms[-1], 3),
+        'per_item_ms': round(median / items, 3) if items else 0.0,
+        'items_per_s': round(items * 1000 / median, 2) if median else 0.0,
+    }
+
+
+def run_case(func, items, repeat, warmup=1):
+    """预热后重复执行func，返回 (耗时统计, 最后一次执行返回的正确性指标)"""
+    checks = None
+    for _ in range(warmup):
+        checks = func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        checks = func()
+        samples.append(time.perf_counter() - start)
+    return timing_stats(samples, items), checks or {}
+
+
+# ---- 各项测量 ----
+
+def bench_fetch(corpus, options):
+    """通过本地静态服务下载全部网页（含编码检测）"""
+    from web_extractor import WebExtractor
+    extractor = WebExtractor()
+    with start_static_server(corpus.root, latency=options.fetch_latency) as server:
+        urls = [f"{server.url}/{page['file']}" for page in corpus.pages]
+
+        def run():
+            pages = [extractor.fetch_url(url) for url in urls]
+            decoded = sum(1 for html, page in zip(pages, corpus.pages) if page['chapter_title'] in html)
+            return {'decoded_ok': decoded, 'pages': len(pages)}
+
+        stats, checks = run_case(run, len(urls), options.repeat)
+    stats['bytes'] = sum(len(raw) for raw in corpus.raw_pages)
+    return stats, checks
+
+
+def bench_parse(corpus, options):
+    """网页正文提取（HTML解析、正文定位和清理）"""
+    from web_extractor import WebExtractor
+    extractor = WebExtractor()
+
+    def run():
+        texts = [extractor.extract_text(html) for html in corpus.html_pages]
+        found = sum(1 for text, page in zip(texts, corpus.pages) if page['first_paragraph'] in text)
+        # 提取字数与原文字数之比，过低说明正文被误删，过高说明混入了页面杂项
+        ratios = [len(text) / page['text_chars'] for text, page in zip(texts, corpus.pages)]
+        return {'first_paragraph_found': found, 'pages': len(texts),
+                'min_length_ratio': round(min(ratios), 3), 'max_length_ratio': round(max(ratios), 3)}
+
+    stats, checks = run_case(run, len(corpus.html_pages), options.repeat)
+    stats['chars'] = sum(len(html) for html in corpus.html_pages)
+    return stats, checks
+
+
+def bench_clean(corpus, options):
+    """页面文本清理（广告、网址和导航文字）"""
+    from web_extractor import WebExtractor
+    from bs4 import BeautifulSoup
+    extractor = WebExtractor()
+    raw_texts = [BeautifulSoup(html, 'html.parser').body.get_text(separator='\n')
+                 for html in corpus.html_pages]
+
+    def run():
+        cleaned = [extractor.clean_text(text) for text in raw_texts]
+        leftover = sum(1 for text in cleaned if 'www.' in text or 'http' in text)
+        return {'pages_with_urls_left': leftover, 'pages': len(cleaned)}
+
+    stats, checks = run_case(run, len(raw_texts), options.repeat)
+    stats['chars'] = sum(len(text) for text in raw_texts)
+    return stats, checks
+
+
+def bench_detect(corpus, options):
+    """标题和章节信息识别"""
+    from web_extractor import WebExtractor
+    extractor = WebExtractor()
+
+    def run():
+        title_ok = number_ok = links_ok = 0
+        for html, page in zip(corpus.html_pages, corpus.pages):
+            title = extractor._extract_title(html)
+            info = extractor._identify_chapter_info(html)
+            title_ok += page['chapter_title'] in title
+            number_ok += info['number'] == page['chapter_number']
+            links_ok += bool(info['prev_url'] and info['next_url'])
+        return {'title_ok': title_ok, 'chapter_number_ok': number_ok, 'prev_next_ok': links_ok,
+                'pages': len(corpus.pages)}
+
+    return run_case(run, len(corpus.html_pages), options.repeat)
+
+
+def bench_mhtml(corpus, options):
+    """MHTML解码和正文提取（含内嵌图片）"""
+    from mhtml_extractor import MHTMLExtractor
+    extractor = MHTMLExtractor()
+
+    def run():
+        results = [extractor.extract_content(path) for path in corpus.mhtml_paths]
+        found = images_ok = 0
+        for result, item in zip(results, corpus.mhtml):
+            if result:
+                found += item['first_paragraph'] in result['text']
+                images_ok += len(result['images']) == item['images']
+        return {'first_paragraph_found': found, 'images_ok': images_ok, 'files': len(results)}
+
+    stats, checks = run_case(run, len(corpus.mhtml_paths), options.repeat)
+    stats['bytes'] = sum(os.path.getsize(path) for path in corpus.mhtml_paths)
+    return stats, checks
+
+
+def bench_ocr(corpus, options):
+    """OCR往返：批量上传图片到替身服务并解析结果"""
+    from ocr_client import OCRClient
+    with start_ocr_stub(corpus.ocr_texts, latency=options.ocr_latency,
+                        per_image=options.ocr_per_image) as server, \
+            OCRClient(server.url, batch_size=options.ocr_batch_size) as client:
+
+        def run():
+            before = server.requests
+            texts = [OCRClient.parse_result(result) for result in client.recognize_batch(corpus.images)]
+            matched = sum(1 for text, item in zip(texts, corpus.manifest['images']) if text == item['ocr_text'])
+            return {'text_ok': matched, 'images': len(texts), 'requests': server.requests - before}
+
+        stats, checks = run_case(run, len(corpus.images), options.repeat)
+    stats['bytes'] = sum(len(image) for image in corpus.images)
+    return stats, checks
+
+
+def bench_summarize_rule(corpus, options):
+    """规则总结（预热时加载jieba词典，不计入测量）"""
+    from ai_summary import TextSummarizer
+    summarizer = TextSummarizer()
+    texts = corpus.chapter_texts()
+
+    def run():
+        summaries = [summarizer.summarize(text) for text in texts]
+        return {'non_empty': sum(1 for s in summaries if s['summary'].strip()), 'chapters': len(summaries)}
+
+    stats, checks = run_case(run, len(texts), options.repeat)
+    stats['chars'] = sum(len(text) for text in texts)
+    return stats, checks
+
+
+def bench_summarize_ai(corpus, options):
+    """AI总结往返：通过AI客户端请求OpenAI兼容的替身服务"""
+    from config.ai_config import AIModelConfig
+    from config.ai_client import AIModelManager
+    texts = corpus.chapter_texts()
+    with start_ai_stub(latency=options.ai_latency) as server:
+        model = AIModelConfig(id='bench', name='bench', base_url=server.url,
+                              token_key='bench-token', model_name='stub-model')
+
+        def run():
+            responses = [AIModelManager.generate_summary(model, text) for text in texts]
+            return {'success': sum(1 for r in responses if r.success), 'chapters': len(responses)}
+
+        stats, checks = run_case(run, len(texts), options.repeat)
+    stats['chars'] = sum(len(text) for text in texts)
+    return stats, checks
+
+
+BENCHMARKS = {
+    'fetch': bench_fetch,
+    'parse': bench_parse,
+    'clean': bench_clean,
+    'detect': bench_detect,
+    'mhtml': bench_mhtml,
+    'ocr': bench_ocr,
+    'summarize_rule': bench_summarize_rule,
+    'summarize_ai': bench_summarize_ai,
+}
+
+
+def environment():
+    """运行环境信息，便于解释不同机器和版本之间的差异"""
+    from importlib import metadata
+    packages = {}
+    for name in TRACKED_PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'git_commit': commit,
+        'packages': packages,
+    }
+
+
+def run_suite(names, options, corpus=None, log=print):
+    """运行指定的测量项，返回结果字典（可直接写入JSON）"""
+    corpus = corpus or Corpus(options.corpus)
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            stats, checks = BENCHMARKS[name](corpus, options)
+            results[name] = dict(stats, checks=checks)
+        except Exception as e:
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+        log(format_result(name, results[name], time.perf_counter() - start))
+    return {
+        'schema': SCHEMA_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'options': {key: value for key, value in vars(options).items()
+                    if key not in ('output', 'baseline', 'only', 'skip')},
+        'results': results,
+    }
+
+
+def format_result(name, result, elapsed):
+    if 'error' in result:
+        return f"{name:<16} 失败: {result['error']}"
+    checks = ", ".join(f"{key}={value}" for key, value in result['checks'].items())
+    return (f"{name:<16} 中位数 {result['median_ms']:>9.2f} ms  每项 {result['per_item_ms']:>8.2f} ms  "
+            f"{result['items_per_s']:>9.1f} 项/秒  [{checks}]  (用时 {elapsed:.1f} s)")
+
+
+def _is_worse(key, value, base_value):
+    """正确性指标是否比基线差"""
+    if not isinstance(value, (int, float)) or not isinstance(base_value, (int, float)):
+        return False
+    return value > base_value if key in LOWER_IS_BETTER else value < base_value
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """与基线结果对比
+
+    Returns:
+        [(测量项, 基线中位数, 当前中位数, 比值, 问题说明或None)]
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None or 'error' in base:
+            continue
+        if 'error' in result:
+            rows.append((name, base['median_ms'], None, None, "运行失败"))
+            continue
+        ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else 1.0
+        problem = None
+        if ratio > 1 + threshold:
+            problem = f"变慢 {ratio - 1:.0%}"
+        worse = [key for key, value in result['checks'].items()
+                 if _is_worse(key, value, base['checks'].get(key))]
+        if worse:
+            problem = "; ".join(filter(None, [problem, "正确性下降: " + ", ".join(worse)]))
+        rows.append((name, base['median_ms'], result['median_ms'], ratio, problem))
+    return rows
+
+
+def print_comparison(rows, baseline):
+    env = baseline.get('environment', {})
+    print("-" * 72)
+    print(f"对比基线（{baseline.get('created', '?')}，提交 {env.get('git_commit') or '?'}）")
+    for name, base_ms, current_ms, ratio, problem in rows:
+        if current_ms is None:
+            print(f"  ❌ {name:<16} {problem}")
+            continue
+        mark = "❌" if problem else "✅"
+        print(f"  {mark} {name:<16} {base_ms:>9.2f} ms -> {current_ms:>9.2f} ms  ({ratio:.2f}x)"
+              + (f"  {problem}" if problem else ""))
+
+
+def _names(value):
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"未知的测量项: {', '.join(unknown)}（可选: {', '.join(BENCHMARKS)}）")
+    return names
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="端到端性能基准套件")
+    parser.add_argument('-o', '--output', help="结果JSON文件（默认只打印）")
+    parser.add_argument('--baseline', help="对比的基线结果JSON文件")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="判定变慢的比例")
+    parser.add_argument('--only', type=_names, help=f"只运行这些测量项（逗号分隔: {', '.join(BENCHMARKS)}）")
+    parser.add_argument('--skip', type=_names, default=[], help="跳过这些测量项")
+    parser.add_argument('--repeat', type=int, default=5, help="每项重复测量次数")
+    parser.add_argument('--corpus', default=CORPUS_DIR, help="语料目录")
+    parser.add_argument('--fetch-latency', type=float, default=0.0, help="静态网页服务的响应延迟（秒）")
+    parser.add_argument('--ocr-latency', type=float, default=0.02, help="OCR替身服务每个请求的耗时（秒）")
+    parser.add_argument('--ocr-per-image', type=float, default=0.01, help="OCR替身服务每张图片的耗时（秒）")
+    parser.add_argument('--ocr-batch-size', type=int, default=8, help="OCR客户端每批上传的图片数")
+    parser.add_argument('--ai-latency', type=float, default=0.05, help="AI替身服务每个请求的耗时（秒）")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.repeat = max(1, args.repeat)
+    names = [name for name in (args.only or BENCHMARKS) if name not in args.skip]
+
+    print("=" * 72)
+    print(f"端到端基准：{len(names)} 项，每项重复 {args.repeat} 次")
+    print("=" * 72)
+    report = run_suite(names, args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"结果已写入 {args.output}")
+
+    status = 0 if all('error' not in result for result in report['results'].values()) else 1
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print_comparison(rows, baseline)
+        if any(problem for *_, problem in rows):
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
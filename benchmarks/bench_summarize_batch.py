@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量规则总结基准测试
+对比逐章顺序总结与进程池批量总结的耗时，并校验两者结果一致
+
+用法:
+    python benchmarks/bench_summarize_batch.py [--chapters 64] [--workers 4]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_summary import TextSummarizer, get_jieba
+
+PARAGRAPHS = [
+    "张无忌自从学会了乾坤大挪移和太极拳，武功大进，现在终于可以为父母报仇了。",
+    "他来到了光明顶，看到了阳顶天留下的七个字“光明正大，洗刷污垢”，心中感慨万千。",
+    "这时，赵敏带着一群蒙古兵闯了进来，张无忌立即迎上前去，二人战在一处。",
+    "赵敏出招狠辣，张无忌则招招相让，不愿伤她。",
+    "战了几十招，张无忌以乾坤大挪移化解了赵敏的招式，并点中了她的穴道。",
+    "“张教主，你为何不杀我？”赵敏问道。",
+    "张无忌叹了口气：“我与姑娘无冤无仇，又怎会取你性命？”",
+    "赵敏心中感动，从此对张无忌芳心暗许。",
+]
+
+
+def build_chapters(count, paragraphs_per_chapter=120):
+    """生成确定性的测试章节（每章约4000字）"""
+    chapters = []
+    for i in range(count):
+        lines = [PARAGRAPHS[(i + j) % len(PARAGRAPHS)] for j in range(paragraphs_per_chapter)]
+        chapters.append(f"第{i + 1}章\n" + "\n".join(lines))
+    return chapters
+
+
+def _timed(func):
+    """执行函数并返回 (结果, 耗时秒)"""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量规则总结基准测试")
+    parser.add_argument('--chapters', type=int, default=64, help="章节数")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="进程数")
+    args = parser.parse_args(argv)
+
+    chapters = build_chapters(args.chapters)
+    total_chars = sum(len(text) for text in chapters)
+    summarizer = TextSummarizer()
+
+    # 词典加载不计入顺序耗时
+    _, load_s = _timed(get_jieba)
+
+    print("=" * 60)
+    print(f"批量规则总结基准：{len(chapters)} 章，共 {total_chars / 10000:.1f} 万字")
+    print("=" * 60)
+    print(f"主进程加载词典:           {load_s:8.2f} s")
+
+    sequential, seq_s = _timed(lambda: [summarizer.summarize(text) for text in chapters])
+    print(f"顺序总结:                 {seq_s:8.2f} s  {total_chars / seq_s / 10000:6.1f} 万字/秒")
+
+    batch, batch_s = _timed(lambda: summarizer.summarize_batch(chapters, workers=args.workers))
+    print(f"批量总结（{args.workers} 进程）:       {batch_s:8.2f} s  "
+          f"{total_chars / batch_s / 10000:6.1f} 万字/秒")
+    print(f"加速比:                   {seq_s / batch_s:8.2f}x")
+
+    if batch != sequential:
+        print("❌ 批量结果与顺序结果不一致")
+        return 1
+    print("✅ 批量结果与顺序结果一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
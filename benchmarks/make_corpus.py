@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试语料生成
+生成benchmarks/corpus下的固定语料：三种常见小说站点版式的章节网页（含GBK编码页面）、
+Chrome格式的MHTML（含内嵌图片）和章节插图PNG，以及记录标准答案的manifest.json。
+内容由固定种子生成，每次运行结果完全相同；语料已随仓库提交，只有修改语料时才需要重新运行
+
+也可以把真实站点保存的网页/MHTML放入corpus对应目录，并在manifest.json中补充条目
+
+用法:
+    python benchmarks/make_corpus.py [--output benchmarks/corpus]
+"""
+
+import os
+import sys
+import json
+import zlib
+import base64
+import quopri
+import random
+import struct
+import hashlib
+import argparse
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+BOOK = "青云志异"
+SEED = 20240601
+
+CHAPTER_TITLES = [
+    "山门初开", "夜雨问剑", "小镇风波", "古道西风", "藏经阁夜话",
+    "断崖之约", "故人来信", "画中山河",
+]
+
+NAMES = ["林青云", "苏晚晴", "顾长风", "沈三娘", "老掌柜", "白衣书生", "玄真道人"]
+PLACES = ["青峰山", "落霞镇", "藏经阁", "断崖", "松风客栈", "渡口", "后山竹林"]
+SENTENCES = [
+    "{a}背着长剑走出了{p}，回头望了一眼云雾缭绕的青峰，心中五味杂陈。",
+    "{a}低声说道：“江湖险恶，人心难测，你可想清楚了？”",
+    "山道蜿蜒，松风阵阵，{a}一路向东，直到夕阳西下才看见{p}的炊烟。",
+    "{a}与{b}在{p}相遇，两人对视片刻，谁也没有先开口。",
+    "雨越下越大，{p}里只剩下一盏孤灯，{a}翻开那本泛黄的剑谱。",
+    "“三年之约，今日已到。”{b}缓缓拔出长剑，剑光映着{a}的脸。",
+    "{a}想起师父临行前的嘱咐，握紧了手中的玉佩。",
+    "{p}外传来急促的马蹄声，{b}神色一变，吹灭了烛火。",
+    "这一战过后，{a}终于明白，剑招再快，也快不过人心的变化。",
+    "{b}笑道：“你若能接我三招，这本剑谱便归你。”",
+    "月色如水，{a}独自坐在{p}的石阶上，听着远处的更鼓声。",
+    "{a}将信纸凑近灯火，只见上面写着八个字：青山不改，绿水长流。",
+]
+
+# 站点常见的广告和导航文字（提取时应被清除）
+SITE_NOISE = [
+    "请记住本站域名：www.qingyun-novel.example",
+    "手机阅读请访问 m.qingyun-novel.example",
+    "本章未完，点击下一页继续阅读",
+    "如果您喜欢本书，请把它推荐给您的朋友",
+]
+
+CHINESE_DIGITS = "零一二三四五六七八九"
+
+
+def chinese_number(n):
+    """1-99转换为中文数字"""
+    if n < 10:
+        return CHINESE_DIGITS[n]
+    tens, ones = divmod(n, 10)
+    return (CHINESE_DIGITS[tens] if tens > 1 else "") + "十" + (CHINESE_DIGITS[ones] if ones else "")
+
+
+def chapter_paragraphs(rng, count):
+    paragraphs = []
+    for _ in range(count):
+        sentences = []
+        for _ in range(rng.randint(2, 4)):
+            a, b = rng.sample(NAMES, 2)
+            sentences.append(rng.choice(SENTENCES).format(a=a, b=b, p=rng.choice(PLACES)))
+        paragraphs.append("".join(sentences))
+    return paragraphs
+
+
+def page_qidian(number, heading, paragraphs):
+    body = "\n".join(f"<p>　　{p}</p>" for p in paragraphs)
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{heading}_{BOOK}_青云小说网</title>
+<link rel="stylesheet" href="/css/read.css"><script src="https://hm.baidu.com/hm.js?abc"></script></head>
+<body><div class="header"><a href="/">首页</a> &gt; <a href="/book/1/">{BOOK}</a></div>
+<div class="main-text-wrap"><div class="text-head"><h1 class="j_chapterName">{heading}</h1>
+<div class="text-info">字数：{sum(len(p) for p in paragraphs)}　更新时间：2024-06-01</div></div>
+<div class="read-content j_readContent">
+{body}
+</div></div>
+<div class="chapter-control"><a id="j_chapterPrev" href="/book/1/{number - 1}.html">上一章</a>
+<a href="/book/1/">目录</a><a id="j_chapterNext" href="/book/1/{number + 1}.html">下一章</a></div>
+<div class="ad-banner"><a href="https://ad.example.com/">{SITE_NOISE[3]}</a></div>
+<script>var chapterId = {number};</script></body></html>
+"""
+
+
+def page_biquge(number, heading, paragraphs):
+    lines = [f"&nbsp;&nbsp;&nbsp;&nbsp;{p}" for p in paragraphs]
+    lines.insert(len(lines) // 2, SITE_NOISE[0])
+    body = "<br /><br />\n".join(lines)
+    return f"""<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN">
+<html><head><meta http-equiv="Content-Type" content="text/html; charset=gbk" />
+<title>{heading} - {BOOK} - 笔趣阁</title></head>
+<body><div id="wrapper"><div class="box_con">
+<div class="con_top"><a href="/">笔趣阁</a> &gt; <a href="/1_1/">{BOOK}</a> &gt; {heading}</div>
+<div class="bookname"><h1>{heading}</h1>
+<div class="bottem1"><a href="/1_1/{number - 1}.html">上一章</a> &larr; <a href="/1_1/">章节目录</a> &rarr;
+<a href="/1_1/{number + 1}.html">下一章</a></div></div>
+<div id="content">{body}<br /><br />{SITE_NOISE[1]}</div>
+<div class="bottem2"><a href="/1_1/{number - 1}.html">上一章</a><a href="/1_1/{number + 1}.html">下一章</a></div>
+</div></div><div class="footer">Copyright 笔趣阁 All Rights Reserved.</div>
+<script src="/js/tongji.js"></script></body></html>
+"""
+
+
+def page_article(number, heading, paragraphs):
+    body = "\n".join(f"<p>{p}</p>" for p in paragraphs)
+    return f"""<!DOCTYPE html>
+<html lang="zh-CN"><head><meta charset="utf-8"><title>{BOOK} {heading}</title>
+<style>article {{ max-width: 40em; }}</style></head>
+<body><nav><a href="/">书架</a><a href="/rank">排行榜</a></nav>
+<main><article><header><h2>{heading}</h2></header>
+<section class="chapter-body">
+{body}
+<p>{SITE_NOISE[2]}</p>
+</section>
+<footer><a rel="prev" href="/read/{number - 1}">上一章</a> <a rel="next" href="/read/{number + 1}">下一章</a></footer>
+</article></main>
+<div class="comment"><p>网友评论：写得真好，催更！</p></div>
+<div class="copyright">© 2024 青云阅读</div></body></html>
+"""
+
+
+LAYOUTS = [
+    ('qidian', page_qidian, 'utf-8', True),
+    ('biquge', page_biquge, 'gbk', False),
+    ('article', page_article, 'utf-8', False),
+]
+
+
+def png_bytes(rng, width=480, height=160):
+    """生成灰度PNG：白底上若干行深色块，模拟扫描的文字行"""
+    rows = []
+    line_height = 24
+    for y in range(height):
+        line = y // line_height
+        in_text = 6 <= y % line_height <= 18 and line < height // line_height
+        row = bytearray(b'\xff' * width)
+        if in_text:
+            rng_line = random.Random(line * 7919 + rng.randint(0, 3))
+            x = 12
+            while x < width - 24:
+                glyph = rng_line.randint(10, 16)
+                for gx in range(x, min(x + glyph, width)):
+                    row[gx] = 40 if (gx + y) % 3 else 90
+                x += glyph + rng_line.randint(3, 6)
+        rows.append(b'\x00' + bytes(row))
+    raw = zlib.compress(b''.join(rows), 9)
+
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', raw) + chunk(b'IEND', b'')
+
+
+def build_mhtml(html, location, resources):
+    """构造Chrome“保存为单个文件”格式的MHTML
+
+    Args:
+        html: 页面HTML
+        location: 页面URL
+        resources: [(URL, Content-Type, 字节)]
+    """
+    boundary = "----MultipartBoundary--qingyunCorpusBoundary----"
+    lines = [
+        "From: <Saved by Blink>",
+        f"Snapshot-Content-Location: {location}",
+        "Subject: =?utf-8?Q?" + quopri.encodestring(BOOK.encode('utf-8'), header=True).decode('ascii') + "?=",
+        "Date: Sat, 1 Jun 2024 12:00:00 +0800",
+        "MIME-Version: 1.0",
+        "Content-Type: multipart/related;",
+        '\ttype="text/html";',
+        f'\tboundary="{boundary}"',
+        "",
+        "",
+        f"--{boundary}",
+        "Content-Type: text/html",
+        "Content-ID: <frame-1@mhtml.blink>",
+        "Content-Transfer-Encoding: quoted-printable",
+        f"Content-Location: {location}",
+        "",
+        quopri.encodestring(html.encode('utf-8')).decode('ascii'),
+    ]
+    for url, content_type, data in resources:
+        encoding = 'base64' if not content_type.startswith('text/') else 'quoted-printable'
+        payload = (base64.encodebytes(data).decode('ascii') if encoding == 'base64'
+                   else quopri.encodestring(data).decode('ascii'))
+        lines += ["", f"--{boundary}", f"Content-Type: {content_type}",
+                  f"Content-Transfer-Encoding: {encoding}", f"Content-Location: {url}", "", payload]
+    lines += [f"--{boundary}--", ""]
+    return "\r\n".join(lines).replace("\n", "\r\n").replace("\r\r\n", "\r\n").encode('ascii')
+
+
+def build_corpus(output=CORPUS_DIR):
+    """生成全部语料并写入manifest.json，返回manifest"""
+    rng = random.Random(SEED)
+    for sub in ('html', 'mhtml', 'images'):
+        os.makedirs(os.path.join(output, sub), exist_ok=True)
+    manifest = {'book': BOOK, 'seed': SEED, 'pages': [], 'mhtml': [], 'images': []}
+
+    # 插图：OCR替身服务按内容哈希返回这里记录的文字
+    images = []
+    for i in range(4):
+        data = png_bytes(rng)
+        name = f"images/illustration_{i + 1}.png"
+        with open(os.path.join(output, name), 'wb') as f:
+            f.write(data)
+        text = "".join(chapter_paragraphs(rng, 1))
+        images.append((name, data))
+        manifest['images'].append({'file': name, 'sha256': hashlib.sha256(data).hexdigest(), 'ocr_text': text})
+
+    # 章节网页：每种版式两章
+    for index in range(6):
+        number = index + 1
+        key, render, encoding, chinese = LAYOUTS[index % len(LAYOUTS)]
+        number_text = chinese_number(number) if chinese else str(number)
+        heading = f"第{number_text}章 {CHAPTER_TITLES[index]}"
+        paragraphs = chapter_paragraphs(rng, rng.randint(30, 45))
+        html = render(number, heading, paragraphs)
+        name = f"html/{number:03d}_{key}.html"
+        with open(os.path.join(output, name), 'wb') as f:
+            f.write(html.encode(encoding))
+        manifest['pages'].append({
+            'file': name, 'layout': key, 'encoding': encoding,
+            'chapter_title': heading, 'chapter_number': number_text,
+            'text_chars': sum(len(p) for p in paragraphs),
+            'first_paragraph': paragraphs[0],
+        })
+
+    # MHTML：一章纯文字，一章带两张插图
+    for index, image_count in ((6, 0), (7, 2)):
+        number = index + 1
+        heading = f"第{chinese_number(number)}章 {CHAPTER_TITLES[index]}"
+        paragraphs = chapter_paragraphs(rng, rng.randint(30, 45))
+        location = f"https://read.qingyun-novel.example/book/1/{number}.html"
+        html = page_qidian(number, heading, paragraphs)
+        resources = [("https://read.qingyun-novel.example/css/read.css", "text/css",
+                      b".read-content p { text-indent: 2em; line-height: 1.8; }\n")]
+        if image_count:
+            figures = "".join(
+                f'<p><img src="https://img.qingyun-novel.example/{name.split("/")[-1]}" alt="插图"></p>'
+                for name, _ in images[:image_count])
+            html = html.replace('<div class="read-content j_readContent">',
+                                '<div class="read-content j_readContent">\n' + figures)
+            resources += [(f"https://img.qingyun-novel.example/{name.split('/')[-1]}", "image/png", data)
+                          for name, data in images[:image_count]]
+        name = f"mhtml/{number:03d}_chapter.mhtml"
+        with open(os.path.join(output, name), 'wb') as f:
+            f.write(build_mhtml(html, location, resources))
+        manifest['mhtml'].append({
+            'file': name, 'chapter_title': heading, 'images': image_count,
+            'text_chars': sum(len(p) for p in paragraphs), 'first_paragraph': paragraphs[0],
+        })
+
+    with open(os.path.join(output, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成基准测试语料")
+    parser.add_argument('--output', default=CORPUS_DIR, help="输出目录")
+    args = parser.parse_args(argv)
+    manifest = build_corpus(args.output)
+    print(f"已生成 {len(manifest['pages'])} 个网页、{len(manifest['mhtml'])} 个MHTML、"
+          f"{len(manifest['images'])} 张图片: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
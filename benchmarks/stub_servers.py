@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试用的本地替身服务
+- 静态网页服务：提供语料中的章节网页，可模拟网络延迟；不声明charset，覆盖编码检测
+- OCR服务：与paddleocr/app.py相同的 /status、/ocr、/ocr/batch 接口，按图片内容哈希
+  返回语料中记录的文字，每个请求和每张图片的耗时可配置
+- AI服务：OpenAI兼容的 /chat/completions 和 /models 接口，返回由章节前几句组成的
+  确定性总结，响应耗时可配置
+
+所有服务监听127.0.0.1的随机端口，在后台线程中运行
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from itertools import islice
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sentence_splitter import iter_sentences
+
+
+class StubServer:
+    """在后台线程中运行的HTTP服务，记录收到的请求数"""
+
+    def __init__(self, handler_class, **attributes):
+        handler = type(handler_class.__name__, (handler_class,), dict(attributes, stub=self))
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    stub = None
+    latency = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reply(self, status, payload):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json')
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def _begin(self):
+        self.stub.count_request()
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class _StaticHandler(_StubHandler):
+    root = None
+
+    def do_GET(self):
+        self._begin()
+        path = os.path.normpath(os.path.join(self.root, self.path.lstrip('/').split('?')[0]))
+        if not path.startswith(os.path.abspath(self.root)) or not os.path.isfile(path):
+            return self._reply(404, {'error': 'not found'})
+        with open(path, 'rb') as f:
+            body = f.read()
+        # 与许多小说站点一样不声明charset，由客户端检测编码
+        self._send(200, body, 'text/html' if path.endswith('.html') else 'application/octet-stream')
+
+
+def start_static_server(root, latency=0.0):
+    """提供root目录下文件的静态网页服务"""
+    return StubServer(_StaticHandler, root=os.path.abspath(root), latency=latency)
+
+
+def _uploaded_files(content_type, body):
+    """解析multipart/form-data请求体，返回上传文件的字节列表"""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body)
+    return [part.get_payload(decode=True) for part in message.iter_parts() if part.get_filename()]
+
+
+class _OCRHandler(_StubHandler):
+    texts = None
+    per_image = 0.0
+
+    def _recognize(self, data):
+        if self.per_image:
+            time.sleep(self.per_image)
+        text = self.texts.get(hashlib.sha256(data).hexdigest(), "")
+        return {'status': 'success',
+                'results': [{'text': line, 'confidence': 0.98, 'position': [[0, 0], [1, 0], [1, 1], [0, 1]]}
+                            for line in text.split("\n") if line]}
+
+    def do_GET(self):
+        self._begin()
+        if self.path == '/status':
+            return self._reply(200, {'status': 'running', 'service': 'OCR stub'})
+        self._reply(404, {'error': 'not found'})
+
+    def do_POST(self):
+        self._begin()
+        files = _uploaded_files(self.headers.get('Content-Type', ''), self._read_body())
+        if not files:
+            return self._reply(400, {'error': '没有上传文件'})
+        if self.path == '/ocr':
+            return self._reply(200, self._recognize(files[0]))
+        if self.path == '/ocr/batch':
+            return self._reply(200, {'status': 'success', 'items': [self._recognize(data) for data in files]})
+        self._reply(404, {'error': 'not found'})
+
+
+def start_ocr_stub(texts=None, latency=0.0, per_image=0.0):
+    """OCR替身服务
+
+    Args:
+        texts: {图片SHA-256: 识别文字}，未记录的图片返回空结果
+        latency: 每个请求的固定耗时（秒）
+        per_image: 每张图片的额外耗时（秒）
+    """
+    return StubServer(_OCRHandler, texts=dict(texts or {}), latency=latency, per_image=per_image)
+
+
+class _AIHandler(_StubHandler):
+    model = 'stub-model'
+
+    def do_GET(self):
+        self._begin()
+        if self.path.endswith('/models'):
+            return self._reply(200, {'object': 'list', 'data': [{'id': self.model, 'object': 'model'}]})
+        self._reply(404, {'error': {'message': 'not found'}})
+
+    def do_POST(self):
+        self._begin()
+        if not self.path.endswith('/chat/completions'):
+            return self._reply(404, {'error': {'message': 'not found'}})
+        try:
+            request = json.loads(self._read_body())
+            prompt = request['messages'][-1]['content']
+        except (ValueError, KeyError, IndexError, TypeError):
+            return self._reply(400, {'error': {'message': 'invalid request'}})
+        # 正文在提示语之后，取前三句作为总结
+        text = prompt.split("\n\n", 1)[-1]
+        summary = "".join(sentence for sentence, _, _ in islice(iter_sentences(text), 3))
+        prompt_tokens = sum(len(m.get('content', '')) for m in request['messages'])
+        self._reply(200, {
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'model': request.get('model', self.model),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': summary or "（空）"},
+                         'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(summary),
+                      'total_tokens': prompt_tokens + len(summary)},
+        })
+
+
+def start_ai_stub(latency=0.0):
+    """OpenAI兼容的AI替身服务，latency为每个请求的耗时（秒）"""
+    return StubServer(_AIHandler, latency=latency)
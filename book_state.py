@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书籍滚动状态
+逐章累积前情摘要、人物表和未解决线索，AI总结每一章时只发送这份
+紧凑的状态和新章节正文；状态大小有上限，与书的长度无关
+"""
+
+import os
+import re
+import json
+import tempfile
+from collections import OrderedDict, deque
+
+from sentence_splitter import split_sentences
+
+# 状态文件格式版本
+STATE_VERSION = 1
+
+# 完整保留的最近章节总结数
+MAX_RECENT_SUMMARIES = 5
+# 更早章节压缩成的前情提要的最大字数
+MAX_DIGEST_CHARS = 1200
+# 人物表和线索表的最大条目数
+MAX_CHARACTERS = 30
+MAX_THREADS = 10
+# 发送给AI的上下文最大字数
+MAX_CONTEXT_CHARS = 2500
+
+# AI按以下标题分段返回总结、人物和线索
+SECTION_SUMMARY = "本章总结"
+SECTION_CHARACTERS = "人物"
+SECTION_OPEN_THREADS = "未解决线索"
+SECTION_RESOLVED_THREADS = "已解决线索"
+
+_SECTION_RE = re.compile(r'^\s*[【\[]\s*(' + '|'.join((
+    SECTION_SUMMARY, SECTION_CHARACTERS, SECTION_OPEN_THREADS, SECTION_RESOLVED_THREADS
+)) + r')\s*[】\]]\s*[:：]?\s*', re.MULTILINE)
+_ITEM_SPLIT_RE = re.compile(r'[、，,；;\n]+')
+_ITEM_PREFIX_RE = re.compile(r'^(?:[-*•·]|\d+[.、)])\s*')
+_EMPTY_ITEMS = {"无", "暂无", "没有", "none", "None"}
+
+
+def _parse_items(text):
+    """把分段内容拆成条目列表（按顿号、逗号、分号或换行分隔）"""
+    items = []
+    for item in _ITEM_SPLIT_RE.split(text):
+        item = _ITEM_PREFIX_RE.sub('', item.strip()).strip()
+        if item and item not in _EMPTY_ITEMS and item not in items:
+            items.append(item)
+    return items
+
+
+def parse_summary_sections(content):
+    """解析AI返回的分段总结
+
+    Args:
+        content: AI返回的文本
+
+    Returns:
+        {'summary': 本章总结, 'characters': [...], 'open_threads': [...],
+         'resolved_threads': [...]}；没有分段标题时整段作为总结
+    """
+    result = {'summary': '', 'characters': [], 'open_threads': [], 'resolved_threads': []}
+    matches = list(_SECTION_RE.finditer(content))
+    if not matches:
+        result['summary'] = content.strip()
+        return result
+
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        body = content[match.end():end].strip()
+        name = match.group(1)
+        if name == SECTION_SUMMARY:
+            result['summary'] = body
+        elif name == SECTION_CHARACTERS:
+            result['characters'] = _parse_items(body)
+        elif name == SECTION_OPEN_THREADS:
+            result['open_threads'] = _parse_items(body)
+        else:
+            result['resolved_threads'] = _parse_items(body)
+    return result
+
+
+class BookState:
+    """一本书的滚动总结状态"""
+
+    def __init__(self, title="", max_recent=MAX_RECENT_SUMMARIES, max_digest_chars=MAX_DIGEST_CHARS,
+                 max_characters=MAX_CHARACTERS, max_threads=MAX_THREADS):
+        """初始化状态
+
+        Args:
+            title: 书名
+            max_recent: 完整保留的最近章节总结数
+            max_digest_chars: 前情提要的最大字数
+            max_characters: 人物表最大人数
+            max_threads: 未解决线索最大条数
+        """
+        self.title = title
+        self.max_digest_chars = max_digest_chars
+        self.max_characters = max_characters
+        self.max_threads = max_threads
+        self.chapter_count = 0
+        self.last_chapter_id = None
+        # 最近章节 (章节标题, 总结)
+        self.recent = deque(maxlen=max_recent)
+        # 更早章节压缩后的前情提要（每章保留首句）
+        self.digest = deque()
+        self._digest_chars = 0
+        # 人物 -> 最近出现的章节序号，按最近出现排序
+        self.characters = OrderedDict()
+        self.open_threads = []
+        # 加入最后一章之前的 (人物列表, 线索列表)，重新总结同一章时据此撤销上次的更新
+        self._before_last = None
+
+    def add_chapter(self, chapter_title, summary, characters=(), open_threads=(), resolved_threads=(),
+                    chapter_id=None):
+        """用一章的总结更新状态
+
+        Args:
+            chapter_title: 章节标题
+            summary: 本章总结
+            characters: 本章出现的人物
+            open_threads: 本章新增或仍未解决的线索
+            resolved_threads: 本章已解决的线索
+            chapter_id: 章节标识（如URL），与上一章相同时视为重新总结：替换上一章的总结，
+                并撤销上次这一章对人物和线索的更新后再按新结果更新
+
+        Returns:
+            是否为新章节
+        """
+        if chapter_id is not None and chapter_id == self.last_chapter_id and self.recent:
+            self.recent[-1] = (chapter_title, summary.strip())
+            if self._before_last is not None:
+                previous_characters, previous_threads = self._before_last
+                self.characters = OrderedDict(previous_characters)
+                self.open_threads = list(previous_threads)
+            self._merge(characters, open_threads, resolved_threads)
+            return False
+        self.last_chapter_id = chapter_id
+        self.chapter_count += 1
+
+        # 最近窗口满时，最早的一章压缩进前情提要
+        if len(self.recent) == self.recent.maxlen:
+            old_title, old_summary = self.recent[0]
+            self._append_digest(old_title, old_summary)
+        self.recent.append((chapter_title, summary.strip()))
+
+        self._before_last = (list(self.characters.items()), list(self.open_threads))
+        self._merge(characters, open_threads, resolved_threads)
+        return True
+
+    def _merge(self, characters, open_threads, resolved_threads):
+        """把一章的人物和线索并入状态"""
+        for name in characters:
+            self.characters.pop(name, None)
+            self.characters[name] = self.chapter_count
+        while len(self.characters) > self.max_characters:
+            self.characters.popitem(last=False)
+
+        resolved = set(resolved_threads)
+        threads = [t for t in self.open_threads if t not in resolved and t not in open_threads]
+        threads.extend(t for t in open_threads if t not in resolved)
+        self.open_threads = threads[-self.max_threads:]
+
+    def add_ai_summary(self, chapter_title, content, chapter_id=None):
+        """解析AI返回的分段总结并更新状态，返回解析结果"""
+        sections = parse_summary_sections(content)
+        self.add_chapter(chapter_title, sections['summary'], sections['characters'],
+                         sections['open_threads'], sections['resolved_threads'], chapter_id)
+        return sections
+
+    def _append_digest(self, chapter_title, summary):
+        """把一章总结的首句加入前情提要，超出上限时丢弃最早的条目"""
+        sentences = split_sentences(summary)
+        line = f"{chapter_title}：{sentences[0]}" if sentences else chapter_title
+        self.digest.append(line)
+        self._digest_chars += len(line)
+        while self._digest_chars > self.max_digest_chars and len(self.digest) > 1:
+            self._digest_chars -= len(self.digest.popleft())
+
+    def to_prompt(self, max_chars=MAX_CONTEXT_CHARS):
+        """生成发送给AI的前情上下文
+
+        Args:
+            max_chars: 上下文最大字数
+
+        Returns:
+            上下文文本，没有任何章节时为空字符串
+        """
+        if not self.chapter_count:
+            return ""
+
+        parts = [f"书名：{self.title}" if self.title else "", f"已读章节数：{self.chapter_count}"]
+        if self.digest:
+            parts.append("【更早的剧情】\n" + "\n".join(self.digest))
+        if self.recent:
+            parts.append("【最近章节】\n" + "\n".join(f"{title}：{summary}" for title, summary in self.recent))
+        if self.characters:
+            parts.append(f"【{SECTION_CHARACTERS}】" + "、".join(reversed(self.characters)))
+        if self.open_threads:
+            parts.append(f"【{SECTION_OPEN_THREADS}】" + "；".join(self.open_threads))
+
+        context = "\n".join(part for part in parts if part)
+        if len(context) > max_chars:
+            # 保留结尾：最近章节、人物和线索比更早的剧情更重要
+            context = "……" + context[-(max_chars - 1):]
+        return context
+
+    def to_dict(self):
+        """转换为可保存的字典"""
+        return {
+            'version': STATE_VERSION,
+            'title': self.title,
+            'chapter_count': self.chapter_count,
+            'last_chapter_id': self.last_chapter_id,
+            'recent': list(self.recent),
+            'max_recent': self.recent.maxlen,
+            'digest': list(self.digest),
+            'characters': list(self.characters.items()),
+            'open_threads': self.open_threads,
+            'before_last': self._before_last,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典恢复状态"""
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f"不支持的状态版本: {data.get('version')}")
+        state = cls(data.get('title', ''), max_recent=data.get('max_recent', MAX_RECENT_SUMMARIES))
+        state.chapter_count = data['chapter_count']
+        state.last_chapter_id = data.get('last_chapter_id')
+        state.recent.extend(tuple(item) for item in data['recent'])
+        state.digest.extend(data['digest'])
+        state._digest_chars = sum(len(line) for line in state.digest)
+        state.characters.update((name, chapter) for name, chapter in data['characters'])
+        state.open_threads = list(data['open_threads'])
+        before_last = data.get('before_last')
+        if before_last is not None:
+            characters, threads = before_last
+            state._before_last = ([tuple(item) for item in characters], list(threads))
+        return state
+
+    def save(self, path):
+        """保存状态（先写临时文件再替换）"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """从文件加载状态"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -6,15 +6,22 @@
 
 import sys
 import os
-import tempfile
-import requests
 import json
+import time
+import threading
 from urllib.parse import urlparse, urljoin
 
-from web_extractor import WebExtractor
-from mhtml_extractor import MHTMLExtractor
 import mimetypes
 import re
+from html import escape
+
+from sentence_splitter import split_sentences
+from feature_detector import get_feature_detector
+from page_scripts import START_EXTRACTION_JS, POLL_RESULT_JS, POLL_INTERVAL_MS, SCRIPT_TIMEOUT
+from resource_blocker import install_resource_blocker
+
+# requests、WebExtractor、MHTMLExtractor(bs4)和AI配置模块都较重，
+# 在首次使用时才导入，保证窗口先于提取/OCR/AI相关模块显示
 
 try:
     from PyQt5.QtCore import QUrl, pyqtSignal, QTimer, Qt
@@ -61,6 +68,14 @@ except ImportError as e:
     def pyqtSignal(*args, **kwargs):
         return None
 
+
+# 打开MHTML文件时网页视图中预览的最大字数（全文在分页阅读视图中查看）
+MHTML_PREVIEW_CHARS = 20000
+
+# 连续总结时AI的原始分段回复在书库中的总结方式后缀，命中已有总结时据此更新书籍状态
+BOOK_REPLY_METHOD_SUFFIX = ":book_reply"
+
+
 class NovelBrowserPage(QWebEnginePage):
     """自定义网页页面类，用于处理弹窗、错误和导航请求"""
     
@@ -96,6 +111,7 @@ class NovelBrowser(QMainWindow):
     content_extracted = pyqtSignal(dict)  # 内容提取完成信号
     ai_summary_completed = pyqtSignal(str)  # AI总结完成信号
     closed = pyqtSignal()  # 窗口关闭信号
+    _gui_call = pyqtSignal(object)  # 后台线程完成后在界面线程中执行回调
     
     def __init__(self, parent=None):
         QMainWindow.__init__(self, parent)
@@ -124,7 +140,6 @@ class NovelBrowser(QMainWindow):
         self.ocr_images_action = None
         self.site_actions = []
         self.go_button = None
-        self.navigation_timer = None
         
         # 设置默认主页
         self.default_urls = [
@@ -134,22 +149,44 @@ class NovelBrowser(QMainWindow):
             "https://www.readnovel.com"
         ]
         
-        # 初始化网页提取器
-        self.web_extractor = WebExtractor()
+        # 网页提取器和AI配置管理器延迟初始化（见对应属性）
+        self._web_extractor = None
+        self._ai_config_manager = None
+        self._ai_config_loaded = False
         
         # 存储最后提取的内容，用于AI总结
         self.last_extracted_content = None
         
-        # 初始化AI配置管理器
-        try:
-            from config import get_config_manager
-            self.ai_config_manager = get_config_manager()
-            self.ai_config_available = True
-            print(f"✅ AI配置管理器初始化成功: {type(self.ai_config_manager)}")
-        except Exception as e:
-            print(f"AI配置模块不可用: {e}")
-            self.ai_config_manager = None
-            self.ai_config_available = False
+        # 当前MHTML页面的内嵌图片（含图片字节），OCR客户端在首次识别时创建
+        self._mhtml_images = []
+        self.ocr_client = None
+        
+        # 页面提取脚本的轮询批次，新的提取开始后旧的轮询不再回调
+        self._extraction_generation = 0
+        self._gui_call.connect(lambda func: func())
+        
+        # 每本书的滚动总结状态（书籍标识 -> BookState），AI总结时只发送前情状态；
+        # 首次使用时从书库读取，每次更新后写回
+        self.book_states = {}
+        
+        # 本地书库延迟打开（见library属性）；保存提取结果和总结（分词、写索引）
+        # 在单个后台写入线程中按提交顺序执行，不阻塞界面
+        self._library = None
+        self._library_loaded = False
+        self._library_lock = threading.Lock()
+        self._library_writer = None
+        
+        # 下一章预取：深度、带宽上限（字节/秒，None为不限速）和是否预先生成规则总结，
+        # 可通过set_prefetch_options修改
+        self.prefetch_depth = 1
+        self.prefetch_max_bytes_per_second = None
+        self.prefetch_summaries = True
+        self._prefetcher = None
+        
+        # 拦截广告、跟踪和第三方媒体等请求以加快页面加载；阅读时仍显示图片
+        self.block_resources = True
+        self.block_images = False
+        self.resource_blocker = None
         
         # 初始化UI
         self.setup_ui()
@@ -160,6 +197,88 @@ class NovelBrowser(QMainWindow):
         # 监听链接点击事件
         self.web_view.page().linkHovered.connect(self.link_hovered)
         
+    @property
+    def web_extractor(self):
+        """网页提取器（首次使用时导入并创建）"""
+        if self._web_extractor is None:
+            from web_extractor import WebExtractor
+            self._web_extractor = WebExtractor()
+        return self._web_extractor
+    
+    @property
+    def ai_config_manager(self):
+        """AI配置管理器（首次使用时导入并创建）"""
+        if not self._ai_config_loaded:
+            self._ai_config_loaded = True
+            try:
+                from config import get_config_manager
+                self._ai_config_manager = get_config_manager()
+                print(f"✅ AI配置管理器初始化成功: {type(self._ai_config_manager)}")
+            except Exception as e:
+                print(f"AI配置模块不可用: {e}")
+                self._ai_config_manager = None
+        return self._ai_config_manager
+    
+    @property
+    def ai_config_available(self):
+        """AI配置模块是否可用"""
+        return self.ai_config_manager is not None
+    
+    @property
+    def library(self):
+        """本地书库（首次使用时打开，不可用时为None；预取线程也会读取，打开过程加锁）"""
+        if not self._library_loaded:
+            with self._library_lock:
+                if not self._library_loaded:
+                    try:
+                        from library_store import LibraryStore
+                        self._library = LibraryStore()
+                    except Exception as e:
+                        print(f"本地书库不可用: {e}")
+                        self._library = None
+                    self._library_loaded = True
+        return self._library
+    
+    @property
+    def prefetcher(self):
+        """下一章预取器（首次使用时创建）"""
+        if self._prefetcher is None:
+            from prefetcher import ChapterPrefetcher
+            self._prefetcher = ChapterPrefetcher(
+                depth=self.prefetch_depth,
+                max_bytes_per_second=self.prefetch_max_bytes_per_second,
+                summarize=self._presummarize if self.prefetch_summaries else None
+            )
+        return self._prefetcher
+    
+    def set_prefetch_options(self, depth=None, max_bytes_per_second=None, summaries=None):
+        """修改预取设置（已缓存的章节保留到预取器重建为止）
+        
+        Args:
+            depth: 预取的章节数，0表示关闭
+            max_bytes_per_second: 预取带宽上限（字节/秒）
+            summaries: 是否预先生成规则总结
+        """
+        if depth is not None:
+            self.prefetch_depth = depth
+        if max_bytes_per_second is not None:
+            self.prefetch_max_bytes_per_second = max_bytes_per_second or None
+        if summaries is not None:
+            self.prefetch_summaries = summaries
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+    
+    def _presummarize(self, content):
+        """预取线程中为章节预先生成规则总结"""
+        return self.generate_summary(content['text'], content.get('title', ''), source=content['url'])
+    
+    def _get_prefetched(self, url):
+        """读取预取缓存中的章节（未创建预取器时不创建）"""
+        if self._prefetcher is None:
+            return None
+        return self._prefetcher.get(url)
+    
     def setup_ui(self):
         """设置用户界面"""
         # 创建中央控件
@@ -174,6 +293,10 @@ class NovelBrowser(QMainWindow):
         # 先创建网页视图（必须在create_address_bar之前）
         self.web_view = QWebEngineView()
         profile = QWebEngineProfile.defaultProfile()
+        if self.block_resources:
+            # 使用默认配置以保留登录状态，只在其上安装拦截器；用户浏览的页面只拦截
+            # 广告和统计跟踪，第三方框架/媒体/字体的拦截只用于无界面提取的独立配置
+            self.resource_blocker = install_resource_blocker(profile, block_images=self.block_images)
         self.web_page = NovelBrowserPage(profile, self)
         self.web_view.setPage(self.web_page)
         
@@ -332,15 +455,61 @@ class NovelBrowser(QMainWindow):
             # 标题变化
             self.web_view.titleChanged.connect(self.on_title_changed)
             
-            # 使用定时器定期更新导航按钮状态
-            self.navigation_timer = QTimer(self)
-            self.navigation_timer.timeout.connect(self.update_navigation_buttons)
-            self.navigation_timer.start(500)  # 每500毫秒更新一次
+            # 所有提取结果统一记录并写入本地书库
+            self.content_extracted.connect(self.on_content_extracted)
+            
+            # 导航按钮状态由事件驱动：页面内置的后退/前进动作在历史记录变化时
+            # 发出changed信号，URL变化和加载完成时再同步一次，空闲时不做任何工作
+            for web_action in (QWebEnginePage.Back, QWebEnginePage.Forward):
+                self.web_view.pageAction(web_action).changed.connect(self.update_navigation_buttons)
+            self.update_navigation_buttons()
             
             print("浏览器信号连接成功")
         except Exception as e:
             print(f"连接浏览器信号时出错: {e}")
 
+    def on_content_extracted(self, extracted_content):
+        """记录最新提取的内容并在后台保存到本地书库"""
+        self.last_extracted_content = extracted_content
+        library = self.library
+        if library is None or not extracted_content.get('text'):
+            return
+        url = extracted_content.get('url') or extracted_content.get('source', '')
+        book_key = self._book_key(url)
+        
+        def save():
+            try:
+                with library.batch():
+                    _, text_hash = library.save_extraction(book_key, extracted_content)
+            except Exception as e:
+                print(f"保存到本地书库失败: {e}")
+                return
+            self._gui_call.emit(lambda: extracted_content.__setitem__('content_hash', text_hash))
+        
+        self._write_library(save)
+    
+    def _write_library(self, func):
+        """在书库写入线程中执行func（首次使用时创建线程）"""
+        if self._library_writer is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._library_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="library-writer")
+        return self._library_writer.submit(func)
+    
+    def closeEvent(self, event):
+        """关闭窗口时等待书库写入完成并提交，释放OCR连接"""
+        if self._library_writer is not None:
+            self._library_writer.shutdown(wait=True)
+            self._library_writer = None
+        if self._library is not None:
+            self._library.close()
+            self._library = None
+        if self.ocr_client is not None:
+            self.ocr_client.close()
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+        self.closed.emit()
+        QMainWindow.closeEvent(self, event)
+    
     def update_navigation_buttons(self):
         """更新导航按钮状态"""
         try:
@@ -414,19 +583,26 @@ class NovelBrowser(QMainWindow):
         """加载MHTML文件"""
         try:
             self.status_label.setText("正在解析MHTML文件...")
+            from mhtml_extractor import MHTMLExtractor
             extractor = MHTMLExtractor()
             extractor.set_debug(True)
             result = extractor.extract_content(file_path)
             
-            if result and result.get('text'):
-                # 创建格式化的HTML显示
-                text_content = result['text'].replace('\n', '<br>')
+            if result and (result.get('text') or result.get('images')):
+                # 网页视图只显示开头部分，避免整本书的HTML让界面卡顿；全文通过提取内容后分页查看
+                text = result['text']
+                preview = text[:MHTML_PREVIEW_CHARS]
+                text_content = "".join(f"<p>{escape(line)}</p>" for line in preview.split('\n') if line.strip())
+                if len(text) > len(preview):
+                    text_content += (f'<p class="meta">…… 此处显示前 {len(preview)} 字，全文 {len(text)} 字，'
+                                     f'请点击工具栏中的"📄 提取内容"后查看完整内容</p>')
+                page_title = escape(result.get('title', 'MHTML文档'))
                 html_content = f"""
                 <!DOCTYPE html>
                 <html>
                 <head>
                     <meta charset="UTF-8">
-                    <title>{result.get('title', 'MHTML文档')}</title>
+                    <title>{page_title}</title>
                     <style>
                         body {{
                             font-family: 'Microsoft YaHei', Arial, sans-serif;
@@ -477,9 +653,9 @@ class NovelBrowser(QMainWindow):
                 </head>
                 <body>
                     <div class="header">
-                        <h1>{result.get('title', 'MHTML文档')}</h1>
+                        <h1>{page_title}</h1>
                         <div class="meta">
-                            文件: {os.path.basename(file_path)} | 
+                            文件: {escape(os.path.basename(file_path))} | 
                             字符数: {len(result['text'])} | 
                             提取方式: {result.get('extraction_method', 'mhtml_parse')}
                         </div>
@@ -502,6 +678,8 @@ class NovelBrowser(QMainWindow):
                 
                 # 自动存储提取结果供后续使用
                 self._mhtml_extracted_content = result
+                # 内嵌图片已解码到内存，供"识别图片"直接使用
+                self._mhtml_images = result.get('images', [])
             else:
                 self.show_error("无法从MHTML文件中提取有效内容")
                 self.status_label.setText("❌ MHTML文件解析失败")
@@ -531,6 +709,10 @@ class NovelBrowser(QMainWindow):
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         self.status_label.setText("正在加载...")
+        if self.resource_blocker:
+            self.resource_blocker.stats.reset()
+        if self.stop_action:
+            self.stop_action.setEnabled(True)
         
     def on_load_progress(self, progress):
         """页面加载进度"""
@@ -539,11 +721,22 @@ class NovelBrowser(QMainWindow):
     def on_load_finished(self, success):
         """页面加载完成"""
         self.progress_bar.setVisible(False)
+        if self.stop_action:
+            self.stop_action.setEnabled(False)
+        self.update_navigation_buttons()
         
         if success:
-            self.status_label.setText("✅ 页面加载完成")
+            if self.resource_blocker and self.resource_blocker.stats.total_blocked:
+                self.status_label.setText(f"✅ 页面加载完成（{self.resource_blocker.stats.report()}）")
+            else:
+                self.status_label.setText("✅ 页面加载完成")
             current_url = self.web_view.url().toString()
             self.page_loaded.emit(current_url)
+            
+            # 后台预取后续章节
+            if self.prefetch_depth > 0 and current_url.startswith(('http://', 'https://')):
+                self.web_view.page().toHtml(
+                    lambda html, url=current_url: self.prefetcher.prefetch(url, html))
         else:
             self.status_label.setText("❌ 页面加载失败")
             self.show_warning("页面加载失败，请检查网络连接或尝试刷新页面")
@@ -551,6 +744,10 @@ class NovelBrowser(QMainWindow):
     def on_url_changed(self, url):
         """URL变化"""
         self.address_bar.setText(url.toString())
+        self.update_navigation_buttons()
+        if not url.isLocalFile():
+            # 离开MHTML页面后不再使用其内嵌图片
+            self._mhtml_images = []
         
     def on_title_changed(self, title):
         """标题变化"""
@@ -644,6 +841,8 @@ class NovelBrowser(QMainWindow):
                 self.extract_content_action.setEnabled(False)
             
             current_url = self.web_view.url().toString()
+            if self._use_prefetched_content(current_url):
+                return
             if "qidian.com" in current_url or "zongheng.com" in current_url or "17k.com" in current_url:
                 self.extract_novel_content()
             else:
@@ -654,6 +853,23 @@ class NovelBrowser(QMainWindow):
             if hasattr(self, 'extract_content_action') and self.extract_content_action:
                 self.extract_content_action.setEnabled(True)
 
+    def _use_prefetched_content(self, url):
+        """当前页面已被预取时直接使用缓存的提取结果
+        
+        Returns:
+            是否已使用缓存
+        """
+        entry = self._get_prefetched(url)
+        content = entry['content'] if entry else None
+        if not content or len(content.get('text', '').strip()) <= 100:
+            return False
+        
+        self.content_extracted.emit(content)
+        self.status_label.setText(f"✅ 内容提取完成（预取缓存） - 已提取 {len(content['text'])} 字符")
+        if self.extract_content_action:
+            self.extract_content_action.setEnabled(True)
+        return True
+    
     def extract_novel_content(self):
         """提取小说网站的内容"""
         print("开始提取小说内容...")
@@ -824,11 +1040,7 @@ class NovelBrowser(QMainWindow):
                 # 处理字体反爬的情况
                 text = content.get('text', '')
                 font_url = content.get('fontUrl')
-                if font_url:
-                    print(f"检测到字体反爬，字体URL: {font_url}")
-                    # 这里可以添加字体解密逻辑
-                    # 暂时使用未解密的文本
-                    content = text
+                content = self._decode_font_obfuscation(text, font_url) if font_url else text
             elif isinstance(content, str):
                 content = content.strip()
             
@@ -996,19 +1208,22 @@ class NovelBrowser(QMainWindow):
             self.status_label.setText("正在提取页面图片...")
             self.ocr_images_action.setEnabled(False)
             
+            if self.ocr_client is None:
+                from ocr_client import OCRClient
+                self.ocr_client = OCRClient()
+            
             # 检查OCR服务是否可用
-            try:
-                response = requests.get("http://127.0.0.1:5000/status", timeout=3)
-                if response.status_code != 200:
-                    self.show_warning("OCR服务不可用，请确保PaddleOCR服务正在运行")
-                    self.ocr_images_action.setEnabled(True)
-                    return
-            except requests.RequestException:
+            if not self.ocr_client.is_available():
                 self.show_warning("无法连接到OCR服务，请确保服务已启动")
                 self.status_label.setText("❌ OCR服务未连接")
                 self.show_info("请按以下步骤启动OCR服务:\n1. 打开新的终端窗口\n2. 导航到paddleocr目录: cd paddleocr\n3. 启动OCR服务: python app.py")
                 self.ocr_images_action.setEnabled(True)
                 return
+            
+            # 离线MHTML页面：内嵌图片已在解析时解码到内存，直接识别
+            if self._mhtml_images:
+                self._ocr_images(self._mhtml_images, self.web_view.url().toString())
+                return
                 
             # 使用安全的方式获取页面内容
             try:
@@ -1023,10 +1238,40 @@ class NovelBrowser(QMainWindow):
             self.status_label.setText("❌ 图片识别启动失败")
             self.ocr_images_action.setEnabled(True)
 
+    def _load_image_bytes(self, img_url):
+        """读取本地或网络图片，返回图片字节（过小或失败时返回None）"""
+        import requests
+        
+        try:
+            if img_url.startswith('file://'):
+                # 本地文件，直接读取
+                from urllib.parse import unquote
+                from urllib.request import url2pathname
+                local_path = url2pathname(unquote(img_url[7:]))  # 移除 file:// 前缀
+                
+                if not os.path.exists(local_path):
+                    print(f"本地图片文件不存在: {local_path}")
+                    return None
+                with open(local_path, 'rb') as img_file:
+                    data = img_file.read()
+            else:
+                # 网络图片，下载到内存
+                img_response = self.ocr_client.session.get(img_url, headers=self.web_extractor.headers, timeout=10)
+                if img_response.status_code != 200:
+                    return None
+                data = img_response.content
+        except (OSError, requests.RequestException) as e:
+            print(f"读取图片失败 {img_url}: {e}")
+            return None
+        
+        if len(data) < 1024:  # 图片太小，跳过
+            print(f"图片太小，跳过: {img_url}")
+            return None
+        return data
+
     def _process_images_for_ocr(self, html):
         """处理HTML中的图片并进行OCR"""
-        processed_count = 0
-        success_count = 0
+        from concurrent.futures import ThreadPoolExecutor
         
         try:
             current_url = self.web_view.url().toString()
@@ -1051,122 +1296,105 @@ class NovelBrowser(QMainWindow):
                 self.status_label.setText("ℹ️ 未发现图片")
                 self.ocr_images_action.setEnabled(True)
                 return
-                    
-            self.status_label.setText(f"发现 {len(images)} 张图片，开始处理...")
-            ocr_results = []
-            all_ocr_text = ""
             
-            for i, img in enumerate(images, 1):
-                try:
-                    processed_count += 1
-                    self.status_label.setText(f"正在处理第 {i}/{len(images)} 张图片...")
-                    self.operation_counter.setText(f"{i}/{len(images)}")
-                    
-                    # 判断是本地文件还是网络图片
-                    img_url = img['url']
-                    if img_url.startswith('file://'):
-                        # 本地文件，直接使用路径
-                        from urllib.parse import unquote
-                        from urllib.request import url2pathname
-                        local_path = url2pathname(unquote(img_url[7:]))  # 移除 file:// 前缀
-                        
-                        # 检查文件是否存在
-                        if not os.path.exists(local_path):
-                            print(f"本地图片文件不存在: {local_path}")
-                            continue
-                        
-                        # 检查文件大小
-                        if os.path.getsize(local_path) < 1024:
-                            print(f"图片文件太小，跳过: {local_path}")
-                            continue
-                        
-                        temp_img_path = local_path
-                        is_temp_file = False
-                    else:
-                        # 网络图片，需要下载
-                        img_response = requests.get(img_url, headers=self.web_extractor.headers, timeout=10)
-                        if img_response.status_code != 200:
-                            continue
-                            
-                        img_content = img_response.content
-                        if len(img_content) < 1024:  # 图片太小，跳过
-                            continue
-                            
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_img:
-                            temp_img.write(img_content)
-                            temp_img_path = temp_img.name
-                        is_temp_file = True
-
-                    # 调用OCR服务
-                    ocr_url = "http://127.0.0.1:5000/ocr"
-                    try:
-                        with open(temp_img_path, 'rb') as img_file:
-                            # 注意：POST请求参数名从"image"改为"file"，与服务端匹配
-                            response = requests.post(ocr_url, files={"file": img_file}, timeout=60)
-                        
-                        if response.status_code == 200:
-                            ocr_result = response.json()
-                            ocr_text = ""
-                            
-                            # 处理不同格式的OCR返回结果
-                            if ocr_result.get("status") == "success" or ocr_result.get("success", False):
-                                if "results" in ocr_result:
-                                    # 确保results是列表并且包含text字段
-                                    results = ocr_result["results"]
-                                    if isinstance(results, list):
-                                        ocr_text = "\n".join([item.get("text", "") for item in results if isinstance(item, dict)])
-                                elif "data" in ocr_result:
-                                    data = ocr_result["data"]
-                                    if isinstance(data, list):
-                                        ocr_text = "\n".join([item.get("text", "") for item in data if isinstance(item, dict)])
-                                elif "text" in ocr_result:
-                                    ocr_text = str(ocr_result["text"])
-                                    
-                            if ocr_text.strip():
-                                ocr_results.append({
-                                    'image_url': img['url'],
-                                    'ocr_text': ocr_text.strip(),
-                                    'confidence': ocr_result.get('confidence', 0)
-                                })
-                                all_ocr_text += ocr_text.strip() + "\n\n"
-                                success_count += 1
-                    except requests.RequestException as req_err:
-                        print(f"OCR请求失败: {req_err}")
-                        continue
-
-                    # 删除临时文件（仅删除网络下载的临时文件）
-                    if is_temp_file:
-                        try:
-                            os.unlink(temp_img_path)
-                        except:
-                            pass
-                        
-                except Exception as img_error:
-                    print(f"处理图片 {i} 时出错: {img_error}")
-                    continue
+            # 并发读取图片到内存，不再写临时文件
+            self.status_label.setText(f"发现 {len(images)} 张图片，正在下载...")
+            with ThreadPoolExecutor(max_workers=self.ocr_client.max_workers) as executor:
+                payloads = list(executor.map(self._load_image_bytes, [img['url'] for img in images]))
+            
+            loaded = []
+            for img, data in zip(images, payloads):
+                if data is not None:
+                    loaded.append(dict(img, data=data))
+            
+            self._ocr_images(loaded, current_url, total=len(images))
+        except Exception as e:
+            self.show_error(f"图片识别过程出错: {str(e)}")
+            self.status_label.setText("❌ 图片识别失败")
+            self.ocr_images_action.setEnabled(True)
+            self.operation_counter.setText("")
 
-            # 合并文本和OCR结果
-            try:
-                content = self.web_extractor.extract_text(html)
-                combined_result = {
-                    'title': '图片OCR识别结果',
-                    'text': all_ocr_text,
-                    'ocr_results': ocr_results,
-                    'url': current_url,
-                    'word_count': len(all_ocr_text)
-                }
+    def _recognize_with_library(self, images, current_url):
+        """识别一批图片，书库中已有结果的图片（按字节哈希）不再提交OCR服务
+        
+        Returns:
+            与输入等长的OCR结果字典列表
+        """
+        library = self.library
+        if library is None:
+            return self.ocr_client.recognize_batch([img['data'] for img in images])
+        
+        from library_store import content_hash
+        hashes = [content_hash(img['data']) for img in images]
+        cached = library.get_ocr_results(hashes)
+        pending = [i for i, h in enumerate(hashes) if h not in cached]
+        
+        results = [None] * len(images)
+        for i, h in enumerate(hashes):
+            if h in cached:
+                results[i] = {'status': 'success', 'text': cached[h]['text'],
+                              'confidence': cached[h]['confidence']}
+        if pending:
+            fresh = self.ocr_client.recognize_batch([images[i]['data'] for i in pending])
+            with library.batch():
+                for i, ocr_result in zip(pending, fresh):
+                    results[i] = ocr_result
+                    text = self.ocr_client.parse_result(ocr_result).strip()
+                    if text:
+                        library.save_ocr_result(hashes[i], text, ocr_result.get('confidence'),
+                                                current_url, images[i].get('url', ''))
+        return results
+    
+    def _ocr_images(self, images, current_url, total=None):
+        """对内存中的图片分批进行OCR，并展示合并结果
+        
+        Args:
+            images: 图片信息列表，每项包含url和图片字节data
+            current_url: 当前页面地址
+            total: 页面中发现的图片总数（用于状态显示）
+        """
+        processed_count = total if total is not None else len(images)
+        success_count = 0
+        ocr_results = []
+        all_ocr_text = ""
+        
+        try:
+            batch_size = self.ocr_client.batch_size
+            for offset in range(0, len(images), batch_size):
+                batch = images[offset:offset + batch_size]
+                done = offset + len(batch)
+                self.status_label.setText(f"正在识别第 {done}/{len(images)} 张图片...")
+                self.operation_counter.setText(f"{done}/{len(images)}")
                 
-                if success_count > 0:
-                    self.content_extracted.emit(combined_result)
-                    self.status_label.setText(f"✅ 图片识别完成 - 成功识别 {success_count}/{processed_count} 张图片")
-                    self.show_extracted_content_dialog(combined_result)
-                else:
-                    self.show_warning(f"图片识别完成，但未识别出文字内容\n处理了 {processed_count} 张图片")
-                    self.status_label.setText(f"⚠️ 未识别出文字 - 已处理 {processed_count} 张图片")
-                    
-            except Exception as e:
-                self.show_error(f"合并识别结果时出错: {str(e)}")
-                self.status_label.setText("❌ 结果合并失败")
+                results = self._recognize_with_library(batch, current_url)
+                for img, ocr_result in zip(batch, results):
+                    ocr_text = self.ocr_client.parse_result(ocr_result).strip()
+                    if ocr_text:
+                        ocr_results.append({
+                            'image_url': img['url'],
+                            'ocr_text': ocr_text,
+                            'confidence': ocr_result.get('confidence', 0)
+                        })
+                        all_ocr_text += ocr_text + "\n\n"
+                        success_count += 1
+            
+            combined_result = {
+                'title': '图片OCR识别结果',
+                'text': all_ocr_text,
+                'ocr_results': ocr_results,
+                'url': current_url,
+                'word_count': len(all_ocr_text)
+            }
+            
+            if success_count > 0:
+                # 保存最后提取的内容，以便进行AI总结
+                self.last_extracted_content = combined_result
+                self.content_extracted.emit(combined_result)
+                self.status_label.setText(f"✅ 图片识别完成 - 成功识别 {success_count}/{processed_count} 张图片")
+                self.show_extracted_content_dialog(combined_result)
+            else:
+                self.show_warning(f"图片识别完成，但未识别出文字内容\n处理了 {processed_count} 张图片")
+                self.status_label.setText(f"⚠️ 未识别出文字 - 已处理 {processed_count} 张图片")
                 
         except Exception as e:
             self.show_error(f"图片识别过程出错: {str(e)}")
@@ -1174,9 +1402,6 @@ class NovelBrowser(QMainWindow):
         finally:
             self.ocr_images_action.setEnabled(True)
             self.operation_counter.setText("")
-            
-        # 保存最后提取的内容，以便进行AI总结
-        self.last_extracted_content = combined_result
 
         
     def get_page_content(self, callback):
@@ -1199,67 +1424,6 @@ class NovelBrowser(QMainWindow):
     
     def execute_javascript_and_get_content(self, callback, fallback_html):
         """执行JavaScript脚本获取动态内容，针对起点中文网优化"""
-        js_script = """
-        function waitForElement(selector, timeout) {
-            return new Promise((resolve, reject) => {
-                const startTime = Date.now();
-                const checkElement = () => {
-                    const element = document.querySelector(selector);
-                    if (element) {
-                        resolve(element);
-                    } else if (Date.now() - startTime > timeout) {
-                        reject(new Error('超时：未找到元素'));
-                    } else {
-                        setTimeout(checkElement, 100);
-                    }
-                };
-                checkElement();
-            });
-        }
-
-        async function extractContent() {
-            try {
-                // 等待页面加载完成
-                await waitForElement('.read-content', 10000);
-                
-                // 尝试触发懒加载
-                window.scrollTo(0, document.body.scrollHeight);
-                await new Promise(resolve => setTimeout(resolve, 1000));
-
-                // 提取小说内容
-                const contentElement = document.querySelector('.read-content');
-                if (contentElement) {
-                    let content = contentElement.innerText || contentElement.textContent;
-                    
-                    // 处理字体反爬
-                    const fontFace = document.querySelector('style[data-qidian]');
-                    if (fontFace) {
-                        const fontUrl = fontFace.textContent.match(/url\\(['"]?(.*?)['"]?\\)/);
-                        if (fontUrl) {
-                            content = {
-                                text: content,
-                                fontUrl: fontUrl[1]
-                            };
-                        }
-                    }
-                    
-                    return JSON.stringify({
-                        content: content,
-                        title: document.querySelector('.j_chapterName').textContent.trim(),
-                        chapterInfo: document.querySelector('.info-chapter').textContent.trim()
-                    });
-                }
-            } catch (error) {
-                console.error('提取内容时出错：', error);
-            }
-            
-            // 如果提取失败，返回整个HTML
-            return document.documentElement.outerHTML;
-        }
-
-        return extractContent();
-        """
-        
         def js_callback(result):
             try:
                 # 处理None值情况
@@ -1273,8 +1437,12 @@ class NovelBrowser(QMainWindow):
                 if isinstance(parsed_result, dict) and 'content' in parsed_result:
                     # 处理成功提取的内容
                     if isinstance(parsed_result['content'], dict) and 'fontUrl' in parsed_result['content']:
-                        # 需要进一步处理字体反爬
-                        self.handle_font_obfuscation(parsed_result)
+                        # 需要进一步处理字体反爬，映射表在后台准备好后再回调
+                        def decoded():
+                            if generation == self._extraction_generation:
+                                callback(json.dumps(parsed_result))
+                        self.handle_font_obfuscation(parsed_result, decoded)
+                        return
                     callback(json.dumps(parsed_result))
                 else:
                     # 如果不是预期的JSON格式，返回原始HTML
@@ -1283,7 +1451,64 @@ class NovelBrowser(QMainWindow):
                 # 如果不是JSON或发生类型错误，返回原始HTML
                 callback(fallback_html)
         
-        self.web_view.page().runJavaScript(js_script, js_callback)
+        # runJavaScript不等待脚本返回的Promise：启动提取后轮询结果
+        self._extraction_generation += 1
+        generation = self._extraction_generation
+        page = self.web_view.page()
+        deadline = time.monotonic() + SCRIPT_TIMEOUT
+        
+        def poll():
+            if generation == self._extraction_generation:
+                page.runJavaScript(POLL_RESULT_JS, on_poll)
+        
+        def on_poll(result):
+            if generation != self._extraction_generation:
+                return
+            if result is None and time.monotonic() < deadline:
+                QTimer.singleShot(POLL_INTERVAL_MS, poll)
+                return
+            js_callback(result)
+        
+        page.runJavaScript(START_EXTRACTION_JS)
+        poll()
+    
+    def handle_font_obfuscation(self, parsed_result, done):
+        """解码字体反爬：把正文中的混淆字符替换为反爬字体中对应的真实字符
+        
+        字体的下载和解析在后台线程中进行，不阻塞界面；映射表准备好后在界面线程中
+        解码并调用done()
+        """
+        content = parsed_result['content']
+        text, font_url = content.get('text', ''), content.get('fontUrl')
+        print(f"检测到字体反爬，字体URL: {font_url}")
+        from font_decoder import get_font_decoder
+        decoder = get_font_decoder(self.ocr_client)
+        
+        def apply(table):
+            if not table:
+                print("未能解码字体反爬，使用未解密的文本")
+            parsed_result['content'] = text.translate(table) if table else text
+            done()
+        
+        table = decoder.cached_table_for_url(font_url)
+        if table is not None:
+            apply(table)
+            return
+        self.status_label.setText("正在解析反爬字体...")
+        decoder.prepare(font_url).add_done_callback(
+            lambda future: self._gui_call.emit(lambda: apply(future.result())))
+    
+    def _decode_font_obfuscation(self, text, font_url):
+        """按已缓存的反爬字体映射解码文本；未缓存时在后台准备映射表并返回原文"""
+        print(f"检测到字体反爬，字体URL: {font_url}")
+        from font_decoder import get_font_decoder
+        decoder = get_font_decoder(self.ocr_client)
+        table = decoder.cached_table_for_url(font_url)
+        if table is None:
+            decoder.prepare(font_url)
+            print("反爬字体映射尚未就绪，使用未解密的文本")
+            return text
+        return text.translate(table)
     
     def ai_summarize_content(self):
         """AI总结当前提取的内容"""
@@ -1310,7 +1535,19 @@ class NovelBrowser(QMainWindow):
                 if default_model:
                     try:
                         self.status_label.setText("正在使用AI模型进行智能总结...")
-                        summary = self.ai_summarize_with_model(text, default_model)
+                        method = f"ai:{default_model.name}"
+                        book_state = self.get_book_state(self.last_extracted_content)
+                        summary = self._get_saved_summary(text, method)
+                        if summary is None:
+                            summary = self.ai_summarize_with_model(
+                                text, default_model, book_state=book_state, chapter_title=title)
+                            if not summary.startswith("❌"):
+                                self._save_summary(text, method, summary)
+                        else:
+                            # 已有总结也计入书籍状态，后续章节的前情不会缺这一章
+                            reply = self._get_saved_summary(text, method + BOOK_REPLY_METHOD_SUFFIX)
+                            if reply is not None:
+                                self._update_book_state(book_state, title, reply)
                         
                         # 如果AI总结失败，检查是否需要回退
                         if summary.startswith("❌"):
@@ -1344,15 +1581,44 @@ class NovelBrowser(QMainWindow):
         finally:
             self.ai_summary_action.setEnabled(True)
     
-    def generate_summary(self, text, title):
-        """生成内容摘要 - 基于规则的简单总结"""
-        # 分句
-        sentences = []
-        for delimiter in ['。', '！', '？', '\n']:
-            text = text.replace(delimiter, delimiter + '|||')
+    def _get_saved_summary(self, text, method):
+        """从书库读取同一正文（或镜像站点的近似重复章节）、同一方式的已有总结"""
+        if self.library is None:
+            return None
+        try:
+            return self.library.find_summary(text, method)
+        except Exception as e:
+            print(f"读取已有总结失败: {e}")
+            return None
+    
+    def _save_summary(self, text, method, summary):
+        """在后台保存总结到书库"""
+        library = self.library
+        if library is None:
+            return
+        from library_store import content_hash
         
-        raw_sentences = text.split('|||')
-        sentences = [s.strip() for s in raw_sentences if s.strip() and len(s.strip()) > 5]
+        def save():
+            try:
+                with library.batch():
+                    library.save_summary(content_hash(text), method, summary)
+            except Exception as e:
+                print(f"保存总结失败: {e}")
+        
+        self._write_library(save)
+    
+    def generate_summary(self, text, title, source=None):
+        """生成内容摘要 - 基于规则的简单总结
+        
+        Args:
+            text: 正文
+            title: 标题
+            source: 来源地址，默认为最后提取内容的地址（预取线程中调用时需显式传入）
+        """
+        if source is None:
+            source = (self.last_extracted_content or {}).get('url', '本地文件')
+        # 分句
+        sentences = [s for s in split_sentences(text) if len(s) > 5]
         
         # 构建总结
         summary_parts = []
@@ -1365,7 +1631,7 @@ class NovelBrowser(QMainWindow):
         summary_parts.append("📊 基本信息：")
         summary_parts.append(f"  • 原文长度：{len(text)} 字符")
         summary_parts.append(f"  • 段落数量：{len(sentences)} 句")
-        summary_parts.append(f"  • 来源：{self.last_extracted_content.get('url', '本地文件')}")
+        summary_parts.append(f"  • 来源：{source}")
         summary_parts.append("")
         
         # 内容预览
@@ -1406,18 +1672,16 @@ class NovelBrowser(QMainWindow):
         else:
             summary_parts.append("  • 篇幅：长篇")
         
-        # 检测常见关键词
-        keywords = {
-            "对话": ["说道", "说：", "问道", "答道", "回答"],
-            "动作": ["走", "跑", "看", "听", "想"],
-            "情感": ["喜", "怒", "哀", "乐", "爱", "恨"],
-            "描写": ["美丽", "壮观", "宏伟", "精致"]
-        }
+        keywords = self._book_keywords(text, source)
+        if keywords:
+            summary_parts.append(f"  • 关键词：{'、'.join(keywords)}")
         
-        detected_features = []
-        for feature, words in keywords.items():
-            if any(word in text for word in words):
-                detected_features.append(feature)
+        # 一次扫描统计各类特征词的频次和密度
+        features = get_feature_detector().detect(text)
+        detected_features = [
+            f"{feature}（{info['count']}次，{info['density']:.1f}/千字）"
+            for feature, info in features.items() if info['count']
+        ]
         
         if detected_features:
             summary_parts.append(f"  • 包含元素：{', '.join(detected_features)}")
@@ -1429,10 +1693,22 @@ class NovelBrowser(QMainWindow):
         
         return '\n'.join(summary_parts)
     
+    def _book_keywords(self, text, source, topK=8):
+        """按本书的IDF索引（保存章节时更新）提取关键词，本书章节还不够多时返回空列表"""
+        library = self.library
+        if library is None or not source:
+            return []
+        index = library.get_idf_index(self._book_key(source))
+        if not index.ready:
+            return []
+        from ai_summary import TextSummarizer
+        return [word for word, _ in TextSummarizer(idf_index=index).extract_keywords(text, topK=topK)]
+    
     def display_summary(self, summary, title):
         """显示AI总结结果"""
         # 创建新窗口显示总结
-        from PyQt5.QtWidgets import QDialog, QTextEdit, QPushButton, QVBoxLayout, QHBoxLayout
+        from PyQt5.QtWidgets import QDialog, QPushButton, QVBoxLayout, QHBoxLayout
+        from ui.text_reader import PagedTextView
 
         dialog = QDialog(self)
         dialog.setWindowTitle(f"AI总结 - {title}")
@@ -1441,9 +1717,7 @@ class NovelBrowser(QMainWindow):
         layout = QVBoxLayout(dialog)
 
         # 总结文本显示
-        text_edit = QTextEdit()
-        text_edit.setReadOnly(True)
-        text_edit.setPlainText(summary)
+        text_edit = PagedTextView(summary, parent=dialog)
         layout.addWidget(text_edit)
 
         # 按钮区域
@@ -1530,25 +1804,14 @@ class NovelBrowser(QMainWindow):
         dialog.exec_()
 
     def view_full_content(self, content):
-        """查看完整提取内容"""
-        from PyQt5.QtWidgets import QDialog, QTextEdit, QVBoxLayout, QPushButton
-
-        dialog = QDialog(self)
-        dialog.setWindowTitle(f"完整内容 - {content.get('title', '未知标题')}")
-        dialog.setGeometry(150, 150, 900, 700)
-
-        layout = QVBoxLayout(dialog)
+        """查看完整提取内容（分页视图，只渲染当前位置附近的几页）"""
+        from ui.text_reader import TextReaderDialog
 
-        # 完整内容显示
-        text_edit = QTextEdit()
-        text_edit.setReadOnly(True)
-        text_edit.setPlainText(content.get('text', '无内容'))
-        layout.addWidget(text_edit)
+        dialog = TextReaderDialog(f"完整内容 - {content.get('title', '未知标题')}",
+                                  content.get('text', '无内容'), self)
 
         # 关闭按钮
-        close_btn = QPushButton("关闭")
-        close_btn.clicked.connect(dialog.close)
-        layout.addWidget(close_btn)
+        dialog.add_button("关闭", dialog.close)
 
         dialog.exec_()
 
@@ -1639,12 +1902,54 @@ class NovelBrowser(QMainWindow):
             traceback.print_exc()
             self.show_error(f"打开AI配置时发生错误: {str(e)}")
     
-    def ai_summarize_with_model(self, text: str, model_config) -> str:
+    @staticmethod
+    def _book_key(url):
+        """由章节URL得到书籍标识（同一目录下的章节视为同一本书）"""
+        parsed = urlparse(url or '')
+        if parsed.scheme in ('', 'file'):
+            return os.path.dirname(os.path.abspath(parsed.path or url or '.'))
+        return parsed.netloc + os.path.dirname(parsed.path)
+    
+    def get_book_state(self, extracted_content):
+        """获取提取内容所属书籍的滚动总结状态（首次使用时从书库读取）"""
+        key = self._content_book_key(extracted_content)
+        state = self.book_states.get(key)
+        if state is None:
+            if self.library is not None:
+                try:
+                    state = self.library.get_book_state(key)
+                except Exception as e:
+                    print(f"读取书籍状态失败: {e}")
+            if state is None:
+                from book_state import BookState
+                state = BookState()
+            self.book_states[key] = state
+        return state
+    
+    def _content_book_key(self, extracted_content):
+        """提取内容所属书籍的标识"""
+        content = extracted_content or {}
+        return self._book_key(content.get('url') or content.get('source', ''))
+    
+    def _update_book_state(self, book_state, chapter_title, reply):
+        """用AI的分段回复更新当前章节所属书籍的状态并写回书库，返回解析出的分段"""
+        content = self.last_extracted_content or {}
+        sections = book_state.add_ai_summary(chapter_title, reply, content.get('url'))
+        if self.library is not None:
+            try:
+                self.library.save_book_state(self._content_book_key(content), book_state)
+            except Exception as e:
+                print(f"保存书籍状态失败: {e}")
+        return sections
+    
+    def ai_summarize_with_model(self, text: str, model_config, book_state=None, chapter_title="") -> str:
         """使用指定AI模型进行总结
         
         Args:
             text: 要总结的文本
             model_config: AI模型配置
+            book_state: 书籍滚动状态，提供时结合前情总结并用结果更新状态
+            chapter_title: 章节标题
             
         Returns:
             总结内容
@@ -1652,8 +1957,18 @@ class NovelBrowser(QMainWindow):
         try:
             from config.ai_client import AIModelManager
             
-            # 调用AI模型进行总结
-            result = AIModelManager.generate_summary(model_config, text)
+            # 调用AI模型进行总结，只附带紧凑的前情状态
+            context = book_state.to_prompt() if book_state is not None else None
+            result = AIModelManager.generate_summary(model_config, text, context=context)
+            
+            if result.success and book_state is not None:
+                self._save_summary(text, f"ai:{model_config.name}{BOOK_REPLY_METHOD_SUFFIX}", result.content)
+                sections = self._update_book_state(book_state, chapter_title, result.content)
+                result.content = sections['summary'] or result.content
+                if sections['characters']:
+                    result.content += f"\n\n👥 人物：{'、'.join(sections['characters'])}"
+                if book_state.open_threads:
+                    result.content += f"\n🧵 未解决线索：{'；'.join(book_state.open_threads)}"
             
             if result.success:
                 # 构建增强的总结结果
@@ -1710,6 +2025,12 @@ class NovelBrowser(QMainWindow):
         Returns:
             规则总结内容
         """
+        # 预取时已为同一正文生成过总结则直接使用
+        url = (self.last_extracted_content or {}).get('url')
+        entry = self._get_prefetched(url) if url else None
+        if entry and entry['summary'] and entry['content'].get('text') == text:
+            return entry['summary']
+        
         # 调用原有的总结方法
         return self.generate_summary(text, title)
 
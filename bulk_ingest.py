@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导入工具
+遍历目录中保存的章节文件（MHTML/HTML），使用进程池并行提取内容，
+结果逐条写入JSONL文件，支持断点续传并报告吞吐量。
+断点只记录提取成功的文件，失败的文件下次运行时重试；工作进程异常退出时
+重建进程池，把当时在途的文件逐个重试，找出导致崩溃的文件后继续处理其余文件
+
+用法:
+    python bulk_ingest.py 章节目录 -o chapters.jsonl [--workers 8]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# 支持的文件类型
+MHTML_EXTENSIONS = ('.mhtml', '.mht')
+HTML_EXTENSIONS = ('.html', '.htm')
+
+# HTML文件尝试的编码顺序
+HTML_ENCODINGS = ('utf-8', 'gb18030', 'big5')
+
+# 每个工作进程内复用的提取器
+_mhtml_extractor = None
+_web_extractor = None
+
+
+def _init_worker():
+    """工作进程初始化：每个进程只创建一次提取器"""
+    global _mhtml_extractor, _web_extractor
+    from mhtml_extractor import MHTMLExtractor
+    from web_extractor import WebExtractor
+    _mhtml_extractor = MHTMLExtractor()
+    _web_extractor = WebExtractor()
+
+
+def _read_html(file_path):
+    """读取HTML文件并按常见编码解码"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    for encoding in HTML_ENCODINGS:
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode('utf-8', errors='ignore')
+
+
+def to_record(result):
+    """将提取结果转换为可写入JSON的记录（图片只保留元信息）"""
+    record = dict(result)
+    record['images'] = [
+        {
+            'url': image.get('url', ''),
+            'alt': image.get('alt', ''),
+            'content_type': image.get('content_type', ''),
+            'size': len(image['data']) if image.get('data') else None
+        }
+        for image in result.get('images', [])
+    ]
+    return record
+
+
+def extract_file(file_path, tokenize=False):
+    """在工作进程中提取单个文件
+
+    Args:
+        file_path: 文件路径
+        tokenize: 是否同时为书库全文索引分词（结果放在记录的search_body中），
+            避免主进程成为分词瓶颈
+
+    Returns:
+        (文件路径, 文件字节数, 提取结果或None, 错误信息)
+    """
+    if _mhtml_extractor is None:
+        _init_worker()
+
+    size = os.path.getsize(file_path)
+    try:
+        if file_path.lower().endswith(MHTML_EXTENSIONS):
+            result = _mhtml_extractor.extract_content(file_path)
+        else:
+            html = _read_html(file_path)
+            result = _web_extractor.extract_content(html)
+            result['source'] = file_path
+    except Exception as e:
+        return file_path, size, None, str(e)
+
+    if not result:
+        return file_path, size, None, "未提取到内容"
+    record = to_record(result)
+    if tokenize:
+        from library_store import tokenize_for_search
+        record['search_body'] = tokenize_for_search(record.get('text', ''))
+    return file_path, size, record, ""
+
+
+def iter_chapter_files(root, extensions=MHTML_EXTENSIONS + HTML_EXTENSIONS):
+    """按路径顺序递归遍历目录中的章节文件"""
+    try:
+        entries = sorted(os.scandir(root), key=lambda entry: entry.name)
+    except OSError as e:
+        print(f"无法读取目录 {root}: {e}")
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_chapter_files(entry.path, extensions)
+        elif entry.name.lower().endswith(extensions):
+            yield entry.path
+
+
+def load_checkpoint(checkpoint_path):
+    """读取已成功提取的文件列表"""
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, 'r', encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+class ThroughputMeter:
+    """吞吐量统计"""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.files = 0
+        self.bytes = 0
+        self.failed = 0
+
+    def add(self, size, success=True):
+        self.files += 1
+        self.bytes += size
+        if not success:
+            self.failed += 1
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        return (f"已处理 {self.files} 个文件（失败 {self.failed}），"
+                f"{self.files / elapsed:.1f} 文件/秒，"
+                f"{self.bytes / elapsed / 1024 / 1024:.2f} MB/秒，"
+                f"耗时 {elapsed:.1f} 秒")
+
+
+def ingest(input_dir, output_path, checkpoint_path=None, workers=None,
+           report_interval=5.0, max_in_flight=None, library_path=None):
+    """批量提取目录中的章节文件
+
+    Args:
+        input_dir: 章节文件目录
+        output_path: 输出JSONL文件路径（追加写入）
+        checkpoint_path: 断点文件路径，默认为输出文件加 .checkpoint 后缀
+        workers: 进程数，默认为CPU核数
+        report_interval: 进度报告间隔（秒）
+        max_in_flight: 同时提交的最大任务数，默认为进程数的4倍
+        library_path: 本地书库路径，提供时同时写入书库（每批结果一次提交）
+
+    Returns:
+        ThroughputMeter统计结果
+    """
+    checkpoint_path = checkpoint_path or output_path + '.checkpoint'
+    done = load_checkpoint(checkpoint_path)
+    if done:
+        print(f"从断点恢复，跳过已完成的 {len(done)} 个文件")
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    meter = ThroughputMeter()
+    last_report = time.perf_counter()
+    
+    library = None
+    if library_path:
+        from library_store import LibraryStore
+        library = LibraryStore(library_path)
+
+    pending_files = (path for path in iter_chapter_files(input_dir) if path not in done)
+    tokenize = library is not None
+
+    def new_executor():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+    def record_failure(path, error):
+        print(f"提取失败: {path}: {error}")
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        meter.add(size, False)
+
+    executor = new_executor()
+    try:
+        with open(output_path, 'a', encoding='utf-8') as output, \
+                open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+
+            # 在途任务 -> 文件路径
+            in_flight = {}
+            # 进程池崩溃时在途的文件，逐个单独重试；单独运行仍崩溃的就是导致崩溃的文件
+            suspects = deque()
+            isolated = None
+            exhausted = False
+            while in_flight or suspects or not exhausted:
+                # 控制在途任务数，避免一次性提交数万个任务；有待重试的文件时一次只提交一个
+                if not in_flight and suspects:
+                    isolated = suspects.popleft()
+                    in_flight[executor.submit(extract_file, isolated, tokenize)] = isolated
+                while not suspects and not exhausted and len(in_flight) < max_in_flight:
+                    path = next(pending_files, None)
+                    if path is None:
+                        exhausted = True
+                    else:
+                        in_flight[executor.submit(extract_file, path, tokenize)] = path
+
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                succeeded = []
+                broken = False
+                for future in finished:
+                    path = in_flight.pop(future)
+                    alone = path == isolated
+                    if alone:
+                        isolated = None
+                    try:
+                        _, size, record, error = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        if alone:
+                            record_failure(path, "工作进程异常退出")
+                        else:
+                            suspects.append(path)
+                        continue
+                    except Exception as e:
+                        record_failure(path, e)
+                        continue
+                    if record is not None:
+                        search_body = record.pop('search_body', None)
+                        record['path'] = path
+                        output.write(json.dumps(record, ensure_ascii=False) + '\n')
+                        if library is not None:
+                            library.save_extraction(os.path.dirname(path), dict(record, url=path), search_body)
+                        succeeded.append(path)
+                        meter.add(size)
+                    else:
+                        record_failure(path, error)
+
+                if broken:
+                    # 同一进程池中其余在途任务也都已失败
+                    suspects.extend(in_flight.values())
+                    in_flight.clear()
+                    executor.shutdown(wait=True)
+                    print(f"工作进程异常退出，重建进程池，逐个重试 {len(suspects)} 个文件")
+                    executor = new_executor()
+
+                # 结果写入并提交后再记录断点，保证中断后不会丢失；失败的文件不记录，下次运行时重试
+                output.flush()
+                if library is not None:
+                    library.flush()
+                for path in succeeded:
+                    checkpoint.write(path + '\n')
+                checkpoint.flush()
+
+                if time.perf_counter() - last_report >= report_interval:
+                    print(meter.report())
+                    last_report = time.perf_counter()
+    finally:
+        executor.shutdown(wait=True)
+
+    if library is not None:
+        library.close()
+    print(meter.report())
+    return meter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量提取目录中的MHTML/HTML章节文件")
+    parser.add_argument('input_dir', help="章节文件目录")
+    parser.add_argument('-o', '--output', default='chapters.jsonl', help="输出JSONL文件（默认 chapters.jsonl）")
+    parser.add_argument('--checkpoint', help="断点文件（默认为输出文件加 .checkpoint）")
+    parser.add_argument('-w', '--workers', type=int, help="工作进程数（默认CPU核数）")
+    parser.add_argument('--report-interval', type=float, default=5.0, help="进度报告间隔秒数")
+    parser.add_argument('--library', help="同时写入的本地书库路径（SQLite）")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.input_dir):
+        print(f"目录不存在: {args.input_dir}")
+        return 1
+
+    ingest(args.input_dir, args.output, args.checkpoint, args.workers, args.report_interval,
+           library_path=args.library)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
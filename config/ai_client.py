@@ -17,6 +17,15 @@ from ai_config import AIModelConfig
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 连续总结时追加到系统提示词，要求AI按book_state可解析的格式返回
+BOOK_CONTEXT_PROMPT = """
+
+这是一本书的连续阅读。用户会先提供前情提要（之前章节的总结、人物和未解决线索），请结合前情理解本章，但只总结本章内容，并严格按以下格式回复：
+【本章总结】3-5句话的本章总结
+【人物】本章出现的主要人物，用顿号分隔
+【未解决线索】本章新出现或仍未解决的情节线索，用分号分隔，没有则写“无”
+【已解决线索】前情中在本章得到解决的线索，用分号分隔，没有则写“无”"""
+
 @dataclass
 class ChatMessage:
     """聊天消息数据类"""
@@ -122,12 +131,14 @@ class AIApiClient:
                 response_time=0.0
             )
     
-    def generate_summary(self, text: str, max_tokens: int = 500) -> APIResponse:
+    def generate_summary(self, text: str, max_tokens: int = 500,
+                         context: Optional[str] = None) -> APIResponse:
         """生成文本总结
         
         Args:
             text: 要总结的文本
             max_tokens: 最大生成token数
+            context: 书籍前情状态，不为None时结合前情总结并分段返回
             
         Returns:
             总结结果
@@ -142,6 +153,12 @@ class AIApiClient:
 
         user_prompt = f"请总结以下小说章节内容：\n\n{text}"
         
+        # 连续总结：只发送紧凑的前情状态和本章正文，并要求分段返回以更新状态
+        if context is not None:
+            system_prompt += BOOK_CONTEXT_PROMPT
+            if context:
+                user_prompt = f"前情提要：\n{context}\n\n{user_prompt}"
+        
         messages = [
             ChatMessage(role="system", content=system_prompt).to_dict(),
             ChatMessage(role="user", content=user_prompt).to_dict()
@@ -368,19 +385,21 @@ class AIModelManager:
             return client.test_connection()
     
     @staticmethod
-    def generate_summary(model_config: AIModelConfig, text: str, max_tokens: int = 500) -> APIResponse:
+    def generate_summary(model_config: AIModelConfig, text: str, max_tokens: int = 500,
+                         context: Optional[str] = None) -> APIResponse:
         """使用指定模型生成总结
         
         Args:
             model_config: AI模型配置
             text: 要总结的文本
             max_tokens: 最大生成token数
+            context: 书籍前情状态（book_state.BookState.to_prompt()），为None时单独总结
             
         Returns:
             总结结果
         """
         with AIModelManager.create_client(model_config) as client:
-            return client.generate_summary(text, max_tokens)
+            return client.generate_summary(text, max_tokens, context=context)
     
     @staticmethod
     def generate_analysis(model_config: AIModelConfig, text: str, analysis_type: str = "comprehensive") -> APIResponse:
@@ -11,6 +11,9 @@ import logging
 from typing import Dict, Any, Optional, Generator
 from dataclasses import dataclass
 
+# 连续总结的格式要求与标准客户端共用
+from ai_client import BOOK_CONTEXT_PROMPT
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -343,7 +346,8 @@ class ImprovedAIClient:
             response_time=response_time
         )
     
-    def generate_summary(self, text: str, max_tokens: int = 500) -> APIResponse:
+    def generate_summary(self, text: str, max_tokens: int = 500,
+                         context: Optional[str] = None) -> APIResponse:
         """生成文本总结（优先使用流式请求）"""
         # 构建专门用于文本总结的prompt
         system_prompt = """你是一个专业的小说内容分析师。请对提供的小说章节内容进行总结，要求：
@@ -355,6 +359,12 @@ class ImprovedAIClient:
 
         user_prompt = f"请总结以下小说章节内容：\n\n{text}"
         
+        # 连续总结：只发送紧凑的前情状态和本章正文，并要求分段返回以更新状态
+        if context is not None:
+            system_prompt += BOOK_CONTEXT_PROMPT
+            if context:
+                user_prompt = f"前情提要：\n{context}\n\n{user_prompt}"
+        
         messages = [
             ChatMessage(role="system", content=system_prompt).to_dict(),
             ChatMessage(role="user", content=user_prompt).to_dict()
@@ -413,7 +423,7 @@ class AIModelManager:
             )
     
     @staticmethod
-    def generate_summary(model_config, text: str) -> APIResponse:
+    def generate_summary(model_config, text: str, context: Optional[str] = None) -> APIResponse:
         """生成文本总结"""
         try:
             client = ImprovedAIClient(
@@ -422,7 +432,7 @@ class AIModelManager:
                 model_name=model_config.model_name
             )
             
-            return client.generate_summary(text)
+            return client.generate_summary(text, context=context)
             
         except Exception as e:
             return APIResponse(
@@ -13,6 +13,7 @@ from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, asdict
 import hashlib
 import base64
+import threading
 
 try:
     from cryptography.fernet import Fernet
@@ -23,6 +24,10 @@ except ImportError:
     CRYPTO_AVAILABLE = False
     print("警告: cryptography库未安装，将使用明文存储API密钥")
 
+# 进程级密钥缓存：PBKDF2派生很慢（10万次迭代），同一密码在进程内只派生一次
+_derived_key_cache: Dict[bytes, bytes] = {}
+_derived_key_lock = threading.Lock()
+
 @dataclass
 class AIModelConfig:
     """AI模型配置数据类"""
@@ -60,16 +65,33 @@ class ConfigEncryptor:
             machine_id = self._get_machine_id()
             password = f"novel_reader_ai_config_{machine_id}"
         
-        # 生成加密密钥
+        self.cipher = Fernet(self._derive_key(password))
+    
+    @staticmethod
+    def _derive_key(password: str) -> bytes:
+        """派生Fernet密钥，结果在进程内缓存，供所有实例共享
+        
+        Args:
+            password: 加密密码
+            
+        Returns:
+            urlsafe base64编码的32字节密钥
+        """
         salt = b'novel_reader_salt'  # 固定盐值，确保一致性
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        self.cipher = Fernet(key)
+        cache_key = hashlib.sha256(salt + password.encode()).digest()
+        
+        with _derived_key_lock:
+            key = _derived_key_cache.get(cache_key)
+            if key is None:
+                kdf = PBKDF2HMAC(
+                    algorithm=hashes.SHA256(),
+                    length=32,
+                    salt=salt,
+                    iterations=100000,
+                )
+                key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+                _derived_key_cache[cache_key] = key
+        return key
     
     def _get_machine_id(self) -> str:
         """获取机器唯一标识"""
@@ -149,7 +171,8 @@ class AIConfigManager:
         self.config_dir = config_dir
         self.config_file = os.path.join(config_dir, "ai_models.json")
         self.backup_dir = os.path.join(config_dir, "backups")
-        self.encryptor = ConfigEncryptor()
+        # 加密器延迟创建，只有真正读写密钥时才派生密钥
+        self._encryptor: Optional[ConfigEncryptor] = None
         
         # 确保目录存在
         os.makedirs(config_dir, exist_ok=True)
@@ -158,6 +181,13 @@ class AIConfigManager:
         # 内存中的配置缓存
         self._models_cache: Optional[List[AIModelConfig]] = None
     
+    @property
+    def encryptor(self) -> ConfigEncryptor:
+        """获取加密器（首次访问时创建）"""
+        if self._encryptor is None:
+            self._encryptor = ConfigEncryptor()
+        return self._encryptor
+    
     def load_models(self) -> List[AIModelConfig]:
         """加载所有AI模型配置
         
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书籍级IDF索引
+随章节导入增量统计词语的文档频率，替代jieba通用IDF表用于关键词提取和
+句子打分；同时保存每章的高频词，使跨章节的关键词查询变为查表
+"""
+
+import os
+import json
+import gzip
+import math
+import tempfile
+from collections import Counter
+
+# 索引文件格式版本
+INDEX_VERSION = 1
+
+# 每章保留的高频词数量
+CHAPTER_TERMS_LIMIT = 200
+
+# 章节数少于该值时IDF统计不可靠，仍使用jieba通用IDF表
+MIN_CHAPTERS_FOR_IDF = 10
+
+
+class BookIDFIndex:
+    """书籍级IDF索引"""
+
+    def __init__(self, path=None):
+        """初始化索引
+
+        Args:
+            path: 索引文件路径（gzip压缩的JSON），存在时自动加载
+        """
+        self.path = path
+        self.chapter_count = 0
+        self.doc_freq = Counter()
+        # 章节ID -> [(词, 词频)]，按词频降序
+        self.chapter_terms = {}
+        # 词 -> 包含该词（在高频词中）的章节ID列表
+        self._postings = None
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    @property
+    def ready(self):
+        """章节数是否足以使用书籍级IDF"""
+        return self.chapter_count >= MIN_CHAPTERS_FOR_IDF
+
+    def add_chapter(self, chapter_id, terms):
+        """导入一个章节的词语
+
+        Args:
+            chapter_id: 章节唯一标识（重复导入同一章节会被忽略）
+            terms: 章节分词后的有效词序列
+
+        Returns:
+            是否为新导入的章节
+        """
+        chapter_id = str(chapter_id)
+        if chapter_id in self.chapter_terms:
+            return False
+
+        freq = Counter(terms)
+        self.doc_freq.update(freq.keys())
+        self.chapter_count += 1
+        self.chapter_terms[chapter_id] = freq.most_common(CHAPTER_TERMS_LIMIT)
+        self._postings = None
+        return True
+
+    def idf(self, term, default=None):
+        """词语的平滑IDF值
+
+        Args:
+            term: 词语
+            default: 索引尚不可用时返回的值
+
+        Returns:
+            IDF值
+        """
+        if not self.ready:
+            return default
+        return math.log((self.chapter_count + 1) / (self.doc_freq.get(term, 0) + 1)) + 1.0
+
+    def chapter_keywords(self, chapter_id, topK=10):
+        """查询章节关键词（按当前全书IDF计算，无需重新分析正文）
+
+        Args:
+            chapter_id: 章节ID
+            topK: 返回的关键词数
+
+        Returns:
+            [(词, 权重)]，按权重降序
+        """
+        terms = self.chapter_terms.get(str(chapter_id))
+        if not terms:
+            return []
+        total = sum(count for _, count in terms)
+        default_idf = math.log(self.chapter_count + 1) + 1.0
+        weighted = [(term, count * (self.idf(term) or default_idf) / total) for term, count in terms]
+        weighted.sort(key=lambda item: item[1], reverse=True)
+        return weighted[:topK]
+
+    def chapters_with_term(self, term):
+        """查询高频词中包含该词的章节ID（按导入顺序）"""
+        if self._postings is None:
+            postings = {}
+            for chapter_id, terms in self.chapter_terms.items():
+                for word, _ in terms:
+                    postings.setdefault(word, []).append(chapter_id)
+            self._postings = postings
+        return list(self._postings.get(term, []))
+
+    def save(self, path=None):
+        """保存索引（先写临时文件再替换，避免中途中断损坏索引）"""
+        path = path or self.path
+        if not path:
+            raise ValueError("未指定索引文件路径")
+
+        data = {
+            'version': INDEX_VERSION,
+            'chapter_count': self.chapter_count,
+            'doc_freq': dict(self.doc_freq),
+            'chapters': self.chapter_terms,
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        self.path = path
+
+    def load(self, path):
+        """从文件加载索引"""
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"不支持的索引版本: {data.get('version')}")
+
+        self.chapter_count = data['chapter_count']
+        self.doc_freq = Counter(data['doc_freq'])
+        self.chapter_terms = {
+            chapter_id: [tuple(item) for item in terms]
+            for chapter_id, terms in data['chapters'].items()
+        }
+        self._postings = None
+        self.path = path
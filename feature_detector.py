@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容特征检测
+用特征词典和小说词典（novel_dict.txt）的全部词语编译一个正则表达式，
+一次扫描统计所有特征词的出现次数，得到各类特征的频次和密度
+"""
+
+import os
+import re
+import threading
+from collections import Counter
+
+# 自定义词典路径
+NOVEL_DICT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "novel_dict.txt")
+
+# 小说词典中的词归入的特征类别
+NOVEL_DICT_CATEGORY = "题材"
+
+# 内置特征词典：类别 -> 特征词
+DEFAULT_FEATURES = {
+    "对话": ["说道", "说：", "问道", "答道", "回答"],
+    "动作": ["走", "跑", "看", "听", "想"],
+    "情感": ["喜", "怒", "哀", "乐", "爱", "恨"],
+    "描写": ["美丽", "壮观", "宏伟", "精致"]
+}
+
+
+class TermCounter:
+    """多个词语的出现次数统计（允许重叠，与逐位置查找一致）
+
+    所有词编译成一个正则表达式，在C层面扫描文本：首字字符集先跳过不可能
+    匹配的位置，再用前瞻匹配从该位置开始的最长词；从同一位置开始的较短词
+    都是最长词的前缀，按前缀表补计
+    """
+
+    def __init__(self, patterns):
+        """编译词表
+
+        Args:
+            patterns: 词语列表（空串和重复项会被忽略）
+        """
+        self.patterns = []
+        index = {}
+        for pattern in patterns:
+            if pattern and pattern not in index:
+                index[pattern] = len(self.patterns)
+                self.patterns.append(pattern)
+
+        # 词 -> 从同一位置开始同时命中的词编号（自身及作为其前缀的词）
+        self._prefix_ids = {
+            pattern: [index[pattern[:k]] for k in range(1, len(pattern) + 1) if pattern[:k] in index]
+            for pattern in self.patterns
+        }
+        self._regex = None
+        if self.patterns:
+            first_chars = ''.join(re.escape(ch) for ch in sorted({p[0] for p in self.patterns}))
+            # 长词在前，前瞻取到的是从该位置开始的最长词
+            alternation = '|'.join(re.escape(p) for p in sorted(self.patterns, key=len, reverse=True))
+            self._regex = re.compile(f"(?=[{first_chars}])(?=({alternation}))")
+
+    def count(self, text):
+        """统计每个词的出现次数
+
+        Returns:
+            与patterns等长的次数列表
+        """
+        counts = [0] * len(self.patterns)
+        if self._regex is None:
+            return counts
+        for term, count in Counter(self._regex.findall(text)).items():
+            for pattern_id in self._prefix_ids[term]:
+                counts[pattern_id] += count
+        return counts
+
+
+def load_dict_terms(path=NOVEL_DICT_PATH):
+    """读取jieba格式的用户词典，返回词语列表（文件不存在时为空）"""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.split()[0] for line in f if line.strip()]
+
+
+class FeatureDetector:
+    """内容特征检测器"""
+
+    def __init__(self, features=None, dict_path=NOVEL_DICT_PATH):
+        """初始化检测器
+
+        Args:
+            features: 特征词典 {类别: [特征词]}，默认为DEFAULT_FEATURES
+            dict_path: 小说词典路径，其中的词归入“题材”类别；为None时不加载
+        """
+        self.features = {category: list(words)
+                         for category, words in (features or DEFAULT_FEATURES).items()}
+        dict_terms = load_dict_terms(dict_path)
+        if dict_terms:
+            self.features.setdefault(NOVEL_DICT_CATEGORY, []).extend(dict_terms)
+
+        # 词语 -> 所属类别（同一个词可属于多个类别）
+        self._term_categories = {}
+        for category, words in self.features.items():
+            for word in words:
+                categories = self._term_categories.setdefault(word, [])
+                if category not in categories:
+                    categories.append(category)
+        self.counter = TermCounter(self._term_categories)
+
+    def detect(self, text):
+        """统计文本中各类特征
+
+        Args:
+            text: 文本
+
+        Returns:
+            {类别: {'count': 出现次数, 'density': 每千字出现次数,
+                    'terms': Counter(命中的词 -> 次数)}}，按特征词典顺序
+        """
+        result = {category: {'count': 0, 'density': 0.0, 'terms': Counter()}
+                  for category in self.features}
+        counts = self.counter.count(text)
+        for term, count in zip(self.counter.patterns, counts):
+            if not count:
+                continue
+            for category in self._term_categories[term]:
+                result[category]['count'] += count
+                result[category]['terms'][term] = count
+
+        length = len(text)
+        if length:
+            for info in result.values():
+                info['density'] = info['count'] * 1000.0 / length
+        return result
+
+
+# 默认检测器只构建一次（界面线程和预取线程都可能首先调用）
+_default_detector = None
+_default_detector_lock = threading.Lock()
+
+
+def get_feature_detector():
+    """返回共享的默认特征检测器"""
+    global _default_detector
+    if _default_detector is None:
+        with _default_detector_lock:
+            if _default_detector is None:
+                _default_detector = FeatureDetector()
+    return _default_detector
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字体反爬解码
+起点等站点用自定义网页字体把正文中的字符映射到私有码位，页面上显示正常，
+提取出的文本却是乱码。本模块下载字体，按以下顺序为每个码位确定真实字符：
+    1. 字形名称（zero/one/period、uniXXXX等）
+    2. 已学到的字形轮廓哈希（轮廓相同即为同一字符，与字形名称和码位无关）
+    3. 渲染字形后交给OCR服务识别（需要Pillow和OCR服务）
+映射表按字体文件哈希缓存在内存和磁盘上，同一字体只解析一次；解码本身是一次
+str.translate。没有OCR客户端时仍有字形无法确定的映射表只缓存在内存中，接入OCR
+客户端后重新解析。首次下载和解析较慢，界面线程用prepare()在后台线程中准备映射表，
+准备好后再解码。字体解析依赖fontTools（可选），未安装时原样返回文本
+"""
+
+import io
+import os
+import json
+import base64
+import hashlib
+import logging
+import tempfile
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from fontTools.ttLib import TTFont
+    from fontTools.pens.basePen import BasePen
+    from fontTools.pens.recordingPen import RecordingPen
+    FONTTOOLS_AVAILABLE = True
+except ImportError:
+    FONTTOOLS_AVAILABLE = False
+    BasePen = object
+
+logger = logging.getLogger(__name__)
+
+# 映射表和轮廓表的缓存目录
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'fonts')
+
+# 内存中缓存的字体数量（起点按章节轮换字体）
+MEMORY_CACHE_SIZE = 64
+
+# 字形名称到字符（起点反爬字体使用英文数字名称）
+GLYPH_NAME_CHARS = {
+    'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
+    'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
+    'period': '.', 'comma': ',', 'hyphen': '-', 'percent': '%', 'colon': ':',
+}
+
+# 字体下载或解析失败后，同一地址在这段时间（秒）内不再重试
+FAILURE_RETRY_SECONDS = 60
+
+# 后台准备映射表的线程数
+PREPARE_WORKERS = 2
+
+# 轮廓哈希前统一缩放到的单位
+OUTLINE_UNITS_PER_EM = 1000
+
+# 渲染字形交给OCR的图片尺寸（像素）
+GLYPH_IMAGE_SIZE = 64
+
+
+def font_hash(data):
+    """字体文件内容的哈希（缓存键）"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def char_from_glyph_name(name):
+    """根据字形名称推断字符，无法推断时返回None"""
+    if name in GLYPH_NAME_CHARS:
+        return GLYPH_NAME_CHARS[name]
+    for prefix in ('uni', 'u'):
+        code = name[len(prefix):]
+        if name.startswith(prefix) and 4 <= len(code) <= 6:
+            try:
+                codepoint = int(code, 16)
+            except ValueError:
+                continue
+            # 私有区码位本身就是混淆后的结果
+            if not 0xE000 <= codepoint <= 0xF8FF and codepoint < 0xF0000:
+                return chr(codepoint)
+    return None
+
+
+def outline_hash(glyph_set, name, units_per_em):
+    """字形轮廓的哈希：坐标缩放到统一单位后取整，不受字形名称和码位影响
+
+    Returns:
+        十六进制哈希，空字形返回None
+    """
+    try:
+        from fontTools.pens.recordingPen import DecomposingRecordingPen
+        pen = DecomposingRecordingPen(glyph_set)
+    except ImportError:
+        pen = RecordingPen()
+    glyph_set[name].draw(pen)
+    if not pen.value:
+        return None
+    scale = OUTLINE_UNITS_PER_EM / units_per_em
+    parts = []
+    for operator, points in pen.value:
+        coords = ",".join(f"{round(x * scale)} {round(y * scale)}" for x, y in
+                          (point for point in points if isinstance(point, tuple) and len(point) == 2))
+        parts.append(f"{operator}:{coords}")
+    return hashlib.blake2b(";".join(parts).encode('ascii'), digest_size=16).hexdigest()
+
+
+class _PolygonPen(BasePen):
+    """把字形轮廓展平为多边形（曲线按固定段数采样）"""
+
+    STEPS = 8
+
+    def __init__(self, glyph_set):
+        super().__init__(glyph_set)
+        self.contours = []
+        self._current = []
+
+    def _moveTo(self, pt):
+        self._current = [pt]
+
+    def _lineTo(self, pt):
+        self._current.append(pt)
+
+    def _curveToOne(self, pt1, pt2, pt3):
+        x0, y0 = self._getCurrentPoint()
+        for i in range(1, self.STEPS + 1):
+            t = i / self.STEPS
+            a, b, c, d = (1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t ** 2, t ** 3
+            self._current.append((a * x0 + b * pt1[0] + c * pt2[0] + d * pt3[0],
+                                  a * y0 + b * pt1[1] + c * pt2[1] + d * pt3[1]))
+
+    def _qCurveToOne(self, pt1, pt2):
+        x0, y0 = self._getCurrentPoint()
+        for i in range(1, self.STEPS + 1):
+            t = i / self.STEPS
+            a, b, c = (1 - t) ** 2, 2 * (1 - t) * t, t ** 2
+            self._current.append((a * x0 + b * pt1[0] + c * pt2[0], a * y0 + b * pt1[1] + c * pt2[1]))
+
+    def _closePath(self):
+        if len(self._current) > 2:
+            self.contours.append(self._current)
+        self._current = []
+
+    _endPath = _closePath
+
+
+def render_glyph(glyph_set, name, size=GLYPH_IMAGE_SIZE):
+    """把字形渲染为白底黑字的PNG（轮廓按奇偶规则填充，保留“口”等字的内部空白）
+
+    Returns:
+        PNG字节，空字形或未安装Pillow时返回None
+    """
+    try:
+        from PIL import Image, ImageChops, ImageDraw
+    except ImportError:
+        return None
+
+    pen = _PolygonPen(glyph_set)
+    glyph_set[name].draw(pen)
+    if not pen.contours:
+        return None
+
+    # 按字形外框等比缩放并居中，字形坐标y轴向上
+    xs = [x for contour in pen.contours for x, _ in contour]
+    ys = [y for contour in pen.contours for _, y in contour]
+    margin = size // 8
+    scale = (size - 2 * margin) / max(max(xs) - min(xs), max(ys) - min(ys), 1)
+    left = margin + ((size - 2 * margin) - (max(xs) - min(xs)) * scale) / 2
+    top = margin + ((size - 2 * margin) - (max(ys) - min(ys)) * scale) / 2
+    ink = Image.new('1', (size, size), 0)
+    for contour in pen.contours:
+        mask = Image.new('1', (size, size), 0)
+        ImageDraw.Draw(mask).polygon(
+            [(left + (x - min(xs)) * scale, top + (max(ys) - y) * scale) for x, y in contour], fill=1)
+        ink = ImageChops.logical_xor(ink, mask)
+    image = ImageChops.invert(ink.convert('L'))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class FontDecoder:
+    """字体反爬解码器"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ocr_client=None, fetch=None, timeout=10):
+        """初始化解码器
+
+        Args:
+            cache_dir: 映射表缓存目录，None表示只缓存在内存中
+            ocr_client: OCRClient，名称和轮廓都无法确定字符时用于识别渲染的字形
+            fetch: 下载函数 fetch(url) -> bytes，默认使用requests
+            timeout: 默认下载函数的超时秒数
+        """
+        self.cache_dir = cache_dir
+        self.ocr_client = ocr_client
+        self.fetch = fetch or self._download
+        self.timeout = timeout
+        # 字体哈希 -> str.translate表
+        self._tables = OrderedDict()
+        # 字体URL -> 字体哈希，避免重复下载
+        self._url_hashes = {}
+        # 字体URL -> 失败时间，避免反复下载失败的字体
+        self._failures = {}
+        # 字体URL -> 后台准备中的Future
+        self._pending = {}
+        # 解析时没有OCR客户端、仍有字形无法确定的字体哈希（映射表不写入磁盘）
+        self._needs_ocr = set()
+        self._executor = None
+        self._outlines = None
+        # _lock只保护缓存，解析字体在_build_lock中进行，不阻塞缓存查询
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+
+    @property
+    def available(self):
+        """是否能够解析字体"""
+        return FONTTOOLS_AVAILABLE
+
+    def _download(self, url):
+        import requests
+        response = requests.get(url, timeout=self.timeout, headers={'User-Agent': 'Mozilla/5.0'})
+        response.raise_for_status()
+        return response.content
+
+    def load_font(self, font_url):
+        """获取字体文件内容（支持data:URI）"""
+        if font_url.startswith('data:'):
+            header, _, payload = font_url.partition(',')
+            return base64.b64decode(payload) if header.endswith(';base64') else payload.encode('latin-1')
+        return self.fetch(font_url)
+
+    def decode(self, text, font_url):
+        """解码被字体混淆的文本
+
+        Args:
+            text: 提取出的文本
+            font_url: 页面使用的反爬字体地址
+
+        Returns:
+            解码后的文本，字体无法获取或解析时返回原文
+        """
+        table = self.get_table_for_url(font_url)
+        return text.translate(table) if table else text
+
+    def cached_table_for_url(self, font_url):
+        """只查缓存中的translate表，不下载也不解析字体（可在界面线程调用）
+
+        Returns:
+            translate表，未缓存时返回None
+        """
+        if not font_url:
+            return None
+        with self._lock:
+            digest = self._url_hashes.get(font_url)
+            return self._get_cached(digest) if digest is not None else None
+
+    def prepare(self, font_url):
+        """在后台线程中下载并解析字体，同一地址进行中的任务共享
+
+        Returns:
+            Future，结果为translate表，失败时为None
+        """
+        with self._lock:
+            future = self._pending.get(font_url)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=PREPARE_WORKERS, thread_name_prefix="font")
+                future = self._executor.submit(self.get_table_for_url, font_url)
+                self._pending[font_url] = future
+                future.add_done_callback(lambda _: self._forget_pending(font_url))
+        return future
+
+    def _forget_pending(self, font_url):
+        with self._lock:
+            self._pending.pop(font_url, None)
+
+    def get_table_for_url(self, font_url):
+        """按字体地址获取translate表（同一地址只下载一次，失败后一段时间内不再重试）"""
+        if not font_url:
+            return None
+        table = self.cached_table_for_url(font_url)
+        if table is not None:
+            return table
+        with self._lock:
+            failed_at = self._failures.get(font_url)
+            if failed_at is not None and time.monotonic() - failed_at < FAILURE_RETRY_SECONDS:
+                return None
+        try:
+            data = self.load_font(font_url)
+        except Exception as e:
+            logger.warning(f"下载反爬字体失败: {font_url}: {e}")
+            table = None
+        else:
+            table = self.get_table(data)
+            if table is not None:
+                with self._lock:
+                    self._url_hashes[font_url] = font_hash(data)
+                    self._failures.pop(font_url, None)
+        if table is None:
+            with self._lock:
+                self._failures[font_url] = time.monotonic()
+        return table
+
+    def get_table(self, font_data):
+        """按字体内容获取translate表，依次查内存缓存、磁盘缓存，最后解析字体"""
+        digest = font_hash(font_data)
+        with self._lock:
+            table = self._get_cached(digest)
+        if table is not None or not FONTTOOLS_AVAILABLE:
+            return table
+        with self._build_lock:
+            # 等待期间其他线程可能已解析了同一字体
+            with self._lock:
+                table = self._get_cached(digest)
+            if table is not None:
+                return table
+            try:
+                mapping, remaining = self._build_map(font_data)
+            except Exception as e:
+                logger.warning(f"解析反爬字体失败: {e}")
+                return None
+            if remaining and self.ocr_client is None:
+                # 接入OCR客户端后再解析，未确定的字形才有机会识别
+                with self._lock:
+                    self._needs_ocr.add(digest)
+            else:
+                with self._lock:
+                    self._needs_ocr.discard(digest)
+                self._save_map(digest, mapping)
+        with self._lock:
+            return self._remember(digest, mapping)
+
+    def _get_cached(self, digest):
+        if digest in self._needs_ocr and self.ocr_client is not None:
+            return None
+        table = self._tables.get(digest)
+        if table is not None:
+            self._tables.move_to_end(digest)
+            return table
+        mapping = self._load_map(digest)
+        if mapping is not None:
+            return self._remember(digest, mapping)
+        return None
+
+    def _remember(self, digest, mapping):
+        table = str.maketrans({int(codepoint): char for codepoint, char in mapping.items()})
+        self._tables[digest] = table
+        while len(self._tables) > MEMORY_CACHE_SIZE:
+            self._tables.popitem(last=False)
+        return table
+
+    def build_map(self, font_data):
+        """解析字体，返回 {码位: 真实字符}（无法确定的码位不包含在内）"""
+        return self._build_map(font_data)[0]
+
+    def _build_map(self, font_data):
+        """解析字体，返回 (映射, 无法确定字符的字形数)"""
+        font = TTFont(io.BytesIO(font_data), lazy=True)
+        try:
+            cmap = font.getBestCmap() or {}
+            glyph_set = font.getGlyphSet()
+            units_per_em = font['head'].unitsPerEm
+            outlines = self._get_outlines()
+
+            mapping = {}
+            unknown = []
+            learned = False
+            for codepoint, name in sorted(cmap.items()):
+                char = char_from_glyph_name(name)
+                digest = outline_hash(glyph_set, name, units_per_em)
+                if char is None and digest is not None:
+                    char = outlines.get(digest)
+                if char is not None:
+                    mapping[codepoint] = char
+                    if digest is not None and outlines.get(digest) != char:
+                        outlines[digest] = char
+                        learned = True
+                elif digest is not None:
+                    unknown.append((codepoint, name, digest))
+
+            if unknown and self.ocr_client is not None:
+                learned = self._recognize_glyphs(glyph_set, unknown, mapping, outlines) or learned
+            remaining = sum(1 for codepoint, _, _ in unknown if codepoint not in mapping)
+            if remaining:
+                logger.info(f"反爬字体中 {remaining} 个字形无法确定对应字符")
+            if learned:
+                self._save_outlines()
+            return mapping, remaining
+        finally:
+            font.close()
+
+    def _recognize_glyphs(self, glyph_set, unknown, mapping, outlines):
+        """渲染无法确定的字形并批量OCR，识别出单个字符的结果写入映射和轮廓表
+
+        Returns:
+            是否学到了新的轮廓
+        """
+        rendered = [(item, render_glyph(glyph_set, item[1])) for item in unknown]
+        rendered = [(item, image) for item, image in rendered if image]
+        if not rendered:
+            return False
+        results = self.ocr_client.recognize_batch([image for _, image in rendered])
+        learned = False
+        for ((codepoint, _, digest), _), result in zip(rendered, results):
+            text = self.ocr_client.parse_result(result).strip() if result else ""
+            if len(text) == 1:
+                mapping[codepoint] = text
+                outlines[digest] = text
+                learned = True
+        return learned
+
+    # ---- 磁盘缓存 ----
+
+    def _map_path(self, digest):
+        return os.path.join(self.cache_dir, 'maps', f"{digest}.json")
+
+    def _outlines_path(self):
+        return os.path.join(self.cache_dir, 'outlines.json')
+
+    def _load_map(self, digest):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._map_path(digest), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_map(self, digest, mapping):
+        if self.cache_dir:
+            self._write_json(self._map_path(digest), {str(k): v for k, v in mapping.items()})
+
+    def _get_outlines(self):
+        if self._outlines is None:
+            self._outlines = {}
+            if self.cache_dir:
+                try:
+                    with open(self._outlines_path(), 'r', encoding='utf-8') as f:
+                        self._outlines = json.load(f)
+                except (OSError, ValueError):
+                    pass
+        return self._outlines
+
+    def _save_outlines(self):
+        if self.cache_dir:
+            self._write_json(self._outlines_path(), self._outlines)
+
+    @staticmethod
+    def _write_json(path, data):
+        """先写临时文件再替换，避免中途中断损坏缓存"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+
+_font_decoder = None
+
+
+def get_font_decoder(ocr_client=None):
+    """获取共享的字体解码器（首次调用时创建）"""
+    global _font_decoder
+    if _font_decoder is None:
+        _font_decoder = FontDecoder(ocr_client=ocr_client)
+    elif ocr_client is not None and _font_decoder.ocr_client is None:
+        _font_decoder.ocr_client = ocr_client
+    return _font_decoder
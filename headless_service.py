@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无界面提取服务
+在offscreen Qt平台上维护一组QWebEnginePage，渲染JavaScript动态加载的章节页面，
+执行与浏览器窗口相同的提取脚本，通过任务队列或本地HTTP接口返回JSON结果。
+页面之间互不依赖，吞吐量随页面池大小增长
+
+用法:
+    python headless_service.py --pool-size 4 --port 8765
+        curl 'http://127.0.0.1:8765/extract?url=https://...'
+        curl -d '{"urls": ["https://...", "https://..."]}' http://127.0.0.1:8765/extract
+    python headless_service.py --pool-size 4 --urls urls.txt -o chapters.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import signal
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from page_scripts import START_EXTRACTION_JS, POLL_RESULT_JS, POLL_INTERVAL_MS, SCRIPT_TIMEOUT
+from resource_blocker import create_extraction_profile
+
+try:
+    from PyQt5.QtCore import QObject, QTimer, QUrl, pyqtSignal
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineProfile
+    PYQT_AVAILABLE = True
+except ImportError as e:
+    PYQT_AVAILABLE = False
+    PYQT_ERROR = str(e)
+
+    # 创建模拟基类避免导入错误
+    class QObject:
+        pass
+    class QWebEnginePage:
+        pass
+    def pyqtSignal(*args, **kwargs):
+        return None
+
+# 默认页面池大小
+DEFAULT_POOL_SIZE = 2
+
+# 单个任务的超时（秒），包括页面加载和脚本执行
+DEFAULT_TIMEOUT = 30
+
+# 静态HTML短于该长度时视为需要JavaScript渲染
+MIN_STATIC_HTML = 1000
+
+# 正文提取结果的最短长度，短于该值时改用HTML解析
+MIN_SCRIPT_CONTENT = 100
+
+
+class ExtractionError(Exception):
+    """页面加载或提取失败"""
+
+
+def is_page_url(url):
+    """是否为可提取的网页地址（只接受http/https，与API服务一致，不读取本地文件）"""
+    return isinstance(url, str) and url.startswith(('http://', 'https://'))
+
+
+def needs_script(html):
+    """页面是否需要执行提取脚本（动态加载的正文或几乎为空的静态HTML）"""
+    return len(html) < MIN_STATIC_HTML or 'read-content' in html
+
+
+def script_font_url(script_result):
+    """提取脚本结果中的反爬字体地址，没有时返回None"""
+    try:
+        content = json.loads(script_result).get('content')
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        return None
+    return content.get('fontUrl') if isinstance(content, dict) else None
+
+
+def build_record(url, script_result, html, web_extractor, font_decoder=None):
+    """将提取脚本的返回值整理为与浏览器窗口一致的提取结果
+
+    Args:
+        url: 页面URL
+        script_result: 提取脚本返回的字符串（JSON或整个页面HTML），未执行时为None
+        html: 页面加载完成时的HTML
+        web_extractor: 脚本未取到正文时用于解析HTML的WebExtractor
+        font_decoder: 用于解码字体反爬的FontDecoder，None时保留混淆文本
+
+    Returns:
+        提取结果字典
+    """
+    data = None
+    if script_result:
+        try:
+            data = json.loads(script_result)
+        except (json.JSONDecodeError, TypeError):
+            data = None
+
+    if isinstance(data, dict):
+        content = data.get('content', '')
+        font_url = None
+        if isinstance(content, dict):
+            font_url = content.get('fontUrl')
+            content = content.get('text', '')
+            if font_url and font_decoder is not None:
+                content = font_decoder.decode(content or '', font_url)
+        content = (content or '').strip()
+        if len(content) > MIN_SCRIPT_CONTENT:
+            record = {
+                'title': data.get('title', '未知标题'),
+                'text': content,
+                'chapter_info': data.get('chapterInfo', ''),
+                'url': url,
+                'word_count': len(content),
+                'method': 'javascript'
+            }
+            if font_url:
+                record['font_url'] = font_url
+            return record
+
+    # 脚本失败时返回的是渲染后的整个页面，比加载完成时的HTML更完整
+    if script_result and data is None and len(script_result) > len(html):
+        html = script_result
+    record = web_extractor.extract_content(html, url)
+    record['url'] = url
+    record['method'] = 'html'
+    return record
+
+
+class HeadlessPage(QWebEnginePage):
+    """无界面页面：屏蔽弹窗、控制台输出和新窗口"""
+
+    def javaScriptAlert(self, url, msg):
+        pass
+
+    def javaScriptConfirm(self, url, msg):
+        return False
+
+    def javaScriptConsoleMessage(self, level, message, line, source):
+        pass
+
+    def createWindow(self, window_type):
+        return None
+
+
+class _Job:
+    """一次提取任务"""
+
+    def __init__(self, url, future):
+        self.url = url
+        self.future = future
+        self.html = ''
+        self.script_deadline = 0.0
+        self.font_prepared = False
+        # 重定向或页面内location.replace会让loadFinished触发多次，只处理第一次
+        self.load_handled = False
+
+
+class HeadlessExtractionPool(QObject):
+    """无界面页面池
+
+    submit()可在任意线程调用，页面的加载和脚本执行都在Qt主线程中进行
+    """
+
+    _submitted = pyqtSignal()
+    _font_ready = pyqtSignal(object)
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, profile=None,
+                 block_resources=True, block_images=True, parent=None):
+        """初始化页面池
+
+        Args:
+            pool_size: 同时渲染的页面数
+            timeout: 单个任务的超时秒数
+            profile: QWebEngineProfile，默认使用独立的无痕配置
+            block_resources: 未提供profile时是否拦截广告、跟踪和第三方媒体等请求
+            block_images: 是否同时拦截图片（图片地址仍从HTML中提取）
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        if profile is None:
+            profile = (create_extraction_profile(self, block_images=block_images)
+                       if block_resources else QWebEngineProfile(self))
+        self.profile = profile
+        self.completed = 0
+        self.failed = 0
+
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._idle = [self._create_page() for _ in range(pool_size)]
+        self._web_extractor = None
+        self._font_decoder = None
+        self._closed = False
+        self._submitted.connect(self._dispatch)
+        self._font_ready.connect(lambda resume: resume())
+
+    @property
+    def web_extractor(self):
+        """HTML解析用的WebExtractor（首次使用时创建）"""
+        if self._web_extractor is None:
+            from web_extractor import WebExtractor
+            self._web_extractor = WebExtractor()
+        return self._web_extractor
+
+    @property
+    def font_decoder(self):
+        """字体反爬解码器（首次使用时创建，映射表按字体缓存）"""
+        if self._font_decoder is None:
+            from font_decoder import get_font_decoder
+            self._font_decoder = get_font_decoder()
+        return self._font_decoder
+
+    def _create_page(self):
+        page = HeadlessPage(self.profile, self)
+        page.loadFinished.connect(lambda ok, page=page: self._on_load_finished(page, ok))
+        return page
+
+    def submit(self, url):
+        """提交提取任务（线程安全）
+
+        Returns:
+            Future，结果为提取结果字典，失败时抛出ExtractionError
+        """
+        future = Future()
+        if self._closed:
+            future.set_exception(ExtractionError("提取服务已关闭"))
+            return future
+        if not is_page_url(url):
+            future.set_exception(ExtractionError(f"只支持http/https地址: {url}"))
+            return future
+        self._queue.put(_Job(url, future))
+        # 跨线程发出的信号会排队到主线程执行
+        self._submitted.emit()
+        return future
+
+    def stats(self):
+        """页面池状态"""
+        stats = {
+            'pool_size': self.pool_size,
+            'busy': len(self._jobs),
+            'queued': self._queue.qsize(),
+            'completed': self.completed,
+            'failed': self.failed
+        }
+        blocker = getattr(self.profile, 'blocker', None)
+        if blocker is not None:
+            stats['requests'] = blocker.stats.to_dict()
+        return stats
+
+    def _dispatch(self):
+        """把排队的任务分配给空闲页面"""
+        while self._idle and not self._closed:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            page = self._idle.pop()
+            self._jobs[page] = job
+            QTimer.singleShot(int(self.timeout * 1000), lambda page=page, job=job: self._on_timeout(page, job))
+            page.load(QUrl(job.url))
+
+    def _is_current(self, page, job):
+        return self._jobs.get(page) is job
+
+    def _on_load_finished(self, page, ok):
+        job = self._jobs.get(page)
+        if job is None or job.load_handled:
+            return
+        job.load_handled = True
+        if not ok:
+            self._finish(page, job, error=f"页面加载失败: {job.url}")
+            return
+        page.toHtml(lambda html, page=page, job=job: self._on_html(page, job, html))
+
+    def _on_html(self, page, job, html):
+        if not self._is_current(page, job):
+            return
+        job.html = html or ' '
+        if not needs_script(job.html):
+            self._complete(page, job, None)
+            return
+        job.script_deadline = time.monotonic() + min(self.timeout, SCRIPT_TIMEOUT)
+        page.runJavaScript(START_EXTRACTION_JS)
+        self._poll(page, job)
+
+    def _poll(self, page, job):
+        if self._is_current(page, job):
+            page.runJavaScript(POLL_RESULT_JS, lambda result, page=page, job=job: self._on_poll(page, job, result))
+
+    def _on_poll(self, page, job, result):
+        if not self._is_current(page, job):
+            return
+        if result is None and time.monotonic() < job.script_deadline:
+            QTimer.singleShot(POLL_INTERVAL_MS, lambda page=page, job=job: self._poll(page, job))
+            return
+        self._complete(page, job, result)
+
+    def _complete(self, page, job, script_result):
+        # 反爬字体首次出现时在后台线程中下载和解析，完成后回到主线程继续，不阻塞其他页面
+        font_url = script_font_url(script_result)
+        if (font_url and not job.font_prepared
+                and self.font_decoder.cached_table_for_url(font_url) is None):
+            job.font_prepared = True
+            self.font_decoder.prepare(font_url).add_done_callback(
+                lambda _, page=page, job=job: self._font_ready.emit(
+                    lambda: self._complete(page, job, script_result)))
+            return
+        if not self._is_current(page, job):
+            return
+        try:
+            record = build_record(job.url, script_result, job.html, self.web_extractor, self.font_decoder)
+        except Exception as e:
+            self._finish(page, job, error=f"解析页面失败: {e}")
+            return
+        self._finish(page, job, record=record)
+
+    def _on_timeout(self, page, job):
+        if not self._is_current(page, job):
+            return
+        # 超时页面可能仍在加载，之后的信号会干扰下一个任务，直接换一个新页面
+        del self._jobs[page]
+        page.loadFinished.disconnect()
+        page.triggerAction(QWebEnginePage.Stop)
+        page.deleteLater()
+        self._idle.append(self._create_page())
+        self.failed += 1
+        job.future.set_exception(ExtractionError(f"提取超时（{self.timeout}秒）: {job.url}"))
+        self._dispatch()
+
+    def _finish(self, page, job, record=None, error=None):
+        if not self._is_current(page, job):
+            return
+        del self._jobs[page]
+        self._idle.append(page)
+        if error:
+            self.failed += 1
+            job.future.set_exception(ExtractionError(error))
+        else:
+            self.completed += 1
+            job.future.set_result(record)
+        self._dispatch()
+
+    def close(self):
+        """关闭页面池，排队和进行中的任务以失败结束"""
+        self._closed = True
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job.future.set_running_or_notify_cancel():
+                job.future.set_exception(ExtractionError("提取服务已关闭"))
+        for page, job in list(self._jobs.items()):
+            job.future.set_exception(ExtractionError("提取服务已关闭"))
+            page.deleteLater()
+        self._jobs.clear()
+        for page in self._idle:
+            page.deleteLater()
+        self._idle = []
+
+
+def result_to_json(url, future, timeout=None):
+    """等待任务完成并转换为接口返回的JSON对象"""
+    try:
+        return {'url': url, 'status': 'success', 'content': future.result(timeout)}
+    except Exception as e:
+        return {'url': url, 'status': 'error', 'error': str(e) or type(e).__name__}
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """本地HTTP接口
+
+    GET  /extract?url=...         提取单个页面
+    POST /extract {"url": ...}     提取单个页面
+    POST /extract {"urls": [...]}  并行提取多个页面，按顺序返回
+    GET  /status                  页面池状态
+    """
+
+    pool = None
+    timeout = DEFAULT_TIMEOUT * 2
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _extract(self, urls, single):
+        if not urls or not all(is_page_url(url) for url in urls):
+            return self._reply(400, {'status': 'error', 'error': '缺少有效的url参数'})
+        futures = [(url, self.pool.submit(url)) for url in urls]
+        results = [result_to_json(url, future, self.timeout) for url, future in futures]
+        if single:
+            result = results[0]
+            return self._reply(200 if result['status'] == 'success' else 502, result)
+        self._reply(200, {'status': 'success', 'items': results})
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/status':
+            return self._reply(200, dict(self.pool.stats(), status='success'))
+        if parsed.path == '/extract':
+            return self._extract(parse_qs(parsed.query).get('url', [])[:1], single=True)
+        self._reply(404, {'status': 'error', 'error': 'not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/extract':
+            return self._reply(404, {'status': 'error', 'error': 'not found'})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, json.JSONDecodeError):
+            return self._reply(400, {'status': 'error', 'error': '请求体不是有效的JSON'})
+        if not isinstance(data, dict):
+            return self._reply(400, {'status': 'error', 'error': '请求体不是有效的JSON'})
+        if 'urls' in data:
+            urls = data['urls'] if isinstance(data['urls'], list) else []
+            return self._extract(urls, single=False)
+        return self._extract([data['url']] if data.get('url') else [], single=True)
+
+
+def make_http_server(pool, host='127.0.0.1', port=8765, timeout=None):
+    """创建HTTP接口服务器（每个请求一个线程，等待结果时不阻塞Qt主线程）
+
+    Args:
+        pool: 提供submit(url)和stats()的页面池
+        host: 监听地址
+        port: 监听端口，0表示随机端口
+        timeout: 单个请求等待结果的秒数
+
+    Returns:
+        ThreadingHTTPServer，调用serve_forever()开始服务
+    """
+    handler = type('Handler', (_ServiceHandler,), {
+        'pool': pool,
+        'timeout': timeout or getattr(pool, 'timeout', DEFAULT_TIMEOUT) * 2
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def run_queue(pool, urls, output, max_in_flight=None):
+    """逐个提交URL并按输入顺序写出JSONL结果（在后台线程中运行）
+
+    Args:
+        pool: 页面池
+        urls: URL可迭代对象
+        output: 文本输出流
+        max_in_flight: 同时提交的最大任务数，默认为页面池大小的2倍
+
+    Returns:
+        (成功数, 失败数)
+    """
+    max_in_flight = max_in_flight or pool.pool_size * 2
+    pending = deque()
+    succeeded = failed = 0
+
+    def write_oldest():
+        nonlocal succeeded, failed
+        url, future = pending.popleft()
+        result = result_to_json(url, future)
+        if result['status'] == 'success':
+            succeeded += 1
+        else:
+            failed += 1
+        output.write(json.dumps(result, ensure_ascii=False) + '\n')
+        output.flush()
+
+    for url in urls:
+        url = url.strip()
+        if not url or url.startswith('#'):
+            continue
+        pending.append((url, pool.submit(url)))
+        if len(pending) >= max_in_flight:
+            write_oldest()
+    while pending:
+        write_oldest()
+    return succeeded, failed
+
+
+def create_application(argv=None):
+    """创建无界面QApplication（必须在创建任何页面之前调用）"""
+    if not PYQT_AVAILABLE:
+        raise ImportError(f"无法启动无界面提取服务: {PYQT_ERROR}")
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    # Chromium沙箱不能在root用户下运行，服务器上通常以root启动
+    if hasattr(os, 'geteuid') and os.geteuid() == 0:
+        os.environ.setdefault('QTWEBENGINE_DISABLE_SANDBOX', '1')
+    app = QApplication.instance()
+    return app or QApplication(argv or [sys.argv[0]])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面章节提取服务（QWebEnginePage页面池）")
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE, help="同时渲染的页面数")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="单个页面的超时秒数")
+    parser.add_argument('--host', default='127.0.0.1', help="HTTP接口监听地址")
+    parser.add_argument('--port', type=int, default=8765, help="HTTP接口监听端口")
+    parser.add_argument('--no-blocking', action='store_true', help="不拦截广告、跟踪和第三方媒体请求")
+    parser.add_argument('--load-images', action='store_true', help="加载图片（默认拦截）")
+    parser.add_argument('--urls', help="从文件读取URL（每行一个，'-'表示标准输入），处理完后退出")
+    parser.add_argument('-o', '--output', help="URL队列模式的JSONL输出文件（默认标准输出）")
+    args = parser.parse_args(argv)
+
+    try:
+        app = create_application()
+    except ImportError as e:
+        print(f"错误: {e}")
+        print("请安装依赖: pip install PyQt5 PyQtWebEngine")
+        return 1
+
+    pool = HeadlessExtractionPool(args.pool_size, args.timeout,
+                                  block_resources=not args.no_blocking, block_images=not args.load_images)
+    # Qt事件循环中Python无法及时处理Ctrl+C，由定时器定期让出控制权
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+    watcher = QTimer()
+    watcher.start(200)
+
+    if args.urls:
+        summary = {}
+
+        def feed():
+            source = sys.stdin if args.urls == '-' else open(args.urls, 'r', encoding='utf-8')
+            output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+            try:
+                summary['result'] = run_queue(pool, source, output)
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+                if output is not sys.stdout:
+                    output.close()
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        # 队列线程结束后退出事件循环
+        watcher.timeout.connect(lambda: feeder.is_alive() or app.quit())
+        app.exec_()
+        pool.close()
+        succeeded, failed = summary.get('result', (0, 0))
+        print(f"完成 {succeeded} 个页面，失败 {failed} 个", file=sys.stderr)
+        if getattr(pool.profile, 'blocker', None) is not None:
+            print(pool.profile.blocker.stats.report(), file=sys.stderr)
+        return 0 if failed == 0 else 2
+
+    server = make_http_server(pool, args.host, args.port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"无界面提取服务已启动: http://{args.host}:{server.server_address[1]}（页面池 {args.pool_size}）",
+          file=sys.stderr)
+    try:
+        app.exec_()
+    finally:
+        server.shutdown()
+        server.server_close()
+        pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,652 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地书库
+用SQLite（WAL模式）持久化书籍、章节、提取结果、OCR结果和总结，
+按内容哈希去重，已处理过的内容直接从书库读取，不再重复提取/识别/总结。
+保存章节时同时更新该书的IDF索引（书库文件旁的idf目录，每本书一个文件）；
+AI连续总结的书籍滚动状态保存在书库文件旁的book_states目录
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+from simhash import simhash, to_signed, to_unsigned, SimHashIndex, DEFAULT_MAX_DISTANCE
+from corpus_idf import BookIDFIndex
+from book_state import BookState
+
+# 默认书库路径
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "library.db")
+
+# 累积多少次写入后提交一次事务
+DEFAULT_BATCH_SIZE = 50
+
+# 提交事务时最多每隔多少秒保存一次有变化的IDF索引（关闭书库时总会保存）
+IDF_SAVE_INTERVAL = 30.0
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    book_key TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chapters (
+    id INTEGER PRIMARY KEY,
+    book_id INTEGER NOT NULL REFERENCES books(id),
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    content_hash TEXT,
+    simhash INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chapters_book ON chapters(book_id);
+CREATE INDEX IF NOT EXISTS idx_chapters_hash ON chapters(content_hash);
+
+CREATE TABLE IF NOT EXISTS extractions (
+    content_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    method TEXT NOT NULL DEFAULT '',
+    word_count INTEGER NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ocr_results (
+    image_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    confidence REAL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chapter_images (
+    chapter_id INTEGER NOT NULL REFERENCES chapters(id),
+    image_hash TEXT NOT NULL,
+    image_url TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (chapter_id, image_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_chapter_images_hash ON chapter_images(image_hash);
+
+CREATE TABLE IF NOT EXISTS summaries (
+    content_hash TEXT NOT NULL,
+    method TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (content_hash, method)
+);
+"""
+
+
+# 全文索引：正文预先用jieba分词并以空格连接，由FTS5的unicode61分词器按空格切分，
+# rowid与chapters.id一致
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS chapter_fts USING fts5(
+    title, body, tokenize='unicode61 remove_diacritics 0'
+);
+"""
+
+# 检索结果高亮标记
+HIGHLIGHT_START = '【'
+HIGHLIGHT_END = '】'
+
+
+def tokenize_for_search(text):
+    """用jieba分词（含novel_dict.txt），返回以空格连接的词序列"""
+    from ai_summary import get_jieba
+    return ' '.join(word for word in get_jieba().cut(text) if word.strip())
+
+
+def _parse_query(query):
+    """拆分用户查询，返回 [(查询项, 是否前缀匹配)]"""
+    terms = []
+    for phrase, term in re.findall(r'"([^"]*)"|(\S+)', query):
+        text = (phrase or term).strip()
+        prefix = text.endswith('*')
+        text = text.rstrip('*').strip()
+        if text:
+            terms.append((text, prefix))
+    return terms
+
+
+def build_fts_query(query):
+    """将用户查询转换为FTS5查询
+
+    空格分隔的每一项都必须出现（AND）；每一项分词后作为短语匹配，
+    以 * 结尾的项最后一个词按前缀匹配；用双引号包住的内容作为一个短语
+
+    Args:
+        query: 用户输入，如 '张无忌 倚天*' 或 '"光明顶之战"'
+
+    Returns:
+        FTS5查询字符串，没有有效词时返回空字符串
+    """
+    clauses = []
+    for text, prefix in _parse_query(query):
+        tokens = tokenize_for_search(text).split()
+        if not tokens:
+            continue
+        clause = '"' + ' '.join(token.replace('"', '""') for token in tokens) + '"'
+        clauses.append(clause + ' *' if prefix else clause)
+    return ' '.join(clauses)
+
+
+def make_snippet(text, terms, width=60):
+    """在原文中截取首个命中附近的片段并高亮查询项
+
+    FTS5的snippet()需要对整章重新分词，按命中章节逐一计算开销较大；
+    直接在原文中查找查询项更快，且片段保留原文格式
+
+    Args:
+        text: 章节原文
+        terms: 查询项列表
+        width: 片段字数
+
+    Returns:
+        片段文本，查询项用【】标出
+    """
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)),
+                         re.IGNORECASE)
+    match = pattern.search(text)
+    if match is None:
+        start = 0
+    else:
+        start = max(0, match.start() - width // 3)
+    end = min(len(text), start + width)
+    window = re.sub(r'\s+', ' ', text[start:end])
+    snippet = pattern.sub(lambda m: HIGHLIGHT_START + m.group(0) + HIGHLIGHT_END, window)
+    return ('…' if start > 0 else '') + snippet + ('…' if end < len(text) else '')
+
+
+def content_hash(data):
+    """计算文本或字节内容的哈希（用于去重）"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+class LibraryStore:
+    """本地书库"""
+
+    def __init__(self, path=DEFAULT_LIBRARY_PATH, batch_size=DEFAULT_BATCH_SIZE, search_index=True,
+                 idf_index=True):
+        """打开（必要时创建）书库
+
+        Args:
+            path: 数据库文件路径，":memory:" 表示内存数据库（IDF索引只保存在内存中）
+            batch_size: 累积多少次写入后提交一次事务
+            search_index: 保存提取结果时是否同时更新全文索引
+            idf_index: 保存提取结果时是否同时更新书籍级IDF索引
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self._pending = 0
+        self._batch_depth = 0
+        # 浏览器的下载/识别线程也会写入，同一连接用锁串行化
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        # 近似重复查找用的SimHash索引，首次查找时从chapters表加载
+        self._simhash_index = None
+
+        # 书籍标识 -> BookIDFIndex，首次使用时从索引文件加载；章节数有变化的在提交时保存
+        self.idf_index = idf_index
+        self._idf_indexes = {}
+        self._idf_saved_counts = {}
+        self._idf_saved_at = time.monotonic()
+
+        # 部分SQLite构建没有FTS5，此时书库照常可用，只是不能检索
+        self.search_index = search_index
+        try:
+            with self._conn:
+                self._conn.executescript(FTS_SCHEMA)
+                # rank使用BM25，标题匹配的权重为正文的5倍
+                self._conn.execute(
+                    "INSERT INTO chapter_fts (chapter_fts, rank) VALUES ('rank', 'bm25(5.0, 1.0)')")
+            self.fts_available = True
+        except sqlite3.OperationalError as e:
+            print(f"SQLite不支持FTS5，全文检索不可用: {e}")
+            self.fts_available = False
+
+    def _migrate(self):
+        """升级旧版本书库的表结构"""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if 0 < version < 2:
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(chapters)")}
+            if 'simhash' not in columns:
+                self._conn.execute("ALTER TABLE chapters ADD COLUMN simhash INTEGER")
+
+    # ---- 事务 ----
+
+    def _wrote(self):
+        """记录一次写入，达到批量大小且不在batch()中时提交"""
+        self._pending += 1
+        if self._batch_depth == 0 and self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """提交所有未提交的写入"""
+        with self._lock:
+            if self._pending:
+                self._conn.commit()
+                self._pending = 0
+            if time.monotonic() - self._idf_saved_at >= IDF_SAVE_INTERVAL:
+                self.save_idf_indexes()
+
+    @contextmanager
+    def batch(self):
+        """批量写入：块内的写入在退出时一次提交"""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def close(self):
+        """提交并关闭书库"""
+        with self._lock:
+            self.flush()
+            self.save_idf_indexes()
+            self._conn.close()
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+
+    # ---- 书籍和章节 ----
+
+    def get_or_create_book(self, book_key, title=""):
+        """按书籍标识获取书籍ID，不存在时创建"""
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM books WHERE book_key=?", (book_key,)).fetchone()
+            if row:
+                if title:
+                    self._conn.execute("UPDATE books SET title=? WHERE id=? AND title=''", (title, row['id']))
+                return row['id']
+            cursor = self._conn.execute(
+                "INSERT INTO books (book_key, title, created_at) VALUES (?, ?, ?)",
+                (book_key, title, time.time()))
+            self._wrote()
+            return cursor.lastrowid
+
+    def _upsert_chapter(self, book_id, url, title, text_hash, fingerprint=None):
+        """插入或更新章节，返回章节ID"""
+        now = time.time()
+        signed = to_signed(fingerprint) if fingerprint is not None else None
+        self._conn.execute(
+            "INSERT INTO chapters (book_id, url, title, content_hash, simhash, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET title=excluded.title, "
+            "content_hash=COALESCE(excluded.content_hash, chapters.content_hash), "
+            "simhash=COALESCE(excluded.simhash, chapters.simhash), "
+            "updated_at=excluded.updated_at",
+            (book_id, url, title, text_hash, signed, now, now))
+        self._wrote()
+        return self._conn.execute("SELECT id FROM chapters WHERE url=?", (url,)).fetchone()['id']
+
+    def get_chapters(self, book_key):
+        """按加入顺序列出一本书的章节"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.id, c.url, c.title, c.content_hash FROM chapters c "
+                "JOIN books b ON b.id = c.book_id WHERE b.book_key=? ORDER BY c.id",
+                (book_key,)).fetchall()
+        return [dict(row) for row in rows]
+
+    # ---- 提取结果 ----
+
+    def save_extraction(self, book_key, extracted_content, search_body=None):
+        """保存一次提取结果
+
+        正文按内容哈希去重，同一内容只存储一份；章节正文变化时更新全文索引，
+        并计算SimHash指纹用于查找镜像站点的近似重复章节
+
+        Args:
+            book_key: 书籍标识
+            extracted_content: 提取结果字典（title、text、url/source等）
+            search_body: 预先分词的正文（tokenize_for_search的结果），
+                为None时在需要索引时现场分词
+
+        Returns:
+            (章节ID, 正文哈希)
+        """
+        text = extracted_content.get('text', '')
+        url = extracted_content.get('url') or extracted_content.get('source', '')
+        title = extracted_content.get('title', '')
+        text_hash = content_hash(text)
+        metadata = {key: value for key, value in extracted_content.items()
+                    if key not in ('text', 'images', 'ocr_results', 'search_body') and
+                    isinstance(value, (str, int, float, bool, type(None)))}
+
+        with self._lock:
+            book_id = self.get_or_create_book(book_key)
+            previous = self._conn.execute(
+                "SELECT content_hash FROM chapters WHERE url=?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR IGNORE INTO extractions (content_hash, text, method, word_count, metadata, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (text_hash, text, extracted_content.get('extraction_method', ''), len(text),
+                 json.dumps(metadata, ensure_ascii=False), time.time()))
+            changed = previous is None or previous['content_hash'] != text_hash
+            fingerprint = simhash(text) if changed else None
+            chapter_id = self._upsert_chapter(book_id, url, title, text_hash, fingerprint)
+            if changed:
+                if search_body is None and (self._search_enabled or self.idf_index):
+                    search_body = tokenize_for_search(text)
+                self._index_chapter(chapter_id, title, text, search_body)
+                if self._simhash_index is not None:
+                    self._simhash_index.add(chapter_id, fingerprint)
+                if self.idf_index and url:
+                    from ai_summary import keyword_terms
+                    self.get_idf_index(book_key).add_chapter(url, keyword_terms(search_body.split()))
+            return chapter_id, text_hash
+
+    def get_extraction(self, url):
+        """读取章节最近一次的提取结果，不存在时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT c.title, c.url, e.content_hash, e.text, e.method, e.word_count, e.metadata "
+                "FROM chapters c JOIN extractions e ON e.content_hash = c.content_hash "
+                "WHERE c.url=?", (url,)).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row['metadata'])
+        result.update(title=row['title'], url=row['url'], text=row['text'],
+                      word_count=row['word_count'], content_hash=row['content_hash'])
+        return result
+
+    # ---- 书籍级IDF ----
+
+    def _idf_path(self, book_key):
+        if self.path == ":memory:":
+            return None
+        name = hashlib.sha1(book_key.encode('utf-8')).hexdigest() + '.json.gz'
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), 'idf', name)
+
+    def get_idf_index(self, book_key):
+        """一本书的IDF索引（随保存的章节增量更新，供关键词提取使用）"""
+        with self._lock:
+            index = self._idf_indexes.get(book_key)
+            if index is None:
+                path = self._idf_path(book_key)
+                try:
+                    index = BookIDFIndex(path)
+                except (OSError, ValueError) as e:
+                    print(f"IDF索引损坏，重新统计: {e}")
+                    index = BookIDFIndex()
+                    index.path = path
+                self._idf_indexes[book_key] = index
+                self._idf_saved_counts[book_key] = index.chapter_count
+            return index
+
+    def save_idf_indexes(self):
+        """保存导入了新章节的IDF索引（包括通过get_idf_index直接导入的）"""
+        with self._lock:
+            for book_key, index in self._idf_indexes.items():
+                if index.path and index.chapter_count != self._idf_saved_counts[book_key]:
+                    index.save()
+                    self._idf_saved_counts[book_key] = index.chapter_count
+            self._idf_saved_at = time.monotonic()
+
+    # ---- 书籍滚动状态 ----
+
+    def _book_state_path(self, book_key):
+        if self.path == ":memory:":
+            return None
+        name = hashlib.sha1(book_key.encode('utf-8')).hexdigest() + '.json'
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), 'book_states', name)
+
+    def get_book_state(self, book_key, title=""):
+        """读取一本书的滚动总结状态，没有保存过（或文件损坏）时返回新状态"""
+        path = self._book_state_path(book_key)
+        if path and os.path.exists(path):
+            try:
+                return BookState.load(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"书籍状态损坏，重新开始: {e}")
+        return BookState(title)
+
+    def save_book_state(self, book_key, state):
+        """保存一本书的滚动总结状态（内存书库不保存）"""
+        path = self._book_state_path(book_key)
+        if path:
+            state.save(path)
+
+    # ---- 近似重复 ----
+
+    def _load_simhash_index(self):
+        """从chapters表构建SimHash索引"""
+        if self._simhash_index is None:
+            index = SimHashIndex(DEFAULT_MAX_DISTANCE)
+            for row in self._conn.execute("SELECT id, simhash FROM chapters WHERE simhash IS NOT NULL"):
+                index.add(row['id'], to_unsigned(row['simhash']))
+            self._simhash_index = index
+        return self._simhash_index
+
+    def find_near_duplicates(self, text, max_distance=DEFAULT_MAX_DISTANCE, exclude_url=None):
+        """查找与文本近似重复的已保存章节
+
+        Args:
+            text: 章节正文
+            max_distance: 最大汉明距离（不超过DEFAULT_MAX_DISTANCE）
+            exclude_url: 排除的章节URL（通常是文本自身所在章节）
+
+        Returns:
+            [{'chapter_id', 'url', 'title', 'content_hash', 'distance'}]，按距离升序
+        """
+        fingerprint = simhash(text)
+        if not fingerprint:
+            return []
+        with self._lock:
+            matches = self._load_simhash_index().find(fingerprint, max_distance)
+            if not matches:
+                return []
+            distances = dict(matches)
+            rows = self._conn.execute(
+                f"SELECT id AS chapter_id, url, title, content_hash FROM chapters "
+                f"WHERE id IN ({','.join('?' * len(distances))})", list(distances)).fetchall()
+        results = [dict(row, distance=distances[row['chapter_id']])
+                   for row in rows if row['url'] != exclude_url]
+        results.sort(key=lambda item: (item['distance'], item['chapter_id']))
+        return results
+
+    def find_summary(self, text, method, exclude_url=None):
+        """查找已有总结：先按正文哈希精确匹配，再查近似重复章节的总结
+
+        Returns:
+            总结内容，不存在时返回None
+        """
+        summary = self.get_summary(content_hash(text), method)
+        if summary is not None:
+            return summary
+        for duplicate in self.find_near_duplicates(text, exclude_url=exclude_url):
+            summary = self.get_summary(duplicate['content_hash'], method)
+            if summary is not None:
+                return summary
+        return None
+
+    # ---- 全文检索 ----
+
+    @property
+    def _search_enabled(self):
+        return self.fts_available and self.search_index
+
+    def _index_chapter(self, chapter_id, title, text, search_body=None):
+        """更新一个章节的全文索引"""
+        if not self._search_enabled:
+            return
+        if search_body is None:
+            search_body = tokenize_for_search(text)
+        self._conn.execute("DELETE FROM chapter_fts WHERE rowid=?", (chapter_id,))
+        self._conn.execute(
+            "INSERT INTO chapter_fts (rowid, title, body) VALUES (?, ?, ?)",
+            (chapter_id, tokenize_for_search(title), search_body))
+        self._wrote()
+
+    def rebuild_search_index(self):
+        """为所有章节重建全文索引（用于已有书库首次启用检索）
+
+        Returns:
+            索引的章节数
+        """
+        if not self.fts_available:
+            return 0
+        with self.batch():
+            self._conn.execute("DELETE FROM chapter_fts")
+            rows = self._conn.execute(
+                "SELECT c.id, c.title, e.text FROM chapters c "
+                "JOIN extractions e ON e.content_hash = c.content_hash").fetchall()
+            for row in rows:
+                self._index_chapter(row['id'], row['title'], row['text'])
+        return len(rows)
+
+    def search(self, query, book_key=None, limit=20, order='rank', snippet_chars=60):
+        """全文检索章节
+
+        Args:
+            query: 查询（见build_fts_query：空格分隔为AND，双引号为短语，* 结尾为前缀）
+            book_key: 只在这本书中检索
+            limit: 最多返回的章节数
+            order: 'rank' 按BM25相关度排序（标题权重更高），'chapter' 按章节顺序
+                （用于查找人物/物品首次出现的章节）
+            snippet_chars: 摘要片段的字数
+
+        Returns:
+            [{'chapter_id', 'url', 'title', 'book_key', 'snippet', 'score'}]
+        """
+        if not self.fts_available:
+            return []
+        fts_query = build_fts_query(query)
+        if not fts_query:
+            return []
+
+        # 先只按rowid和相关度选出前limit个章节（FTS5对 ORDER BY rank LIMIT 有优化），
+        # 再只为这些章节读取原文生成摘要片段
+        sql = "SELECT rowid, rank FROM chapter_fts WHERE chapter_fts MATCH ?"
+        params = [fts_query]
+        if book_key is not None:
+            sql += (" AND rowid IN (SELECT c.id FROM chapters c JOIN books b ON b.id = c.book_id"
+                    " WHERE b.book_key = ?)")
+            params.append(book_key)
+        sql += " ORDER BY rowid" if order == 'chapter' else " ORDER BY rank"
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            hits = self._conn.execute(sql, params).fetchall()
+            if not hits:
+                return []
+            ids = [hit['rowid'] for hit in hits]
+            rows = self._conn.execute(
+                "SELECT c.id AS chapter_id, c.url, c.title, b.book_key, e.text "
+                "FROM chapters c "
+                "JOIN books b ON b.id = c.book_id "
+                "JOIN extractions e ON e.content_hash = c.content_hash "
+                f"WHERE c.id IN ({','.join('?' * len(ids))})", ids).fetchall()
+
+        terms = [text for text, _ in _parse_query(query)]
+        by_id = {row['chapter_id']: row for row in rows}
+        results = []
+        for hit in hits:
+            row = by_id.get(hit['rowid'])
+            if row is None:
+                continue
+            result = dict(row)
+            result['snippet'] = make_snippet(result.pop('text'), terms, snippet_chars)
+            # bm25越小越相关，取反后越大越相关
+            result['score'] = -hit['rank']
+            results.append(result)
+        return results
+
+    # ---- OCR结果 ----
+
+    def save_ocr_result(self, image_hash, text, confidence=None, chapter_url=None, image_url=""):
+        """保存一张图片的OCR结果（按图片字节哈希去重）
+
+        Args:
+            image_hash: 图片字节的content_hash
+            text: 识别文本
+            confidence: 置信度
+            chapter_url: 图片所在章节URL（章节需已保存）
+            image_url: 图片地址
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_results (image_hash, text, confidence, created_at) "
+                "VALUES (?, ?, ?, ?)", (image_hash, text, confidence, time.time()))
+            self._wrote()
+            if chapter_url:
+                row = self._conn.execute("SELECT id FROM chapters WHERE url=?", (chapter_url,)).fetchone()
+                if row:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO chapter_images (chapter_id, image_hash, image_url) "
+                        "VALUES (?, ?, ?)", (row['id'], image_hash, image_url))
+                    self._wrote()
+
+    def get_ocr_results(self, image_hashes):
+        """批量查询已识别的图片
+
+        Returns:
+            {图片哈希: {'text': 识别文本, 'confidence': 置信度}}
+        """
+        hashes = list(dict.fromkeys(image_hashes))
+        found = {}
+        with self._lock:
+            # SQLite默认最多999个参数，分段查询
+            for offset in range(0, len(hashes), 500):
+                chunk = hashes[offset:offset + 500]
+                rows = self._conn.execute(
+                    f"SELECT image_hash, text, confidence FROM ocr_results "
+                    f"WHERE image_hash IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+                for row in rows:
+                    found[row['image_hash']] = {'text': row['text'], 'confidence': row['confidence']}
+        return found
+
+    # ---- 总结 ----
+
+    def save_summary(self, text_hash, method, summary):
+        """保存总结（同一正文、同一总结方式只保留最新一份）
+
+        Args:
+            text_hash: 正文哈希
+            method: 总结方式，如 "rule" 或 "ai:模型名"
+            summary: 总结内容
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (content_hash, method, summary, created_at) "
+                "VALUES (?, ?, ?, ?)", (text_hash, method, summary, time.time()))
+            self._wrote()
+
+    def get_summary(self, text_hash, method):
+        """读取已保存的总结，不存在时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries WHERE content_hash=? AND method=?",
+                (text_hash, method)).fetchone()
+        return row['summary'] if row else None
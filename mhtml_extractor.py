@@ -7,12 +7,147 @@ MHTML文件内容提取器
 
 import os
 import re
-import email
+import mmap
 import binascii
+from collections import namedtuple
+from email.parser import BytesHeaderParser
 from bs4 import BeautifulSoup
-from urllib.parse import unquote
-import base64
-import quopri
+from urllib.parse import unquote, urljoin
+
+# MIME分段：headers为解析后的头部(email.message.Message)，
+# start/end为正文在文件中的字节偏移，正文本身不会被读入内存
+MimePart = namedtuple('MimePart', ['headers', 'start', 'end'])
+
+_header_parser = BytesHeaderParser()
+
+# 小于该字节数的图片通常是图标或占位图，不做OCR
+MIN_IMAGE_BYTES = 1024
+
+
+def _find_blank_line(data, start):
+    """查找从start开始的头部结束位置
+    
+    Returns:
+        (头部结束偏移, 正文起始偏移)，未找到时返回 (-1, -1)
+    """
+    # 头部为空，紧接着就是空行
+    if data[start:start + 2] == b'\r\n':
+        return start, start + 2
+    if data[start:start + 1] == b'\n':
+        return start, start + 1
+    
+    candidates = []
+    crlf = data.find(b'\r\n\r\n', start)
+    if crlf != -1:
+        candidates.append((crlf, crlf + 4))
+    lf = data.find(b'\n\n', start)
+    if lf != -1:
+        candidates.append((lf, lf + 2))
+    if not candidates:
+        return -1, -1
+    return min(candidates)
+
+
+def iter_mime_parts(data):
+    """增量扫描MIME消息的各个分段
+    
+    只解析各分段的头部并按boundary定位正文范围，不复制、不解码正文，
+    适用于mmap映射的大文件（内嵌图片和CSS的MHTML可达数十MB）。
+    
+    Args:
+        data: bytes或mmap对象
+        
+    Yields:
+        MimePart(headers, start, end)
+    """
+    header_end, body_start = _find_blank_line(data, 0)
+    if header_end == -1:
+        return
+    
+    top_headers = _header_parser.parsebytes(data[:header_end])
+    boundary = top_headers.get_param('boundary')
+    if not boundary or top_headers.get_content_maintype() != 'multipart':
+        # 单一分段的消息，整个正文就是内容
+        yield MimePart(top_headers, body_start, len(data))
+        return
+    
+    # 分隔行必须位于行首
+    separator = b'\n--' + boundary.encode('ascii', errors='ignore')
+    pos = data.find(separator, body_start - 1)
+    
+    while pos != -1:
+        marker_end = pos + len(separator)
+        # 结束分隔符 --boundary--
+        if data[marker_end:marker_end + 2] == b'--':
+            return
+        
+        line_end = data.find(b'\n', marker_end)
+        if line_end == -1:
+            return
+        part_start = line_end + 1
+        
+        part_header_end, part_body_start = _find_blank_line(data, part_start)
+        if part_header_end == -1:
+            return
+        
+        next_pos = data.find(separator, part_body_start - 1)
+        part_body_end = next_pos if next_pos != -1 else len(data)
+        if data[part_body_end - 1:part_body_end] == b'\r':
+            part_body_end -= 1
+        
+        headers = _header_parser.parsebytes(data[part_start:part_header_end])
+        yield MimePart(headers, part_body_start, max(part_body_start, part_body_end))
+        
+        pos = next_pos
+
+
+# 编码检测与解码用的预编译正则
+_QP_ESCAPE_RE = re.compile(r'=[0-9A-Fa-f]{2}')
+_QP_SOFT_BREAK_RE = re.compile(r'=[ \t]*\r?\n')
+_QP_SPLIT_ESCAPE_RE = re.compile(r'=([0-9A-Fa-f])\s+([0-9A-Fa-f])')
+_BASE64_RE = re.compile(r'[A-Za-z0-9+/]+={0,2}')
+_URL_ESCAPE_RE = re.compile(r'%[0-9A-Fa-f]{2}')
+
+
+def detect_text_encoding(text):
+    """快速检测文本可能的编码方式（每种特征只扫描一次）
+    
+    Args:
+        text: 待检测文本
+        
+    Returns:
+        'quoted-printable'、'base64'、'url'，或None表示无需解码
+    """
+    if not text:
+        return None
+    if len(text) > 100 and len(_QP_ESCAPE_RE.findall(text)) > 10:
+        return 'quoted-printable'
+    if len(text) >= 16 and _BASE64_RE.fullmatch(text.strip()):
+        return 'base64'
+    if _URL_ESCAPE_RE.search(text):
+        return 'url'
+    return None
+
+
+def decode_part_body(raw, transfer_encoding):
+    """按Content-Transfer-Encoding解码分段正文
+    
+    Args:
+        raw: 分段原始字节
+        transfer_encoding: 传输编码（base64、quoted-printable等）
+        
+    Returns:
+        解码后的字节
+    """
+    encoding = (transfer_encoding or '').strip().lower()
+    try:
+        if encoding == 'base64':
+            return binascii.a2b_base64(raw)
+        if encoding == 'quoted-printable':
+            return binascii.a2b_qp(raw)
+    except (binascii.Error, ValueError):
+        pass
+    return raw
 
 class MHTMLExtractor:
     """MHTML文件内容提取器"""
@@ -39,43 +174,32 @@ class MHTMLExtractor:
             return None
             
         try:
-            # 使用email库处理MHTML文件（因为MHTML是基于MIME标准的）
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                mhtml_content = file.read()
-            
-            self.log(f"成功读取文件，内容长度: {len(mhtml_content)} 字符")
+            # MHTML基于MIME标准，使用mmap增量扫描分段，只解码HTML分段
+            html_content = None
+            html_location = ''
+            image_parts = []
+            mhtml_content = None
+            with open(file_path, 'rb') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    self.log("文件为空")
+                    return None
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    self.log(f"成功映射文件，大小: {len(data)} 字节")
+                    try:
+                        html_content, html_location, image_parts = self._scan_parts(data)
+                    except Exception as mime_error:
+                        self.log(f"扫描MIME分段失败: {mime_error}")
+                    
+                    if not html_content:
+                        # 回退方案需要完整文本
+                        mhtml_content = data[:].decode('utf-8', errors='ignore')
             
-            # 尝试解析为email/MIME消息
-            try:
-                msg = email.message_from_string(mhtml_content)
-                self.log("成功解析MHTML为MIME消息")
-                
-                # 提取HTML部分
-                html_content = None
-                for part in msg.walk():
-                    content_type = part.get_content_type()
-                    if content_type == "text/html":
-                        self.log(f"找到HTML部分，编码: {part.get_content_charset()}")
-                        try:
-                            # 尝试获取HTML内容
-                            payload = part.get_payload(decode=True)
-                            charset = part.get_content_charset() or 'utf-8'
-                            html_content = payload.decode(charset, errors='ignore')
-                            self.log(f"成功解码HTML内容，长度: {len(html_content)}")
-                            break
-                        except Exception as decode_error:
-                            self.log(f"解码HTML内容失败: {decode_error}")
-                
-                if html_content:
-                    # 使用解析出的HTML内容
-                    html_blocks = [html_content]
-                else:
-                    # 回退到正则表达式提取
-                    self.log("未能从MIME消息中提取HTML，回退到正则表达式")
-                    html_blocks = re.findall(r'<html[\s\S]*?</html>', mhtml_content, re.IGNORECASE)
-            except Exception as mime_error:
-                self.log(f"解析MIME消息失败，使用正则表达式: {mime_error}")
+            if html_content:
+                # 使用解析出的HTML内容（已按MIME头部解码）
+                html_blocks = [html_content]
+            else:
                 # 回退到正则表达式提取
+                self.log("未能从MIME消息中提取HTML，回退到正则表达式")
                 html_blocks = re.findall(r'<html[\s\S]*?</html>', mhtml_content, re.IGNORECASE)
             
             self.log(f"找到 {len(html_blocks)} 个HTML块")
@@ -102,7 +226,7 @@ class MHTMLExtractor:
             results = []
             for i, html_block in enumerate(html_blocks):
                 self.log(f"正在处理HTML块 {i+1}/{len(html_blocks)}")
-                result = self._process_html_block(html_block, i)
+                result = self._process_html_block(html_block, i, decoded=html_content is not None)
                 if result:
                     results.append(result)
             
@@ -114,11 +238,14 @@ class MHTMLExtractor:
             best_result = max(results, key=lambda x: x['content_length'])
             self.log(f"找到最佳结果，内容长度: {best_result['content_length']}")
             
+            # 正文引用的内嵌图片直接从MIME分段解码，供OCR使用
+            images = self._load_images(file_path, image_parts, best_result['image_urls'], html_location)
+            
             return {
                 'title': best_result['title'],
                 'text': best_result['content'],
                 'word_count': best_result['content_length'],
-                'images': [],  # MHTML中的图片暂不处理
+                'images': images,
                 'source': file_path,
                 'extraction_method': 'mhtml_direct_parse'
             }
@@ -129,78 +256,158 @@ class MHTMLExtractor:
             self.log(traceback.format_exc())
             return None
     
-    def _decode_text(self, text):
-        """尝试解码文本"""
-        original_text = text
+    def _scan_parts(self, data):
+        """扫描MIME数据：解码第一个text/html分段，并记录图片分段的位置
         
-        # 检查是否包含大量"=XX"格式，这是quoted-printable编码的特征
-        if '=' in text and text.count('=') > 10 and len(text) > 100:
+        Args:
+            data: bytes或mmap对象
+            
+        Returns:
+            (HTML文本或None, HTML分段的Content-Location, 图片分段列表)
+        """
+        html_content = None
+        html_location = ''
+        image_parts = []
+        
+        for part in iter_mime_parts(data):
+            content_type = part.headers.get_content_type()
+            
+            if content_type.startswith('image/'):
+                # 只记录位置，用到时再解码
+                image_parts.append(part)
+                continue
+            
+            if content_type != "text/html" or html_content is not None:
+                continue
+            
+            charset = part.headers.get_content_charset() or 'utf-8'
+            transfer_encoding = part.headers.get('Content-Transfer-Encoding', '')
+            self.log(f"找到HTML部分，编码: {charset}，传输编码: {transfer_encoding or '无'}")
+            
+            payload = decode_part_body(data[part.start:part.end], transfer_encoding)
             try:
-                # 尝试修复可能的格式问题并解码
-                text = text.replace('\n', '')
-                text = text.replace(' ', '')
-                # 确保每个等号后面都有两个字符（quoted-printable格式）
-                cleaned_text = ""
-                i = 0
-                while i < len(text):
-                    if text[i] == '=' and i+2 < len(text):
-                        try:
-                            # 检查后两个字符是否是有效的十六进制
-                            int(text[i+1:i+3], 16)
-                            cleaned_text += text[i:i+3]
-                            i += 3
-                        except ValueError:
-                            cleaned_text += text[i]
-                            i += 1
-                    else:
-                        cleaned_text += text[i]
-                        i += 1
-                
-                # 尝试使用quopri解码
-                decoded = quopri.decodestring(cleaned_text).decode('utf-8', errors='ignore')
-                self.log(f"成功应用quoted-printable解码")
-                return decoded
-            except Exception as e:
-                self.log(f"quoted-printable解码失败: {e}")
+                html_content = payload.decode(charset, errors='ignore')
+            except LookupError:
+                html_content = payload.decode('utf-8', errors='ignore')
+            html_location = part.headers.get('Content-Location', '')
+            self.log(f"成功解码HTML内容，长度: {len(html_content)}")
+        
+        self.log(f"找到 {len(image_parts)} 个内嵌图片分段")
+        return html_content, html_location, image_parts
+    
+    def _load_images(self, file_path, image_parts, image_urls, base_url=''):
+        """将正文引用的内嵌图片直接从MIME分段解码到内存
+        
+        Args:
+            file_path: MHTML文件路径
+            image_parts: _scan_parts记录的图片分段
+            image_urls: 正文中<img>引用的地址，按出现顺序
+            base_url: 用于解析相对地址的页面地址
+            
+        Returns:
+            图片信息列表，每项包含url、content_type和图片字节data
+        """
+        if not image_parts or not image_urls:
+            return []
+        
+        parts_by_location = {}
+        for part in image_parts:
+            location = part.headers.get('Content-Location', '')
+            if location:
+                parts_by_location.setdefault(location, part)
+        
+        images = []
+        seen = set()
+        with open(file_path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for image in image_urls:
+                    url = urljoin(base_url, image['url']) if base_url else image['url']
+                    part = parts_by_location.get(url)
+                    if part is None or url in seen:
+                        continue
+                    seen.add(url)
+                    
+                    payload = decode_part_body(
+                        data[part.start:part.end],
+                        part.headers.get('Content-Transfer-Encoding', '')
+                    )
+                    if len(payload) < MIN_IMAGE_BYTES:
+                        continue
+                    images.append({
+                        'url': url,
+                        'alt': image.get('alt', ''),
+                        'title': image.get('title', ''),
+                        'content_type': part.headers.get_content_type(),
+                        'data': payload
+                    })
+        
+        self.log(f"解码正文引用的内嵌图片 {len(images)} 张")
+        return images
+    
+    def _decode_text(self, text, transfer_encoding=None):
+        """解码文本
+        
+        Args:
+            text: 待解码文本
+            transfer_encoding: 已知的传输编码（来自MIME头部）；为None时
+                用detect_text_encoding检测一次，只尝试检测到的那种编码
                 
-        # 尝试标准的quoted-printable解码
+        Returns:
+            解码后的文本，无法解码时返回原文本
+        """
+        encoding = transfer_encoding or detect_text_encoding(text)
+        if not encoding:
+            return text
+        
         try:
-            if '=' in text:
-                decoded = quopri.decodestring(text).decode('utf-8', errors='ignore')
-                if decoded != text and len(decoded) > 10:
-                    self.log("标准quoted-printable解码成功")
-                    return decoded
-        except:
-            pass
+            if encoding == 'quoted-printable':
+                # 去掉软换行、修复被空白打断的"=XX"，再用C实现的a2b_qp整体解码
+                repaired = _QP_SOFT_BREAK_RE.sub('', text)
+                repaired = _QP_SPLIT_ESCAPE_RE.sub(r'=\1\2', repaired)
+                decoded = binascii.a2b_qp(repaired.encode('utf-8')).decode('utf-8', errors='ignore')
+                self.log("成功应用quoted-printable解码")
+                return decoded
             
-        # 检查是否可能是Base64编码（只包含Base64字符）
-        base64_chars = set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=")
-        if all(c in base64_chars for c in text.strip()):
-            try:
-                padding_needed = 4 - (len(text) % 4)
-                if padding_needed < 4:
-                    text += "=" * padding_needed
-                decoded = base64.b64decode(text).decode('utf-8', errors='ignore')
+            if encoding == 'base64':
+                stripped = text.strip()
+                stripped += "=" * (-len(stripped) % 4)
+                decoded = binascii.a2b_base64(stripped).decode('utf-8', errors='ignore')
                 if decoded.isprintable() and len(decoded) > 10:
                     self.log("Base64解码成功")
                     return decoded
-            except:
-                pass
-
-        # 尝试URL解码
-        try:
-            decoded = unquote(text)
-            if decoded != text:
+                return text
+            
+            if encoding == 'url':
+                decoded = unquote(text)
                 self.log("URL解码成功")
                 return decoded
-        except:
-            pass
-
-        # 如果所有解码方法都失败，返回原始文本
-        return original_text
+        except (binascii.Error, ValueError) as e:
+            self.log(f"{encoding}解码失败: {e}")
+        
+        return text
 
-    def _process_html_block(self, html_block, block_index):
-        """处理单个HTML块"""
+    def _collect_image_urls(self, element):
+        """收集元素内<img>的地址，按出现顺序"""
+        image_urls = []
+        for img in element.find_all('img'):
+            src = img.get('src', img.get('data-src', img.get('data-original')))
+            if src and not src.startswith('data:'):
+                image_urls.append({
+                    'url': src,
+                    'alt': img.get('alt', ''),
+                    'title': img.get('title', '')
+                })
+        return image_urls
+    
+    def _process_html_block(self, html_block, block_index, decoded=False):
+        """处理单个HTML块
+        
+        Args:
+            html_block: HTML文本
+            block_index: 块序号
+            decoded: HTML是否已按MIME头部的传输编码解码过，
+                已解码时不再对标题和正文做编码猜测
+        """
         try:
             soup = BeautifulSoup(html_block, 'html.parser')
             
@@ -235,6 +442,7 @@ class MHTMLExtractor:
             ]
             
             content = ""
+            image_urls = []
             for selector in content_selectors:
                 content_elem = soup.select_one(selector)
                 if content_elem:
@@ -244,21 +452,24 @@ class MHTMLExtractor:
                         content = '\n'.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
                     else:
                         content = content_elem.get_text().strip()
+                    image_urls = self._collect_image_urls(content_elem)
                     
-                    if len(content) > 100:  # 只接受足够长的内容
+                    # 只接受足够长的内容，图片章节则以图片为正文
+                    if len(content) > 100 or image_urls:
                         self.log(f"使用选择器 '{selector}' 找到内容")
                         break
             
-            if not content or len(content) < 100:
+            if (not content or len(content) < 100) and not image_urls:
                 self.log("未找到足够长的内容")
                 return None
                 
-            # 处理可能的编码问题
-            if title and title != "未找到标题":
-                title = self._decode_text(title)
+            if not decoded:
+                # 处理可能的编码问题
+                if title and title != "未找到标题":
+                    title = self._decode_text(title)
 
-            # 解码内容
-            content = self._decode_text(content)
+                # 解码内容
+                content = self._decode_text(content)
             
             # 如果标题看起来是编码的，尝试使用文件名作为标题
             if '%' in title or '=' in title:
@@ -272,7 +483,8 @@ class MHTMLExtractor:
                 'block_index': block_index,
                 'title': title,
                 'content': content,
-                'content_length': len(content)
+                'content_length': len(content),
+                'image_urls': image_urls
             }
             
         except Exception as e:
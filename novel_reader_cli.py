@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+小说阅读器命令行工具
+不依赖图形界面执行浏览器中的抓取、提取、OCR和总结流程，输入可以是文件、目录、
+URL或标准输入（'-'，每行一个路径/URL或上一步输出的JSON记录），结果逐条写入JSONL，
+可串联使用，适合在服务器上运行夜间批量任务
+
+用法:
+    python novel_reader_cli.py fetch URL... -o pages.jsonl
+    python novel_reader_cli.py extract 章节目录 chapter.mhtml https://... -o chapters.jsonl
+    python novel_reader_cli.py ocr 1.png https://example.com/2.png chapters.jsonl -o ocr.jsonl
+    python novel_reader_cli.py summarize chapters.jsonl --method ai --model 模型名 -o summaries.jsonl
+    python novel_reader_cli.py book 章节目录 --state book_state.json -o book.jsonl
+    cat urls.txt | python novel_reader_cli.py extract - | python novel_reader_cli.py summarize -
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from bulk_ingest import iter_chapter_files, extract_file, to_record
+
+# 同时提交的任务数为工作者数的倍数，避免一次性提交全部输入
+IN_FLIGHT_FACTOR = 4
+
+# 规则总结每批提交给进程池的章节数
+SUMMARY_BATCH_SIZE = 256
+
+# 每个工作进程/线程内复用的网页提取器
+_web_extractor = None
+
+
+def is_url(item):
+    return isinstance(item, str) and item.startswith(('http://', 'https://'))
+
+
+def _parse_line(line):
+    """解析输入中的一行：JSON记录或路径/URL，空行和注释忽略"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line.startswith('{'):
+        return json.loads(line)
+    return line
+
+
+def iter_inputs(inputs):
+    """展开命令行输入
+
+    '-'逐行读取标准输入，目录递归列出章节文件，.jsonl文件逐行读取记录
+
+    Yields:
+        路径/URL字符串，或上一步输出的记录字典
+    """
+    for item in inputs:
+        if item == '-':
+            lines = sys.stdin
+        elif os.path.isdir(item):
+            yield from iter_chapter_files(item)
+            continue
+        elif item.lower().endswith('.jsonl') and os.path.isfile(item):
+            lines = open(item, 'r', encoding='utf-8')
+        else:
+            yield item
+            continue
+        try:
+            for line in lines:
+                parsed = _parse_line(line)
+                if parsed is not None:
+                    yield parsed
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+
+
+def source_of(item):
+    """输入项的来源标识（路径或URL）"""
+    if isinstance(item, dict):
+        return item.get('url') or item.get('path') or item.get('source') or ''
+    return item
+
+
+def ordered_map(executor, func, items, max_in_flight):
+    """并行执行func，按输入顺序产出结果，同时在途的任务不超过max_in_flight"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class JsonlOutput:
+    """JSONL输出（默认为标准输出），统计成功和失败数"""
+
+    def __init__(self, path=None):
+        self.stream = open(path, 'w', encoding='utf-8') if path else sys.stdout
+        self.written = 0
+        self.failed = 0
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.stream.flush()
+        self.written += 1
+
+    def fail(self, source, error):
+        print(f"失败: {source}: {error}", file=sys.stderr)
+        self.failed += 1
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+        print(f"完成 {self.written} 条，失败 {self.failed} 条", file=sys.stderr)
+        return 0 if self.failed == 0 else 2
+
+
+def _get_web_extractor():
+    global _web_extractor
+    if _web_extractor is None:
+        from web_extractor import WebExtractor
+        _web_extractor = WebExtractor()
+    return _web_extractor
+
+
+# ---- fetch ----
+
+def fetch_item(item):
+    """下载一个网页
+
+    Returns:
+        (来源, 记录或None, 错误信息)
+    """
+    url = source_of(item)
+    if not is_url(url):
+        return url, None, "不是有效的URL"
+    html = _get_web_extractor().fetch_url(url)
+    if not html:
+        return url, None, "下载失败"
+    return url, {'url': url, 'html': html}, ""
+
+
+def cmd_fetch(args, output):
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for source, record, error in ordered_map(executor, fetch_item, iter_inputs(args.inputs),
+                                                 args.workers * IN_FLIGHT_FACTOR):
+            if record is None:
+                output.fail(source, error)
+            else:
+                output.write(record)
+
+
+# ---- extract ----
+
+def extract_item(item):
+    """提取一个输入项：章节文件、URL或fetch输出的记录（含html）
+
+    Returns:
+        (来源, 提取结果或None, 错误信息)
+    """
+    source = source_of(item)
+    if isinstance(item, dict) and item.get('text'):
+        # 已经是提取结果
+        return source, item, ""
+    if isinstance(item, dict) and item.get('html'):
+        html = item['html']
+    elif is_url(item):
+        html = _get_web_extractor().fetch_url(item)
+        if not html:
+            return source, None, "下载失败"
+    elif isinstance(item, str) and os.path.isfile(item):
+        path, _, record, error = extract_file(item)
+        if record is not None:
+            record['path'] = path
+        return source, record, error
+    else:
+        return source, None, "无法识别的输入"
+
+    try:
+        result = _get_web_extractor().extract_content(html, source)
+    except Exception as e:
+        return source, None, str(e)
+    if not result or not result.get('text'):
+        return source, None, "未提取到内容"
+    record = to_record(result)
+    record['url'] = source
+    return source, record, ""
+
+
+def iter_extracted(inputs, workers, output):
+    """并行提取输入，按顺序产出提取结果，失败的输入记入output"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for source, record, error in ordered_map(executor, extract_item, iter_inputs(inputs),
+                                                 workers * IN_FLIGHT_FACTOR):
+            if record is None:
+                output.fail(source, error)
+            else:
+                yield record
+
+
+def cmd_extract(args, output):
+    for record in iter_extracted(args.inputs, args.workers, output):
+        output.write(record)
+
+
+# ---- ocr ----
+
+def _load_image(source, timeout=15):
+    """读取本地图片或下载网络图片"""
+    if is_url(source):
+        import requests
+        response = requests.get(source, headers=_get_web_extractor().headers, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _load_image_safely(source):
+    try:
+        return _load_image(source), ""
+    except Exception as e:
+        return None, str(e)
+
+
+def cmd_ocr(args, output):
+    from ocr_client import OCRClient, DEFAULT_OCR_URL
+
+    ocr_url = args.ocr_url or DEFAULT_OCR_URL
+    with OCRClient(ocr_url, batch_size=args.batch_size, max_workers=args.workers) as client, \
+            ThreadPoolExecutor(max_workers=args.workers) as downloader:
+        if not client.is_available():
+            output.fail(ocr_url, "OCR服务不可用")
+            return
+
+        # 图片输入逐张输出；提取结果识别其中的图片，识别文字写入ocr_text
+        for item in iter_inputs(args.inputs):
+            if isinstance(item, dict):
+                sources = [image['url'] for image in item.get('images', []) if image.get('url')]
+            else:
+                sources = [item]
+            loaded = list(downloader.map(_load_image_safely, sources))
+            images = [data for data, _ in loaded if data is not None]
+            results = iter(client.recognize_batch(images)) if images else iter(())
+
+            texts = []
+            for source, (data, error) in zip(sources, loaded):
+                text = client.parse_result(next(results)) if data is not None else ""
+                if data is None:
+                    output.fail(source, error)
+                elif not isinstance(item, dict):
+                    output.write({'source': source, 'text': text})
+                texts.append(text)
+            if isinstance(item, dict):
+                output.write(dict(item, ocr_text="\n".join(text for text in texts if text)))
+
+
+# ---- summarize ----
+
+def _read_chapter(item):
+    """summarize的输入：提取结果记录或文本文件"""
+    if isinstance(item, dict):
+        return item
+    if isinstance(item, str) and os.path.isfile(item):
+        with open(item, 'r', encoding='utf-8', errors='ignore') as f:
+            return {'path': item, 'text': f.read()}
+    return None
+
+
+def load_ai_model(name=None):
+    """按名称或ID获取AI模型配置，未指定时使用默认模型"""
+    from config.ai_config import get_config_manager
+    manager = get_config_manager()
+    if name:
+        for model in manager.load_models():
+            if name in (model.name, model.id):
+                return model
+        raise ValueError(f"未找到AI模型: {name}")
+    model = manager.get_default_model()
+    if model is None:
+        raise ValueError("未配置默认AI模型，请先在浏览器中配置或使用 --model 指定")
+    return model
+
+
+def _summary_record(chapter, method, summary, keywords=None):
+    record = {
+        'source': source_of(chapter),
+        'title': chapter.get('title', ''),
+        'method': method,
+        'summary': summary
+    }
+    if keywords is not None:
+        record['keywords'] = keywords
+    return record
+
+
+def summarize_rule(chapters, workers, idf_index=None):
+    """规则总结：按批交给进程池，按输入顺序产出 (章节, 总结记录)
+
+    Args:
+        idf_index: 书籍级IDF索引，章节足够多时关键词按全书IDF计算
+    """
+    from ai_summary import TextSummarizer
+    summarizer = TextSummarizer(idf_index=idf_index)
+    batch = []
+
+    def flush():
+        results = summarizer.summarize_batch([chapter.get('text', '') for chapter in batch], workers=workers)
+        for chapter, result in zip(batch, results):
+            yield chapter, _summary_record(chapter, 'rule', result['summary'], result['keywords'])
+        batch.clear()
+
+    for chapter in chapters:
+        batch.append(chapter)
+        if len(batch) >= SUMMARY_BATCH_SIZE:
+            yield from flush()
+    if batch:
+        yield from flush()
+
+
+def summarize_ai(chapters, model, workers, output):
+    """AI总结：章节之间互不依赖，多线程并发请求"""
+    from config.ai_client import AIModelManager
+
+    def summarize(chapter):
+        return chapter, AIModelManager.generate_summary(model, chapter.get('text', ''))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chapter, result in ordered_map(executor, summarize, chapters, workers * IN_FLIGHT_FACTOR):
+            if result.success:
+                yield chapter, _summary_record(chapter, f"ai:{model.name}", result.content)
+            else:
+                output.fail(source_of(chapter), result.error_message)
+
+
+def iter_chapters(inputs, output):
+    """summarize的输入逐条转换为章节记录，没有正文的输入记为失败"""
+    for item in iter_inputs(inputs):
+        chapter = _read_chapter(item)
+        if chapter is None or not chapter.get('text'):
+            output.fail(source_of(item), "没有可总结的正文")
+        else:
+            yield chapter
+
+
+def cmd_summarize(args, output):
+    chapters = iter_chapters(args.inputs, output)
+    if args.method == 'ai':
+        try:
+            model = load_ai_model(args.model)
+        except (ImportError, ValueError) as e:
+            output.fail(args.model or "默认模型", e)
+            return
+        results = summarize_ai(chapters, model, args.workers, output)
+    else:
+        results = summarize_rule(chapters, args.workers)
+    for _, record in results:
+        output.write(record)
+
+
+# ---- book ----
+
+def cmd_book(args, output):
+    """整本书：并行提取全部章节，再按章节顺序总结
+
+    AI总结时每章附带前几章的滚动状态（BookState），因此逐章顺序请求；
+    规则总结互不依赖，先把全部章节导入书籍级IDF索引（指定书库时使用并更新
+    书库中该书的索引），再交给进程池并行，关键词按全书IDF计算
+    """
+    from book_state import BookState
+
+    chapters = list(iter_extracted(args.inputs, args.workers, output))
+    if not chapters:
+        return
+
+    library = None
+    if args.library:
+        from library_store import LibraryStore
+        library = LibraryStore(args.library)
+    book_key = args.title or os.path.dirname(source_of(chapters[0]))
+
+    if args.method == 'ai':
+        from config.ai_client import AIModelManager
+        try:
+            model = load_ai_model(args.model)
+        except (ImportError, ValueError) as e:
+            output.fail(args.model or "默认模型", e)
+            return
+        pending = chapters
+        if args.state and os.path.exists(args.state):
+            state = BookState.load(args.state)
+            # 续跑时跳过状态中最后一章及之前的章节，避免重复请求AI和重复计入状态
+            sources = [source_of(chapter) for chapter in chapters]
+            if state.last_chapter_id in sources:
+                pending = chapters[sources.index(state.last_chapter_id) + 1:]
+                print(f"接着状态文件继续：跳过已总结的 {len(chapters) - len(pending)} 章", file=sys.stderr)
+        else:
+            state = BookState(args.title or chapters[0].get('title', ''))
+
+        def summarized():
+            for chapter in pending:
+                result = AIModelManager.generate_summary(model, chapter['text'], context=state.to_prompt())
+                if not result.success:
+                    output.fail(source_of(chapter), result.error_message)
+                    continue
+                sections = state.add_ai_summary(chapter.get('title', ''), result.content, source_of(chapter))
+                record = _summary_record(chapter, f"ai:{model.name}", sections['summary'] or result.content)
+                record['characters'] = sections['characters']
+                record['open_threads'] = list(state.open_threads)
+                if args.state:
+                    state.save(args.state)
+                yield chapter, record
+        results = summarized()
+    else:
+        from ai_summary import TextSummarizer
+        from corpus_idf import BookIDFIndex
+        idf_index = library.get_idf_index(book_key) if library is not None else BookIDFIndex()
+        TextSummarizer(idf_index=idf_index).index_chapters(
+            [(source_of(chapter), chapter['text']) for chapter in chapters], args.workers)
+        results = summarize_rule(chapters, args.workers, idf_index)
+
+    try:
+        for chapter, record in results:
+            record['text'] = chapter['text']
+            output.write(record)
+            if library is not None:
+                _, text_hash = library.save_extraction(book_key, dict(chapter, url=source_of(chapter)))
+                library.save_summary(text_hash, record['method'], record['summary'])
+    finally:
+        if library is not None:
+            library.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='novel-reader', description="小说阅读器命令行工具")
+    parser.add_argument('-o', '--output', help="输出JSONL文件（默认标准输出）")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="并行数（默认CPU核数）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_inputs(subparser, help_text):
+        subparser.add_argument('inputs', nargs='+', help=help_text + "，'-'表示从标准输入逐行读取")
+
+    fetch = subparsers.add_parser('fetch', help="下载网页")
+    add_inputs(fetch, "网页URL")
+
+    extract = subparsers.add_parser('extract', help="提取章节正文")
+    add_inputs(extract, "MHTML/HTML文件、目录、URL或fetch输出的JSONL")
+
+    ocr = subparsers.add_parser('ocr', help="识别图片文字")
+    add_inputs(ocr, "图片文件、图片URL或extract输出的JSONL（识别其中的图片）")
+    ocr.add_argument('--ocr-url', help="OCR服务地址（默认使用OCR客户端的默认地址）")
+    ocr.add_argument('--batch-size', type=int, default=8, help="每批提交的图片数")
+
+    for name, help_text, inputs_help in (
+            ('summarize', "总结章节", "extract输出的JSONL或文本文件"),
+            ('book', "提取并按顺序总结整本书", "章节目录、文件、URL或JSONL（按给出的顺序作为章节顺序）")):
+        subparser = subparsers.add_parser(name, help=help_text)
+        add_inputs(subparser, inputs_help)
+        subparser.add_argument('--method', choices=('rule', 'ai'), default='rule', help="总结方式")
+        subparser.add_argument('--model', help="AI模型名称或ID（默认使用配置中的默认模型）")
+        if name == 'book':
+            subparser.add_argument('--title', help="书名（默认使用第一章标题）")
+            subparser.add_argument('--state', help="书籍滚动状态文件，存在时跳过已总结的章节，接着上次的状态继续")
+            subparser.add_argument('--library', help="同时写入的本地书库路径（SQLite）")
+    return parser
+
+
+COMMANDS = {
+    'fetch': cmd_fetch,
+    'extract': cmd_extract,
+    'ocr': cmd_ocr,
+    'summarize': cmd_summarize,
+    'book': cmd_book,
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.workers = max(1, args.workers)
+    output = JsonlOutput(args.output)
+    try:
+        COMMANDS[args.command](args, output)
+    except KeyboardInterrupt:
+        print("已中断", file=sys.stderr)
+    finally:
+        status = output.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR服务客户端
+封装对PaddleOCR服务（paddleocr/app.py）的调用，支持直接提交内存中的
+图片字节和批量识别，无需落地临时文件
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 默认OCR服务地址
+DEFAULT_OCR_URL = "http://127.0.0.1:5000"
+
+
+class OCRClient:
+    """PaddleOCR服务客户端"""
+
+    def __init__(self, base_url=DEFAULT_OCR_URL, timeout=60, batch_size=8, max_workers=4):
+        """初始化OCR客户端
+
+        Args:
+            base_url: OCR服务地址
+            timeout: 单次请求超时时间（秒）
+            batch_size: 每批提交的图片数
+            max_workers: 服务不支持批量接口时的并发请求数
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        # 复用连接，避免每张图片重新建立TCP连接
+        self.session = requests.Session()
+        self._batch_supported = None
+
+    def is_available(self):
+        """检查OCR服务是否可用"""
+        try:
+            response = self.session.get(f"{self.base_url}/status", timeout=3)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    @staticmethod
+    def parse_result(ocr_result):
+        """从OCR服务返回的JSON中取出识别文本
+
+        兼容 results / data / text 三种返回格式
+
+        Args:
+            ocr_result: OCR服务返回的字典
+
+        Returns:
+            识别出的文本（多行以换行连接）
+        """
+        if not isinstance(ocr_result, dict):
+            return ""
+        if not (ocr_result.get("status") == "success" or ocr_result.get("success", False)):
+            return ""
+
+        for key in ("results", "data"):
+            items = ocr_result.get(key)
+            if isinstance(items, list):
+                return "\n".join(item.get("text", "") for item in items if isinstance(item, dict))
+        if "text" in ocr_result:
+            return str(ocr_result["text"])
+        return ""
+
+    def recognize(self, image_bytes, filename="image.jpg"):
+        """识别单张图片
+
+        Args:
+            image_bytes: 图片字节
+            filename: 上传时使用的文件名
+
+        Returns:
+            OCR服务返回的字典，失败时返回None
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/ocr",
+                files={"file": (filename, image_bytes)},
+                timeout=self.timeout
+            )
+            if response.status_code == 200:
+                return response.json()
+            logger.warning(f"OCR请求失败，状态码: {response.status_code}")
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"OCR请求失败: {e}")
+        return None
+
+    def _recognize_chunk(self, chunk):
+        """通过批量接口识别一批图片，返回与输入等长的结果列表"""
+        files = [("files", (f"image_{i}.jpg", data)) for i, data in enumerate(chunk)]
+        try:
+            response = self.session.post(
+                f"{self.base_url}/ocr/batch",
+                files=files,
+                timeout=self.timeout * len(chunk)
+            )
+        except requests.RequestException as e:
+            logger.warning(f"批量OCR请求失败: {e}")
+            return [None] * len(chunk)
+
+        if response.status_code == 404:
+            # 旧版服务没有批量接口
+            self._batch_supported = False
+            return None
+
+        self._batch_supported = True
+        try:
+            items = response.json().get("items", [])
+        except ValueError:
+            items = []
+        if len(items) != len(chunk):
+            return [None] * len(chunk)
+        return items
+
+    def recognize_batch(self, images):
+        """批量识别图片
+
+        优先使用服务端的 /ocr/batch 接口按批提交；服务不支持时
+        回退为并发的单张请求。结果顺序与输入一致。
+
+        Args:
+            images: 图片字节列表
+
+        Returns:
+            OCR结果字典列表，识别失败的位置为None
+        """
+        results = []
+        pending = list(images)
+
+        if self._batch_supported is not False:
+            while pending:
+                chunk, rest = pending[:self.batch_size], pending[self.batch_size:]
+                chunk_results = self._recognize_chunk(chunk)
+                if chunk_results is None:
+                    break
+                results.extend(chunk_results)
+                pending = rest
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results.extend(executor.map(self.recognize, pending))
+
+        return results
+
+    def close(self):
+        """关闭客户端，释放连接"""
+        self.session.close()
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
@@ -21,6 +21,23 @@ def get_ocr():
             raise Exception(f"PaddleOCR初始化失败: {str(e)}")
     return ocr
 
+def format_ocr_result(result):
+    """将PaddleOCR的识别结果转换为接口返回的列表"""
+    ocr_results = []
+    for idx, line in enumerate(result):
+        if not line:
+            continue
+        for box in line:
+            position = box[0]
+            text = box[1][0]
+            confidence = float(box[1][1])
+            ocr_results.append({
+                'text': text,
+                'confidence': confidence,
+                'position': position
+            })
+    return ocr_results
+
 @app.route('/ocr', methods=['GET', 'POST'])
 def ocr_service():
     """
@@ -62,22 +79,39 @@ def ocr_service():
         ocr_instance = get_ocr()
         result = ocr_instance.ocr(image, cls=True)
         
-        # 处理结果
-        ocr_results = []
-        for idx, line in enumerate(result):
-            for box in line:
-                position = box[0]
-                text = box[1][0]
-                confidence = float(box[1][1])
-                ocr_results.append({
-                    'text': text,
-                    'confidence': confidence,
-                    'position': position
-                })
+        return jsonify({
+            'status': 'success',
+            'results': format_ocr_result(result)
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/ocr/batch', methods=['POST'])
+def ocr_batch():
+    """批量OCR接口：一次上传多张图片（字段名files），按上传顺序返回结果"""
+    try:
+        files = request.files.getlist('files')
+        if not files:
+            return jsonify({'error': '没有上传文件'}), 400
+        
+        ocr_instance = get_ocr()
+        items = []
+        for file in files:
+            nparr = np.frombuffer(file.read(), np.uint8)
+            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            if image is None:
+                items.append({'status': 'error', 'error': '无法解码图片'})
+                continue
+            result = ocr_instance.ocr(image, cls=True)
+            items.append({
+                'status': 'success',
+                'results': format_ocr_result(result)
+            })
         
         return jsonify({
             'status': 'success',
-            'results': ocr_results
+            'items': items
         })
     
     except Exception as e:
@@ -98,22 +132,9 @@ def ocr_local_file():
         ocr_instance = get_ocr()
         result = ocr_instance.ocr(file_path, cls=True)
         
-        # 处理结果
-        ocr_results = []
-        for idx, line in enumerate(result):
-            for box in line:
-                position = box[0]
-                text = box[1][0]
-                confidence = float(box[1][1])
-                ocr_results.append({
-                    'text': text,
-                    'confidence': confidence,
-                    'position': position
-                })
-        
         return jsonify({
             'status': 'success',
-            'results': ocr_results
+            'results': format_ocr_result(result)
         })
     
     except Exception as e:
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面脚本
+浏览器窗口和无界面提取服务共用的JavaScript代码
+"""
+
+# 针对起点中文网等动态加载章节的提取脚本：定义extractContent()，用MutationObserver
+# 等待正文容器填充且内容稳定、滚动触发懒加载并等待新增内容稳定后，返回JSON
+# （content/title/chapterInfo）的Promise，失败时返回整个页面HTML
+EXTRACT_CONTENT_JS = """
+// 等待selector对应元素有文字，且quietMs内不再变化；超时仍无文字时失败。
+// 只有正文容器内的变化（以及容器出现或被替换）才重新计时，广告轮播、倒计时、
+// 评论挂件等页面其他位置的变化不会推迟完成
+function waitForContent(selector, timeout, quietMs) {
+    return new Promise((resolve, reject) => {
+        let quietTimer = null;
+        let observer = null;
+        let target = document.querySelector(selector);
+        const hasText = (element) => element && (element.innerText || element.textContent || '').trim().length > 0;
+        const finish = () => {
+            observer.disconnect();
+            clearTimeout(deadline);
+            clearTimeout(quietTimer);
+            const element = document.querySelector(selector);
+            if (hasText(element)) {
+                resolve(element);
+            } else {
+                reject(new Error('超时：未找到正文'));
+            }
+        };
+        const check = () => {
+            clearTimeout(quietTimer);
+            if (hasText(document.querySelector(selector))) {
+                quietTimer = setTimeout(finish, quietMs);
+            }
+        };
+        const deadline = setTimeout(finish, timeout);
+        observer = new MutationObserver((records) => {
+            const element = document.querySelector(selector);
+            if (element !== target || (element && records.some(record => element.contains(record.target)))) {
+                target = element;
+                check();
+            }
+        });
+        observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+        check();
+    });
+}
+
+async function extractContent() {
+    try {
+        // 正文出现并稳定后立即继续，不再固定等待
+        await waitForContent('.read-content', 10000, 100);
+
+        // 页面可以滚动时尝试触发懒加载，新增内容稳定后继续
+        if (document.body.scrollHeight > window.innerHeight) {
+            window.scrollTo(0, document.body.scrollHeight);
+            await waitForContent('.read-content', 2000, 200);
+        }
+
+        // 提取小说内容
+        const contentElement = document.querySelector('.read-content');
+        if (contentElement) {
+            let content = contentElement.innerText || contentElement.textContent;
+
+            // 处理字体反爬
+            const fontFace = document.querySelector('style[data-qidian]');
+            if (fontFace) {
+                const fontUrl = fontFace.textContent.match(/url\\(['"]?(.*?)['"]?\\)/);
+                if (fontUrl) {
+                    content = {
+                        text: content,
+                        fontUrl: fontUrl[1]
+                    };
+                }
+            }
+
+            return JSON.stringify({
+                content: content,
+                title: document.querySelector('.j_chapterName').textContent.trim(),
+                chapterInfo: document.querySelector('.info-chapter').textContent.trim()
+            });
+        }
+    } catch (error) {
+        console.error('提取内容时出错：', error);
+    }
+
+    // 如果提取失败，返回整个HTML
+    return document.documentElement.outerHTML;
+}
+"""
+
+# runJavaScript不会等待Promise完成：浏览器窗口和无界面服务都执行START_EXTRACTION_JS
+# 启动提取，结果写入window变量后由Python端用POLL_RESULT_JS轮询读取（空字符串表示脚本出错）
+START_EXTRACTION_JS = (
+    "window.__novelReaderResult = undefined;"
+    "Promise.resolve((function () {" + EXTRACT_CONTENT_JS + "return extractContent();})())"
+    ".then(r => { window.__novelReaderResult = (r === undefined || r === null) ? '' : String(r); },"
+    " () => { window.__novelReaderResult = ''; });"
+    "true;"
+)
+
+# 提取未完成时返回null
+POLL_RESULT_JS = "window.__novelReaderResult === undefined ? null : window.__novelReaderResult"
+
+# 轮询提取结果的间隔（毫秒）
+POLL_INTERVAL_MS = 100
+
+# 提取脚本最多等待正文10秒、懒加载内容2秒，轮询的截止时间（秒）留出少量余量
+SCRIPT_TIMEOUT = 13
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下一章预取
+当前章节加载完成后，在后台线程下载并提取后续章节（可选预先生成规则总结），
+结果放入有上限的LRU缓存；翻到下一章时提取和总结直接命中缓存
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+logger = logging.getLogger(__name__)
+
+# 默认预取的章节数
+DEFAULT_PREFETCH_DEPTH = 1
+# 缓存的最大章节数
+DEFAULT_CACHE_SIZE = 8
+# 默认不限速（字节/秒）
+DEFAULT_MAX_BYTES_PER_SECOND = None
+# 下载分块大小
+CHUNK_SIZE = 16 * 1024
+
+# 网页常见编码（服务器未声明编码时依次尝试）
+HTML_ENCODINGS = ('utf-8', 'gb18030', 'big5')
+
+
+class RateLimiter:
+    """令牌桶限速器，限制预取占用的带宽"""
+
+    def __init__(self, max_bytes_per_second):
+        """
+        Args:
+            max_bytes_per_second: 每秒最大字节数，None或0表示不限速
+        """
+        self.rate = max_bytes_per_second or None
+        self._allowance = float(self.rate or 0)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size):
+        """消耗size字节的额度，额度不足时等待"""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate)
+            self._last = now
+            self._allowance -= size
+            wait = -self._allowance / self.rate if self._allowance < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class ChapterPrefetcher:
+    """后续章节预取器"""
+
+    def __init__(self, depth=DEFAULT_PREFETCH_DEPTH, cache_size=DEFAULT_CACHE_SIZE,
+                 max_bytes_per_second=DEFAULT_MAX_BYTES_PER_SECOND, summarize=None,
+                 fetch=None, timeout=15):
+        """初始化预取器
+
+        Args:
+            depth: 从当前章节向后预取的章节数，0表示关闭预取
+            cache_size: 缓存的最大章节数
+            max_bytes_per_second: 预取下载的带宽上限（字节/秒），None表示不限速
+            summarize: 预先总结函数 summarize(提取结果) -> 总结文本，None表示不预先总结
+            fetch: 下载函数 fetch(url) -> HTML，默认使用requests按带宽上限下载
+            timeout: 下载超时时间（秒）
+        """
+        self.depth = max(0, depth)
+        self.cache_size = max(1, cache_size)
+        self.limiter = RateLimiter(max_bytes_per_second)
+        self.summarize = summarize
+        self.timeout = timeout
+        self._fetch = fetch or self._download
+        self._session = None
+        self._extractor = None
+
+        self._cache = OrderedDict()
+        # 正在预取的URL，避免重复提交
+        self._pending = set()
+        self._lock = threading.Lock()
+        # 单个后台线程按顺序预取，不与前台页面争抢连接
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        # 每次调用prefetch递增，旧的预取链在新章节打开后停止
+        self._generation = 0
+
+    # ---- 缓存 ----
+
+    def get(self, url):
+        """读取缓存的章节
+
+        Returns:
+            {'url', 'html', 'content', 'summary'}，未缓存时返回None
+        """
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is not None:
+                self._cache.move_to_end(url)
+            return entry
+
+    def put(self, url, html, content, summary=None):
+        """放入缓存，超出上限时淘汰最久未使用的章节"""
+        entry = {'url': url, 'html': html, 'content': content, 'summary': summary}
+        with self._lock:
+            self._cache[url] = entry
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self._cache
+
+    # ---- 预取 ----
+
+    def prefetch(self, url, html=None):
+        """当前章节打开后，开始预取后续章节
+
+        Args:
+            url: 当前章节URL
+            html: 当前章节HTML（用于查找下一章链接），为None时从缓存中查找
+
+        Returns:
+            Future，预取链结束时完成；未预取时返回None
+        """
+        if self.depth <= 0:
+            return None
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        return self._executor.submit(self._prefetch_chain, url, html, generation)
+
+    def _prefetch_chain(self, url, html, generation):
+        """沿下一章链接依次预取depth章"""
+        if html is not None:
+            next_url = self._next_url(url, self._extract(html, url))
+        else:
+            entry = self.get(url)
+            next_url = self._next_url(url, entry['content']) if entry else None
+
+        for _ in range(self.depth):
+            if not next_url or generation != self._generation:
+                return
+            entry = self.get(next_url)
+            if entry is None:
+                entry = self._load(next_url)
+                if entry is None:
+                    return
+            next_url = self._next_url(next_url, entry['content'])
+
+    def _load(self, url):
+        """下载、提取并（可选）总结一个章节"""
+        with self._lock:
+            if url in self._pending:
+                return None
+            self._pending.add(url)
+        try:
+            html = self._fetch(url)
+            if not html:
+                return None
+            content = self._extract(html, url)
+            summary = None
+            if self.summarize is not None and content.get('text'):
+                try:
+                    summary = self.summarize(content)
+                except Exception as e:
+                    logger.warning(f"预先总结失败 {url}: {e}")
+            logger.info(f"已预取章节: {url}")
+            return self.put(url, html, content, summary)
+        except Exception as e:
+            logger.warning(f"预取章节失败 {url}: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+
+    def _extract(self, html, url):
+        """提取章节内容（含下一章链接）"""
+        if self._extractor is None:
+            from web_extractor import WebExtractor
+            self._extractor = WebExtractor()
+        content = self._extractor.extract_content(html, url)
+        content['url'] = url
+        content['extraction_method'] = 'prefetch'
+        return content
+
+    @staticmethod
+    def _next_url(url, content):
+        """提取结果中的下一章绝对地址"""
+        next_url = ((content or {}).get('chapter_info') or {}).get('next_url')
+        if not next_url or next_url.startswith(('javascript:', '#')):
+            return None
+        next_url = urljoin(url, next_url)
+        return next_url if next_url != url else None
+
+    def _download(self, url):
+        """按带宽上限分块下载网页"""
+        import requests
+        if self._session is None:
+            from web_extractor import WebExtractor
+            self._session = requests.Session()
+            self._session.headers.update(WebExtractor().headers)
+
+        with self._session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            chunks = []
+            for chunk in response.iter_content(CHUNK_SIZE):
+                self.limiter.consume(len(chunk))
+                chunks.append(chunk)
+            raw = b''.join(chunks)
+            declared = response.encoding if 'charset' in response.headers.get('content-type', '') else None
+
+        for encoding in ((declared,) if declared else ()) + HTML_ENCODINGS:
+            try:
+                return raw.decode(encoding)
+            except (UnicodeDecodeError, LookupError):
+                continue
+        return raw.decode('utf-8', errors='ignore')
+
+    def close(self):
+        """停止预取并释放连接"""
+        with self._lock:
+            self._generation += 1
+        self._executor.shutdown(wait=False)
+        if self._session is not None:
+            self._session.close()
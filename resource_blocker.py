@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资源拦截
+为提取内容优化的QWebEngineProfile：拦截广告、统计跟踪、第三方视频/推荐框架，
+可选拦截图片（不需要OCR时）和第三方字体，让loadFinished更早触发并统计拦截的请求数。
+第三方框架、媒体和字体只在无界面提取的独立配置中拦截；浏览器窗口的默认配置只拦截
+广告和统计跟踪，不影响跨站登录/验证码/支付框架、内嵌视频和反爬字体
+
+规则文件（默认为项目目录下的blocklist.txt，可选）每行一条：
+    example.com         拦截该域名及其子域名
+    /ad/banner          拦截URL中包含该片段的请求
+    @@cdn.example.com   例外，不拦截该域名
+    # 注释
+"""
+
+import os
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+try:
+    from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
+    from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+    PYQT_AVAILABLE = True
+except ImportError:
+    PYQT_AVAILABLE = False
+
+    # 创建模拟基类避免导入错误
+    class QWebEngineUrlRequestInterceptor:
+        pass
+
+# 用户规则文件
+USER_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blocklist.txt')
+
+# 广告联盟域名
+DEFAULT_AD_HOSTS = (
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'adservice.google.com',
+    'pos.baidu.com', 'cpro.baidu.com', 'union.baidu.com', 'gdt.qq.com', 'e.qq.com',
+    'tanx.com', 'alimama.com', 'mmstat.com', 'adsame.com', 'miaozhen.com',
+    'admaster.com.cn', 'ipinyou.com', 'pangolin-sdk-toutiao.com', 'adnxs.com',
+)
+
+# 访问统计和行为跟踪域名
+DEFAULT_TRACKER_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'hm.baidu.com', 'cnzz.com', 'umeng.com',
+    '51.la', 'growingio.com', 'sensorsdata.cn', 'zhugeio.com', 'hotjar.com',
+    'scorecardresearch.com', 'connect.facebook.net', 'bat.bing.com',
+)
+
+# 需要按三段计算站点的二级域名后缀
+_SECOND_LEVEL_SUFFIXES = {
+    'com.cn', 'net.cn', 'org.cn', 'gov.cn', 'edu.cn', 'com.tw', 'com.hk', 'co.jp', 'co.uk', 'com.au',
+}
+
+# 规则使用的资源类型名称（主框架请求从不拦截）
+RESOURCE_TYPES = ('main_frame', 'sub_frame', 'stylesheet', 'script', 'image', 'font',
+                  'media', 'xhr', 'ping', 'other')
+
+
+def site_of(host):
+    """主机名对应的站点（可注册域名的近似）"""
+    parts = (host or '').lower().rstrip('.').split('.')
+    if len(parts) >= 3 and '.'.join(parts[-2:]) in _SECOND_LEVEL_SUFFIXES:
+        return '.'.join(parts[-3:])
+    return '.'.join(parts[-2:])
+
+
+def _host_matches(host, suffixes):
+    """主机名是否为列表中某个域名或其子域名"""
+    while host:
+        if host in suffixes:
+            return True
+        _, _, host = host.partition('.')
+    return False
+
+
+class BlockRules:
+    """拦截规则"""
+
+    def __init__(self, ad_hosts=DEFAULT_AD_HOSTS, tracker_hosts=DEFAULT_TRACKER_HOSTS,
+                 block_images=False, block_third_party_media=True, block_third_party_fonts=False,
+                 block_third_party_frames=True, rules_path=USER_RULES_PATH):
+        """初始化规则
+
+        Args:
+            ad_hosts: 广告域名列表
+            tracker_hosts: 跟踪统计域名列表
+            block_images: 是否拦截所有图片（不需要OCR时）
+            block_third_party_media: 是否拦截第三方视频/音频
+            block_third_party_fonts: 是否拦截第三方字体。反爬字体常放在其他域名的CDN上
+                （如起点的qidian.gtimg.com），拦截后页面显示为私有区乱码，只适合不显示
+                页面、另行下载反爬字体的无界面提取
+            block_third_party_frames: 是否拦截第三方框架（推荐位、评论等挂件）
+            rules_path: 用户规则文件路径，不存在时忽略
+        """
+        self.ad_hosts = set(ad_hosts)
+        self.tracker_hosts = set(tracker_hosts)
+        self.block_images = block_images
+        self.block_third_party_media = block_third_party_media
+        self.block_third_party_fonts = block_third_party_fonts
+        self.block_third_party_frames = block_third_party_frames
+        self.custom_hosts = set()
+        self.url_patterns = []
+        self.allowed_hosts = set()
+        if rules_path and os.path.exists(rules_path):
+            self.load(rules_path)
+
+    def load(self, path):
+        """从规则文件追加规则"""
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self.add_rule(line)
+
+    def add_rule(self, rule):
+        """追加一条规则（格式见模块说明）"""
+        rule = rule.strip()
+        if not rule or rule.startswith('#'):
+            return
+        if rule.startswith('@@'):
+            self.allowed_hosts.add(rule[2:].lower())
+        elif '/' in rule:
+            self.url_patterns.append(rule)
+        else:
+            self.custom_hosts.add(rule.lower())
+
+    def match(self, url, first_party_url='', resource_type='other'):
+        """判断请求是否应被拦截
+
+        Args:
+            url: 请求URL
+            first_party_url: 发起请求的页面URL
+            resource_type: RESOURCE_TYPES中的资源类型
+
+        Returns:
+            拦截类别（ad/tracker/rule/image/media/font/frame），不拦截时返回None
+        """
+        if resource_type == 'main_frame':
+            return None
+        host = (urlparse(url).hostname or '').lower()
+        if not host or _host_matches(host, self.allowed_hosts):
+            return None
+
+        if _host_matches(host, self.ad_hosts):
+            return 'ad'
+        if _host_matches(host, self.tracker_hosts):
+            return 'tracker'
+        if _host_matches(host, self.custom_hosts) or any(pattern in url for pattern in self.url_patterns):
+            return 'rule'
+        if resource_type == 'image' and self.block_images:
+            return 'image'
+
+        first_party_host = (urlparse(first_party_url).hostname or '').lower()
+        if not first_party_host or site_of(host) == site_of(first_party_host):
+            return None
+        if resource_type == 'media' and self.block_third_party_media:
+            return 'media'
+        if resource_type == 'font' and self.block_third_party_fonts:
+            return 'font'
+        if resource_type == 'sub_frame' and self.block_third_party_frames:
+            return 'frame'
+        return None
+
+
+class BlockStats:
+    """拦截统计（拦截器可能在网络线程中调用，计数加锁）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.blocked = Counter()
+        self.allowed = 0
+
+    def add(self, category):
+        with self._lock:
+            if category:
+                self.blocked[category] += 1
+            else:
+                self.allowed += 1
+
+    @property
+    def total_blocked(self):
+        return sum(self.blocked.values())
+
+    def reset(self):
+        with self._lock:
+            self.blocked.clear()
+            self.allowed = 0
+
+    def to_dict(self):
+        with self._lock:
+            return {'blocked': dict(self.blocked), 'allowed': self.allowed}
+
+    def report(self):
+        """统计摘要，例如“已拦截 12 个请求（ad 5, tracker 4, font 3）”"""
+        with self._lock:
+            if not self.blocked:
+                return "未拦截请求"
+            details = ", ".join(f"{category} {count}" for category, count in self.blocked.most_common())
+            return f"已拦截 {sum(self.blocked.values())} 个请求（{details}）"
+
+
+def _resource_type_names():
+    """Qt资源类型到规则资源类型的映射"""
+    info = QWebEngineUrlRequestInfo
+    return {
+        info.ResourceTypeMainFrame: 'main_frame',
+        info.ResourceTypeSubFrame: 'sub_frame',
+        info.ResourceTypeStylesheet: 'stylesheet',
+        info.ResourceTypeScript: 'script',
+        info.ResourceTypeImage: 'image',
+        info.ResourceTypeFavicon: 'image',
+        info.ResourceTypeFontResource: 'font',
+        info.ResourceTypeMedia: 'media',
+        info.ResourceTypeXhr: 'xhr',
+        info.ResourceTypePing: 'ping',
+    }
+
+
+class ResourceBlockingInterceptor(QWebEngineUrlRequestInterceptor):
+    """按BlockRules拦截请求并计数"""
+
+    def __init__(self, rules=None, parent=None):
+        super().__init__(parent)
+        self.rules = rules or BlockRules()
+        self.stats = BlockStats()
+        self._type_names = _resource_type_names()
+
+    def interceptRequest(self, info):
+        resource_type = self._type_names.get(info.resourceType(), 'other')
+        category = self.rules.match(info.requestUrl().toString(),
+                                    info.firstPartyUrl().toString(), resource_type)
+        if category:
+            info.block(True)
+        self.stats.add(category)
+
+
+def install_resource_blocker(profile, rules=None, block_images=False, block_third_party=False):
+    """为QWebEngineProfile安装拦截器
+
+    Args:
+        profile: QWebEngineProfile（浏览器窗口使用默认配置以保留登录状态）
+        rules: BlockRules，默认使用内置规则和用户规则文件
+        block_images: 未提供rules时是否拦截图片
+        block_third_party: 未提供rules时是否拦截第三方框架、媒体和字体。
+            用户浏览的配置应保持关闭：跨站登录、验证码、支付都在第三方框架中
+
+    Returns:
+        ResourceBlockingInterceptor（含stats统计），同时保存在profile.blocker中
+    """
+    if rules is None:
+        rules = BlockRules(block_images=block_images, block_third_party_media=block_third_party,
+                           block_third_party_fonts=block_third_party,
+                           block_third_party_frames=block_third_party)
+    interceptor = ResourceBlockingInterceptor(rules, profile)
+    if hasattr(profile, 'setUrlRequestInterceptor'):
+        profile.setUrlRequestInterceptor(interceptor)
+    else:
+        profile.setRequestInterceptor(interceptor)
+    # 保留Python引用，避免拦截器被回收
+    profile.blocker = interceptor
+    return interceptor
+
+
+def create_extraction_profile(parent=None, rules=None, block_images=False):
+    """创建带拦截器的无痕QWebEngineProfile（无界面提取服务使用）
+
+    页面不显示，正文由脚本读取、反爬字体另行下载解码，因此拦截全部第三方框架、媒体和字体
+    """
+    if not PYQT_AVAILABLE:
+        raise ImportError("PyQt5/PyQtWebEngine 未安装")
+    profile = QWebEngineProfile(parent)
+    install_resource_blocker(profile, rules, block_images, block_third_party=True)
+    return profile
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中文分句
+单次扫描的分句生成器，返回句子及其在原文中的字符偏移，
+供规则总结、AI总结和正文高亮共用
+"""
+
+import re
+
+# 句末标点（连续的标点视为一个句末，如“？！”、“。……”）、省略号、引号和换行
+_BOUNDARY_RE = re.compile(
+    r'(?P<end>(?:[。！？!?…]|\.{3,})+)'
+    r'|(?P<open>[“‘「『])'
+    r'|(?P<close>[”’」』])'
+    r'|(?P<quote>")'
+    r'|(?P<newline>\n)'
+)
+
+# 引号闭合后紧跟这些标点时句子尚未结束（如：“走吧！”，他说。）
+_CONTINUATION = frozenset('，,、：:；;')
+
+
+def iter_sentences(text):
+    """逐句切分文本
+
+    规则：
+    - 句末标点、省略号和换行结束一个句子
+    - 引号内的句末标点不断句，对话在引号闭合处结束
+    - 引号闭合后紧跟逗号、顿号、冒号、分号时，句子继续
+    - 换行重置引号状态，未闭合的引号不会吞掉后续段落
+
+    Args:
+        text: 原文
+
+    Yields:
+        (句子, 起始偏移, 结束偏移)，text[起始偏移:结束偏移] == 句子，
+        句子已去除首尾空白，空句子被跳过
+    """
+    start = 0
+    depth = 0
+    ascii_open = False
+    # 引号内最近一个句末标点的结束位置，引号紧随其后闭合时断句
+    quoted_end = -1
+
+    for match in _BOUNDARY_RE.finditer(text):
+        kind = match.lastgroup
+        split_at = None
+
+        if kind == 'newline':
+            split_at = match.start()
+            depth = 0
+            ascii_open = False
+        elif kind == 'end':
+            if depth == 0:
+                split_at = match.end()
+            else:
+                quoted_end = match.end()
+        elif kind == 'open' or (kind == 'quote' and not ascii_open):
+            depth += 1
+            ascii_open = ascii_open or kind == 'quote'
+        else:
+            if kind == 'quote':
+                ascii_open = False
+            depth = max(depth - 1, 0)
+            if quoted_end == match.start():
+                # 嵌套引号连续闭合时继续向后延伸
+                quoted_end = match.end()
+                if depth == 0 and text[match.end():match.end() + 1] not in _CONTINUATION:
+                    split_at = match.end()
+
+        if split_at is not None:
+            sentence = _span(text, start, split_at)
+            if sentence:
+                yield sentence
+            start = match.end() if kind == 'newline' else split_at
+            quoted_end = -1
+
+    sentence = _span(text, start, len(text))
+    if sentence:
+        yield sentence
+
+
+def _span(text, start, end):
+    """去除首尾空白后的 (句子, 起始偏移, 结束偏移)，空句子返回None"""
+    raw = text[start:end]
+    sentence = raw.strip()
+    if not sentence:
+        return None
+    start += len(raw) - len(raw.lstrip())
+    return sentence, start, start + len(sentence)
+
+
+def split_sentences(text):
+    """切分文本，返回句子列表"""
+    return [sentence for sentence, _, _ in iter_sentences(text)]
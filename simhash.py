@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节指纹
+用SimHash为章节正文计算64位指纹，镜像站点附加的广告、换行差异只改变少数位；
+分段索引按汉明距离快速查找近似重复的章节
+"""
+
+import re
+import hashlib
+from collections import Counter
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 指纹位数
+FINGERPRINT_BITS = 64
+
+# 字符n-gram长度
+SHINGLE_SIZE = 4
+
+# 汉明距离不超过该值视为近似重复
+DEFAULT_MAX_DISTANCE = 3
+
+# 计算指纹前去除空白和标点，只保留文字
+_NOISE_RE = re.compile(r'[\W_]+')
+
+
+def _shingle_hash(shingle):
+    """n-gram的64位哈希"""
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def simhash(text, shingle_size=SHINGLE_SIZE):
+    """计算文本的64位SimHash指纹
+
+    Args:
+        text: 文本
+        shingle_size: 字符n-gram长度
+
+    Returns:
+        指纹（非负整数），文本为空时为0
+    """
+    text = _NOISE_RE.sub('', text)
+    if not text:
+        return 0
+    if len(text) <= shingle_size:
+        counts = Counter([text])
+    else:
+        counts = Counter(text[i:i + shingle_size] for i in range(len(text) - shingle_size + 1))
+
+    hashes = [_shingle_hash(shingle) for shingle in counts]
+    weights = list(counts.values())
+
+    if NUMPY_AVAILABLE:
+        values = np.array(hashes, dtype=np.uint64)
+        bits = (values[:, None] >> np.arange(FINGERPRINT_BITS, dtype=np.uint64)) & np.uint64(1)
+        totals = (np.array(weights, dtype=np.int64)[:, None] * (bits.astype(np.int64) * 2 - 1)).sum(axis=0)
+        return sum(1 << i for i in np.flatnonzero(totals > 0).tolist())
+
+    totals = [0] * FINGERPRINT_BITS
+    for value, weight in zip(hashes, weights):
+        for i in range(FINGERPRINT_BITS):
+            totals[i] += weight if (value >> i) & 1 else -weight
+    return sum(1 << i for i, total in enumerate(totals) if total > 0)
+
+
+def hamming_distance(a, b):
+    """两个指纹的汉明距离"""
+    return bin(a ^ b).count('1')
+
+
+def to_signed(fingerprint):
+    """无符号64位指纹转换为SQLite可存储的有符号整数"""
+    return fingerprint - (1 << 64) if fingerprint >= (1 << 63) else fingerprint
+
+
+def to_unsigned(value):
+    """SQLite中读出的有符号整数转换回无符号指纹"""
+    return value + (1 << 64) if value < 0 else value
+
+
+class SimHashIndex:
+    """SimHash分段索引
+
+    按鸽巢原理把64位指纹分成 max_distance+1 段：汉明距离不超过max_distance的
+    两个指纹至少有一段完全相同，因此只需比较段值相同的候选项
+    """
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE):
+        """初始化索引
+
+        Args:
+            max_distance: 查找时允许的最大汉明距离
+        """
+        self.max_distance = max_distance
+        band_count = max_distance + 1
+        width = FINGERPRINT_BITS // band_count
+        # 每段的 (位移, 掩码)，最后一段包含剩余的位
+        self._bands = []
+        for i in range(band_count):
+            shift = i * width
+            bits = FINGERPRINT_BITS - shift if i == band_count - 1 else width
+            self._bands.append((shift, (1 << bits) - 1))
+        self._tables = [{} for _ in self._bands]
+        self._fingerprints = {}
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def _band_values(self, fingerprint):
+        return [(fingerprint >> shift) & mask for shift, mask in self._bands]
+
+    def add(self, key, fingerprint):
+        """加入（或更新）一个指纹"""
+        if key in self._fingerprints:
+            self.remove(key)
+        self._fingerprints[key] = fingerprint
+        for table, value in zip(self._tables, self._band_values(fingerprint)):
+            table.setdefault(value, set()).add(key)
+
+    def remove(self, key):
+        """移除一个指纹"""
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        for table, value in zip(self._tables, self._band_values(fingerprint)):
+            keys = table.get(value)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del table[value]
+
+    def find(self, fingerprint, max_distance=None):
+        """查找近似重复项
+
+        Args:
+            fingerprint: 指纹
+            max_distance: 最大汉明距离，默认为索引的max_distance（不能更大）
+
+        Returns:
+            [(键, 汉明距离)]，按距离升序
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        candidates = set()
+        for table, value in zip(self._tables, self._band_values(fingerprint)):
+            candidates.update(table.get(value, ()))
+        matches = []
+        for key in candidates:
+            distance = hamming_distance(fingerprint, self._fingerprints[key])
+            if distance <= max_distance:
+                matches.append((key, distance))
+        matches.sort(key=lambda item: (item[1], str(item[0])))
+        return matches
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地API服务测试
+验证各接口、请求ID、结果缓存、错误状态码和延迟直方图
+"""
+
+import sys
+import os
+import json
+import pickle
+import base64
+import socket
+import unittest
+import tempfile
+import shutil
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_mhtml_streaming import build_mhtml, CHAPTER_HTML
+from test_novel_reader_cli import _FakeOCRService
+
+try:
+    import requests
+    from api_server import APIServer, APIError, BackgroundServer, LatencyHistogram, ResultCache, StagePool
+    API_AVAILABLE = True
+except ImportError as e:
+    API_AVAILABLE = False
+    API_ERROR = str(e)
+
+
+class TestAPIStats(unittest.TestCase):
+    """直方图和缓存测试类"""
+
+    def setUp(self):
+        if not API_AVAILABLE:
+            self.skipTest(f"无法导入API服务: {API_ERROR}")
+
+    def test_histogram_percentiles(self):
+        """分位数落在对应的桶内"""
+        histogram = LatencyHistogram()
+        for ms in [3] * 90 + [150] * 9 + [4000]:
+            histogram.observe(ms)
+        data = histogram.to_dict()
+        self.assertEqual(data['count'], 100)
+        self.assertTrue(2 <= data['p50'] <= 5)
+        self.assertTrue(100 <= data['p99'] <= 200)
+        self.assertEqual(data['max'], 4000)
+        self.assertEqual(sum(count for _, count in data['buckets']), 100)
+        print("✅ 延迟直方图正确")
+
+    def test_cache_lru_and_ttl(self):
+        """超过条目数时淘汰最久未使用的条目，过期条目失效"""
+        cache = ResultCache(max_entries=2, ttl=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+        expired = ResultCache(ttl=-1)
+        expired.put('a', 1)
+        self.assertIsNone(expired.get('a'))
+        print("✅ 结果缓存正确")
+
+    def test_stage_timeout_keeps_slot_until_task_ends(self):
+        """超时后仍在执行的任务继续占用名额，任务结束后才释放"""
+        pool = StagePool('test', 1, max_pending=0, timeout=0.05)
+        self.addCleanup(pool.close)
+        release = threading.Event()
+
+        async def scenario():
+            with self.assertRaises(APIError) as timeout:
+                await pool.run(release.wait, 5)
+            self.assertEqual(timeout.exception.status, 504)
+            # 工作线程仍被占用，新请求直接拒绝，而不是排到卡住的任务后面
+            self.assertEqual(pool.active, 1)
+            with self.assertRaises(APIError) as busy:
+                await pool.run(len, 'abc')
+            self.assertEqual(busy.exception.status, 503)
+
+            release.set()
+            for _ in range(100):
+                if pool.active == 0:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertEqual(pool.active, 0)
+            self.assertEqual(await pool.run(len, 'abc'), 3)
+
+        asyncio.run(scenario())
+        self.assertEqual((pool.rejected, pool.failed), (1, 1))
+        print("✅ 超时任务结束后才释放名额")
+
+    def test_error_pickles(self):
+        """工作进程中抛出的APIError可以传回主进程"""
+        error = pickle.loads(pickle.dumps(APIError(422, "未提取到内容")))
+        self.assertEqual((error.status, error.message), (422, "未提取到内容"))
+        print("✅ 错误跨进程传递正确")
+
+
+class TestAPIServer(unittest.TestCase):
+    """API服务测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        if not API_AVAILABLE:
+            self.skipTest(f"无法导入API服务: {API_ERROR}")
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+
+        ocr = ThreadingHTTPServer(('127.0.0.1', 0), _FakeOCRService)
+        threading.Thread(target=ocr.serve_forever, daemon=True).start()
+        self.addCleanup(ocr.server_close)
+        self.addCleanup(ocr.shutdown)
+
+        workers = {name: 2 for name in ('fetch', 'extract', 'mhtml', 'summarize', 'ocr', 'ai')}
+        api = APIServer(workers, use_processes=False,
+                        ocr_url=f"http://127.0.0.1:{ocr.server_address[1]}", allow_local_files=True)
+        self.server = BackgroundServer(api)
+        self.addCleanup(self.server.stop)
+        self.session = requests.Session()
+        self.addCleanup(self.session.close)
+
+    def _post(self, path, **kwargs):
+        return self.session.post(self.server.url + path, timeout=30, **kwargs)
+
+    def test_extract_html_and_cache(self):
+        """提取内联HTML，相同请求第二次命中缓存"""
+        first = self._post('/v1/extract', json={'html': CHAPTER_HTML, 'url': 'https://example.com/1'})
+        self.assertEqual(first.status_code, 200)
+        data = first.json()
+        self.assertFalse(data['cached'])
+        self.assertTrue(data['content']['text'])
+        self.assertEqual(first.headers['X-Request-Id'], data['request_id'])
+
+        second = self._post('/v1/extract', json={'html': CHAPTER_HTML, 'url': 'https://example.com/1'},
+                            headers={'X-Request-Id': 'client-42'})
+        self.assertTrue(second.json()['cached'])
+        self.assertEqual(second.json()['content'], data['content'])
+        self.assertEqual(second.headers['X-Request-Id'], 'client-42')
+        print("✅ 网页提取和缓存正确")
+
+    def test_mhtml_upload_and_path(self):
+        """上传MHTML内容或按本地路径提取"""
+        mhtml = build_mhtml(CHAPTER_HTML, os.urandom(1024))
+        uploaded = self._post('/v1/mhtml', data=mhtml, headers={'Content-Type': 'multipart/related'})
+        self.assertEqual(uploaded.status_code, 200)
+        self.assertTrue(uploaded.json()['content']['text'])
+        self.assertEqual(uploaded.json()['content']['source'], '')
+
+        path = os.path.join(self.temp_dir, "chapter.mhtml")
+        with open(path, 'wb') as f:
+            f.write(mhtml)
+        by_path = self._post('/v1/mhtml', json={'path': path})
+        self.assertEqual(by_path.json()['content']['text'], uploaded.json()['content']['text'])
+        print("✅ MHTML提取正确")
+
+    def test_summarize_rule(self):
+        """规则总结"""
+        text = "\n".join(["少年背着长剑走出了山门，回头望了一眼云雾中的青山。"] * 40)
+        response = self._post('/v1/summarize', json={'text': text})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("内容概要", response.json()['content']['summary'])
+        print("✅ 规则总结正确")
+
+    def test_ocr(self):
+        """图片内容和base64图片都转发到OCR服务"""
+        image = os.urandom(512)
+        raw = self._post('/v1/ocr', data=image, headers={'Content-Type': 'image/png'})
+        self.assertEqual(raw.status_code, 200)
+        self.assertEqual(raw.json()['content']['text'], "识别文字")
+        encoded = self._post('/v1/ocr', json={'image': base64.b64encode(image).decode('ascii')})
+        self.assertTrue(encoded.json()['cached'])
+        print("✅ OCR转发正确")
+
+    def test_errors(self):
+        """错误请求返回对应的状态码"""
+        self.assertEqual(self._post('/v1/extract', data=b'not json',
+                                    headers={'Content-Type': 'application/json'}).status_code, 400)
+        self.assertEqual(self._post('/v1/extract', json={}).status_code, 400)
+        self.assertEqual(self._post('/v1/summarize', json={'text': 'x', 'method': 'other'}).status_code, 400)
+        self.assertEqual(self._post('/v1/mhtml', json={'path': '/no/such/file.mhtml'}).status_code, 404)
+        self.assertEqual(self._post('/v1/extract', json={'html': '<html></html>'}).status_code, 422)
+        self.assertEqual(self.session.get(self.server.url + '/v1/extract').status_code, 405)
+        self.assertEqual(self.session.get(self.server.url + '/missing').status_code, 404)
+        print("✅ 错误状态码正确")
+
+    def test_malformed_request(self):
+        """无效的请求行返回400并关闭连接"""
+        with socket.create_connection(('127.0.0.1', self.server.port), timeout=5) as sock:
+            sock.sendall(b"garbage\r\n\r\n")
+            response = sock.recv(4096)
+        self.assertTrue(response.startswith(b"HTTP/1.1 400"))
+        print("✅ 无效请求处理正确")
+
+    def test_status_histograms(self):
+        """状态接口报告各接口的请求数和延迟"""
+        for _ in range(3):
+            self._post('/v1/extract', json={'html': CHAPTER_HTML})
+        stats = self.session.get(self.server.url + '/v1/status').json()
+        endpoint = stats['endpoints']['POST /v1/extract']
+        self.assertEqual(endpoint['statuses'], {'200': 3})
+        self.assertEqual(endpoint['latency_ms']['count'], 3)
+        self.assertEqual(stats['stages']['extract']['completed'], 1)
+        self.assertEqual(stats['cache']['hits'], 2)
+        print("✅ 状态统计正确")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准套件测试
+验证语料可重复生成、替身服务和套件的JSON输出及基线对比
+"""
+
+import sys
+import os
+import json
+import unittest
+import tempfile
+import shutil
+
+# 添加项目根目录和benchmarks目录到Python路径
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'benchmarks'))
+
+try:
+    import bench_suite
+    import make_corpus
+    SUITE_AVAILABLE = True
+except ImportError as e:
+    SUITE_AVAILABLE = False
+    SUITE_ERROR = str(e)
+
+
+class TestBenchSuite(unittest.TestCase):
+    """基准套件测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        if not SUITE_AVAILABLE:
+            self.skipTest(f"无法导入基准套件: {SUITE_ERROR}")
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_corpus_is_reproducible(self):
+        """重新生成的语料与仓库中提交的语料一致"""
+        make_corpus.build_corpus(self.temp_dir)
+        for root, _, files in os.walk(bench_suite.CORPUS_DIR):
+            for name in files:
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, bench_suite.CORPUS_DIR)
+                with open(path, 'rb') as committed, open(os.path.join(self.temp_dir, relative), 'rb') as built:
+                    self.assertEqual(committed.read(), built.read(), relative)
+        print("✅ 语料可重复生成")
+
+    def test_suite_json_and_compare(self):
+        """套件输出JSON结果，对比时识别变慢和正确性下降"""
+        output = os.path.join(self.temp_dir, "results.json")
+        status = bench_suite.main(['--only', 'detect,mhtml,ocr', '--repeat', '1',
+                                   '--ocr-latency', '0', '--ocr-per-image', '0', '-o', output])
+        self.assertEqual(status, 0)
+        with open(output, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertEqual(report['schema'], bench_suite.SCHEMA_VERSION)
+        self.assertEqual(set(report['results']), {'detect', 'mhtml', 'ocr'})
+        ocr = report['results']['ocr']
+        self.assertEqual(ocr['checks']['text_ok'], ocr['checks']['images'])
+        self.assertEqual(report['results']['mhtml']['checks']['images_ok'], 2)
+        self.assertGreater(report['results']['detect']['median_ms'], 0)
+
+        # 与自身对比没有问题；基线更快或正确性更高时报告回退
+        self.assertFalse(any(problem for *_, problem in bench_suite.compare(report, report)))
+        baseline = json.loads(json.dumps(report))
+        baseline['results']['detect']['median_ms'] = report['results']['detect']['median_ms'] / 2
+        baseline['results']['ocr']['checks']['text_ok'] += 1
+        problems = {name: problem for name, _, _, _, problem in bench_suite.compare(report, baseline)}
+        self.assertIn("变慢", problems['detect'])
+        self.assertIn("text_ok", problems['ocr'])
+        self.assertIsNone(problems['mhtml'])
+        print("✅ 套件结果和基线对比正确")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
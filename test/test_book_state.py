@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书籍滚动状态测试
+验证逐章更新、上下文大小上限、AI分段解析和持久化
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_state import BookState, parse_summary_sections, MAX_CONTEXT_CHARS
+
+AI_REPLY = """【本章总结】张无忌在光明顶击退六大派。赵敏设计夺走倚天剑。
+【人物】张无忌、赵敏、杨逍
+【未解决线索】倚天剑下落；成昆的阴谋
+【已解决线索】无"""
+
+
+class TestBookState(unittest.TestCase):
+    """书籍滚动状态测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_parse_sections(self):
+        """解析AI分段返回，无分段时整段作为总结"""
+        sections = parse_summary_sections(AI_REPLY)
+        self.assertTrue(sections['summary'].startswith("张无忌在光明顶"))
+        self.assertEqual(sections['characters'], ["张无忌", "赵敏", "杨逍"])
+        self.assertEqual(sections['open_threads'], ["倚天剑下落", "成昆的阴谋"])
+        self.assertEqual(sections['resolved_threads'], [])
+        
+        plain = parse_summary_sections("  只是一段普通总结。 ")
+        self.assertEqual(plain['summary'], "只是一段普通总结。")
+        self.assertEqual(plain['characters'], [])
+    
+    def test_threads_and_characters(self):
+        """线索的新增和解决，人物按最近出现排序"""
+        state = BookState("倚天屠龙记")
+        self.assertEqual(state.to_prompt(), "")
+        state.add_ai_summary("第一章", AI_REPLY)
+        state.add_chapter("第二章", "张无忌找回倚天剑。", ["周芷若", "张无忌"],
+                          ["周芷若的身世"], ["倚天剑下落"])
+        self.assertEqual(state.open_threads, ["成昆的阴谋", "周芷若的身世"])
+        self.assertEqual(list(state.characters), ["赵敏", "杨逍", "周芷若", "张无忌"])
+        
+        prompt = state.to_prompt()
+        self.assertIn("倚天屠龙记", prompt)
+        self.assertIn("第二章：张无忌找回倚天剑。", prompt)
+        self.assertNotIn("倚天剑下落", prompt)
+    
+    def test_same_chapter_replaces_summary(self):
+        """重新总结同一章时替换而不是新增"""
+        state = BookState()
+        self.assertTrue(state.add_chapter("第一章", "旧总结。", chapter_id="u1"))
+        self.assertFalse(state.add_chapter("第一章", "新总结。", chapter_id="u1"))
+        self.assertEqual(state.chapter_count, 1)
+        self.assertEqual(list(state.recent), [("第一章", "新总结。")])
+    
+    def test_same_chapter_rolls_back_threads(self):
+        """重新总结同一章时撤销上次这一章的人物和线索，保存后重新加载也一样"""
+        state = BookState()
+        state.add_chapter("第一章", "张无忌出场。", ["张无忌"], ["义父下落"], chapter_id="u1")
+        state.add_chapter("第二章", "旧总结。", ["赵敏", "张无忌"], ["倚天剑下落"], ["义父下落"], chapter_id="u2")
+        path = os.path.join(self.temp_dir, "state.json")
+        state.save(path)
+        
+        for current in (state, BookState.load(path)):
+            current.add_chapter("第二章", "新总结。", ["周芷若"], ["峨眉掌门之位"], chapter_id="u2")
+            self.assertEqual(current.open_threads, ["义父下落", "峨眉掌门之位"])
+            self.assertEqual(list(current.characters), ["张无忌", "周芷若"])
+            self.assertNotIn("倚天剑下落", current.to_prompt())
+            self.assertNotIn("赵敏", current.to_prompt())
+    
+    def test_prompt_size_bounded(self):
+        """章节再多，上下文大小也有上限"""
+        state = BookState("长篇")
+        sizes = []
+        for i in range(500):
+            state.add_chapter(f"第{i + 1}章", f"第{i + 1}章发生了很多事情。" * 5 + "后续剧情。",
+                              [f"人物{i}"], [f"线索{i}"])
+            sizes.append(len(state.to_prompt()))
+        self.assertEqual(state.chapter_count, 500)
+        self.assertLessEqual(max(sizes), MAX_CONTEXT_CHARS)
+        self.assertEqual(sizes[-1], sizes[-100])
+        self.assertIn("第500章", state.to_prompt())
+        self.assertIn("第495章：第495章发生了很多事情。", "\n".join(state.digest))
+    
+    def test_save_and_load(self):
+        """保存后重新加载上下文一致"""
+        state = BookState("倚天屠龙记", max_recent=2)
+        for i in range(5):
+            state.add_ai_summary(f"第{i + 1}章", AI_REPLY, chapter_id=f"u{i}")
+        path = os.path.join(self.temp_dir, "state.json")
+        state.save(path)
+        
+        loaded = BookState.load(path)
+        self.assertEqual(loaded.to_prompt(), state.to_prompt())
+        self.assertEqual(loaded.last_chapter_id, "u4")
+        self.assertEqual(loaded.recent.maxlen, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
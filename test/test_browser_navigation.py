@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器导航状态测试
+验证导航按钮由信号驱动，窗口不再创建轮询定时器
+"""
+
+import sys
+import os
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestBrowserNavigation(unittest.TestCase):
+    """浏览器导航状态测试类"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """创建QApplication（离屏运行）"""
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        try:
+            from PyQt5.QtWidgets import QApplication
+            import browser
+        except ImportError as e:
+            raise unittest.SkipTest(f"PyQt5/PyQtWebEngine 不可用: {e}")
+        if not browser.PYQT_AVAILABLE:
+            raise unittest.SkipTest("PyQt5/PyQtWebEngine 不可用")
+        cls.app = QApplication.instance() or QApplication([])
+        cls.browser = browser
+    
+    def test_no_polling_timer(self):
+        """窗口空闲时没有活动的定时器"""
+        from PyQt5.QtCore import QTimer
+        window = self.browser.NovelBrowser()
+        try:
+            active = [timer for timer in window.findChildren(QTimer) if timer.isActive()]
+            self.assertEqual(active, [])
+            self.assertFalse(hasattr(window, 'navigation_timer'))
+        finally:
+            window.close()
+    
+    def test_buttons_follow_history(self):
+        """初始时不能后退/前进，停止按钮在加载完成后禁用"""
+        window = self.browser.NovelBrowser()
+        try:
+            window.update_navigation_buttons()
+            self.assertFalse(window.back_action.isEnabled())
+            self.assertFalse(window.forward_action.isEnabled())
+            window.on_load_started()
+            self.assertTrue(window.stop_action.isEnabled())
+            window.on_load_finished(True)
+            self.assertFalse(window.stop_action.isEnabled())
+        finally:
+            window.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导入工具测试
+验证进程池并行提取、JSONL输出、断点续传和工作进程崩溃后的恢复
+"""
+
+import sys
+import os
+import json
+import unittest
+import tempfile
+import shutil
+import multiprocessing
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_mhtml_streaming import build_mhtml, CHAPTER_HTML
+
+
+def _crash_on_marked_file(file_path):
+    """读取到文件名带crash的HTML时让工作进程直接退出（模拟解析库崩溃）"""
+    if 'crash' in os.path.basename(file_path):
+        os._exit(1)
+    return _real_read_html(file_path)
+
+
+_real_read_html = None
+
+
+class TestBulkIngest(unittest.TestCase):
+    """批量导入测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        try:
+            import bulk_ingest
+        except ImportError as e:
+            self.skipTest(f"无法导入批量导入模块: {e}")
+        self.bulk_ingest = bulk_ingest
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "chapters")
+        os.makedirs(os.path.join(self.input_dir, "volume2"))
+        
+        for i in range(3):
+            with open(os.path.join(self.input_dir, f"chapter_{i}.mhtml"), 'wb') as f:
+                f.write(build_mhtml(CHAPTER_HTML, os.urandom(4096)))
+        with open(os.path.join(self.input_dir, "volume2", "chapter_3.html"), 'w', encoding='gb18030') as f:
+            f.write(CHAPTER_HTML)
+        with open(os.path.join(self.input_dir, "notes.txt"), 'w') as f:
+            f.write("不是章节文件")
+        
+        self.output = os.path.join(self.temp_dir, "out.jsonl")
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _read_output(self):
+        with open(self.output, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    
+    def test_ingest_directory(self):
+        """并行提取目录中所有章节文件"""
+        meter = self.bulk_ingest.ingest(self.input_dir, self.output, workers=2, report_interval=60)
+        self.assertEqual(meter.files, 4)
+        self.assertEqual(meter.failed, 0)
+        
+        records = self._read_output()
+        self.assertEqual(len(records), 4)
+        for record in records:
+            self.assertTrue(record['path'].startswith(self.input_dir))
+            self.assertTrue(record['text'])
+            if record['path'].endswith('.mhtml'):
+                self.assertIn("少年背着长剑走出了山门", record['text'])
+        print("✅ 目录批量提取正确")
+    
+    def test_resume_from_checkpoint(self):
+        """断点续传时跳过已完成的文件"""
+        files = list(self.bulk_ingest.iter_chapter_files(self.input_dir))
+        self.assertEqual(len(files), 4)
+        with open(self.output + '.checkpoint', 'w', encoding='utf-8') as f:
+            f.write(files[0] + '\n' + files[1] + '\n')
+        
+        meter = self.bulk_ingest.ingest(self.input_dir, self.output, workers=2, report_interval=60)
+        self.assertEqual(meter.files, 2)
+        self.assertEqual({r['path'] for r in self._read_output()}, set(files[2:]))
+        
+        # 再次运行时没有新文件
+        meter = self.bulk_ingest.ingest(self.input_dir, self.output, workers=2, report_interval=60)
+        self.assertEqual(meter.files, 0)
+        print("✅ 断点续传正确")
+    
+    def test_failed_files_retried(self):
+        """提取失败的文件不记入断点，下次运行时重试"""
+        bad = os.path.join(self.input_dir, "broken.mhtml")
+        with open(bad, 'wb') as f:
+            f.write(b'')
+        meter = self.bulk_ingest.ingest(self.input_dir, self.output, workers=2, report_interval=60)
+        self.assertEqual((meter.files, meter.failed), (5, 1))
+        self.assertNotIn(bad, self.bulk_ingest.load_checkpoint(self.output + '.checkpoint'))
+        
+        meter = self.bulk_ingest.ingest(self.input_dir, self.output, workers=2, report_interval=60)
+        self.assertEqual((meter.files, meter.failed), (1, 1))
+        print("✅ 失败文件下次运行时重试")
+    
+    def test_worker_crash_recovers(self):
+        """工作进程崩溃时重建进程池，只有导致崩溃的文件失败"""
+        global _real_read_html
+        if multiprocessing.get_start_method() != 'fork':
+            self.skipTest("需要fork方式创建工作进程")
+        crash = os.path.join(self.input_dir, "volume2", "crash.html")
+        with open(crash, 'w', encoding='utf-8') as f:
+            f.write(CHAPTER_HTML)
+        
+        _real_read_html = self.bulk_ingest._read_html
+        with mock.patch.object(self.bulk_ingest, '_read_html', _crash_on_marked_file):
+            meter = self.bulk_ingest.ingest(self.input_dir, self.output, workers=2, report_interval=60)
+        self.assertEqual((meter.files, meter.failed), (5, 1))
+        paths = {record['path'] for record in self._read_output()}
+        self.assertEqual(len(paths), 4)
+        self.assertNotIn(crash, paths)
+        self.assertEqual(self.bulk_ingest.load_checkpoint(self.output + '.checkpoint'), paths)
+        print("✅ 工作进程崩溃后继续处理其余文件")
+    
+    def test_ingest_into_library(self):
+        """同时写入本地书库，相同内容的章节只存一份正文"""
+        from library_store import LibraryStore
+        library_path = os.path.join(self.temp_dir, "library.db")
+        self.bulk_ingest.ingest(self.input_dir, self.output, workers=2, report_interval=60,
+                                library_path=library_path)
+        
+        with LibraryStore(library_path) as library:
+            chapters = library.get_chapters(self.input_dir)
+            self.assertEqual(len(chapters), 3)
+            self.assertEqual(len(library.get_chapters(os.path.join(self.input_dir, "volume2"))), 1)
+            self.assertEqual(len({c['content_hash'] for c in chapters}), 1)
+            self.assertTrue(library.get_extraction(chapters[0]['url'])['text'])
+            hits = library.search("山门", book_key=self.input_dir)
+            self.assertEqual(len(hits), 3)
+        print("✅ 书库写入正确")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置加密密钥缓存测试
+验证PBKDF2密钥在进程内只派生一次，并在多个管理器间共享
+"""
+
+import sys
+import os
+import unittest
+import tempfile
+import shutil
+import uuid
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestConfigKeyCache(unittest.TestCase):
+    """密钥缓存测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_manager_construction_does_not_derive_key(self):
+        """创建管理器时不应触发密钥派生"""
+        try:
+            from config import ai_config
+        except ImportError as e:
+            self.skipTest(f"无法导入配置模块: {e}")
+        
+        with patch.object(ai_config.ConfigEncryptor, '_derive_key') as derive:
+            manager = ai_config.AIConfigManager(config_dir=self.temp_dir)
+            self.assertIsNone(manager._encryptor)
+            derive.assert_not_called()
+        print("✅ 管理器创建未派生密钥")
+    
+    def test_key_derived_once_per_process(self):
+        """同一密码只派生一次，所有加密器共享密钥"""
+        try:
+            from config import ai_config
+        except ImportError as e:
+            self.skipTest(f"无法导入配置模块: {e}")
+        if not ai_config.CRYPTO_AVAILABLE:
+            self.skipTest("cryptography库未安装")
+        
+        password = f"test_password_{uuid.uuid4()}"
+        with patch.object(ai_config, 'PBKDF2HMAC', wraps=ai_config.PBKDF2HMAC) as kdf:
+            first = ai_config.ConfigEncryptor(password)
+            second = ai_config.ConfigEncryptor(password)
+            self.assertEqual(kdf.call_count, 1)
+        
+        # 两个实例可互相解密
+        token = first.encrypt("sk-shared-key")
+        self.assertEqual(second.decrypt(token), "sk-shared-key")
+        print("✅ 密钥在进程内只派生一次")
+    
+    def test_round_trip_across_managers(self):
+        """不同管理器实例读写同一配置"""
+        try:
+            from config.ai_config import AIConfigManager, AIModelConfig
+        except ImportError as e:
+            self.skipTest(f"无法导入配置模块: {e}")
+        
+        writer = AIConfigManager(config_dir=self.temp_dir)
+        writer.add_model(AIModelConfig(
+            id=str(uuid.uuid4()),
+            name="缓存测试模型",
+            base_url="https://api.example.com/v1",
+            token_key="sk-cache-test",
+            model_name="test-model"
+        ))
+        
+        reader = AIConfigManager(config_dir=self.temp_dir)
+        default_model = reader.get_default_model()
+        self.assertIsNotNone(default_model)
+        self.assertEqual(default_model.token_key, "sk-cache-test")
+        print("✅ 多个管理器共享密钥读写成功")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
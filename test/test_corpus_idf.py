@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+书籍级IDF索引测试
+验证增量统计、持久化和总结器集成
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus_idf import BookIDFIndex, MIN_CHAPTERS_FOR_IDF
+
+
+def build_index(chapter_count=MIN_CHAPTERS_FOR_IDF):
+    """构建测试索引：主角每章出现，配角只出现在第一章"""
+    index = BookIDFIndex()
+    for i in range(chapter_count):
+        terms = ['张无忌'] * 5 + [f'地点{i}'] * 2
+        if i == 0:
+            terms += ['赵敏'] * 3
+        index.add_chapter(f'ch{i}', terms)
+    return index
+
+
+class TestBookIDFIndex(unittest.TestCase):
+    """书籍级IDF索引测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_not_ready_returns_default(self):
+        """章节不足时返回默认值"""
+        index = build_index(MIN_CHAPTERS_FOR_IDF - 1)
+        self.assertFalse(index.ready)
+        self.assertEqual(index.idf('张无忌', default=7.0), 7.0)
+    
+    def test_idf_ordering(self):
+        """稀有词的IDF高于常见词"""
+        index = build_index()
+        self.assertTrue(index.ready)
+        self.assertGreater(index.idf('赵敏'), index.idf('张无忌'))
+        self.assertGreater(index.idf('未出现的词'), index.idf('赵敏'))
+    
+    def test_duplicate_chapter_ignored(self):
+        """重复导入同一章节不重复计数"""
+        index = build_index()
+        self.assertFalse(index.add_chapter('ch0', ['赵敏']))
+        self.assertEqual(index.chapter_count, MIN_CHAPTERS_FOR_IDF)
+        self.assertEqual(index.doc_freq['赵敏'], 1)
+    
+    def test_chapter_keywords(self):
+        """章节关键词按全书IDF排序"""
+        index = build_index()
+        keywords = [term for term, _ in index.chapter_keywords('ch0', topK=3)]
+        # 赵敏词频低于张无忌，但只出现在本章
+        self.assertEqual(keywords[0], '赵敏')
+        self.assertEqual(index.chapter_keywords('不存在'), [])
+    
+    def test_chapters_with_term(self):
+        """按词查询章节"""
+        index = build_index()
+        self.assertEqual(index.chapters_with_term('赵敏'), ['ch0'])
+        self.assertEqual(len(index.chapters_with_term('张无忌')), MIN_CHAPTERS_FOR_IDF)
+        index.add_chapter('extra', ['赵敏'])
+        self.assertEqual(index.chapters_with_term('赵敏'), ['ch0', 'extra'])
+    
+    def test_save_and_load(self):
+        """保存后重新加载结果一致"""
+        index = build_index()
+        path = os.path.join(self.temp_dir, 'book', 'idf.json.gz')
+        index.save(path)
+        
+        loaded = BookIDFIndex(path)
+        self.assertEqual(loaded.chapter_count, index.chapter_count)
+        self.assertEqual(loaded.idf('赵敏'), index.idf('赵敏'))
+        self.assertEqual(loaded.chapter_keywords('ch0'), index.chapter_keywords('ch0'))
+        self.assertEqual(os.listdir(os.path.dirname(path)), ['idf.json.gz'])
+
+
+class TestSummarizerIntegration(unittest.TestCase):
+    """总结器使用书籍级IDF的测试"""
+    
+    def setUp(self):
+        """测试前准备"""
+        try:
+            from ai_summary import TextSummarizer
+        except ImportError as e:
+            self.skipTest(f"无法导入总结模块: {e}")
+        self.index = BookIDFIndex()
+        self.summarizer = TextSummarizer(idf_index=self.index)
+    
+    def test_add_chapter_feeds_index(self):
+        """导入章节时写入索引并返回分析结果"""
+        analysis = self.summarizer.add_chapter(1, "张无忌来到光明顶。赵敏带着蒙古兵闯了进来。")
+        self.assertEqual(self.index.chapter_count, 1)
+        self.assertIn('1', self.index.chapter_terms)
+        self.assertTrue(analysis.sentences)
+    
+    def test_book_idf_changes_keywords(self):
+        """索引可用后，全书常见的人名权重下降"""
+        for i in range(MIN_CHAPTERS_FOR_IDF):
+            self.summarizer.add_chapter(i, f"张无忌走进第{i}座城池。张无忌四处张望。")
+        
+        text = "张无忌看见赵敏。张无忌向赵敏行礼。"
+        keywords = [term for term, _ in self.summarizer.analyze(text).keywords]
+        self.assertEqual(keywords[0], '赵敏')
+        self.assertEqual(self.summarizer.extract_keywords(text, topK=1)[0][0], '赵敏')
+    
+    def test_index_chapters(self):
+        """批量导入章节，已导入的章节跳过"""
+        chapters = [(i, f"张无忌走进第{i}座城池。张无忌四处张望。") for i in range(3)]
+        self.assertEqual(self.summarizer.index_chapters(chapters, workers=1), 3)
+        self.assertEqual(self.summarizer.index_chapters(chapters, workers=1), 0)
+        self.assertEqual(self.index.chapter_count, 3)
+        self.assertEqual(self.index.doc_freq['张无忌'], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容特征检测测试
+验证多词计数与逐位置查找一致，类别频次和密度，以及共享检测器只构建一次
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feature_detector
+from feature_detector import TermCounter, FeatureDetector, DEFAULT_FEATURES, NOVEL_DICT_CATEGORY
+
+
+def naive_count(text, pattern):
+    """逐位置统计（允许重叠）的出现次数"""
+    return sum(1 for i in range(len(text)) if text.startswith(pattern, i))
+
+
+class TestTermCounter(unittest.TestCase):
+    """多词计数测试类"""
+    
+    def test_overlapping_matches(self):
+        """重叠匹配和后缀匹配"""
+        counter = TermCounter(["he", "she", "his", "hers", "he"])
+        self.assertEqual(counter.patterns, ["he", "she", "his", "hers"])
+        self.assertEqual(counter.count("ushers"), [1, 1, 0, 1])
+        self.assertEqual(TermCounter(["哈哈", "哈"]).count("哈哈哈"), [2, 3])
+        self.assertEqual(TermCounter([]).count("任意文本"), [])
+    
+    def test_matches_naive_count(self):
+        """计数结果与逐词查找一致"""
+        patterns = ["灵气", "灵", "气运", "运气", "说道", "道"]
+        text = "他运气灵气，说道：“气运在我。”灵气充盈，道心稳固。" * 3
+        counter = TermCounter(patterns + ["a.b", "[x]"])
+        text += "a.b[x]axb"
+        self.assertEqual(counter.count(text), [naive_count(text, p) for p in counter.patterns])
+
+
+class TestFeatureDetector(unittest.TestCase):
+    """特征检测器测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.dict_path = os.path.join(self.temp_dir, "novel_dict.txt")
+        with open(self.dict_path, "w", encoding="utf-8") as f:
+            f.write("修仙\n筑基 10 n\n\n长老\n")
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_category_counts_and_density(self):
+        """各类别的频次、密度和命中词"""
+        detector = FeatureDetector(dict_path=self.dict_path)
+        text = "长老问道：“你何时筑基？”弟子回答：“明日筑基。”"
+        result = detector.detect(text)
+        
+        self.assertEqual(list(result), list(DEFAULT_FEATURES) + [NOVEL_DICT_CATEGORY])
+        self.assertEqual(result["对话"]["count"], 2)
+        self.assertEqual(result[NOVEL_DICT_CATEGORY]["terms"]["筑基"], 2)
+        self.assertEqual(result[NOVEL_DICT_CATEGORY]["count"], 3)
+        self.assertAlmostEqual(result["对话"]["density"], 2 * 1000.0 / len(text))
+        self.assertEqual(result["描写"]["count"], 0)
+    
+    def test_missing_dict_and_empty_text(self):
+        """词典不存在时只使用内置特征，空文本密度为0"""
+        detector = FeatureDetector(dict_path=os.path.join(self.temp_dir, "missing.txt"))
+        self.assertNotIn(NOVEL_DICT_CATEGORY, detector.features)
+        result = detector.detect("")
+        self.assertTrue(all(info["count"] == 0 and info["density"] == 0.0
+                            for info in result.values()))
+    
+    def test_shared_detector_built_once(self):
+        """界面线程和预取线程同时首次获取时只构建一个检测器"""
+        built = []
+        
+        class SlowDetector:
+            def __init__(self):
+                built.append(self)
+                time.sleep(0.05)
+        
+        results = []
+        with mock.patch.object(feature_detector, '_default_detector', None), \
+                mock.patch.object(feature_detector, 'FeatureDetector', SlowDetector):
+            threads = [threading.Thread(target=lambda: results.append(feature_detector.get_feature_detector()))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(built), 1)
+        self.assertTrue(all(result is built[0] for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
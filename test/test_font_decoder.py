@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字体反爬解码测试
+验证字形名称、轮廓哈希和OCR回退三种映射来源，以及按字体哈希缓存映射表
+"""
+
+import sys
+import os
+import io
+import json
+import unittest
+import tempfile
+import shutil
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _square(pen):
+    pen.moveTo((100, 0))
+    pen.lineTo((100, 700))
+    pen.lineTo((500, 700))
+    pen.lineTo((500, 0))
+    pen.closePath()
+
+
+def _triangle(pen):
+    pen.moveTo((100, 0))
+    pen.lineTo((300, 700))
+    pen.lineTo((500, 0))
+    pen.closePath()
+
+
+def build_font(glyphs, cmap):
+    """生成只含简单轮廓的TrueType字体
+
+    Args:
+        glyphs: {字形名称: 绘制函数}
+        cmap: {码位: 字形名称}
+    """
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    
+    order = ['.notdef'] + list(glyphs)
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(order)
+    builder.setupCharacterMap(cmap)
+    outlines = {}
+    for name in order:
+        pen = TTGlyphPen(None)
+        if name in glyphs:
+            glyphs[name](pen)
+        outlines[name] = pen.glyph()
+    builder.setupGlyf(outlines)
+    builder.setupHorizontalMetrics({name: (600, 0) for name in order})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({'familyName': 'Test', 'styleName': 'Regular'})
+    builder.setupOS2()
+    builder.setupPost()
+    buffer = io.BytesIO()
+    builder.save(buffer)
+    return buffer.getvalue()
+
+
+class _FakeOCRClient:
+    """模拟OCR客户端：每张图片都识别为同一个字"""
+    
+    def __init__(self, text):
+        self.text = text
+        self.images = 0
+    
+    def recognize_batch(self, images):
+        self.images += len(images)
+        return [{'status': 'success', 'results': [{'text': self.text}]} for _ in images]
+    
+    @staticmethod
+    def parse_result(result):
+        return "\n".join(item['text'] for item in result['results'])
+
+
+class TestFontDecoder(unittest.TestCase):
+    """字体反爬解码测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        try:
+            import font_decoder
+        except ImportError as e:
+            self.skipTest(f"无法导入字体解码模块: {e}")
+        self.module = font_decoder
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_glyph_names(self):
+        """常见字形名称直接对应字符，私有区码位名称不可信"""
+        self.assertEqual(self.module.char_from_glyph_name('seven'), '7')
+        self.assertEqual(self.module.char_from_glyph_name('period'), '.')
+        self.assertEqual(self.module.char_from_glyph_name('uni5B57'), '字')
+        self.assertIsNone(self.module.char_from_glyph_name('uniE001'))
+        self.assertIsNone(self.module.char_from_glyph_name('glyph12'))
+        print("✅ 字形名称推断正确")
+    
+    def test_cached_map_downloads_once(self):
+        """映射表按字体哈希缓存，同一字体地址只下载一次"""
+        font_data = b'fake font data'
+        maps_dir = os.path.join(self.temp_dir, 'maps')
+        os.makedirs(maps_dir)
+        with open(os.path.join(maps_dir, self.module.font_hash(font_data) + '.json'), 'w') as f:
+            json.dump({str(0xE001): '3', str(0xE002): '万'}, f)
+        
+        downloads = []
+        decoder = self.module.FontDecoder(self.temp_dir, fetch=lambda url: downloads.append(url) or font_data)
+        obfuscated = "共字"
+        self.assertEqual(decoder.decode(obfuscated, "https://example.com/a.woff"), "共3万字")
+        self.assertEqual(decoder.decode(obfuscated, "https://example.com/a.woff"), "共3万字")
+        self.assertEqual(downloads, ["https://example.com/a.woff"])
+        
+        # 无法获取字体时原样返回
+        failing = self.module.FontDecoder(self.temp_dir, fetch=lambda url: 1 / 0)
+        self.assertEqual(failing.decode(obfuscated, "https://example.com/b.woff"), obfuscated)
+        print("✅ 映射表缓存正确")
+    
+    def test_prepare_in_background(self):
+        """后台准备映射表时缓存查询不被阻塞，同一地址只下载一次，失败后不立即重试"""
+        import threading
+        font_data = b'slow font data'
+        maps_dir = os.path.join(self.temp_dir, 'maps')
+        os.makedirs(maps_dir)
+        with open(os.path.join(maps_dir, self.module.font_hash(font_data) + '.json'), 'w') as f:
+            json.dump({str(0xE001): '3'}, f)
+        
+        release = threading.Event()
+        downloads = []
+        
+        def fetch(url):
+            downloads.append(url)
+            release.wait(5)
+            return font_data
+        
+        decoder = self.module.FontDecoder(self.temp_dir, fetch=fetch)
+        url = "https://example.com/slow.woff"
+        first = decoder.prepare(url)
+        second = decoder.prepare(url)
+        self.assertIs(first, second)
+        self.assertIsNone(decoder.cached_table_for_url(url))
+        release.set()
+        self.assertEqual("第\ue001章".translate(first.result(5)), "第3章")
+        self.assertIsNotNone(decoder.cached_table_for_url(url))
+        self.assertEqual(downloads, [url])
+        
+        failures = []
+        failing = self.module.FontDecoder(self.temp_dir, fetch=lambda url: failures.append(url) / 0)
+        self.assertIsNone(failing.prepare("https://example.com/bad.woff").result(5))
+        self.assertEqual(failing.decode("第\ue001章", "https://example.com/bad.woff"), "第\ue001章")
+        self.assertEqual(len(failures), 1)
+        print("✅ 后台准备映射表正确")
+    
+    def test_outline_learning_and_ocr_fallback(self):
+        """名称已知的字形轮廓被学习，换名换码位的新字体按轮廓解码，未知轮廓交给OCR"""
+        if not self.module.FONTTOOLS_AVAILABLE:
+            self.skipTest("fontTools 未安装")
+        
+        named_font = build_font({'one': _square}, {0xE001: 'one'})
+        decoder = self.module.FontDecoder(self.temp_dir, fetch=lambda url: named_font)
+        self.assertEqual(decoder.decode("第章", "https://example.com/1.woff"), "第1章")
+        
+        # 新字体：字形名称和码位都变了，正方形轮廓仍是“1”，三角形需要OCR
+        renamed_font = build_font({'gA': _square, 'gB': _triangle}, {0xE101: 'gA', 0xE102: 'gB'})
+        ocr = _FakeOCRClient('字')
+        decoder = self.module.FontDecoder(self.temp_dir, ocr_client=ocr, fetch=lambda url: renamed_font)
+        decoded = decoder.decode("", "https://example.com/2.woff")
+        self.assertEqual(decoded[0], "1")
+        try:
+            import PIL
+        except ImportError:
+            self.assertEqual(decoded[1], "")
+            print("✅ 轮廓学习正确（未安装Pillow，跳过OCR回退）")
+            return
+        self.assertEqual(decoded, "1字")
+        self.assertEqual(ocr.images, 1)
+        
+        # OCR结果写入轮廓表，之后的字体不再需要OCR
+        third_font = build_font({'x1': _triangle}, {0xE201: 'x1'})
+        decoder = self.module.FontDecoder(self.temp_dir, fetch=lambda url: third_font)
+        self.assertEqual(decoder.decode("", "https://example.com/3.woff"), "字")
+        print("✅ 轮廓学习和OCR回退正确")
+
+    
+    def test_incomplete_map_retried_with_ocr(self):
+        """没有OCR客户端时不完整的映射表不写入磁盘，接入OCR客户端后重新解析"""
+        if not self.module.FONTTOOLS_AVAILABLE:
+            self.skipTest("fontTools 未安装")
+        try:
+            import PIL
+        except ImportError:
+            self.skipTest("Pillow 未安装")
+        
+        font_data = build_font({'one': _square, 'gB': _triangle}, {0xE001: 'one', 0xE002: 'gB'})
+        downloads = []
+        decoder = self.module.FontDecoder(self.temp_dir, fetch=lambda url: downloads.append(url) or font_data)
+        url = "https://example.com/partial.woff"
+        self.assertEqual(decoder.decode("\ue001\ue002", url), "1\ue002")
+        self.assertEqual(decoder.decode("\ue001\ue002", url), "1\ue002")
+        self.assertEqual(len(downloads), 1)
+        self.assertFalse(os.path.exists(decoder._map_path(self.module.font_hash(font_data))))
+        
+        decoder.ocr_client = _FakeOCRClient('字')
+        self.assertEqual(decoder.decode("\ue001\ue002", url), "1字")
+        self.assertEqual(decoder.ocr_client.images, 1)
+        self.assertTrue(os.path.exists(decoder._map_path(self.module.font_hash(font_data))))
+        
+        # 完整的映射表从磁盘读取，不再识别
+        fresh = self.module.FontDecoder(self.temp_dir, ocr_client=_FakeOCRClient('错'), fetch=lambda url: font_data)
+        self.assertEqual(fresh.decode("\ue001\ue002", url), "1字")
+        self.assertEqual(fresh.ocr_client.images, 0)
+        print("✅ 不完整的映射表在接入OCR后重新解析")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
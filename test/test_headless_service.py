@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无界面提取服务测试
+验证提取结果整理、HTTP接口和offscreen页面池
+"""
+
+import sys
+import os
+import json
+import threading
+import unittest
+import urllib.request
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHAPTER_TEXT = "少年背着长剑走出了山门，回头望了一眼云雾中的青山。" * 10
+
+# 正文由脚本延迟填充，模拟起点的动态加载
+DYNAMIC_CHAPTER_HTML = f"""<html><head><meta charset="utf-8"><title>动态章节</title></head>
+<body><h1 class="j_chapterName">第一章 下山</h1><div class="info-chapter">字数：3000</div>
+<div class="read-content"></div>
+<script>setTimeout(function () {{
+    document.querySelector('.read-content').innerText = "{CHAPTER_TEXT}";
+}}, 300);</script>
+</body></html>"""
+
+
+class _FakePool:
+    """模拟页面池：立即返回结果，URL包含fail时失败"""
+    
+    pool_size = 2
+    timeout = 5
+    
+    def __init__(self):
+        self.submitted = []
+    
+    def submit(self, url):
+        self.submitted.append(url)
+        future = Future()
+        if 'fail' in url:
+            future.set_exception(RuntimeError("页面加载失败"))
+        else:
+            future.set_result({'url': url, 'text': CHAPTER_TEXT})
+        return future
+    
+    def stats(self):
+        return {'pool_size': self.pool_size, 'busy': 0, 'queued': 0}
+
+
+class _ChapterHandler(BaseHTTPRequestHandler):
+    """返回动态加载的章节页面"""
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_GET(self):
+        body = DYNAMIC_CHAPTER_HTML.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestHeadlessService(unittest.TestCase):
+    """无界面提取服务测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        try:
+            import headless_service
+        except ImportError as e:
+            self.skipTest(f"无法导入无界面提取服务: {e}")
+        self.service = headless_service
+    
+    def _start(self, server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+    
+    def test_build_record_from_script(self):
+        """脚本返回的JSON整理为提取结果，字体反爬信息被保留"""
+        result = json.dumps({
+            'content': {'text': CHAPTER_TEXT, 'fontUrl': 'https://example.com/font.woff'},
+            'title': '第一章 下山',
+            'chapterInfo': '字数：3000'
+        })
+        record = self.service.build_record("https://example.com/1", result, "<html></html>", None)
+        self.assertEqual(record['text'], CHAPTER_TEXT.strip())
+        self.assertEqual(record['title'], '第一章 下山')
+        self.assertEqual(record['method'], 'javascript')
+        self.assertEqual(record['font_url'], 'https://example.com/font.woff')
+        self.assertEqual(self.service.script_font_url(result), 'https://example.com/font.woff')
+        self.assertIsNone(self.service.script_font_url("<html></html>"))
+        print("✅ 脚本结果整理正确")
+    
+    def test_build_record_falls_back_to_html(self):
+        """脚本失败返回页面HTML时使用其中较完整的一份解析"""
+        try:
+            from web_extractor import WebExtractor
+        except ImportError as e:
+            self.skipTest(f"无法导入网页提取器: {e}")
+        rendered = f"<html><body><div id='content'><p>{CHAPTER_TEXT}</p></div></body></html>"
+        record = self.service.build_record("https://example.com/1", rendered, "<html></html>", WebExtractor())
+        self.assertEqual(record['method'], 'html')
+        self.assertIn("少年背着长剑", record['text'])
+        print("✅ HTML回退解析正确")
+    
+    def test_http_api(self):
+        """HTTP接口支持单个和批量提取，并返回页面池状态"""
+        pool = _FakePool()
+        base = self._start(self.service.make_http_server(pool, port=0))
+        
+        with urllib.request.urlopen(f"{base}/extract?url=https://example.com/1") as response:
+            result = json.loads(response.read())
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['content']['url'], "https://example.com/1")
+        
+        body = json.dumps({'urls': ["https://example.com/2", "https://example.com/fail"]}).encode()
+        with urllib.request.urlopen(urllib.request.Request(f"{base}/extract", data=body)) as response:
+            items = json.loads(response.read())['items']
+        self.assertEqual([item['status'] for item in items], ['success', 'error'])
+        self.assertEqual(items[1]['error'], "页面加载失败")
+        
+        with urllib.request.urlopen(f"{base}/status") as response:
+            self.assertEqual(json.loads(response.read())['pool_size'], 2)
+        
+        for url in ("javascript:alert(1)", "file:///etc/passwd"):
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                urllib.request.urlopen(f"{base}/extract?url={url}")
+            self.assertEqual(context.exception.code, 400)
+        self.assertEqual(pool.submitted, ["https://example.com/1", "https://example.com/2", "https://example.com/fail"])
+        self.assertTrue(self.service.is_page_url("https://example.com/1"))
+        self.assertFalse(self.service.is_page_url("file:///etc/passwd"))
+        print("✅ HTTP接口正确")
+    
+    def test_run_queue_keeps_order(self):
+        """队列模式按输入顺序输出JSONL"""
+        import io
+        pool = _FakePool()
+        output = io.StringIO()
+        urls = [f"https://example.com/{i}\n" for i in range(5)] + ["# 注释\n", "https://example.com/fail\n"]
+        self.assertEqual(self.service.run_queue(pool, urls, output, max_in_flight=2), (5, 1))
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([line['url'] for line in lines], [url.strip() for url in urls if '#' not in url])
+        print("✅ 队列模式正确")
+    
+    def test_offscreen_pool(self):
+        """offscreen页面池渲染动态页面并执行提取脚本"""
+        if not self.service.PYQT_AVAILABLE:
+            self.skipTest("PyQt5/PyQtWebEngine 未安装")
+        app = self.service.create_application()
+        base = self._start(ThreadingHTTPServer(('127.0.0.1', 0), _ChapterHandler))
+        
+        from PyQt5.QtCore import QTimer
+        pool = self.service.HeadlessExtractionPool(pool_size=2, timeout=20)
+        futures = [pool.submit(f"{base}/chapter/{i}.html") for i in range(3)]
+        with self.assertRaises(self.service.ExtractionError):
+            pool.submit("file:///etc/passwd").result(0)
+        
+        def check():
+            if all(future.done() for future in futures):
+                app.quit()
+        timer = QTimer()
+        timer.timeout.connect(check)
+        timer.start(50)
+        QTimer.singleShot(30000, app.quit)
+        app.exec_()
+        pool.close()
+        
+        for future in futures:
+            record = future.result(0)
+            self.assertEqual(record['method'], 'javascript')
+            self.assertEqual(record['title'], '第一章 下山')
+            self.assertIn("少年背着长剑", record['text'])
+        print("✅ offscreen页面池提取正确")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地书库测试
+验证WAL模式、去重、批量提交以及OCR结果和总结的读写
+"""
+
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_store import LibraryStore, content_hash, build_fts_query
+
+CHAPTER = {
+    'title': '第一章 光明顶',
+    'text': '张无忌来到光明顶。' * 20,
+    'url': 'https://example.com/book/1/1.html',
+    'word_count': 180,
+    'extraction_method': 'direct_html',
+    'images': [{'url': 'a.png', 'data': b'png'}],
+}
+
+
+class TestLibraryStore(unittest.TestCase):
+    """本地书库测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'data', 'library.db')
+        self.store = LibraryStore(self.path)
+    
+    def tearDown(self):
+        """测试后清理"""
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_wal_mode(self):
+        """数据库使用WAL模式"""
+        mode = self.store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+    
+    def test_extraction_round_trip_and_dedup(self):
+        """提取结果读写，相同正文只存一份"""
+        chapter_id, text_hash = self.store.save_extraction('book', CHAPTER)
+        self.assertEqual(text_hash, content_hash(CHAPTER['text']))
+        
+        saved = self.store.get_extraction(CHAPTER['url'])
+        self.assertEqual(saved['text'], CHAPTER['text'])
+        self.assertEqual(saved['extraction_method'], 'direct_html')
+        self.assertNotIn('images', saved)
+        
+        # 同一URL重新提取：章节更新而不是新增
+        again_id, _ = self.store.save_extraction('book', dict(CHAPTER, title='第一章'))
+        self.assertEqual(again_id, chapter_id)
+        # 另一章节内容相同：正文不重复存储
+        self.store.save_extraction('book', dict(CHAPTER, url='https://example.com/book/1/copy.html'))
+        count = self.store._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        self.assertEqual(count, 1)
+        
+        chapters = self.store.get_chapters('book')
+        self.assertEqual([c['title'] for c in chapters], ['第一章', CHAPTER['title']])
+        self.assertIsNone(self.store.get_extraction('https://example.com/missing'))
+    
+    def test_save_extraction_feeds_idf_index(self):
+        """保存章节时更新该书的IDF索引，关闭书库后索引保存在书库旁"""
+        from corpus_idf import MIN_CHAPTERS_FOR_IDF
+        for i in range(MIN_CHAPTERS_FOR_IDF):
+            self.store.save_extraction('book', dict(CHAPTER, url=f'https://example.com/book/1/{i}.html',
+                                                    text=f'张无忌来到第{i}座城。' * 5 + ('赵敏笑了。' if i == 0 else '')))
+        # 同一章节重复保存不重复计数
+        self.store.save_extraction('book', dict(CHAPTER, url='https://example.com/book/1/0.html', text='新内容。'))
+        index = self.store.get_idf_index('book')
+        self.assertEqual(index.chapter_count, MIN_CHAPTERS_FOR_IDF)
+        self.assertTrue(index.ready)
+        self.assertGreater(index.idf('赵敏'), index.idf('张无忌'))
+        self.assertEqual(self.store.get_idf_index('other').chapter_count, 0)
+        
+        self.store.close()
+        self.store = LibraryStore(self.path)
+        self.assertEqual(self.store.get_idf_index('book').chapter_count, MIN_CHAPTERS_FOR_IDF)
+    
+    def test_batch_commits_once(self):
+        """batch块内的写入在退出时才提交，其他连接之前看不到"""
+        reader = sqlite3.connect(self.path)
+        try:
+            with self.store.batch():
+                for i in range(5):
+                    self.store.save_extraction('book', dict(CHAPTER, url=f'u{i}', text=f'正文{i}'))
+                visible = reader.execute("SELECT COUNT(*) FROM chapters").fetchone()[0]
+                self.assertEqual(visible, 0)
+            visible = reader.execute("SELECT COUNT(*) FROM chapters").fetchone()[0]
+            self.assertEqual(visible, 5)
+        finally:
+            reader.close()
+    
+    def test_ocr_results(self):
+        """OCR结果按图片哈希去重并关联章节"""
+        self.store.save_extraction('book', CHAPTER)
+        image_hash = content_hash(b'image-bytes')
+        self.store.save_ocr_result(image_hash, '识别文字', 0.9, CHAPTER['url'], 'a.png')
+        self.store.save_ocr_result(image_hash, '识别文字', 0.9, CHAPTER['url'], 'a.png')
+        
+        found = self.store.get_ocr_results([image_hash, content_hash(b'other')])
+        self.assertEqual(found, {image_hash: {'text': '识别文字', 'confidence': 0.9}})
+        links = self.store._conn.execute("SELECT COUNT(*) FROM chapter_images").fetchone()[0]
+        self.assertEqual(links, 1)
+    
+    def test_summaries_persist(self):
+        """总结关闭后重新打开仍可读取"""
+        text_hash = content_hash(CHAPTER['text'])
+        self.store.save_summary(text_hash, 'ai:test', '第一版')
+        self.store.save_summary(text_hash, 'ai:test', '第二版')
+        self.store.close()
+        
+        self.store = LibraryStore(self.path)
+        self.assertEqual(self.store.get_summary(text_hash, 'ai:test'), '第二版')
+        self.assertIsNone(self.store.get_summary(text_hash, 'rule'))
+
+    def test_book_state_persists(self):
+        """书籍滚动状态按书籍标识保存在书库旁，重新打开后继续累积"""
+        state = self.store.get_book_state('book', '倚天屠龙记')
+        self.assertEqual(state.chapter_count, 0)
+        state.add_chapter("第一章", "张无忌出场。", ["张无忌"], chapter_id='u1')
+        self.store.save_book_state('book', state)
+        self.store.close()
+
+        self.store = LibraryStore(self.path)
+        restored = self.store.get_book_state('book')
+        self.assertEqual(restored.title, '倚天屠龙记')
+        self.assertEqual(restored.last_chapter_id, 'u1')
+        self.assertIn("张无忌出场。", restored.to_prompt())
+        self.assertEqual(self.store.get_book_state('other').chapter_count, 0)
+
+        # 内存书库不写文件
+        memory = LibraryStore(":memory:")
+        memory.save_book_state('book', state)
+        self.assertEqual(memory.get_book_state('book').chapter_count, 0)
+        memory.close()
+    
+    def test_search_phrase_prefix_and_order(self):
+        """短语、前缀和多词检索，按相关度或章节顺序返回"""
+        if not self.store.fts_available:
+            self.skipTest("SQLite不支持FTS5")
+        chapters = [
+            ('第一章 少年', '张无忌在冰火岛长大，义父谢逊教他武功。'),
+            ('第二章 倚天剑', '赵敏手持倚天剑闯进山门。张无忌大惊。'),
+            ('第三章 赵敏', '赵敏与张无忌再次相见，赵敏笑而不语，赵敏转身离去。'),
+        ]
+        with self.store.batch():
+            for i, (title, text) in enumerate(chapters):
+                self.store.save_extraction('book', {'title': title, 'text': text, 'url': f'u{i}'})
+            self.store.save_extraction('other', {'title': '番外', 'text': '赵敏的番外故事。', 'url': 'x'})
+        
+        first = self.store.search('张无忌', book_key='book', order='chapter')
+        self.assertEqual([hit['url'] for hit in first], ['u0', 'u1', 'u2'])
+        self.assertIn('【张无忌】', first[0]['snippet'])
+        self.assertNotIn(' ', first[0]['snippet'])
+        
+        ranked = self.store.search('赵敏', book_key='book')
+        self.assertEqual(ranked[0]['url'], 'u2')
+        self.assertEqual(len(self.store.search('赵敏')), 3)
+        
+        self.assertEqual([hit['url'] for hit in self.store.search('倚天*')], ['u1'])
+        self.assertEqual([hit['url'] for hit in self.store.search('赵敏 冰火岛')], [])
+        self.assertEqual(self.store.search('  '), [])
+    
+    def test_search_index_updates_incrementally(self):
+        """章节重新提取后索引随之更新"""
+        if not self.store.fts_available:
+            self.skipTest("SQLite不支持FTS5")
+        self.store.save_extraction('book', {'title': '第一章', 'text': '峨眉派掌门灭绝师太。', 'url': 'u'})
+        self.assertEqual(len(self.store.search('灭绝师太')), 1)
+        self.store.save_extraction('book', {'title': '第一章', 'text': '武当派掌门张三丰。', 'url': 'u'})
+        self.assertEqual(self.store.search('灭绝师太'), [])
+        self.assertEqual(len(self.store.search('张三丰')), 1)
+        
+        self.store._conn.execute("DELETE FROM chapter_fts")
+        self.assertEqual(self.store.rebuild_search_index(), 1)
+        self.assertEqual(len(self.store.search('张三丰')), 1)
+    
+    def test_build_fts_query(self):
+        """查询转换与引号转义"""
+        self.assertEqual(build_fts_query('"光明顶" 倚天*'), '"光明顶" "倚天" *')
+        # 残留的引号被转义，不会破坏FTS5语法
+        self.assertEqual(self.store.search('a"b'), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
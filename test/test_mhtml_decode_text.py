@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MHTML文本解码测试
+验证编码检测和基于binascii的quoted-printable/Base64/URL解码
+"""
+
+import sys
+import os
+import time
+import base64
+import quopri
+import unittest
+from urllib.parse import quote
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_TEXT = "他推开门，看见院子里的老槐树下站着一个白衣女子，手里握着一柄细长的剑。" * 5
+
+
+class TestMHTMLDecodeText(unittest.TestCase):
+    """文本解码测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        try:
+            from mhtml_extractor import MHTMLExtractor, detect_text_encoding
+        except ImportError as e:
+            self.skipTest(f"无法导入MHTML提取器: {e}")
+        self.extractor = MHTMLExtractor()
+        self.detect = detect_text_encoding
+    
+    def test_detect_encoding(self):
+        """编码检测"""
+        qp = quopri.encodestring(SAMPLE_TEXT.encode('utf-8')).decode('ascii')
+        b64 = base64.b64encode(SAMPLE_TEXT.encode('utf-8')).decode('ascii')
+        self.assertEqual(self.detect(qp), 'quoted-printable')
+        self.assertEqual(self.detect(b64), 'base64')
+        self.assertEqual(self.detect(quote("第一章 初入江湖")), 'url')
+        self.assertIsNone(self.detect(SAMPLE_TEXT))
+        self.assertIsNone(self.detect("Chapter one begins here"))
+        print("✅ 编码检测正确")
+    
+    def test_quoted_printable_with_broken_lines(self):
+        """被换行打断的quoted-printable也能解码"""
+        qp = quopri.encodestring(SAMPLE_TEXT.encode('utf-8')).decode('ascii')
+        # 模拟HTML中被折断的转义序列
+        broken = qp.replace("=E4", "=E\n4", 3)
+        self.assertEqual(self.extractor._decode_text(broken), SAMPLE_TEXT)
+        print("✅ quoted-printable修复解码正确")
+    
+    def test_base64_and_url(self):
+        """Base64和URL编码"""
+        b64 = base64.b64encode(SAMPLE_TEXT.encode('utf-8')).decode('ascii').rstrip('=')
+        self.assertEqual(self.extractor._decode_text(b64), SAMPLE_TEXT)
+        self.assertEqual(self.extractor._decode_text(quote("第一章 初入江湖")), "第一章 初入江湖")
+        print("✅ Base64/URL解码正确")
+    
+    def test_known_transfer_encoding_skips_detection(self):
+        """已知传输编码时直接解码"""
+        qp = quopri.encodestring("短文本=".encode('utf-8')).decode('ascii')
+        self.assertEqual(self.extractor._decode_text(qp, 'quoted-printable'), "短文本=")
+        # 普通文本不做任何猜测
+        self.assertEqual(self.extractor._decode_text(SAMPLE_TEXT), SAMPLE_TEXT)
+        print("✅ 按传输编码解码正确")
+    
+    def test_large_text_is_fast(self):
+        """大章节quoted-printable解码应在线性时间内完成"""
+        large = SAMPLE_TEXT * 400
+        qp = quopri.encodestring(large.encode('utf-8')).decode('ascii')
+        start = time.perf_counter()
+        decoded = self.extractor._decode_text(qp)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(decoded, large)
+        self.assertLess(elapsed, 1.0)
+        print(f"✅ {len(qp)} 字符quoted-printable解码耗时 {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
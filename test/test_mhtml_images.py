@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MHTML内嵌图片OCR测试
+验证内嵌图片从MIME分段解码到内存，并能通过OCR客户端批量识别
+"""
+
+import sys
+import os
+import json
+import threading
+import unittest
+import tempfile
+import shutil
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_mhtml_streaming import build_mhtml
+
+IMAGE_CHAPTER_HTML = """<html><head><meta charset="utf-8"><title>图片章节</title></head>
+<body><h1 class="j_chapterName">第二章 图片章节</h1>
+<div class="read-content"><img src="https://img.example.com/1.png" alt="第1页"></div>
+<div class="footer"><img src="https://img.example.com/logo.png"></div>
+</body></html>"""
+
+
+class _FakeOCRHandler(BaseHTTPRequestHandler):
+    """模拟OCR服务：按上传的文件个数返回结果"""
+    
+    batch_enabled = True
+    
+    def log_message(self, *args):
+        pass
+    
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        item = {'status': 'success', 'results': [{'text': '识别文字', 'confidence': 0.99}]}
+        if self.path == '/ocr/batch':
+            if not self.batch_enabled:
+                return self._reply(404, {'error': 'not found'})
+            count = body.count(b'name="files"')
+            return self._reply(200, {'status': 'success', 'items': [item] * count})
+        if self.path == '/ocr':
+            return self._reply(200, item)
+        self._reply(404, {'error': 'not found'})
+
+
+class TestMHTMLImages(unittest.TestCase):
+    """MHTML内嵌图片测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_embedded_images_decoded_in_memory(self):
+        """正文引用的内嵌图片被解码并按Content-Location对应"""
+        try:
+            from mhtml_extractor import MHTMLExtractor
+        except ImportError as e:
+            self.skipTest(f"无法导入MHTML提取器: {e}")
+        
+        image_bytes = os.urandom(8 * 1024)
+        path = os.path.join(self.temp_dir, "image_chapter.mhtml")
+        with open(path, 'wb') as f:
+            f.write(build_mhtml(IMAGE_CHAPTER_HTML, image_bytes))
+        
+        result = MHTMLExtractor().extract_content(path)
+        self.assertIsNotNone(result)
+        self.assertEqual(len(result['images']), 1)
+        image = result['images'][0]
+        self.assertEqual(image['url'], "https://img.example.com/1.png")
+        self.assertEqual(image['content_type'], "image/png")
+        self.assertEqual(image['data'], image_bytes)
+        print("✅ 内嵌图片解码正确")
+    
+    def _start_server(self, batch_enabled):
+        handler = type('Handler', (_FakeOCRHandler,), {'batch_enabled': batch_enabled})
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+    
+    def test_ocr_client_batches(self):
+        """批量接口和单张回退都按输入顺序返回结果"""
+        try:
+            from ocr_client import OCRClient
+        except ImportError as e:
+            self.skipTest(f"无法导入OCR客户端: {e}")
+        
+        images = [os.urandom(2048) for _ in range(5)]
+        for batch_enabled in (True, False):
+            with OCRClient(self._start_server(batch_enabled), batch_size=2) as client:
+                results = client.recognize_batch(images)
+                self.assertEqual(len(results), len(images))
+                self.assertEqual([OCRClient.parse_result(r) for r in results], ["识别文字"] * 5)
+                self.assertEqual(client._batch_supported, batch_enabled)
+        print("✅ OCR客户端批量识别正确")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MHTML流式解析测试
+验证基于mmap的MIME分段扫描能正确定位HTML分段并跳过二进制分段
+"""
+
+import sys
+import os
+import base64
+import quopri
+import unittest
+import tempfile
+import shutil
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BOUNDARY = "----MultipartBoundary--TestBoundary1234----"
+
+CHAPTER_HTML = """<html><head><meta charset="utf-8"><title>测试章节</title></head>
+<body><h1 class="j_chapterName">第一章 初入江湖</h1>
+<div class="read-content">
+<p>少年背着长剑走出了山门，回头望了一眼云雾缭绕的青峰，心中五味杂陈。</p>
+<p>师父说过，江湖险恶，人心难测，可他还是想去看看山外的世界究竟是什么模样。</p>
+<p>山道蜿蜒，松风阵阵，他一路向东，直到夕阳西下才看见远处小镇的炊烟。</p>
+</div></body></html>"""
+
+
+def build_mhtml(html, image_bytes, line_ending="\r\n"):
+    """构造Chrome格式的MHTML文件内容"""
+    qp_html = quopri.encodestring(html.encode('utf-8')).decode('ascii')
+    image_b64 = base64.encodebytes(image_bytes).decode('ascii')
+    lines = [
+        "From: <Saved by Blink>",
+        "Snapshot-Content-Location: https://read.example.com/chapter/1",
+        "Subject: test",
+        "MIME-Version: 1.0",
+        "Content-Type: multipart/related;",
+        f'\ttype="text/html";',
+        f'\tboundary="{BOUNDARY}"',
+        "",
+        "",
+        f"--{BOUNDARY}",
+        "Content-Type: text/html",
+        "Content-ID: <frame-1@mhtml.blink>",
+        "Content-Transfer-Encoding: quoted-printable",
+        "Content-Location: https://read.example.com/chapter/1",
+        "",
+        qp_html,
+        "",
+        f"--{BOUNDARY}",
+        "Content-Type: image/png",
+        "Content-Transfer-Encoding: base64",
+        "Content-Location: https://img.example.com/1.png",
+        "",
+        image_b64,
+        f"--{BOUNDARY}--",
+        "",
+    ]
+    return line_ending.join(lines).encode('ascii')
+
+
+class TestMHTMLStreaming(unittest.TestCase):
+    """MHTML流式解析测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.image_bytes = os.urandom(256 * 1024)
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _write(self, name, data):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def test_iter_mime_parts(self):
+        """扫描分段只返回偏移，并能正确定位各分段"""
+        try:
+            from mhtml_extractor import iter_mime_parts, decode_part_body
+        except ImportError as e:
+            self.skipTest(f"无法导入MHTML提取器: {e}")
+        
+        data = build_mhtml(CHAPTER_HTML, self.image_bytes)
+        parts = list(iter_mime_parts(data))
+        self.assertEqual([p.headers.get_content_type() for p in parts], ["text/html", "image/png"])
+        
+        html_part, image_part = parts
+        html = decode_part_body(data[html_part.start:html_part.end], 'quoted-printable').decode('utf-8')
+        self.assertEqual(html.strip(), CHAPTER_HTML)
+        
+        image = decode_part_body(data[image_part.start:image_part.end], 'base64')
+        self.assertEqual(image, self.image_bytes)
+        print("✅ MIME分段扫描正确")
+    
+    def test_extract_content_crlf_and_lf(self):
+        """CRLF和LF换行的MHTML都能提取正文"""
+        try:
+            from mhtml_extractor import MHTMLExtractor
+        except ImportError as e:
+            self.skipTest(f"无法导入MHTML提取器: {e}")
+        
+        extractor = MHTMLExtractor()
+        for line_ending in ("\r\n", "\n"):
+            path = self._write("chapter.mhtml", build_mhtml(CHAPTER_HTML, self.image_bytes, line_ending))
+            result = extractor.extract_content(path)
+            self.assertIsNotNone(result)
+            self.assertEqual(result['title'], "第一章 初入江湖")
+            self.assertIn("少年背着长剑走出了山门", result['text'])
+            self.assertIn("远处小镇的炊烟", result['text'])
+        print("✅ MHTML正文提取正确")
+    
+    def test_empty_file(self):
+        """空文件返回None"""
+        try:
+            from mhtml_extractor import MHTMLExtractor
+        except ImportError as e:
+            self.skipTest(f"无法导入MHTML提取器: {e}")
+        
+        path = self._write("empty.mhtml", b"")
+        self.assertIsNone(MHTMLExtractor().extract_content(path))
+        print("✅ 空文件处理正确")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行工具测试
+验证extract/summarize/book/ocr子命令的输入展开、JSONL输出和串联使用
+"""
+
+import sys
+import os
+import json
+import unittest
+import tempfile
+import shutil
+import threading
+from http.server import ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_mhtml_streaming import build_mhtml, CHAPTER_HTML
+from test_mhtml_images import _FakeOCRHandler
+
+
+class _FakeOCRService(_FakeOCRHandler):
+    """模拟OCR服务，增加状态接口"""
+
+    def do_GET(self):
+        if self.path == '/status':
+            return self._reply(200, {'status': 'ok'})
+        self._reply(404, {'error': 'not found'})
+
+
+class TestNovelReaderCLI(unittest.TestCase):
+    """命令行工具测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        try:
+            import novel_reader_cli
+        except ImportError as e:
+            self.skipTest(f"无法导入命令行工具: {e}")
+        self.cli = novel_reader_cli
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "chapters")
+        os.makedirs(self.input_dir)
+        for i in range(3):
+            with open(os.path.join(self.input_dir, f"chapter_{i}.mhtml"), 'wb') as f:
+                f.write(build_mhtml(CHAPTER_HTML, os.urandom(1024)))
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, *argv):
+        output = os.path.join(self.temp_dir, "out.jsonl")
+        status = self.cli.main(['-o', output, '-w', '2'] + list(argv))
+        with open(output, 'r', encoding='utf-8') as f:
+            return status, [json.loads(line) for line in f]
+
+    def test_extract_directory(self):
+        """目录中的章节文件按顺序提取，失败的输入不影响其他输入"""
+        missing = os.path.join(self.temp_dir, "missing.mhtml")
+        status, records = self._run('extract', self.input_dir, missing)
+        self.assertEqual(status, 2)
+        self.assertEqual(len(records), 3)
+        self.assertEqual([os.path.basename(r['path']) for r in records],
+                         [f"chapter_{i}.mhtml" for i in range(3)])
+        self.assertTrue(all(r['text'] for r in records))
+        print("✅ 目录提取正确")
+
+    def test_summarize_from_jsonl(self):
+        """summarize读取extract输出的JSONL"""
+        _, records = self._run('extract', self.input_dir)
+        chapters = os.path.join(self.temp_dir, "chapters.jsonl")
+        with open(chapters, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        status, summaries = self._run('summarize', chapters)
+        self.assertEqual(status, 0)
+        self.assertEqual(len(summaries), 3)
+        self.assertEqual([s['source'] for s in summaries], [r['path'] for r in records])
+        self.assertTrue(all(s['method'] == 'rule' and s['summary'] for s in summaries))
+        print("✅ JSONL串联总结正确")
+
+    def test_book_rule_with_library(self):
+        """book提取并总结整本书，同时写入书库"""
+        library_path = os.path.join(self.temp_dir, "library.db")
+        status, records = self._run('book', self.input_dir, '--title', "测试书", '--library', library_path)
+        self.assertEqual(status, 0)
+        self.assertEqual(len(records), 3)
+        self.assertTrue(all(r['text'] and r['summary'] for r in records))
+
+        from library_store import LibraryStore
+        with LibraryStore(library_path) as library:
+            self.assertEqual(len(library.get_chapters("测试书")), 3)
+            self.assertEqual(library.get_idf_index("测试书").chapter_count, 3)
+        self.assertEqual(len(os.listdir(os.path.join(self.temp_dir, "idf"))), 1)
+        print("✅ 整本书处理正确")
+
+    def test_book_ai_resumes_from_state(self):
+        """book中断后用同一状态文件重跑，只总结剩余章节，已总结的章节不重复计入状态"""
+        from unittest import mock
+        from types import SimpleNamespace
+        from book_state import BookState
+
+        calls = []
+
+        def generate_summary(model, text, context=None):
+            if interrupt_at is not None and len(calls) == interrupt_at:
+                raise KeyboardInterrupt
+            calls.append(context)
+            return SimpleNamespace(success=True, content=f"【本章总结】第{len(calls)}次总结。", error_message='')
+
+        state_path = os.path.join(self.temp_dir, "state.json")
+        argv = ['book', self.input_dir, '--method', 'ai', '--state', state_path]
+        with mock.patch.object(self.cli, 'load_ai_model', return_value=SimpleNamespace(name='fake')), \
+                mock.patch('config.ai_client.AIModelManager.generate_summary', side_effect=generate_summary):
+            interrupt_at = 2
+            _, records = self._run(*argv)
+            self.assertEqual(len(records), 2)
+            self.assertEqual(BookState.load(state_path).chapter_count, 2)
+
+            interrupt_at = None
+            status, records = self._run(*argv)
+        self.assertEqual(status, 0)
+        self.assertEqual([os.path.basename(r['source']) for r in records], ["chapter_2.mhtml"])
+        self.assertEqual(len(calls), 3)
+        self.assertIn("第2次总结", calls[-1])
+        state = BookState.load(state_path)
+        self.assertEqual(state.chapter_count, 3)
+        self.assertEqual([summary for _, summary in state.recent], [f"第{i}次总结。" for i in (1, 2, 3)])
+        print("✅ 整本书AI总结续跑正确")
+
+    def test_ocr_images(self):
+        """图片逐张识别，读取失败的图片记为失败"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeOCRService)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        images = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, f"{i}.png")
+            with open(path, 'wb') as f:
+                f.write(os.urandom(512))
+            images.append(path)
+        missing = os.path.join(self.temp_dir, "missing.png")
+
+        status, records = self._run('ocr', '--ocr-url', f"http://127.0.0.1:{server.server_address[1]}",
+                                    *images, missing)
+        self.assertEqual(status, 2)
+        self.assertEqual([r['source'] for r in records], images)
+        self.assertEqual([r['text'] for r in records], ["识别文字"] * 3)
+        print("✅ 图片识别正确")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
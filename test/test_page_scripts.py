@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面提取脚本测试
+用Node.js和最小的模拟DOM，按浏览器窗口的方式执行启动脚本并轮询结果，
+验证正文稳定后立即返回、不再固定等待，能等到滚动触发的懒加载内容，
+且页面其他位置持续变化时不会拖到超时
+"""
+
+import sys
+import os
+import json
+import shutil
+import subprocess
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHAPTER_TEXT = "少年背着长剑走出了山门。" * 20
+
+# 模拟DOM：正文容器在fillMs后出现并填充，滚动后lazyMs追加懒加载内容，
+# noiseMs不为0时正文外的广告节点每隔noiseMs变化一次。
+# 与QWebEnginePage.runJavaScript相同，脚本作为顶层脚本编译执行，再轮询结果
+HARNESS = """
+const vm = require('vm');
+const scripts = %(scripts)s;
+const observers = [];
+class MutationObserver {
+    constructor(callback) { this.callback = callback; }
+    observe() { observers.push(this); }
+    disconnect() { const i = observers.indexOf(this); if (i >= 0) observers.splice(i, 1); }
+}
+const mutate = (target) => observers.slice().forEach(o => o.callback([{target: target}]));
+const options = %(options)s;
+const node = (props) => Object.assign({contains(other) { return other === this; }}, props);
+const body = node({scrollHeight: options.scrollHeight});
+const elements = {
+    '.j_chapterName': node({textContent: ' 第一章 下山 '}),
+    '.info-chapter': node({textContent: '字数：3000'})
+};
+const sandbox = {
+    MutationObserver, setTimeout, clearTimeout, console,
+    document: {
+        querySelector: selector => elements[selector] || null,
+        documentElement: {outerHTML: '<html></html>'},
+        body: body
+    },
+    innerHeight: 800,
+    scrollTo: () => {
+        if (options.lazyText) {
+            setTimeout(() => {
+                elements['.read-content'].innerText += options.lazyText;
+                mutate(elements['.read-content']);
+            }, options.lazyMs);
+        }
+    }
+};
+sandbox.window = sandbox;
+const context = vm.createContext(sandbox);
+setTimeout(() => { elements['.read-content'] = node({innerText: options.text}); mutate(body); }, options.fillMs);
+const ad = node({});
+const noise = options.noiseMs ? setInterval(() => mutate(ad), options.noiseMs) : null;
+const start = Date.now();
+new vm.Script(scripts.start).runInContext(context);
+const poll = new vm.Script(scripts.poll);
+const timer = setInterval(() => {
+    const result = poll.runInContext(context);
+    if (result !== null) {
+        clearInterval(timer);
+        clearInterval(noise);
+        console.log(JSON.stringify({result: result, elapsed: Date.now() - start}));
+    }
+}, %(interval)d);
+"""
+
+
+class TestPageScripts(unittest.TestCase):
+    """页面提取脚本测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.node = shutil.which('node') or shutil.which('nodejs')
+        if not self.node:
+            self.skipTest("未安装Node.js")
+        import page_scripts
+        self.page_scripts = page_scripts
+    
+    def _run(self, **options):
+        options = dict({'text': CHAPTER_TEXT, 'fillMs': 200, 'scrollHeight': 600,
+                        'lazyText': '', 'lazyMs': 0, 'noiseMs': 0}, **options)
+        scripts = {'start': self.page_scripts.START_EXTRACTION_JS, 'poll': self.page_scripts.POLL_RESULT_JS}
+        source = HARNESS % {'options': json.dumps(options, ensure_ascii=False),
+                            'scripts': json.dumps(scripts, ensure_ascii=False),
+                            'interval': self.page_scripts.POLL_INTERVAL_MS}
+        output = subprocess.run([self.node, '-e', source], capture_output=True, text=True,
+                                encoding='utf-8', timeout=30, check=True).stdout
+        data = json.loads(output)
+        return json.loads(data['result']), data['elapsed']
+    
+    def test_resolves_when_content_is_stable(self):
+        """正文填充后约100毫秒即返回，没有1秒以上的固定等待"""
+        result, elapsed = self._run()
+        self.assertEqual(result['content'], CHAPTER_TEXT)
+        self.assertEqual(result['title'], "第一章 下山")
+        self.assertLess(elapsed, 700)
+        print(f"✅ 正文稳定后立即返回（{elapsed} ms）")
+    
+    def test_waits_for_lazy_content(self):
+        """滚动触发的懒加载内容被包含在结果中"""
+        result, elapsed = self._run(scrollHeight=5000, lazyText="第二段懒加载内容。", lazyMs=100)
+        self.assertTrue(result['content'].endswith("第二段懒加载内容。"))
+        self.assertLess(elapsed, 1000)
+        print(f"✅ 懒加载内容已等待（{elapsed} ms）")
+    
+    def test_ignores_mutations_outside_content(self):
+        """广告轮播等正文外的持续变化不推迟完成"""
+        result, elapsed = self._run(scrollHeight=5000, lazyText="第二段懒加载内容。", lazyMs=100, noiseMs=20)
+        self.assertTrue(result['content'].endswith("第二段懒加载内容。"))
+        self.assertLess(elapsed, 1000)
+        print(f"✅ 正文外的变化不影响等待（{elapsed} ms）")
+    
+    def test_scripts_compile_as_top_level_scripts(self):
+        """runJavaScript把脚本作为顶层脚本执行，不能包含顶层return等语法错误"""
+        source = ("const vm = require('vm'); for (const s of %s) new vm.Script(s);"
+                  % json.dumps([self.page_scripts.EXTRACT_CONTENT_JS, self.page_scripts.START_EXTRACTION_JS,
+                                self.page_scripts.POLL_RESULT_JS], ensure_ascii=False))
+        subprocess.run([self.node, '-e', source], capture_output=True, text=True,
+                       encoding='utf-8', timeout=30, check=True)
+        print("✅ 页面脚本可作为顶层脚本编译")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
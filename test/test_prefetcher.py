@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下一章预取测试
+使用本地HTTP服务模拟章节链，验证预取深度、缓存上限、预先总结和限速
+"""
+
+import sys
+import os
+import time
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHAPTER_COUNT = 6
+
+
+def chapter_html(number):
+    """第number章的HTML，最后一章没有下一章链接"""
+    next_link = f'<a href="/chapter/{number + 1}.html">下一章</a>' if number < CHAPTER_COUNT else ''
+    body = "".join(f"<p>第{number}章第{i}段，少年背着长剑走出了山门。</p>" for i in range(20))
+    return (f"<html><head><title>第{number}章</title></head><body>"
+            f"<h1>第{number}章 下山</h1><div id=\"content\">{body}</div>{next_link}</body></html>")
+
+
+class _ChapterHandler(BaseHTTPRequestHandler):
+    """按路径返回章节页面，并记录请求"""
+    
+    requested = []
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_GET(self):
+        self.requested.append(self.path)
+        try:
+            number = int(self.path.rsplit('/', 1)[-1].split('.')[0])
+        except ValueError:
+            number = 0
+        if not 1 <= number <= CHAPTER_COUNT:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = chapter_html(number).encode('gb18030')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestChapterPrefetcher(unittest.TestCase):
+    """下一章预取测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        try:
+            import prefetcher
+        except ImportError as e:
+            self.skipTest(f"无法导入预取模块: {e}")
+        self.prefetcher_module = prefetcher
+        
+        handler = type('Handler', (_ChapterHandler,), {'requested': []})
+        self.handler = handler
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    def _url(self, number):
+        return f"{self.base_url}/chapter/{number}.html"
+    
+    def test_prefetch_depth_and_summaries(self):
+        """按深度沿下一章链接预取，并预先总结"""
+        summaries = []
+        prefetcher = self.prefetcher_module.ChapterPrefetcher(
+            depth=2, summarize=lambda content: summaries.append(content['url']) or f"总结:{content['title']}")
+        self.addCleanup(prefetcher.close)
+        
+        prefetcher.prefetch(self._url(1), chapter_html(1)).result(timeout=10)
+        self.assertNotIn(self._url(1), prefetcher)
+        entry = prefetcher.get(self._url(2))
+        self.assertIn("少年背着长剑", entry['content']['text'])
+        self.assertEqual(entry['summary'], "总结:第2章")
+        self.assertIn(self._url(3), prefetcher)
+        self.assertNotIn(self._url(4), prefetcher)
+        self.assertEqual(summaries, [self._url(2), self._url(3)])
+        
+        # 翻到第2章：第3章已缓存，只需再下载第4章
+        prefetcher.prefetch(self._url(2)).result(timeout=10)
+        self.assertIn(self._url(4), prefetcher)
+        self.assertEqual(self.handler.requested, ['/chapter/2.html', '/chapter/3.html', '/chapter/4.html'])
+        
+        # 最后一章之后不再预取
+        prefetcher.prefetch(self._url(CHAPTER_COUNT), chapter_html(CHAPTER_COUNT)).result(timeout=10)
+        self.assertEqual(len(self.handler.requested), 3)
+    
+    def test_cache_bounded_lru(self):
+        """缓存超出上限时淘汰最久未使用的章节"""
+        prefetcher = self.prefetcher_module.ChapterPrefetcher(cache_size=2, fetch=lambda url: "")
+        self.addCleanup(prefetcher.close)
+        for url in ('a', 'b'):
+            prefetcher.put(url, '<html></html>', {'text': url})
+        prefetcher.get('a')
+        prefetcher.put('c', '<html></html>', {'text': 'c'})
+        self.assertIn('a', prefetcher)
+        self.assertNotIn('b', prefetcher)
+        self.assertIsNone(prefetcher.get('b'))
+    
+    def test_disabled_depth(self):
+        """深度为0时不预取"""
+        prefetcher = self.prefetcher_module.ChapterPrefetcher(depth=0)
+        self.addCleanup(prefetcher.close)
+        self.assertIsNone(prefetcher.prefetch(self._url(1), chapter_html(1)))
+    
+    def test_rate_limiter(self):
+        """限速器按带宽上限等待"""
+        limiter = self.prefetcher_module.RateLimiter(100 * 1024)
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.consume(50 * 1024)
+        # 初始额度100KB，其余100KB需要约1秒
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+        
+        unlimited = self.prefetcher_module.RateLimiter(None)
+        start = time.monotonic()
+        unlimited.consume(10 ** 9)
+        self.assertLess(time.monotonic() - start, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
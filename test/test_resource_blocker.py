@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资源拦截规则测试
+验证广告/跟踪域名、第三方媒体、可选图片拦截、规则文件和拦截统计
+"""
+
+import sys
+import os
+import unittest
+import tempfile
+import shutil
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAGE = "https://read.qidian.com/chapter/abc/123"
+
+
+class TestResourceBlocker(unittest.TestCase):
+    """资源拦截规则测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        try:
+            import resource_blocker
+        except ImportError as e:
+            self.skipTest(f"无法导入资源拦截模块: {e}")
+        self.module = resource_blocker
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_default_rules(self):
+        """广告和跟踪域名被拦截，主框架和第一方资源不受影响"""
+        rules = self.module.BlockRules(rules_path=None)
+        self.assertEqual(rules.match("https://hm.baidu.com/hm.js?x", PAGE, 'script'), 'tracker')
+        self.assertEqual(rules.match("https://pagead2.googlesyndication.com/a.js", PAGE, 'script'), 'ad')
+        self.assertEqual(rules.match("https://v.youku.com/promo.mp4", PAGE, 'media'), 'media')
+        self.assertEqual(rules.match("https://widget.example.net/rec.html", PAGE, 'sub_frame'), 'frame')
+        
+        # 站点自己的资源（包括其他子域名上的反爬字体）保留
+        self.assertIsNone(rules.match("https://qidian.gtimg.com/x.js", PAGE, 'script'))
+        self.assertIsNone(rules.match("https://font.qidian.com/f.woff", PAGE, 'font'))
+        self.assertIsNone(rules.match("https://img.example.net/1.png", PAGE, 'image'))
+        self.assertIsNone(rules.match("https://hm.baidu.com/", "", 'main_frame'))
+        print("✅ 默认规则正确")
+    
+    def test_third_party_fonts(self):
+        """默认不拦截第三方字体（起点的反爬字体在qidian.gtimg.com上），无界面提取可开启"""
+        font_url = "https://qidian.gtimg.com/qd_anti_spider/x.woff"
+        chapter_url = "https://read.qidian.com/chapter/abc/123"
+        self.assertIsNone(self.module.BlockRules(rules_path=None).match(font_url, chapter_url, 'font'))
+        rules = self.module.BlockRules(block_third_party_fonts=True, rules_path=None)
+        self.assertEqual(rules.match(font_url, chapter_url, 'font'), 'font')
+        self.assertEqual(rules.match("https://fonts.example.net/a.woff", PAGE, 'font'), 'font')
+        print("✅ 第三方字体拦截正确")
+    
+    def test_interactive_profile_keeps_third_party(self):
+        """浏览器窗口的配置只拦截广告和跟踪，跨站登录框架、视频和字体照常加载"""
+        if not self.module.PYQT_AVAILABLE:
+            self.skipTest("PyQtWebEngine 未安装")
+
+        class FakeProfile:
+            def setUrlRequestInterceptor(self, interceptor):
+                self.interceptor = interceptor
+
+        rules = self.module.install_resource_blocker(FakeProfile()).rules
+        chapter_url = "https://read.qidian.com/chapter/abc/123"
+        self.assertIsNone(rules.match("https://passport.qq.com/login.html", chapter_url, 'sub_frame'))
+        self.assertIsNone(rules.match("https://v.youku.com/embed.mp4", chapter_url, 'media'))
+        self.assertIsNone(rules.match("https://qidian.gtimg.com/qd_anti_spider/x.woff", chapter_url, 'font'))
+        self.assertEqual(rules.match("https://hm.baidu.com/hm.js?x", chapter_url, 'script'), 'tracker')
+
+        rules = self.module.install_resource_blocker(FakeProfile(), block_third_party=True).rules
+        self.assertEqual(rules.match("https://passport.qq.com/login.html", chapter_url, 'sub_frame'), 'frame')
+        print("✅ 浏览器配置不拦截第三方框架、媒体和字体")
+
+    def test_site_of(self):
+        """站点按可注册域名近似计算"""
+        self.assertEqual(self.module.site_of("read.qidian.com"), "qidian.com")
+        self.assertEqual(self.module.site_of("www.admaster.com.cn"), "admaster.com.cn")
+        print("✅ 站点计算正确")
+    
+    def test_block_images_and_rules_file(self):
+        """可选拦截图片，规则文件支持域名、URL片段和例外"""
+        path = os.path.join(self.temp_dir, "blocklist.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("# 自定义规则\nrecommend.example.com\n/ad/banner\n@@cdn.doubleclick.net\n")
+        rules = self.module.BlockRules(block_images=True, rules_path=path)
+        self.assertEqual(rules.match("https://read.qidian.com/1.png", PAGE, 'image'), 'image')
+        self.assertEqual(rules.match("https://a.recommend.example.com/x", PAGE, 'xhr'), 'rule')
+        self.assertEqual(rules.match("https://read.qidian.com/ad/banner.js", PAGE, 'script'), 'rule')
+        self.assertIsNone(rules.match("https://cdn.doubleclick.net/x.js", PAGE, 'script'))
+        print("✅ 图片拦截和规则文件正确")
+    
+    def test_stats(self):
+        """按类别统计拦截数"""
+        stats = self.module.BlockStats()
+        for category in ['ad', 'ad', 'tracker', None, None, None]:
+            stats.add(category)
+        self.assertEqual(stats.total_blocked, 3)
+        self.assertEqual(stats.to_dict(), {'blocked': {'ad': 2, 'tracker': 1}, 'allowed': 3})
+        self.assertEqual(stats.report(), "已拦截 3 个请求（ad 2, tracker 1）")
+        stats.reset()
+        self.assertEqual(stats.report(), "未拦截请求")
+        print("✅ 拦截统计正确")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
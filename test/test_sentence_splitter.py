@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中文分句测试
+验证句末标点、引号对话、省略号和偏移量
+"""
+
+import sys
+import os
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentence_splitter import iter_sentences, split_sentences
+
+
+class TestSentenceSplitter(unittest.TestCase):
+    """中文分句测试类"""
+    
+    def assertOffsets(self, text):
+        """偏移量可直接切出句子"""
+        for sentence, start, end in iter_sentences(text):
+            self.assertEqual(text[start:end], sentence)
+    
+    def test_basic_punctuation(self):
+        """句号、问号、叹号和连续标点"""
+        text = "他来了。你是谁？快走！！真的吗？！"
+        self.assertEqual(split_sentences(text), ["他来了。", "你是谁？", "快走！！", "真的吗？！"])
+        self.assertOffsets(text)
+    
+    def test_dialogue_quotes(self):
+        """引号内不断句，对话在引号闭合处结束"""
+        text = "“你好。我是谁？”他问道。“走吧！”，她说。"
+        self.assertEqual(split_sentences(text), ["“你好。我是谁？”", "他问道。", "“走吧！”，她说。"])
+        
+        nested = "他说：“她说‘好。’”随后离开。"
+        self.assertEqual(split_sentences(nested), ["他说：“她说‘好。’”", "随后离开。"])
+        self.assertOffsets(nested)
+    
+    def test_ellipsis(self):
+        """中文省略号和英文点号省略号"""
+        text = "他……走了......结束。3.14不断句。"
+        self.assertEqual(split_sentences(text), ["他……", "走了......", "结束。", "3.14不断句。"])
+    
+    def test_newlines_and_whitespace(self):
+        """换行断句、去除空白并重置未闭合的引号"""
+        text = "  第一段“未闭合。\n\n　　第二段。  \n第三段"
+        result = list(iter_sentences(text))
+        self.assertEqual([s for s, _, _ in result], ["第一段“未闭合。", "第二段。", "第三段"])
+        self.assertEqual(result[0][1], 2)
+        self.assertOffsets(text)
+    
+    def test_empty_text(self):
+        """空文本不产生句子"""
+        self.assertEqual(split_sentences(""), [])
+        self.assertEqual(split_sentences(" \n\n "), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
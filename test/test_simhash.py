@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节指纹测试
+验证SimHash对广告噪声的稳定性、分段索引查找以及书库中的近似重复检测
+"""
+
+import sys
+import os
+import random
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import simhash
+from simhash import SimHashIndex, hamming_distance
+
+random.seed(20)
+_CHARS = "张无忌赵敏周芷若光明顶倚天剑屠龙刀武当少林峨眉明教蒙古郡主师太掌门弟子江湖恩怨"
+
+
+def make_chapter(seed, length=3000):
+    """生成确定性的随机章节"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(length // 30):
+        lines.append("".join(rng.choice(_CHARS) for _ in range(29)) + "。")
+    return "\n".join(lines)
+
+
+CHAPTER = make_chapter(1)
+MIRROR = "笔趣阁 www.example.com 最快更新！\n" + CHAPTER.replace("\n", "\n\n") + "\n本章未完，请点击下一页继续阅读"
+
+
+class TestSimHash(unittest.TestCase):
+    """SimHash测试类"""
+    
+    def test_mirror_copy_is_near_duplicate(self):
+        """镜像站点的广告和换行差异只改变少数位"""
+        a, b = simhash.simhash(CHAPTER), simhash.simhash(MIRROR)
+        self.assertLessEqual(hamming_distance(a, b), simhash.DEFAULT_MAX_DISTANCE)
+        self.assertGreater(hamming_distance(a, simhash.simhash(make_chapter(2))), 10)
+        self.assertEqual(simhash.simhash("  \n，。"), 0)
+    
+    def test_pure_python_matches_numpy(self):
+        """无NumPy时结果一致"""
+        expected = simhash.simhash(CHAPTER)
+        with patch.object(simhash, 'NUMPY_AVAILABLE', False):
+            self.assertEqual(simhash.simhash(CHAPTER), expected)
+    
+    def test_signed_round_trip(self):
+        """指纹与SQLite有符号整数互转"""
+        for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            signed = simhash.to_signed(value)
+            self.assertTrue(-(1 << 63) <= signed < (1 << 63))
+            self.assertEqual(simhash.to_unsigned(signed), value)
+    
+    def test_index_finds_within_distance(self):
+        """分段索引找出所有距离不超过阈值的指纹"""
+        index = SimHashIndex(max_distance=3)
+        base = random.getrandbits(64)
+        fingerprints = {'same': base, 'far': base ^ 0xFFFF_0000_FFFF}
+        for bits in (1, 2, 3):
+            value = base
+            for position in random.sample(range(64), bits):
+                value ^= 1 << position
+            fingerprints[f'd{bits}'] = value
+        for key, value in fingerprints.items():
+            index.add(key, value)
+        
+        self.assertEqual(index.find(base), [('same', 0), ('d1', 1), ('d2', 2), ('d3', 3)])
+        self.assertEqual([key for key, _ in index.find(base, max_distance=1)], ['same', 'd1'])
+        index.remove('same')
+        index.add('d1', fingerprints['far'])
+        self.assertEqual([key for key, _ in index.find(base)], ['d2', 'd3'])
+        self.assertEqual(len(index), 4)
+
+
+class TestLibraryDuplicates(unittest.TestCase):
+    """书库近似重复检测测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        from library_store import LibraryStore, content_hash
+        self.content_hash = content_hash
+        self.store = LibraryStore(":memory:", search_index=False)
+    
+    def tearDown(self):
+        """测试后清理"""
+        self.store.close()
+    
+    def test_reuse_summary_of_mirror_copy(self):
+        """镜像章节复用已有总结"""
+        self.store.save_extraction('site-a', {'title': '第一章', 'text': CHAPTER, 'url': 'a/1'})
+        self.store.save_summary(self.content_hash(CHAPTER), 'ai:test', '已有总结')
+        # 索引加载后新增的章节也能被找到
+        self.assertEqual(self.store.find_near_duplicates(make_chapter(3)), [])
+        self.store.save_extraction('site-b', {'title': '第一章', 'text': MIRROR, 'url': 'b/1'})
+        
+        duplicates = self.store.find_near_duplicates(MIRROR, exclude_url='b/1')
+        self.assertEqual([d['url'] for d in duplicates], ['a/1'])
+        self.assertEqual(self.store.find_summary(MIRROR, 'ai:test'), '已有总结')
+        self.assertIsNone(self.store.find_summary(MIRROR, 'rule'))
+        self.assertIsNone(self.store.find_summary(make_chapter(4), 'ai:test'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分页文本阅读视图测试
+验证长文本按需分页，以及视图中只保留有限的页
+"""
+
+import sys
+import os
+import time
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PARAGRAPH = "少年背着长剑走出了山门，回头望了一眼云雾中的青山。\n"
+
+
+class TestTextPager(unittest.TestCase):
+    """长文本分页测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        from ui.text_pager import TextPager
+        self.TextPager = TextPager
+    
+    def test_pages_cover_text_at_line_breaks(self):
+        """各页首尾相接还原全文，并在换行处分页"""
+        text = PARAGRAPH * 500
+        pager = self.TextPager(text, page_chars=1000)
+        pages = [pager.page(i) for i in range(pager.page_count)]
+        self.assertEqual("".join(pages), text)
+        self.assertTrue(all(page.endswith('\n') for page in pages))
+        self.assertTrue(all(len(page) <= 1000 for page in pages))
+        self.assertEqual(pager.page_at(0), 0)
+        self.assertEqual(pager.page_at(len(text)), len(pages) - 1)
+        self.assertFalse(pager.has_page(len(pages)))
+        print("✅ 分页正确")
+    
+    def test_long_line_is_split(self):
+        """没有换行的长段落按字数切分"""
+        pager = self.TextPager("字" * 2500, page_chars=1000)
+        self.assertEqual([len(pager.page(i)) for i in range(pager.page_count)], [1000, 1000, 500])
+        self.assertEqual(self.TextPager("", page_chars=1000).page(0), "")
+        print("✅ 长段落切分正确")
+    
+    def test_open_time_independent_of_length(self):
+        """打开时只计算用到的页，不扫描全文"""
+        text = PARAGRAPH * 400000  # 约1000万字
+        start = time.perf_counter()
+        pager = self.TextPager(text)
+        first = pager.page(0)
+        elapsed = time.perf_counter() - start
+        self.assertTrue(first)
+        self.assertLessEqual(pager.known_pages, 2)
+        self.assertFalse(pager.complete)
+        self.assertLess(elapsed, 0.01)
+        print(f"✅ 打开长文本只计算首页（{elapsed * 1000:.2f} ms）")
+
+
+class TestPagedTextView(unittest.TestCase):
+    """分页文本视图测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        try:
+            from PyQt5.QtWidgets import QApplication
+            from ui.text_reader import PagedTextView
+        except ImportError as e:
+            self.skipTest(f"PyQt5 不可用: {e}")
+        self.app = QApplication.instance() or QApplication([])
+        self.PagedTextView = PagedTextView
+    
+    def test_keeps_bounded_window(self):
+        """滚动到底部时载入后续页，视图中最多保留max_pages页"""
+        text = PARAGRAPH * 20000
+        view = self.PagedTextView(text, page_chars=2000, max_pages=3)
+        view.resize(600, 400)
+        self.assertEqual(view.loaded_pages, (0, 1))
+        
+        bar = view.verticalScrollBar()
+        for _ in range(10):
+            bar.setValue(bar.maximum())
+        first, last = view.loaded_pages
+        self.assertGreater(last, 3)
+        self.assertLessEqual(last - first + 1, 3)
+        self.assertLessEqual(len(view.toPlainText()), 3 * 2000)
+        
+        view.show_page(50)
+        self.assertIn(50, range(view.loaded_pages[0], view.loaded_pages[1] + 1))
+        print("✅ 视图页数有上限")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则总结器测试
+验证单次分词的TextRank总结结果格式、关键词和稳定性
+"""
+
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_CHAPTER = """
+张无忌自从学会了乾坤大挪移和太极拳，武功大进，现在终于可以为父母报仇了。
+他来到了光明顶，看到了阳顶天留下的七个字“光明正大，洗刷污垢”，心中感慨万千。
+这时，赵敏带着一群蒙古兵闯了进来，张无忌立即迎上前去，二人战在一处。
+赵敏出招狠辣，张无忌则招招相让，不愿伤她。
+战了几十招，张无忌以乾坤大挪移化解了赵敏的招式，并点中了她的穴道。
+“张教主，你为何不杀我？”赵敏问道。
+张无忌叹了口气：“我与姑娘无冤无仇，又怎会取你性命？”
+赵敏心中感动，从此对张无忌芳心暗许。
+"""
+
+
+class TestTextSummarizer(unittest.TestCase):
+    """规则总结器测试类"""
+    
+    def setUp(self):
+        """测试前准备"""
+        try:
+            import ai_summary
+        except ImportError as e:
+            self.skipTest(f"无法导入总结模块: {e}")
+        self.ai_summary = ai_summary
+        self.summarizer = ai_summary.TextSummarizer()
+    
+    def test_summarize_output(self):
+        """总结结果字典结构不变"""
+        info = self.summarizer.summarize(SAMPLE_CHAPTER)
+        self.assertEqual(set(info), {"summary", "keywords", "important_sentences", "ratio"})
+        self.assertIn("张无忌", info["keywords"])
+        self.assertEqual(len(info["important_sentences"]), 3)
+        self.assertTrue(info["summary"].startswith("【内容概要】"))
+        print("✅ 总结结果格式正确")
+    
+    def test_keywords_match_jieba(self):
+        """单次分词得到的关键词与jieba.analyse.extract_tags一致"""
+        text = SAMPLE_CHAPTER.replace("\n\n", "\n").strip()
+        analysis = self.summarizer.analyze(text)
+        expected = [word for word, _ in self.summarizer.extract_keywords(text, topK=8)]
+        self.assertEqual([word for word, _ in analysis.keywords[:8]], expected)
+        print("✅ 关键词与jieba一致")
+    
+    def test_text_segmented_once(self):
+        """summarize对每个句子只分词一次，不再调用extract_tags"""
+        jieba = self.ai_summary.get_jieba()
+        with patch.object(jieba, 'cut', wraps=jieba.cut) as cut, \
+                patch.object(jieba.analyse, 'extract_tags') as extract_tags:
+            self.summarizer.summarize(SAMPLE_CHAPTER)
+            sentence_count = len(self.summarizer.split_sentences(SAMPLE_CHAPTER.strip()))
+            self.assertEqual(cut.call_count, sentence_count)
+            extract_tags.assert_not_called()
+        print("✅ 全文只分词一次")
+    
+    def test_deterministic_and_fallback(self):
+        """结果稳定，无NumPy时回退到关键词打分"""
+        first = self.summarizer.summarize(SAMPLE_CHAPTER)
+        second = self.summarizer.summarize(SAMPLE_CHAPTER)
+        self.assertEqual(first, second)
+        
+        with patch.object(self.ai_summary, 'NUMPY_AVAILABLE', False):
+            fallback = self.summarizer.summarize(SAMPLE_CHAPTER)
+        self.assertEqual(len(fallback["important_sentences"]), len(first["important_sentences"]))
+        print("✅ 总结结果稳定")
+    
+    def test_summarize_batch_matches_sequential(self):
+        """进程池批量总结与逐章总结结果一致且顺序不变"""
+        chapters = [SAMPLE_CHAPTER, SAMPLE_CHAPTER.replace("赵敏", "周芷若"), "短文本。",
+                    SAMPLE_CHAPTER.replace("光明顶", "少林寺")]
+        expected = [self.summarizer.summarize(text) for text in chapters]
+        self.assertEqual(self.summarizer.summarize_batch(chapters, workers=2), expected)
+        self.assertEqual(self.summarizer.summarize_batch(chapters, workers=1), expected)
+        self.assertEqual(self.summarizer.summarize_batch([]), [])
+        print("✅ 批量总结结果一致")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+长文本分页
+按段落边界把文本切分为页，页的起点在访问到时才计算，
+打开任意长度的文本都只需扫描第一页
+"""
+
+import bisect
+
+# 每页的目标字符数
+DEFAULT_PAGE_CHARS = 4000
+
+
+class TextPager:
+    """长文本分页器（只保存每页的起始位置，不复制文本）"""
+
+    def __init__(self, text, page_chars=DEFAULT_PAGE_CHARS):
+        """初始化分页器
+
+        Args:
+            text: 全文
+            page_chars: 每页的目标字符数，实际页长在其一半到全长之间，优先在换行处分页
+        """
+        self.text = text or ''
+        self.page_chars = max(1, page_chars)
+        self._starts = [0]
+        self._complete = len(self.text) <= self.page_chars
+
+    @property
+    def complete(self):
+        """是否已知全部页"""
+        return self._complete
+
+    @property
+    def known_pages(self):
+        """目前已计算出的页数"""
+        return len(self._starts)
+
+    @property
+    def page_count(self):
+        """总页数（需要扫描全文，只在需要时调用）"""
+        while not self._complete:
+            self._extend()
+        return len(self._starts)
+
+    def _extend(self):
+        """计算下一页的起点"""
+        start = self._starts[-1]
+        end = start + self.page_chars
+        if end >= len(self.text):
+            self._complete = True
+            return
+        # 在后半页内找最后一个换行，找不到时按字数截断
+        cut = self.text.rfind('\n', start + self.page_chars // 2, end)
+        cut = end if cut == -1 else cut + 1
+        self._starts.append(cut)
+        if cut >= len(self.text):
+            self._starts.pop()
+            self._complete = True
+
+    def has_page(self, index):
+        """第index页（从0开始）是否存在"""
+        if index < 0:
+            return False
+        while len(self._starts) <= index and not self._complete:
+            self._extend()
+        return index < len(self._starts)
+
+    def page_range(self, index):
+        """第index页在全文中的 (起点, 终点)"""
+        if not self.has_page(index):
+            raise IndexError(f"页码超出范围: {index}")
+        self.has_page(index + 1)
+        end = self._starts[index + 1] if index + 1 < len(self._starts) else len(self.text)
+        return self._starts[index], end
+
+    def page(self, index):
+        """第index页的文本"""
+        start, end = self.page_range(index)
+        return self.text[start:end]
+
+    def page_at(self, offset):
+        """全文位置offset所在的页码"""
+        offset = max(0, min(offset, len(self.text)))
+        while not self._complete and self._starts[-1] <= offset:
+            self._extend()
+        return bisect.bisect_right(self._starts, offset) - 1
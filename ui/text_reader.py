@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分页文本阅读视图
+视图中只保留当前位置附近的若干页，滚动接近边缘时载入相邻页并移除远处的页，
+打开耗时和占用的内存与全文长度无关
+"""
+
+from PyQt5.QtCore import Qt, QPoint, pyqtSignal
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtWidgets import QDialog, QHBoxLayout, QLabel, QPlainTextEdit, QPushButton, QVBoxLayout
+
+from ui.text_pager import TextPager, DEFAULT_PAGE_CHARS
+
+# 视图中同时保留的最大页数
+DEFAULT_MAX_PAGES = 5
+
+
+def _qt_length(text):
+    """文本在QTextDocument中占用的位置数（按UTF-16计算）"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+class PagedTextView(QPlainTextEdit):
+    """只渲染可见范围附近若干页的只读文本视图"""
+
+    page_changed = pyqtSignal(int)  # 当前页码（从0开始）
+
+    def __init__(self, text='', page_chars=DEFAULT_PAGE_CHARS, max_pages=DEFAULT_MAX_PAGES, parent=None):
+        """初始化视图
+
+        Args:
+            text: 全文
+            page_chars: 每页的目标字符数
+            max_pages: 视图中同时保留的最大页数（至少3页）
+            parent: 父控件
+        """
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.page_chars = page_chars
+        self.max_pages = max(3, max_pages)
+        self.pager = None
+        self._first = 0
+        self._lengths = []
+        self._current = -1
+        self._adjusting = False
+        self.verticalScrollBar().valueChanged.connect(self._on_scroll)
+        self.set_text(text)
+
+    @property
+    def loaded_pages(self):
+        """视图中当前载入的页码范围 (首页, 末页)"""
+        return self._first, self._first + len(self._lengths) - 1
+
+    def set_text(self, text):
+        """显示新的全文（只载入开头的页）"""
+        self.pager = TextPager(text, self.page_chars)
+        self.clear()
+        self._lengths = []
+        self._current = -1
+        self.show_page(0)
+
+    def show_page(self, index):
+        """跳转到第index页"""
+        if not self.pager.has_page(index):
+            return
+        self._adjusting = True
+        try:
+            self.clear()
+            self._first = index
+            self._lengths = []
+            self._append_page()
+            # 多载入一页，保证首屏能够滚动
+            self._append_page()
+            if index > 0:
+                self._prepend_page()
+            start = sum(self._lengths[:index - self._first])
+            cursor = self.textCursor()
+            cursor.setPosition(start)
+            self.setTextCursor(cursor)
+            bar = self.verticalScrollBar()
+            bar.setValue(bar.maximum())
+            self.ensureCursorVisible()
+        finally:
+            self._adjusting = False
+        self._update_current_page()
+
+    def _append_page(self):
+        index = self._first + len(self._lengths)
+        if not self.pager.has_page(index):
+            return False
+        text = self.pager.page(index)
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self._lengths.append(_qt_length(text))
+        return True
+
+    def _prepend_page(self):
+        if self._first == 0:
+            return False
+        bar = self.verticalScrollBar()
+        value, maximum = bar.value(), bar.maximum()
+        self._first -= 1
+        text = self.pager.page(self._first)
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.Start)
+        cursor.insertText(text)
+        self._lengths.insert(0, _qt_length(text))
+        # 保持可见内容不动：滚动条范围增加多少，位置就后移多少
+        bar.setValue(value + bar.maximum() - maximum)
+        return True
+
+    def _drop_first_page(self):
+        bar = self.verticalScrollBar()
+        value, maximum = bar.value(), bar.maximum()
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.Start)
+        cursor.setPosition(self._lengths[0], QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        self._lengths.pop(0)
+        self._first += 1
+        bar.setValue(value - (maximum - bar.maximum()))
+
+    def _drop_last_page(self):
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.setPosition(sum(self._lengths[:-1]), QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        self._lengths.pop()
+
+    def _on_scroll(self, value):
+        if self._adjusting:
+            return
+        bar = self.verticalScrollBar()
+        margin = max(bar.pageStep(), 1)
+        self._adjusting = True
+        try:
+            if value >= bar.maximum() - margin and self._append_page():
+                if len(self._lengths) > self.max_pages:
+                    self._drop_first_page()
+            elif value <= margin and self._prepend_page():
+                if len(self._lengths) > self.max_pages:
+                    self._drop_last_page()
+        finally:
+            self._adjusting = False
+        self._update_current_page()
+
+    def current_page(self):
+        """视图顶部所在的页码"""
+        position = self.cursorForPosition(QPoint(0, 0)).position()
+        for offset, length in enumerate(self._lengths):
+            if position < length:
+                return self._first + offset
+            position -= length
+        return self._first + max(len(self._lengths) - 1, 0)
+
+    def _update_current_page(self):
+        page = self.current_page()
+        if page != self._current:
+            self._current = page
+            self.page_changed.emit(page)
+
+
+class TextReaderDialog(QDialog):
+    """分页阅读对话框：文本视图、页码和翻页按钮，可追加自定义按钮"""
+
+    def __init__(self, title, text, parent=None, page_chars=DEFAULT_PAGE_CHARS):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setGeometry(150, 150, 900, 700)
+
+        layout = QVBoxLayout(self)
+        self.view = PagedTextView(text, page_chars, parent=self)
+        layout.addWidget(self.view)
+
+        self.button_layout = QHBoxLayout()
+        prev_btn = QPushButton("◀ 上一页")
+        prev_btn.clicked.connect(lambda: self.view.show_page(self.view.current_page() - 1))
+        self.button_layout.addWidget(prev_btn)
+        self.page_label = QLabel()
+        self.page_label.setAlignment(Qt.AlignCenter)
+        self.button_layout.addWidget(self.page_label)
+        next_btn = QPushButton("下一页 ▶")
+        next_btn.clicked.connect(lambda: self.view.show_page(self.view.current_page() + 1))
+        self.button_layout.addWidget(next_btn)
+        self.button_layout.addStretch()
+        layout.addLayout(self.button_layout)
+
+        self.view.page_changed.connect(self._update_page_label)
+        self._update_page_label(self.view.current_page())
+
+    def _update_page_label(self, page):
+        pager = self.view.pager
+        # 总页数未知时不扫描全文
+        total = pager.known_pages if pager.complete else "…"
+        self.page_label.setText(f"第 {page + 1} 页 / 共 {total} 页（{len(pager.text)} 字）")
+
+    def add_button(self, text, callback):
+        """在按钮区域末尾追加按钮"""
+        button = QPushButton(text)
+        button.clicked.connect(callback)
+        self.button_layout.addWidget(button)
+        return button